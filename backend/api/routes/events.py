@@ -37,6 +37,14 @@ from backend.core.utils import (
 
 # Import Repository pattern for data access
 from backend.core.data_access import Repositories
+from backend.core.database.fulltext import match_condition
+from backend.core.database.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    keyset_condition,
+    paginate_rows,
+)
+from backend.core.cache.cache_system import hierarchical_cache
 
 sys.path.append("..")
 try:
@@ -64,6 +72,68 @@ from .. import api_bp
 
 logger = logging.getLogger(__name__)
 
+# Keyset sort key of GET /api/events (must match its ORDER BY)
+EVENTS_SORT_KEYS = [("le.id", "DESC")]
+
+# Total counts are cached briefly; pages themselves are always fresh
+EVENTS_COUNT_CACHE_TTL = 60
+
+
+def _event_filters(game_gid, search):
+    """
+    WHERE clause and parameters shared by the events listing and its count
+
+    Args:
+        game_gid: Game GID filter (None for all games)
+        search: Search keyword ("" for none)
+
+    Returns:
+        Tuple of (where_sql, params); where_sql is "" when there is no filter
+    """
+    where_clauses = []
+    params = []
+
+    # Game filter
+    if game_gid:
+        where_clauses.append("le.game_gid = ?")
+        params.append(game_gid)
+
+    # Search filter
+    if search:
+        # Event names via the FTS5 index (LIKE fallback), category names via LIKE
+        name_condition, name_params = match_condition(
+            "events", search, "le.id", ["le.event_name", "le.event_name_cn"]
+        )
+        where_clauses.append(f"({name_condition} OR ec.name LIKE ?)")
+        params.extend(name_params + [f"%{search}%"])
+
+    where_sql = " WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+    return where_sql, params
+
+
+def count_events(game_gid, search):
+    """
+    Count events matching the listing filters (the events.count cache loader)
+
+    Args:
+        game_gid: Game GID filter (None for all games)
+        search: Search keyword ("" for none)
+
+    Returns:
+        int: Number of matching events
+    """
+    where_sql, params = _event_filters(game_gid, search)
+    count_query = (
+        "SELECT COUNT(*) as total FROM log_events le "
+        "LEFT JOIN event_categories ec ON le.category_id = ec.id" + where_sql
+    )
+    total_result = fetch_one_as_dict(count_query, tuple(params))
+    return total_result["total"] if total_result else 0
+
+
+# Stale-while-revalidate refreshes and hot-key warmup reuse the same loader
+hierarchical_cache.register_loader("events.count", count_events, ttl=EVENTS_COUNT_CACHE_TTL)
+
 
 @api_bp.route("/api/events", methods=["GET"])
 def api_list_events() -> Tuple[Dict[str, Any], int]:
@@ -75,6 +145,11 @@ def api_list_events() -> Tuple[Dict[str, Any], int]:
         - page: Page number (default: 1)
         - per_page: Items per page (default: 20, max: 100)
         - search: Search keyword for event names (optional)
+        - cursor: Opaque keyset cursor from a previous response's next_cursor
+          (optional; empty value requests the first page). Replaces page/OFFSET
+          so deep pages cost the same as the first one
+        - include_total: Whether to return the (cached) total count
+          (default: true in page mode, false in cursor mode)
 
     Returns:
         Tuple containing response dictionary and HTTP status code
@@ -88,7 +163,9 @@ def api_list_events() -> Tuple[Dict[str, Any], int]:
                     "page": 1,
                     "per_page": 20,
                     "total": 100,
-                    "total_pages": 5
+                    "total_pages": 5,
+                    "has_more": true,
+                    "next_cursor": "eyJ2IjoxLCJrIjpbMTIzXX0"
                 }
             }
         }
@@ -99,6 +176,9 @@ def api_list_events() -> Tuple[Dict[str, Any], int]:
     page = safe_int_convert(request.args.get("page"), 1, 1)
     per_page = safe_int_convert(request.args.get("per_page"), 20, 1)
     search = request.args.get("search", "").strip()
+    cursor_mode = "cursor" in request.args
+    include_total = request.args.get("include_total", "false" if cursor_mode else "true")
+    include_total = include_total.lower() in ("1", "true", "yes")
 
     # Validate pagination parameters
     if page < 1:
@@ -109,63 +189,61 @@ def api_list_events() -> Tuple[Dict[str, Any], int]:
         per_page = 100
     offset = (page - 1) * per_page
 
+    try:
+        after = decode_cursor(request.args.get("cursor"), len(EVENTS_SORT_KEYS))
+    except InvalidCursorError as e:
+        return json_error_response(str(e), status_code=400)
+
     # Build base query
     query = """
         SELECT
             le.*,
             g.gid, g.name as game_name, g.ods_db,
             ec.name as category_name,
-            (SELECT COUNT(*) FROM event_params ep
-             WHERE ep.event_id = le.id AND ep.is_active = 1) as param_count
+            COALESCE(es.param_count, 0) as param_count
         FROM log_events le
         LEFT JOIN games g ON le.game_gid = g.gid
         LEFT JOIN event_categories ec ON le.category_id = ec.id
+        LEFT JOIN event_stats es ON es.event_id = le.id
     """
 
-    # Build WHERE clauses and parameters
-    where_clauses = []
-    params = []
-
-    # Game filter
-    if game_gid:
-        where_clauses.append("le.game_gid = ?")
-        params.append(game_gid)
+    # Build WHERE clause and parameters
+    where_sql, params = _event_filters(game_gid, search)
+
+    # Total count is optional; cached briefly since it scans every matching row
+    total_events = None
+    if include_total:
+        total_events = hierarchical_cache.get_or_load(
+            "events.count",
+            lambda: count_events(game_gid, search),
+            ttl=EVENTS_COUNT_CACHE_TTL,
+            game_gid=game_gid,
+            search=search,
+        )
 
-    # Search filter
-    if search:
-        where_clauses.append("(le.event_name LIKE ? OR le.event_name_cn LIKE ? OR ec.name LIKE ?)")
-        search_pattern = f"%{search}%"
-        params.extend([search_pattern, search_pattern, search_pattern])
-
-    # Construct WHERE clause
-    if where_clauses:
-        where_sql = " WHERE " + " AND ".join(where_clauses)
-        query += where_sql
-
-    # Get total count with filters
-    count_query = "SELECT COUNT(*) as total FROM log_events le LEFT JOIN event_categories ec ON le.category_id = ec.id"
-    if where_clauses:
-        count_query += where_sql
-    total_result = fetch_one_as_dict(count_query, tuple(params))
+    # Keyset condition replaces OFFSET in cursor mode
+    if cursor_mode:
+        keyset_sql, keyset_params = keyset_condition(EVENTS_SORT_KEYS, after)
+        where_sql += (" AND " if where_sql else " WHERE ") + keyset_sql
+        params.extend(keyset_params)
+        offset = 0
+
+    # Add ORDER BY and pagination (one extra row tells whether more pages exist)
+    query += where_sql + " ORDER BY le.id DESC LIMIT ? OFFSET ?"
+    events = fetch_all_as_dict(query, tuple(params + [per_page + 1, offset]))
+    events, next_cursor = paginate_rows(events, per_page, lambda row: [row["id"]])
+
+    pagination = {
+        "page": None if cursor_mode else page,
+        "per_page": per_page,
+        "has_more": next_cursor is not None,
+        "next_cursor": next_cursor,
+    }
+    if total_events is not None:
+        pagination["total"] = total_events
+        pagination["total_pages"] = max(1, (total_events + per_page - 1) // per_page)
 
-    # Add ORDER BY and pagination
-    query += " ORDER BY le.id DESC LIMIT ? OFFSET ?"
-    events = fetch_all_as_dict(query, tuple(params + [per_page, offset]))
-
-    total_events = total_result["total"] if total_result else 0
-    total_pages = max(1, (total_events + per_page - 1) // per_page)
-
-    return json_success_response(
-        data={
-            "events": events,
-            "pagination": {
-                "page": page,
-                "per_page": per_page,
-                "total": total_events,
-                "total_pages": total_pages,
-            },
-        }
-    )
+    return json_success_response(data={"events": events, "pagination": pagination})
 
 
 @api_bp.route("/api/events", methods=["POST"])
@@ -276,6 +354,7 @@ def api_create_event():
                 )
 
         clear_cache_pattern("dashboard_statistics")
+        clear_cache_pattern("events.count")
         logger.info(f"Event created: {data['event_name']} (ID: {event_id})")
         return json_success_response(
             data={"event_id": event_id}, message="Event created successfully"
@@ -89,7 +89,8 @@ def api_list_games() -> Tuple[Dict[str, Any], int]:
     PERFORMANCE OPTIMIZATION:
     This endpoint was optimized to eliminate N+1 query problem and implement caching.
     - Previous implementation used 4 correlated subqueries per game (212+ queries for 53 games)
-    - Now uses LEFT JOINs with GROUP BY to aggregate all data in a single query
+    - Counts come from the trigger-maintained game_stats table (backend.core.database.stats),
+      one primary-key lookup per game instead of a COUNT(DISTINCT) join fan-out
     - Implements Flask-Caching with Redis backend for sub-10ms response times
     - Cache TTL: 1 hour (static data)
     - Cache key: "games:list:v1"
@@ -143,16 +144,12 @@ def api_list_games() -> Tuple[Dict[str, Any], int]:
             g.icon_path,
             g.created_at,
             g.updated_at,
-            COUNT(DISTINCT le.id) as event_count,
-            COUNT(DISTINCT CASE WHEN ep.is_active = 1 THEN ep.id END) as param_count,
-            COUNT(DISTINCT enc.id) as event_node_count,
-            COUNT(DISTINCT CASE WHEN ft.is_active = 1 THEN ft.id END) as flow_template_count
+            COALESCE(gs.event_count, 0) as event_count,
+            COALESCE(gs.param_count, 0) as param_count,
+            COALESCE(gs.event_node_count, 0) as event_node_count,
+            COALESCE(gs.flow_template_count, 0) as flow_template_count
         FROM games g
-        LEFT JOIN log_events le ON le.game_gid = g.gid
-        LEFT JOIN event_params ep ON ep.event_id = le.id
-        LEFT JOIN event_node_configs enc ON enc.game_gid = CAST(g.gid AS INTEGER)
-        LEFT JOIN flow_templates ft ON ft.game_id = g.id
-        GROUP BY g.id, g.gid, g.name, g.ods_db, g.icon_path, g.created_at, g.updated_at
+        LEFT JOIN game_stats gs ON gs.game_id = g.id
         ORDER BY g.id
     """)
 
@@ -419,17 +416,18 @@ def execute_cascade_delete(
     Returns:
         (响应字典, HTTP状态码)
     """
-    from backend.core.database import get_db_connection
+    from backend.core.database.routing import write_transaction
+    from backend.core.database.write_behind import synchronous_writes
 
     game_gid = game["gid"]
     game_id = game["id"]
 
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        try:
-            cursor.execute("BEGIN IMMEDIATE")  # 立即锁，防止并发修改
+        # 多语句事务绕过write-behind队列：先提交已排队的写入，事务期间暂停写线程；
+        # write_transaction 在串行写连接上以 BEGIN IMMEDIATE 开启事务（立即锁，防止并发修改），
+        # 正常退出时提交，异常时回滚
+        with synchronous_writes(), write_transaction() as conn:
+            cursor = conn.cursor()
 
             # 验证游戏仍然存在（防止已被其他请求删除）
             cursor.execute(
@@ -438,7 +436,6 @@ def execute_cascade_delete(
             game_exists = cursor.fetchone()
 
             if not game_exists:
-                conn.rollback()
                 return json_error_response(
                     "Game not found (may have been deleted)",
                     status_code=404
@@ -464,30 +461,21 @@ def execute_cascade_delete(
             # 4. 删除游戏记录（在同一事务中完成）
             cursor.execute("DELETE FROM games WHERE id = ?", (game_id,))
 
-            conn.commit()
-
-            logger.info(
-                f"Cascade deleted game {game['name']} (GID: {game_gid}): "
-                f"{impact['event_count']} events, "
-                f"{impact['param_count']} params, "
-                f"{impact['node_config_count']} node configs"
-            )
-
-            return json_success_response(
-                message="Game and all associated data deleted successfully",
-                data={
-                    "deleted_event_count": impact["event_count"],
-                    "deleted_param_count": impact["param_count"],
-                    "deleted_node_config_count": impact["node_config_count"]
-                }
-            )
-
-        except Exception as e:
-            conn.rollback()
-            raise e
+        logger.info(
+            f"Cascade deleted game {game['name']} (GID: {game_gid}): "
+            f"{impact['event_count']} events, "
+            f"{impact['param_count']} params, "
+            f"{impact['node_config_count']} node configs"
+        )
 
-        finally:
-            conn.close()
+        return json_success_response(
+            message="Game and all associated data deleted successfully",
+            data={
+                "deleted_event_count": impact["event_count"],
+                "deleted_param_count": impact["param_count"],
+                "deleted_node_config_count": impact["node_config_count"]
+            }
+        )
 
     except Exception as e:
         logger.error(f"Error cascade deleting game: {e}")
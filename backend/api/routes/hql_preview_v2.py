@@ -4,7 +4,10 @@ HQL Preview V2 API Blueprint
 新的HQL预览API，与现有API并行运行
 """
 
-from flask import Blueprint, request, jsonify
+import json
+import time
+
+from flask import Blueprint, Response, request, jsonify
 from typing import Dict, Any
 
 # Import HQL V2 core service
@@ -19,6 +22,8 @@ from backend.api.routes._hql_helpers import (
     build_success_response,
 )
 from backend.core.utils import success_response, error_response
+from backend.core.config import HQLConfig
+from backend.core.database.pagination import InvalidCursorError
 
 hql_preview_v2_bp = Blueprint("hql_preview_v2", __name__)
 
@@ -61,7 +66,8 @@ def generate_hql_v2():
         "options": {
             "mode": "single",
             "sql_mode": "VIEW",
-            "include_comments": true
+            "include_comments": true,
+            "use_json_tuple": false   // 可选，顶层参数合并为一个 LATERAL VIEW json_tuple
         }
     }
 
@@ -167,6 +173,8 @@ def generate_hql_v2():
                     "subqueryCount": report.metrics.subquery_count,
                     "udfCount": report.metrics.udf_count,
                     "complexity": report.metrics.complexity,
+                    "jsonParsesPerRow": report.metrics.json_parses_per_row,
+                    "jsonParsesSaved": report.metrics.json_parses_saved,
                 },
             }
 
@@ -177,6 +185,135 @@ def generate_hql_v2():
         return handle_hql_generation_error(e, "generate_hql_v2")
 
 
+@hql_preview_v2_bp.route("/hql-preview-v2/api/generate-batch", methods=["POST"])
+def generate_hql_batch():
+    """
+    批量HQL生成API（NDJSON流式返回）
+
+    一次请求生成N个配置：所有事件和游戏用集合查询一次性解析，生成任务分发到
+    线程/进程池（由 HQL_BATCH_USE_PROCESSES 决定），结果按完成顺序逐行返回
+    （每行一个JSON对象），单项失败只影响该项。
+
+    Request Body:
+    {
+        "items": [
+            {
+                "id": "dwd_login",            // 可选，原样返回（默认为序号）
+                "events": [{"game_gid": 10000147, "event_id": 1}],
+                "fields": [...],
+                "where_conditions": [...],
+                "options": {"mode": "single"}
+            },
+            ...
+        ],
+        "options": {"include_comments": false},   // 可选，所有项的默认选项
+        "max_workers": 8                           // 可选，不超过 HQL_BATCH_WORKERS
+    }
+
+    Response (application/x-ndjson):
+        {"index": 0, "id": "dwd_login", "success": true, "hql": "SELECT ..."}
+        {"index": 3, "id": 3, "success": false, "error": "Event not found: id=42"}
+        ...
+        {"summary": {"total": 10000, "succeeded": 9998, "failed": 2, "elapsed_ms": 5321.4}}
+    """
+    is_valid, data, error = parse_json_request()
+    if not is_valid:
+        return jsonify(error_response(error, status_code=400)[0]), 400
+
+    is_valid, error = validate_required_fields(data, ["items"])
+    if not is_valid:
+        return jsonify(error_response(error, status_code=400)[0]), 400
+
+    items = data["items"]
+    if not isinstance(items, list) or not items:
+        return jsonify(error_response("items must be a non-empty list", status_code=400)[0]), 400
+    if len(items) > HQLConfig.BATCH_MAX_ITEMS:
+        return jsonify(
+            error_response(
+                f"Too many items: {len(items)} (max {HQLConfig.BATCH_MAX_ITEMS})", status_code=400
+            )[0]
+        ), 400
+
+    default_options = data.get("options") or {}
+    try:
+        max_workers = int(data.get("max_workers") or HQLConfig.BATCH_WORKERS)
+    except (ValueError, TypeError):
+        return jsonify(error_response("max_workers must be an integer", status_code=400)[0]), 400
+    # 并发数和进程池由服务端配置决定，客户端只能调低
+    max_workers = min(max(max_workers, 1), HQLConfig.BATCH_WORKERS)
+
+    start = time.perf_counter()
+
+    # 1. 集合查询：一次解析所有项引用的事件和游戏
+    refs = []
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get("events"), list):
+            continue
+        for event in item["events"]:
+            # 与单条接口相同：顶层game_gid合并到未指定game_gid的事件
+            if isinstance(event, dict) and "game_gid" in item and "game_gid" not in event:
+                event["game_gid"] = item["game_gid"]
+        refs.extend(ProjectAdapter.project_refs(item["events"]))
+    project_events = ProjectAdapter.events_from_project_batch(refs)
+
+    # 2. 惰性转换每一项：只有在途的配置驻留内存，转换失败的项记为错误结果
+    errors = []
+
+    def iter_configs():
+        for index, item in enumerate(items):
+            item_id = item.get("id", index) if isinstance(item, dict) else index
+            try:
+                if not isinstance(item, dict) or not item.get("events") or not item.get("fields"):
+                    raise ValueError("events and fields are required")
+                events = ProjectAdapter.events_from_api_request(item["events"], project_events)
+                config = {
+                    "key": (index, item_id),
+                    "events": events,
+                    "fields": ProjectAdapter.fields_from_api_request(item["fields"]),
+                    "conditions": ProjectAdapter.conditions_from_api_request(
+                        item.get("where_conditions", [])
+                    ),
+                    "options": dict(default_options, **(item.get("options") or {})),
+                }
+            except Exception as e:
+                errors.append({"index": index, "id": item_id, "success": False, "error": str(e)})
+                continue
+            yield config
+
+    # 3. 流式返回：生成结果按完成顺序逐行输出，内存占用与批次大小无关
+    def stream():
+        succeeded = 0
+        generator = HQLGenerator()
+        results = generator.generate_batch(
+            iter_configs(),
+            max_workers=max_workers,
+            use_processes=HQLConfig.BATCH_USE_PROCESSES,
+            max_pending=max_workers * 4,
+        )
+        for result in results:
+            while errors:
+                yield json.dumps(errors.pop(0), ensure_ascii=False) + "\n"
+            index, item_id = result["key"]
+            line = {"index": index, "id": item_id, "success": "error" not in result}
+            if line["success"]:
+                line["hql"] = result["hql"]
+                succeeded += 1
+            else:
+                line["error"] = result["error"]
+            yield json.dumps(line, ensure_ascii=False) + "\n"
+        while errors:
+            yield json.dumps(errors.pop(0), ensure_ascii=False) + "\n"
+        summary = {
+            "total": len(items),
+            "succeeded": succeeded,
+            "failed": len(items) - succeeded,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+        yield json.dumps({"summary": summary}) + "\n"
+
+    return Response(stream(), mimetype="application/x-ndjson")
+
+
 @hql_preview_v2_bp.route("/hql-preview-v2/api/generate-debug", methods=["POST"])
 def generate_hql_debug():
     """
@@ -606,8 +743,9 @@ def cache_stats():
     返回LRU缓存的详细统计信息
 
     Returns:
-        缓存统计：大小、命中率、未命中数等
+        缓存统计：大小、命中率、未命中数等；fragment_caches 为字段/条件SQL片段缓存的统计
     """
+    from backend.services.hql.builders.fragment_cache import CONDITION_FRAGMENTS, FIELD_FRAGMENTS
     from backend.services.hql.core.cache import get_global_cache
 
     cache = get_global_cache()
@@ -622,6 +760,10 @@ def cache_stats():
                 "cache_misses": stats["misses"],
                 "hit_rate": stats["hit_rate"],
                 "keys_count": len(cache.get_keys()),
+                "fragment_caches": {
+                    "fields": FIELD_FRAGMENTS.get_stats(),
+                    "conditions": CONDITION_FRAGMENTS.get_stats(),
+                },
             }
         )[0]
     )
@@ -632,14 +774,16 @@ def cache_clear():
     """
     清空缓存API
 
-    清空LRU缓存中的所有条目
+    清空LRU缓存中的所有条目（包括字段/条件SQL片段缓存）
 
     Returns:
         操作结果
     """
+    from backend.services.hql.builders import clear_fragment_caches
     from backend.services.hql.core.cache import clear_global_cache
 
     clear_global_cache()
+    clear_fragment_caches()
 
     return jsonify(success_response(data={"message": "Cache cleared successfully"})[0])
 
@@ -973,6 +1117,7 @@ def get_history_list():
         session_id: 会话ID (可选，优先级高于user_id)
         limit: 返回数量限制 (default: 50)
         offset: 偏移量 (default: 0)
+        cursor: 游标分页（可选，空值表示第一页；传回上一页的next_cursor，忽略offset）
 
     Response:
     {
@@ -988,7 +1133,9 @@ def get_history_list():
                     ...
                 }
             ],
-            "count": 1
+            "count": 1,
+            "next_cursor": "...",  // 仅游标模式
+            "has_more": true       // 仅游标模式
         }
     }
     """
@@ -1002,6 +1149,24 @@ def get_history_list():
         limit = request.args.get("limit", 50, type=int)
         offset = request.args.get("offset", 0, type=int)
 
+        if "cursor" in request.args:
+            try:
+                history_list, next_cursor = service.get_history_page(
+                    user_id=user_id,
+                    session_id=session_id,
+                    limit=limit,
+                    cursor=request.args.get("cursor"),
+                )
+            except InvalidCursorError as e:
+                return jsonify(error_response(str(e), status_code=400)[0]), 400
+            data = {
+                "history": history_list,
+                "count": len(history_list),
+                "next_cursor": next_cursor,
+                "has_more": next_cursor is not None,
+            }
+            return jsonify(success_response(data=data)[0])
+
         history_list = service.get_history_list(
             user_id=user_id, session_id=session_id, limit=limit, offset=offset
         )
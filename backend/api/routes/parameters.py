@@ -51,6 +51,13 @@ from backend.core.cache.cache_system import (
     CacheInvalidator,
     CacheKeyBuilder,
 )
+from backend.core.database.fulltext import match_condition
+from backend.core.database.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    keyset_condition,
+    paginate_rows,
+)
 
 # Import the parent blueprint
 from .. import api_bp
@@ -65,6 +72,135 @@ PARAMETERS_ALL_CACHE_TTL = 300  # 5 minutes for parameters list
 PARAMETERS_DETAILS_CACHE_TTL = 600  # 10 minutes for parameter details
 PARAMETERS_STATS_CACHE_TTL = 300  # 5 minutes for stats
 
+# Keyset sort key of GET /api/parameters/all (must match its ORDER BY)
+PARAMETERS_ALL_SORT_KEYS = [
+    ("COUNT(*)", "DESC"),
+    ("ep.param_name", "ASC"),
+    ("COALESCE(pt.base_type, '')", "ASC"),
+]
+
+
+def load_all_parameters(
+    game_id, search, param_type, page, cursor, limit, include_total, game_gid=None
+):
+    """
+    Load one page of GET /api/parameters/all (the parameters.all cache loader)
+
+    Called with exactly the cache key parameters, so it is registered as the
+    parameters.all loader for stale-while-revalidate refreshes and hot-key warmup.
+
+    Args:
+        game_id: Game database ID
+        search: Search keyword ("" for none)
+        param_type: Base type filter ("" for none)
+        page: Page number (None in cursor mode)
+        cursor: Keyset cursor (None in page mode, "" for the first cursor page)
+        limit: Page size
+        include_total: Whether to run the COUNT query
+        game_gid: Business GID if already resolved (looked up from game_id otherwise)
+
+    Returns:
+        dict: parameters/total/page/has_more/next_cursor
+    """
+    if game_gid is None:
+        game = fetch_one_as_dict("SELECT gid FROM games WHERE id = ?", (game_id,))
+        game_gid = game["gid"] if game else None
+    cursor_mode = cursor is not None
+    after = decode_cursor(cursor, len(PARAMETERS_ALL_SORT_KEYS))
+    page = page or 1
+
+    # 使用helper函数获取WHERE子句(统一game_gid关联)
+    where_clause, query_value = get_where_clause_for_game(game_gid=game_gid)
+    params = [query_value]
+
+    # 基础查询 - 按参数名分组去重
+    query = f"""
+        SELECT
+            ep.param_name,
+            MIN(ep.param_name_cn) as param_name_cn,
+            pt.base_type,
+            COUNT(DISTINCT ep.event_id) as events_count,
+            COUNT(*) as usage_count,
+            CASE WHEN COUNT(DISTINCT ep.event_id) >= 3 THEN 1 ELSE 0 END as is_common
+        FROM event_params ep
+        JOIN log_events le ON ep.event_id = le.id
+        LEFT JOIN param_templates pt ON ep.template_id = pt.id
+        WHERE {where_clause} AND ep.is_active = 1
+    """
+
+    # params已在上面的if/else中设置
+
+    # 动态添加筛选条件
+    if search:
+        search_condition, search_params = match_condition(
+            "params", search, "ep.id", ["ep.param_name", "ep.param_name_cn"]
+        )
+        query += f" AND {search_condition}"
+        params.extend(search_params)
+
+    if param_type:
+        query += " AND pt.base_type = ?"
+        params.append(param_type)
+
+    # 保存WHERE条件的参数（在添加分组和分页参数之前）
+    base_params = params.copy()
+
+    # 分组和分页（排序键是聚合值，游标条件放在HAVING中）
+    query += " GROUP BY ep.param_name, pt.base_type"
+    offset = (page - 1) * limit
+    if cursor_mode:
+        keyset_sql, keyset_params = keyset_condition(PARAMETERS_ALL_SORT_KEYS, after)
+        query += f" HAVING {keyset_sql}"
+        params.extend(keyset_params)
+        offset = 0
+    query += " ORDER BY usage_count DESC, ep.param_name ASC, COALESCE(pt.base_type, '') ASC"
+    query += " LIMIT ? OFFSET ?"
+    params.extend([limit + 1, offset])
+
+    parameters = fetch_all_as_dict(query, params)
+    parameters, next_cursor = paginate_rows(
+        parameters,
+        limit,
+        lambda row: [row["usage_count"], row["param_name"], row["base_type"] or ""],
+    )
+
+    # 获取总数(不带分页)
+    total = None
+    if include_total:
+        count_query = f"""
+            SELECT COUNT(DISTINCT ep.param_name) as total
+            FROM event_params ep
+            JOIN log_events le ON ep.event_id = le.id
+            LEFT JOIN param_templates pt ON ep.template_id = pt.id
+            WHERE {where_clause} AND ep.is_active = 1
+        """
+        count_params = base_params.copy()  # 使用不含分页参数的params
+
+        if search:
+            count_query += f" AND {search_condition}"
+            count_params.extend(search_params)
+
+        if param_type:
+            count_query += " AND pt.base_type = ?"
+            count_params.append(param_type)
+
+        total_result = fetch_one_as_dict(count_query, count_params)
+        total = total_result["total"] if total_result else 0
+
+    return {
+        "parameters": parameters,
+        "total": total,
+        "page": None if cursor_mode else page,
+        "has_more": next_cursor is not None,
+        "next_cursor": next_cursor,
+    }
+
+
+# 软过期后台刷新和热点快照预热使用同一个加载函数
+hierarchical_cache.register_loader(
+    "parameters.all", load_all_parameters, ttl=PARAMETERS_ALL_CACHE_TTL
+)
+
 
 @api_bp.route("/api/parameters/all", methods=["GET"])
 def api_get_all_parameters():
@@ -76,6 +212,9 @@ def api_get_all_parameters():
     - L1 cache: 60s (hot data)
     - L2 cache: 300s (shared cache)
     - Target: <100ms response time (70% improvement from 267ms baseline)
+
+    Pagination: page/limit (OFFSET) or cursor/limit (keyset, pass back next_cursor);
+    include_total controls the COUNT query (default: true for page, false for cursor)
     """
     try:
         # 使用helper函数解析游戏上下文
@@ -88,101 +227,47 @@ def api_get_all_parameters():
         type_filter = request.args.get("type", "")
         page = request.args.get("page", 1, type=int)
         limit = min(request.args.get("limit", 50, type=int), 100)
+        # 游标分页：cursor参数存在即启用（空值表示第一页），总数默认不返回
+        cursor_mode = "cursor" in request.args
+        cursor = request.args.get("cursor", "")
+        include_total = request.args.get("include_total", "false" if cursor_mode else "true")
+        include_total = include_total.lower() in ("1", "true", "yes")
+
+        # 非法游标在进入缓存前拒绝
+        try:
+            decode_cursor(cursor, len(PARAMETERS_ALL_SORT_KEYS))
+        except InvalidCursorError as e:
+            return json_error_response(str(e), status_code=400)
 
         # 构建缓存键
         cache_key_params = {
             "game_id": game_id,
             "search": search or "",
-            "type": type_filter or "",
-            "page": page,
+            "param_type": type_filter or "",
+            "page": None if cursor_mode else page,
+            "cursor": cursor if cursor_mode else None,
             "limit": limit,
+            "include_total": include_total,
         }
 
-        # 尝试从缓存获取
-        cached_result = hierarchical_cache.get("parameters.all", **cache_key_params)
-        if cached_result is not None:
+        # 查询缓存，未命中时合并并发回源（Single-Flight），软过期后返回旧值并后台刷新
+        loaded = []
+
+        def load():
+            loaded.append(True)
+            return load_all_parameters(**cache_key_params, game_gid=game_gid)
+
+        result_data = hierarchical_cache.get_or_load(
+            "parameters.all", load, ttl=PARAMETERS_ALL_CACHE_TTL, **cache_key_params
+        )
+        if not loaded:
             logger.debug(f"✅ Cache HIT: parameters.all for game_id={game_id}, page={page}")
             return json_success_response(
-                data=cached_result,
+                data=result_data,
                 message="Parameters retrieved successfully (cached)",
             )
 
-        # 缓存未命中，执行查询
-        logger.debug(f"❌ Cache MISS: parameters.all for game_id={game_id}, page={page}")
-
-        # 使用helper函数获取WHERE子句(统一game_gid关联)
-        where_clause, query_value = get_where_clause_for_game(game_gid=game_gid)
-        params = [query_value]
-
-        # 基础查询 - 按参数名分组去重
-        query = f"""
-            SELECT
-                ep.param_name,
-                MIN(ep.param_name_cn) as param_name_cn,
-                pt.base_type,
-                COUNT(DISTINCT ep.event_id) as events_count,
-                COUNT(*) as usage_count,
-                CASE WHEN COUNT(DISTINCT ep.event_id) >= 3 THEN 1 ELSE 0 END as is_common
-            FROM event_params ep
-            JOIN log_events le ON ep.event_id = le.id
-            LEFT JOIN param_templates pt ON ep.template_id = pt.id
-            WHERE {where_clause} AND ep.is_active = 1
-        """
-
-        # params已在上面的if/else中设置
-
-        # 动态添加筛选条件
-        if search:
-            query += " AND (ep.param_name LIKE ? OR ep.param_name_cn LIKE ?)"
-            params.extend([f"%{search}%", f"%{search}%"])
-
-        if type_filter:
-            query += " AND pt.base_type = ?"
-            params.append(type_filter)
-
-        # 分组和分页
-        query += " GROUP BY ep.param_name, pt.base_type"
-        query += " ORDER BY usage_count DESC, ep.param_name ASC"
-        query += " LIMIT ? OFFSET ?"
-
-        # 保存WHERE条件的参数（在添加分页参数之前）
-        base_params = params.copy()
-        params.extend([limit, (page - 1) * limit])
-
-        parameters = fetch_all_as_dict(query, params)
-
-        # 获取总数(不带分页)
-        count_query = f"""
-            SELECT COUNT(DISTINCT ep.param_name) as total
-            FROM event_params ep
-            JOIN log_events le ON ep.event_id = le.id
-            LEFT JOIN param_templates pt ON ep.template_id = pt.id
-            WHERE {where_clause} AND ep.is_active = 1
-        """
-        count_params = base_params.copy()  # 使用不含分页参数的params
-
-        if search:
-            count_query += " AND (ep.param_name LIKE ? OR ep.param_name_cn LIKE ?)"
-            count_params.extend([f"%{search}%", f"%{search}%"])
-
-        if type_filter:
-            count_query += " AND pt.base_type = ?"
-            count_params.append(type_filter)
-
-        total_result = fetch_one_as_dict(count_query, count_params)
-        total = total_result["total"] if total_result else 0
-
-        result_data = {
-            "parameters": parameters,
-            "total": total,
-            "page": page,
-            "has_more": page * limit < total,
-        }
-
-        # 写入缓存
-        hierarchical_cache.set("parameters.all", result_data, ttl=PARAMETERS_ALL_CACHE_TTL, **cache_key_params)
         logger.debug(f"💾 Cache SET: parameters.all for game_id={game_id}, page={page}")
-
         return json_success_response(
             data=result_data,
             message="Parameters retrieved successfully",
@@ -439,7 +524,9 @@ def api_update_parameter(id):
         # Invalidate all pages for this parameter
         try:
             # Get event_id to determine game_id
-            event = fetch_one_as_dict("SELECT game_id FROM log_events WHERE id = ?", (param["event_id"],))
+            event = fetch_one_as_dict(
+                "SELECT game_id FROM log_events WHERE id = ?", (param["event_id"],)
+            )
             if event:
                 game_id = event["game_id"]
 
@@ -449,7 +536,9 @@ def api_update_parameter(id):
                 # Invalidate parameter details cache
                 cache_invalidator.invalidate("parameters.details", param_name=param["param_name"])
 
-                logger.info(f"✅ Cache invalidated for parameter update: id={id}, game_id={game_id}")
+                logger.info(
+                    f"✅ Cache invalidated for parameter update: id={id}, game_id={game_id}"
+                )
         except Exception as cache_error:
             logger.warning(f"⚠️ Cache invalidation failed: {cache_error}")
 
@@ -477,8 +566,10 @@ def api_search_parameters():
 
     try:
         game_gid = data["game_gid"]
-        keyword = f"%{data['keyword']}%"
         data_type = data.get("data_type", "")
+        keyword_condition, keyword_params = match_condition(
+            "params", data["keyword"], "ep.id", ["ep.param_name", "ep.param_name_cn"]
+        )
 
         # 修复：直接使用game_gid查询，不再转换为game_id
         query = f"""
@@ -487,17 +578,16 @@ def api_search_parameters():
             JOIN log_events le ON ep.event_id = le.id
             LEFT JOIN param_templates pt ON ep.template_id = pt.id
             WHERE le.game_gid = ?
-              AND (ep.param_name LIKE ? OR ep.param_name_cn LIKE ?)
+              AND {keyword_condition}
               AND ep.is_active = 1
-            GROUP BY ep.param_name, pt.base_type
         """
-        params = [game_gid, keyword, keyword]
+        params = [game_gid] + keyword_params
 
         if data_type:
             query += " AND pt.base_type = ?"
             params.append(data_type)
 
-        query += " ORDER BY ep.param_name LIMIT 100"
+        query += " GROUP BY ep.param_name, pt.base_type ORDER BY ep.param_name LIMIT 100"
 
         parameters = fetch_all_as_dict(query, params)
 
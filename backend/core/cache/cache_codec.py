@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+L2缓存载荷编解码
+================
+
+Flask-Caching 把值直接 pickle 后写入Redis；parameters.all 分页、事件详情、
+生成的HQL等大载荷的网络传输和Redis内存因此成为L2延迟的主要来源。
+本模块在 HierarchicalCache 写入/读取L2时对载荷编码：
+
+- 列式：字段一致的 list[dict] 只存一次列名，行存为元组（递归处理dict中的列表）
+- 压缩：编码后超过阈值时 zlib 压缩（安装 lz4 时可选 lz4）
+- 版本化：信封头 = 魔数(2字节) + 版本(1字节) + 标志位(1字节)；
+  未知版本视为未命中，非信封值（旧数据、其他写入方）原样返回
+- 统计：按缓存模式记录原始/存储字节数、压缩率、编码/解码耗时
+
+使用示例:
+    from backend.core.cache.cache_codec import CacheCodec
+
+    codec = CacheCodec(compress_threshold=4096)
+    payload = codec.encode(rows, pattern="parameters.all")
+    rows = codec.decode(payload, pattern="parameters.all")
+"""
+
+import logging
+import pickle
+import threading
+import time
+import zlib
+from typing import Any, Dict
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # lz4 为可选依赖
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"\xe2\x2c"
+VERSION = 1
+HEADER_SIZE = len(MAGIC) + 2
+
+# 标志位
+FLAG_ZLIB = 0x01
+FLAG_LZ4 = 0x02
+FLAG_COLUMNAR = 0x04
+
+# 列式块标记（元组首元素）
+_COLUMNAR_TAG = "\x00cols"
+
+# 列式转换的递归深度（覆盖 {"parameters": [...]} 这类外层包装）
+_MAX_DEPTH = 3
+
+# 解码失败标记（调用方视为未命中）
+UNDECODABLE = object()
+
+
+def _to_columnar(value: Any, depth: int = 0):
+    """
+    把字段一致的 list[dict] 转换为 (标记, 列名, 行元组列表)
+
+    Returns:
+        (转换后的值, 是否发生了转换)
+    """
+    if depth > _MAX_DEPTH:
+        return value, False
+
+    if isinstance(value, list) and len(value) > 1 and isinstance(value[0], dict):
+        columns = tuple(value[0].keys())
+        width = len(columns)
+        if all(type(k) is str for k in columns) and all(
+            type(row) is dict and len(row) == width and tuple(row.keys()) == columns
+            for row in value
+        ):
+            rows = [tuple(row.values()) for row in value]
+            return (_COLUMNAR_TAG, columns, rows), True
+        return value, False
+
+    if isinstance(value, dict):
+        converted = False
+        result = {}
+        for k, v in value.items():
+            result[k], changed = _to_columnar(v, depth + 1)
+            converted = converted or changed
+        return (result, True) if converted else (value, False)
+
+    return value, False
+
+
+def _from_columnar(value: Any, depth: int = 0) -> Any:
+    """还原 _to_columnar 的结果"""
+    if depth > _MAX_DEPTH:
+        return value
+    if type(value) is tuple and len(value) == 3 and value[0] == _COLUMNAR_TAG:
+        columns = value[1]
+        return [dict(zip(columns, row)) for row in value[2]]
+    if isinstance(value, dict):
+        return {k: _from_columnar(v, depth + 1) for k, v in value.items()}
+    return value
+
+
+class CacheCodec:
+    """
+    版本化的L2载荷编解码器（线程安全）
+
+    只对容器和长字符串编码；短的标量值原样写入，避免信封开销
+    """
+
+    def __init__(self, compress_threshold: int = 4096, algorithm: str = "zlib", level: int = 6):
+        """
+        初始化编解码器
+
+        Args:
+            compress_threshold: 编码后字节数超过该值才压缩
+            algorithm: 'zlib'、'lz4'（需安装lz4，缺失时回退zlib）或 'none'
+            level: zlib压缩级别
+        """
+        if algorithm == "lz4" and lz4_frame is None:
+            logger.warning("⚠️ 未安装lz4，L2压缩回退为zlib")
+            algorithm = "zlib"
+        self.compress_threshold = compress_threshold
+        self.algorithm = algorithm
+        self.level = level
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    # ------------------------------------------------------------------------
+    # 编码
+    # ------------------------------------------------------------------------
+
+    def encode(self, value: Any, pattern: str = "") -> Any:
+        """
+        编码L2载荷
+
+        Args:
+            value: 原始值
+            pattern: 缓存模式（用于分模式统计）
+
+        Returns:
+            信封字节串；不值得编码的值原样返回
+        """
+        if isinstance(value, str):
+            if len(value) < self.compress_threshold:
+                return value
+        elif not isinstance(value, (list, dict, tuple)):
+            return value
+
+        start = time.perf_counter()
+        converted, columnar = _to_columnar(value)
+        body = pickle.dumps(converted, pickle.HIGHEST_PROTOCOL)
+        raw_bytes = len(body)
+
+        flags = FLAG_COLUMNAR if columnar else 0
+        if self.algorithm != "none" and raw_bytes >= self.compress_threshold:
+            if self.algorithm == "lz4":
+                compressed = lz4_frame.compress(body)
+                flag = FLAG_LZ4
+            else:
+                compressed = zlib.compress(body, self.level)
+                flag = FLAG_ZLIB
+            # 不可压缩的数据保持原样
+            if len(compressed) < raw_bytes:
+                body = compressed
+                flags |= flag
+
+        payload = MAGIC + bytes((VERSION, flags)) + body
+        self._record(pattern, "encode", start, raw_bytes, len(payload), flags)
+        return payload
+
+    # ------------------------------------------------------------------------
+    # 解码
+    # ------------------------------------------------------------------------
+
+    def decode(self, payload: Any, pattern: str = "") -> Any:
+        """
+        解码L2载荷
+
+        Args:
+            payload: L2读取到的值
+            pattern: 缓存模式（用于分模式统计）
+
+        Returns:
+            原始值；非信封值原样返回；无法解码时返回 UNDECODABLE
+        """
+        if not isinstance(payload, bytes) or payload[:2] != MAGIC or len(payload) < HEADER_SIZE:
+            return payload
+
+        start = time.perf_counter()
+        version, flags = payload[2], payload[3]
+        if version != VERSION:
+            logger.debug(f"⚠️ 未知的L2载荷版本: v{version}")
+            return UNDECODABLE
+
+        try:
+            body = payload[HEADER_SIZE:]
+            if flags & FLAG_ZLIB:
+                body = zlib.decompress(body)
+            elif flags & FLAG_LZ4:
+                if lz4_frame is None:
+                    return UNDECODABLE
+                body = lz4_frame.decompress(body)
+            value = pickle.loads(body)
+            if flags & FLAG_COLUMNAR:
+                value = _from_columnar(value)
+        except Exception as e:
+            logger.warning(f"⚠️ L2载荷解码失败: {e}")
+            return UNDECODABLE
+
+        self._record(pattern, "decode", start, 0, 0, flags)
+        return value
+
+    # ------------------------------------------------------------------------
+    # 统计
+    # ------------------------------------------------------------------------
+
+    def _record(self, pattern: str, op: str, start: float, raw: int, stored: int, flags: int):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            stats = self._stats.get(pattern)
+            if stats is None:
+                stats = self._stats[pattern] = {
+                    "encodes": 0,
+                    "decodes": 0,
+                    "compressed": 0,
+                    "columnar": 0,
+                    "raw_bytes": 0,
+                    "stored_bytes": 0,
+                    "encode_ms": 0.0,
+                    "decode_ms": 0.0,
+                }
+            if op == "encode":
+                stats["encodes"] += 1
+                stats["raw_bytes"] += raw
+                stats["stored_bytes"] += stored
+                stats["encode_ms"] += elapsed_ms
+                if flags & (FLAG_ZLIB | FLAG_LZ4):
+                    stats["compressed"] += 1
+                if flags & FLAG_COLUMNAR:
+                    stats["columnar"] += 1
+            else:
+                stats["decodes"] += 1
+                stats["decode_ms"] += elapsed_ms
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取分模式编解码统计
+
+        Returns:
+            {pattern: {encodes, decodes, compressed, columnar, raw_bytes, stored_bytes,
+                       compression_ratio, avg_encode_ms, avg_decode_ms}}
+        """
+        with self._lock:
+            snapshot = {pattern: dict(stats) for pattern, stats in self._stats.items()}
+
+        result = {}
+        for pattern, stats in snapshot.items():
+            raw, stored = stats.pop("raw_bytes"), stats.pop("stored_bytes")
+            encode_ms, decode_ms = stats.pop("encode_ms"), stats.pop("decode_ms")
+            result[pattern] = dict(
+                stats,
+                raw_bytes=raw,
+                stored_bytes=stored,
+                compression_ratio=round(raw / stored, 2) if stored else 0.0,
+                avg_encode_ms=round(encode_ms / stats["encodes"], 4) if stats["encodes"] else 0.0,
+                avg_decode_ms=round(decode_ms / stats["decodes"], 4) if stats["decodes"] else 0.0,
+            )
+        return result
+
+    def reset_stats(self):
+        """重置统计"""
+        with self._lock:
+            self._stats.clear()
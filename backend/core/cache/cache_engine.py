@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+L1缓存引擎
+==========
+
+供 HierarchicalCache 使用的进程内热点缓存引擎
+
+特性:
+- O(1) LRU排序与淘汰（OrderedDict）
+- 可选 TinyLFU 准入过滤（Count-Min Sketch），防止一次性扫描冲刷热点键
+- 条数上限 + 字节预算（按估算的载荷大小）双重限制
+- 淘汰次数、拒绝次数、已用字节数统计
+
+使用示例:
+    from backend.core.cache.cache_engine import L1CacheEngine
+
+    engine = L1CacheEngine(max_entries=1000, max_bytes=64 * 1024 * 1024, admission=True)
+    engine.set("key", {"id": 1})
+    entry = engine.get("key")
+    if entry is not None:
+        value, stored_at = entry.value, entry.timestamp
+"""
+
+from collections import OrderedDict
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+# 估算集合大小时每个集合最多采样的元素数（超出部分按平均值外推）
+_SIZE_SAMPLE_LIMIT = 64
+
+# 单次估算所有层级合计最多采样的元素数（嵌套结构按层相乘会达到 64^深度）
+_SIZE_TOTAL_SAMPLE_LIMIT = 2048
+
+# 估算嵌套结构时的最大递归深度
+_SIZE_MAX_DEPTH = 6
+
+
+def estimate_size(obj: Any) -> int:
+    """
+    估算对象的内存占用（字节）
+
+    对大列表/字典只采样前 _SIZE_SAMPLE_LIMIT 个元素并外推；
+    整次估算合计最多采样 _SIZE_TOTAL_SAMPLE_LIMIT 个元素，预算用完后
+    内层集合只计自身大小，保证估算本身的开销有上限（不随载荷大小和嵌套深度增长）
+
+    Args:
+        obj: 任意Python对象
+
+    Returns:
+        估算字节数
+    """
+    return _estimate(obj, 0, [_SIZE_TOTAL_SAMPLE_LIMIT])
+
+
+def _estimate(obj: Any, depth: int, budget: List[int]) -> int:
+    """
+    estimate_size 的递归实现
+
+    Args:
+        obj: 任意Python对象
+        depth: 当前递归深度
+        budget: 剩余采样预算（单元素列表，在整次估算中共享）
+
+    Returns:
+        估算字节数
+    """
+    size = sys.getsizeof(obj)
+    if depth >= _SIZE_MAX_DEPTH:
+        return size
+
+    if isinstance(obj, dict):
+        items = obj.items()
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        items = obj
+    else:
+        return size
+
+    count = len(obj)
+    sampled = 0
+    sample_size = 0
+    for item in items:
+        if sampled >= _SIZE_SAMPLE_LIMIT or budget[0] <= 0:
+            break
+        budget[0] -= 1
+        if isinstance(obj, dict):
+            sample_size += _estimate(item[0], depth + 1, budget)
+            sample_size += _estimate(item[1], depth + 1, budget)
+        else:
+            sample_size += _estimate(item, depth + 1, budget)
+        sampled += 1
+    if sampled == 0:
+        return size
+    return size + sample_size * count // sampled
+
+
+class FrequencySketch:
+    """
+    TinyLFU 频率草图（Count-Min Sketch，4行，计数上限15）
+
+    - increment/estimate 均为 O(depth)
+    - 累计增量达到 sample_size 后所有计数减半（老化），让历史热点逐步退场
+    """
+
+    DEPTH = 4
+    MAX_COUNT = 15
+    # 每行使用不同的64位奇数乘子（乘法哈希取高位），保证各行索引相互独立
+    _SEEDS = (
+        0x9E3779B97F4A7C15,
+        0xC2B2AE3D27D4EB4F,
+        0x165667B19E3779F9,
+        0xD6E8FEB86659FD93,
+    )
+    _MASK64 = 0xFFFFFFFFFFFFFFFF
+
+    def __init__(self, capacity: int):
+        """
+        初始化频率草图
+
+        Args:
+            capacity: 缓存条数上限，用于确定草图宽度和老化周期
+        """
+        width = 1
+        while width < max(capacity, 16) * 4:
+            width <<= 1
+        self._mask = width - 1
+        self._tables: List[List[int]] = [[0] * width for _ in range(self.DEPTH)]
+        self.sample_size = max(capacity, 16) * 10
+        self._additions = 0
+
+    def _indexes(self, key: str):
+        h = hash(key) & self._MASK64
+        for seed in self._SEEDS:
+            yield (((h * seed) & self._MASK64) >> 32) & self._mask
+
+    def increment(self, key: str):
+        """记录一次访问"""
+        added = False
+        for table, idx in zip(self._tables, self._indexes(key)):
+            if table[idx] < self.MAX_COUNT:
+                table[idx] += 1
+                added = True
+        if added:
+            self._additions += 1
+            if self._additions >= self.sample_size:
+                self._reset()
+
+    def estimate(self, key: str) -> int:
+        """估算访问频率"""
+        return min(table[idx] for table, idx in zip(self._tables, self._indexes(key)))
+
+    def _reset(self):
+        """老化：所有计数减半"""
+        for table in self._tables:
+            for i, count in enumerate(table):
+                if count:
+                    table[i] = count >> 1
+        self._additions //= 2
+
+    def clear(self):
+        """清空草图"""
+        for table in self._tables:
+            for i in range(len(table)):
+                table[i] = 0
+        self._additions = 0
+
+
+class L1Entry:
+    """L1缓存条目"""
+
+    __slots__ = ("value", "timestamp", "size")
+
+    def __init__(self, value: Any, timestamp: float, size: int):
+        self.value = value
+        self.timestamp = timestamp
+        self.size = size
+
+
+class L1CacheEngine:
+    """
+    L1内存缓存引擎（线程安全）
+
+    - get/set/delete 均为 O(1)（TinyLFU 为 O(depth)）
+    - 仅负责容量管理，TTL判断由调用方根据 entry.timestamp 完成
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        max_bytes: Optional[int] = None,
+        admission: bool = False,
+    ):
+        """
+        初始化L1缓存引擎
+
+        Args:
+            max_entries: 条数上限
+            max_bytes: 字节预算（估算值），None表示不限制
+            admission: 是否启用 TinyLFU 准入过滤
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, L1Entry]" = OrderedDict()
+        self._bytes = 0
+        self._sketch = FrequencySketch(max_entries) if admission else None
+        self._lock = threading.Lock()
+
+        self.evictions = 0
+        self.admission_rejects = 0
+
+    @property
+    def admission(self) -> bool:
+        """是否启用 TinyLFU 准入过滤"""
+        return self._sketch is not None
+
+    @property
+    def bytes_used(self) -> int:
+        """当前已用字节数（估算）"""
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def keys(self) -> List[str]:
+        """返回所有键的快照（从最久未使用到最近使用）"""
+        with self._lock:
+            return list(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def get(self, key: str) -> Optional[L1Entry]:
+        """
+        读取条目并标记为最近使用
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            L1Entry 或 None（未命中）
+        """
+        with self._lock:
+            if self._sketch is not None:
+                self._sketch.increment(key)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: Any, timestamp: Optional[float] = None) -> bool:
+        """
+        写入条目（必要时淘汰最久未使用的条目）
+
+        Args:
+            key: 缓存键
+            value: 缓存数据
+            timestamp: 写入时间，None则使用当前时间
+
+        Returns:
+            是否被接纳（TinyLFU拒绝或超过字节预算时返回False）
+        """
+        size = estimate_size(value) if self.max_bytes is not None else 0
+        if timestamp is None:
+            timestamp = time.time()
+
+        with self._lock:
+            if self._sketch is not None:
+                self._sketch.increment(key)
+
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+
+            if self.max_bytes is not None and size > self.max_bytes:
+                # 单条超过预算，直接拒绝（旧值已过时，一并移除）
+                self.admission_rejects += 1
+                return False
+            elif old is None and self._sketch is not None and self._is_full(size) and self._entries:
+                # TinyLFU准入：新键频率不高于淘汰候选者时拒绝
+                victim = next(iter(self._entries))
+                if self._sketch.estimate(key) <= self._sketch.estimate(victim):
+                    self.admission_rejects += 1
+                    return False
+
+            while self._entries and self._is_full(size):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+            self._entries[key] = L1Entry(value, timestamp, size)
+            self._bytes += size
+            return True
+
+    def _is_full(self, incoming_size: int) -> bool:
+        """判断写入 incoming_size 字节的新条目前是否需要淘汰"""
+        if len(self._entries) >= self.max_entries:
+            return True
+        return self.max_bytes is not None and self._bytes + incoming_size > self.max_bytes
+
+    def delete(self, key: str) -> bool:
+        """
+        删除条目
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            是否存在并被删除
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            self._bytes -= entry.size
+            return True
+
+    def clear(self):
+        """清空所有条目（保留频率草图）"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def reset_stats(self):
+        """重置淘汰/拒绝计数"""
+        with self._lock:
+            self.evictions = 0
+            self.admission_rejects = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取引擎统计信息
+
+        Returns:
+            统计信息字典
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes_used": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "admission": "tinylfu" if self._sketch is not None else "lru",
+                "admission_rejects": self.admission_rejects,
+            }
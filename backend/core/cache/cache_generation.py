@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+实体代数计数器（命名空间版本化失效）
+==================================
+
+按游戏/事件失效缓存时，原方案需要找出并删除属于该实体的每一个键；
+一个有1万个事件的游戏每次写入都要扫描/删除大量键。代数计数器把失效变成 O(1)：
+
+- 每个实体（game / game_gid / event / parameter）有一个代数，存储在L2，默认0
+- CacheKeyBuilder.build 把参数中实体的当前代数嵌入缓存键（_gen_<参数名>:<代数>）
+- 写入时只需把代数 +1：旧代数的键不会再被读到，随TTL自然过期
+- 代数在本进程内镜像一小段时间（默认2秒），避免每次构建键都访问L2；
+  递增后通过失效总线通知其他worker立即丢弃镜像
+
+代数为0时不嵌入，实体从未失效过的键与原格式完全一致。
+
+使用示例:
+    from backend.core.cache.cache_system import hierarchical_cache
+
+    hierarchical_cache.generations.bump("game_gid", 10000147)   # 按GID缓存的键立即失效
+    cache_invalidator.bump_game(game_gid=10000147)              # 同时换代 game_id 键
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationStore:
+    """
+    实体代数存储（L2持久 + 本进程短TTL镜像，线程安全）
+
+    L2为Redis时使用原子 INCR；其他后端使用 Flask-Caching inc；
+    没有应用上下文时退化为进程内计数
+    """
+
+    NAMESPACE = "gen:"
+
+    # 缓存参数 → 实体类型；game_id（自增ID）和 game_gid（业务GID）取值不同，
+    # 各用一个代数，按游戏失效时两者都要递增（见 CacheInvalidator.bump_game）
+    ENTITY_PARAMS = {
+        "game_id": "game",
+        "game_gid": "game_gid",
+        "event_id": "event",
+        "param_id": "parameter",
+    }
+
+    # 详情类模式的 id 参数视为对应实体
+    DETAIL_PATTERNS = {
+        "games.detail": "game",
+        "events.detail": "event",
+    }
+
+    # 嵌入缓存键的参数名前缀
+    STAMP_PREFIX = "_gen_"
+
+    def __init__(
+        self,
+        cache_getter: Callable[[], Any],
+        mirror_ttl: float = 2.0,
+        counter_ttl: int = 86400,
+        on_bump: Optional[Callable[[str], None]] = None,
+        max_mirror: int = 10000,
+    ):
+        """
+        初始化代数存储
+
+        Args:
+            cache_getter: 返回Flask-Caching实例的函数（无应用上下文时返回None）
+            mirror_ttl: 本进程镜像TTL（秒）
+            counter_ttl: L2中计数器的TTL（秒），每次递增时续期；必须大于数据TTL
+            on_bump: 代数递增后的回调（接收计数器键），用于广播给其他worker
+            max_mirror: 镜像条目上限，超出时清理过期条目
+        """
+        self._cache_getter = cache_getter
+        self.mirror_ttl = mirror_ttl
+        self.counter_ttl = counter_ttl
+        self.on_bump = on_bump
+        self.max_mirror = max_mirror
+        self._mirror: Dict[str, Tuple[int, float]] = {}
+        self._local: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.stats = {"lookups": 0, "mirror_hits": 0, "l2_reads": 0, "bumps": 0, "errors": 0}
+
+    # ------------------------------------------------------------------------
+    # 键构建
+    # ------------------------------------------------------------------------
+
+    def stamp(self, pattern: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        返回嵌入实体代数后的参数（代数均为0时返回原参数）
+
+        Args:
+            pattern: 缓存模式
+            params: 参数键值对
+
+        Returns:
+            参数键值对（可能新增 _gen_<参数名> 项）
+        """
+        stamps = {}
+        for name, value in params.items():
+            entity = self.ENTITY_PARAMS.get(name)
+            if entity is None and name == "id":
+                entity = self.DETAIL_PATTERNS.get(pattern)
+            if entity is None or value is None or value == "*":
+                continue
+            generation = self.current(entity, value)
+            if generation:
+                stamps[f"{self.STAMP_PREFIX}{name}"] = generation
+
+        if not stamps:
+            return params
+        return {**params, **stamps}
+
+    # ------------------------------------------------------------------------
+    # 读取 / 递增
+    # ------------------------------------------------------------------------
+
+    def counter_key(self, entity: str, entity_id: Any) -> str:
+        return f"{self.NAMESPACE}{entity}:{entity_id}"
+
+    def current(self, entity: str, entity_id: Any) -> int:
+        """
+        获取实体当前代数（优先读本进程镜像）
+
+        Args:
+            entity: 实体类型 ('game' / 'game_gid' / 'event' / 'parameter')
+            entity_id: 实体ID
+
+        Returns:
+            当前代数（从未递增过为0）
+        """
+        key = self.counter_key(entity, entity_id)
+        now = time.monotonic()
+        with self._lock:
+            self.stats["lookups"] += 1
+            mirrored = self._mirror.get(key)
+            if mirrored is not None and mirrored[1] > now:
+                self.stats["mirror_hits"] += 1
+                return mirrored[0]
+
+        generation = self._read(key)
+        self._remember(key, generation, now)
+        return generation
+
+    def bump(self, entity: str, entity_id: Any) -> int:
+        """
+        递增实体代数，使该实体的所有缓存键失效
+
+        Args:
+            entity: 实体类型
+            entity_id: 实体ID
+
+        Returns:
+            新代数
+        """
+        key = self.counter_key(entity, entity_id)
+        generation = self._incr(key)
+        self._remember(key, generation, time.monotonic())
+        with self._lock:
+            self.stats["bumps"] += 1
+
+        if self.on_bump is not None:
+            try:
+                self.on_bump(key)
+            except Exception as e:
+                logger.warning(f"⚠️ 代数变更广播失败: {e}")
+        logger.debug(f"🔢 代数递增: {key} → {generation}")
+        return generation
+
+    def forget(self, key: str):
+        """丢弃本进程镜像（其他worker递增代数后调用）"""
+        with self._lock:
+            self._mirror.pop(key, None)
+
+    def _remember(self, key: str, generation: int, now: float):
+        with self._lock:
+            if len(self._mirror) >= self.max_mirror:
+                self._mirror = {k: v for k, v in self._mirror.items() if v[1] > now}
+                if len(self._mirror) >= self.max_mirror:
+                    self._mirror.clear()
+            self._mirror[key] = (generation, now + self.mirror_ttl)
+
+    def _read(self, key: str) -> int:
+        from backend.core.cache.cache_l2_invalidation import resolve_redis_backend
+
+        cache = self._cache_getter()
+        if cache is None:
+            with self._lock:
+                return self._local.get(key, 0)
+
+        try:
+            with self._lock:
+                self.stats["l2_reads"] += 1
+            client, key_prefix = resolve_redis_backend(cache)
+            if client is not None:
+                value = client.get(f"{key_prefix}{key}")
+            else:
+                value = cache.get(key)
+            return int(value) if value is not None else 0
+        except Exception as e:
+            with self._lock:
+                self.stats["errors"] += 1
+            logger.warning(f"⚠️ 代数读取失败: {key}: {e}")
+            return 0
+
+    def _incr(self, key: str) -> int:
+        from backend.core.cache.cache_l2_invalidation import resolve_redis_backend
+
+        cache = self._cache_getter()
+        if cache is not None:
+            try:
+                client, key_prefix = resolve_redis_backend(cache)
+                if client is not None:
+                    pipe = client.pipeline(transaction=True)
+                    pipe.incr(f"{key_prefix}{key}")
+                    pipe.expire(f"{key_prefix}{key}", self.counter_ttl)
+                    return int(pipe.execute()[0])
+
+                generation = int(cache.get(key) or 0) + 1
+                cache.set(key, generation, timeout=self.counter_ttl)
+                return generation
+            except Exception as e:
+                with self._lock:
+                    self.stats["errors"] += 1
+                logger.warning(f"⚠️ 代数递增失败，退化为进程内计数: {key}: {e}")
+
+        with self._lock:
+            generation = max(self._local.get(key, 0), self._mirror.get(key, (0, 0))[0]) + 1
+            self._local[key] = generation
+            return generation
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取代数统计"""
+        with self._lock:
+            return dict(self.stats, mirrored=len(self._mirror))
+
+    def reset_stats(self):
+        """重置统计"""
+        with self._lock:
+            for name in self.stats:
+                self.stats[name] = 0
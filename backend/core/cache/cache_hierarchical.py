@@ -12,8 +12,9 @@ L3: 数据库查询
 """
 
 from functools import wraps
-from typing import Any, Optional, Dict
+from typing import Any, Optional
 from backend.core.cache.cache_system import CacheKeyBuilder, get_cache
+from backend.core.cache.cache_engine import L1CacheEngine
 import logging
 import time
 
@@ -31,11 +32,11 @@ class HierarchicalCache:
     优势:
     - 热点数据极快访问（L1）
     - 大容量缓存存储（L2）
-    - 自动LRU淘汰，节省内存
+    - O(1) LRU淘汰 + 字节预算，节省内存（与cache_system共用L1CacheEngine）
     - L2命中自动回填L1
     """
 
-    def __init__(self, l1_size=1000, l1_ttl=60, l2_ttl=3600):
+    def __init__(self, l1_size=1000, l1_ttl=60, l2_ttl=3600, l1_max_bytes=None, l1_admission=None):
         """
         初始化分层缓存
 
@@ -43,15 +44,23 @@ class HierarchicalCache:
             l1_size: L1缓存大小（条数），默认1000
             l1_ttl: L1缓存TTL（秒），默认60
             l2_ttl: L2缓存TTL（秒），默认3600
+            l1_max_bytes: L1字节预算，None则使用CacheConfig.CACHE_L1_MAX_BYTES
+            l1_admission: 是否启用TinyLFU准入，None则使用CacheConfig.CACHE_L1_ADMISSION
         """
+        from backend.core.config.config import CacheConfig
+
+        if l1_max_bytes is None:
+            l1_max_bytes = CacheConfig.CACHE_L1_MAX_BYTES
+        if l1_admission is None:
+            l1_admission = CacheConfig.CACHE_L1_ADMISSION
+
         self.l1_size = l1_size
         self.l1_ttl = l1_ttl
         self.l2_ttl = l2_ttl
-        self.l1_cache: Dict[str, Any] = {}  # 简单字典缓存（带TTL）
-        self.l1_timestamps: Dict[str, float] = {}
+        self.l1 = L1CacheEngine(max_entries=l1_size, max_bytes=l1_max_bytes, admission=l1_admission)
 
         # 统计信息
-        self.stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0, "l1_evictions": 0}
+        self.stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0}
 
         logger.info(f"✅ 三级缓存初始化: " f"L1={l1_size}条/{l1_ttl}秒, " f"L2={l2_ttl}秒")
 
@@ -74,16 +83,15 @@ class HierarchicalCache:
         key = CacheKeyBuilder.build(pattern, **kwargs)
 
         # L1: 内存热点缓存
-        if key in self.l1_cache:
-            timestamp = self.l1_timestamps.get(key, 0)
-            if time.time() - timestamp < self.l1_ttl:
+        entry = self.l1.get(key)
+        if entry is not None:
+            if time.time() - entry.timestamp < self.l1_ttl:
                 self.stats["l1_hits"] += 1
                 logger.debug(f"✅ L1 HIT: {key}")
-                return self.l1_cache[key]
+                return entry.value
             else:
                 # L1过期，删除
-                del self.l1_cache[key]
-                del self.l1_timestamps[key]
+                self.l1.delete(key)
                 logger.debug(f"⏰ L1过期: {key}")
 
         # L2: Redis缓存
@@ -132,24 +140,14 @@ class HierarchicalCache:
 
     def _set_l1(self, key: str, data: Any):
         """
-        写入L1缓存（带LRU淘汰）
-
-        当L1缓存满时，删除最旧的条目
+        写入L1缓存（O(1) LRU淘汰，见L1CacheEngine）
 
         Args:
             key: 缓存键
             data: 缓存数据
         """
-        # 如果L1已满，删除最旧的条目
-        if len(self.l1_cache) >= self.l1_size:
-            oldest_key = min(self.l1_timestamps, key=self.l1_timestamps.get)
-            del self.l1_cache[oldest_key]
-            del self.l1_timestamps[oldest_key]
-            self.stats["l1_evictions"] += 1
-            logger.debug(f"🗑️ L1淘汰: {oldest_key}")
-
-        self.l1_cache[key] = data
-        self.l1_timestamps[key] = time.time()
+        if not self.l1.set(key, data):
+            logger.debug(f"🚫 L1拒绝写入: {key}")
 
     def invalidate(self, pattern: str, **kwargs):
         """
@@ -162,9 +160,7 @@ class HierarchicalCache:
         key = CacheKeyBuilder.build(pattern, **kwargs)
 
         # 失效L1
-        if key in self.l1_cache:
-            del self.l1_cache[key]
-            del self.l1_timestamps[key]
+        if self.l1.delete(key):
             logger.debug(f"🗑️ L1失效: {key}")
 
         # 失效L2
@@ -192,14 +188,13 @@ class HierarchicalCache:
 
         # 收集要删除的键
         keys_to_delete = []
-        for key in self.l1_cache:
+        for key in self.l1.keys():
             if self._match_pattern(key, wildcard):
                 keys_to_delete.append(key)
 
         # 删除匹配的键
         for key in keys_to_delete:
-            del self.l1_cache[key]
-            del self.l1_timestamps[key]
+            self.l1.delete(key)
             count += 1
             logger.debug(f"🗑️ L1模式失效: {key}")
 
@@ -289,27 +284,33 @@ class HierarchicalCache:
         else:
             hit_rate = (self.stats["l1_hits"] + self.stats["l2_hits"]) / total_requests * 100
 
+        l1_stats = self.l1.get_stats()
+
         return {
-            "l1_size": len(self.l1_cache),
+            "l1_size": l1_stats["entries"],
             "l1_capacity": self.l1_size,
-            "l1_usage": f"{len(self.l1_cache) / self.l1_size * 100:.1f}%",
+            "l1_usage": f"{l1_stats['entries'] / self.l1_size * 100:.1f}%",
+            "l1_bytes": l1_stats["bytes_used"],
+            "l1_max_bytes": l1_stats["max_bytes"],
+            "l1_admission": l1_stats["admission"],
+            "l1_admission_rejects": l1_stats["admission_rejects"],
             "l1_hits": self.stats["l1_hits"],
             "l2_hits": self.stats["l2_hits"],
             "misses": self.stats["misses"],
             "hit_rate": f"{hit_rate:.2f}%",
-            "l1_evictions": self.stats["l1_evictions"],
+            "l1_evictions": l1_stats["evictions"],
             "total_requests": total_requests,
         }
 
     def clear_l1(self):
         """清空L1缓存"""
-        self.l1_cache.clear()
-        self.l1_timestamps.clear()
+        self.l1.clear()
         logger.info("🗑️ L1缓存已清空")
 
     def reset_stats(self):
         """重置统计信息"""
-        self.stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0, "l1_evictions": 0}
+        self.stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0}
+        self.l1.reset_stats()
         logger.info("📊 缓存统计已重置")
 
 
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+热点键追踪与快照
+================
+
+记录 HierarchicalCache 各键的访问频率，定期把 Top-K 热点键（模式、参数、
+加载函数标识）写入磁盘快照；应用重启后 CacheWarmer 按热度顺序回放快照，
+预热真实的线上热点，而不是固定的一组查询。
+
+- 新键先进入 Count-Min 草图，近期出现过至少 admit_threshold 次才成为候选
+- 候选键精确计数；候选数超过上限时保留计数最高的一半
+- 每次写快照后所有计数减半，排名偏向最近的访问
+- 每个worker写自己的快照文件（cache_hotkeys.<pid>.json，临时文件 + os.replace 原子写入），
+  读取时合并所有未过期的worker快照、按键累加计数，不会只剩最后一个worker的热点
+- 超过 max_age 的worker快照（已退出的进程）在写入时顺带删除
+- 预热后观察命中：统计重启后的命中中有多少落在已预热的键上（覆盖率）
+
+快照格式（JSON，loader 仅用于诊断）:
+    {"version": 1, "written_at": 1700000000.0, "pid": 123,
+     "entries": [{"key": "...", "pattern": "events.detail", "params": {"id": 1},
+                  "score": 42, "loader": "backend.services.events:get_event"}]}
+"""
+
+import atexit
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from backend.core.cache.cache_engine import FrequencySketch
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+def worker_snapshot_path(path: str, pid: Optional[int] = None) -> Path:
+    """
+    返回worker自己的快照文件路径
+
+    Example:
+        >>> worker_snapshot_path("data/cache_hotkeys.json", 123)
+        PosixPath('data/cache_hotkeys.123.json')
+    """
+    base = Path(path)
+    return base.with_name(f"{base.stem}.{pid or os.getpid()}{base.suffix}")
+
+
+def snapshot_files(path: str) -> List[Path]:
+    """
+    列出快照路径对应的所有worker快照文件（以及旧版的单一快照文件）
+
+    Args:
+        path: 配置的快照路径（如 data/cache_hotkeys.json）
+
+    Returns:
+        存在的快照文件列表
+    """
+    base = Path(path)
+    pattern = re.compile(rf"^{re.escape(base.stem)}\.\d+{re.escape(base.suffix)}$")
+    files = [base] if base.is_file() else []
+    if base.parent.is_dir():
+        files += [f for f in base.parent.iterdir() if pattern.match(f.name) and f.is_file()]
+    return files
+
+
+def loader_identity(loader: Optional[Callable[..., Any]]) -> Optional[str]:
+    """
+    返回加载函数的可导入标识 "module:qualname"
+
+    Args:
+        loader: 加载函数
+
+    Returns:
+        标识字符串；lambda/局部函数等无法导入的返回None
+    """
+    if loader is None:
+        return None
+    module = getattr(loader, "__module__", None)
+    qualname = getattr(loader, "__qualname__", None)
+    if not module or not qualname or "<" in qualname:
+        return None
+    return f"{module}:{qualname}"
+
+
+class HotKeyTracker:
+    """
+    热点键追踪器（线程安全）
+
+    Args:
+        top_k: 快照保留的热点键数量
+        admit_threshold: 新键在草图中的估算次数达到该值才成为候选
+        max_age: worker快照的有效期（秒），更早的快照读取时忽略、写入时删除
+    """
+
+    def __init__(self, top_k: int = 500, admit_threshold: int = 2, max_age: float = 86400):
+        self.top_k = top_k
+        self.admit_threshold = admit_threshold
+        self.max_age = max_age
+        self.max_candidates = top_k * 4
+        self._sketch = FrequencySketch(self.max_candidates)
+        # key → [pattern, params, count]
+        self._candidates: Dict[str, List[Any]] = {}
+        self._lock = threading.Lock()
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        # 预热覆盖率观察
+        self._watched: Optional[Set[str]] = None
+        self.coverage = {"hits": 0, "warmed_hits": 0, "misses": 0, "watch_started": None}
+        self.stats = {"snapshots_written": 0, "last_snapshot_at": None, "last_snapshot_size": 0}
+
+    # ------------------------------------------------------------------------
+    # 记录访问
+    # ------------------------------------------------------------------------
+
+    def record(self, key: str, pattern: str, params: Dict[str, Any], hit: bool):
+        """
+        记录一次访问
+
+        Args:
+            key: 缓存键
+            pattern: 缓存模式
+            params: 参数键值对（不含代数戳）
+            hit: 是否命中
+        """
+        with self._lock:
+            candidate = self._candidates.get(key)
+            if candidate is not None:
+                candidate[2] += 1
+            else:
+                self._sketch.increment(key)
+                estimate = self._sketch.estimate(key)
+                if estimate >= self.admit_threshold:
+                    self._candidates[key] = [pattern, dict(params), estimate]
+                    if len(self._candidates) > self.max_candidates:
+                        self._trim()
+
+            if self._watched is not None:
+                if not hit:
+                    self.coverage["misses"] += 1
+                else:
+                    self.coverage["hits"] += 1
+                    if key in self._watched:
+                        self.coverage["warmed_hits"] += 1
+
+    def _trim(self):
+        """保留计数最高的一半候选"""
+        ranked = sorted(self._candidates.items(), key=lambda item: item[1][2], reverse=True)
+        self._candidates = dict(ranked[: self.max_candidates // 2])
+
+    def top(self, k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        获取Top-K热点键
+
+        Args:
+            k: 数量，默认top_k
+
+        Returns:
+            按热度降序的 [{key, pattern, params, score}]
+        """
+        k = k or self.top_k
+        with self._lock:
+            ranked = sorted(self._candidates.items(), key=lambda item: item[1][2], reverse=True)
+            return [
+                {"key": key, "pattern": pattern, "params": dict(params), "score": count}
+                for key, (pattern, params, count) in ranked[:k]
+            ]
+
+    def decay(self):
+        """所有候选计数减半，淘汰计数归零的候选"""
+        with self._lock:
+            self._candidates = {
+                key: [pattern, params, count >> 1]
+                for key, (pattern, params, count) in self._candidates.items()
+                if count >> 1
+            }
+
+    # ------------------------------------------------------------------------
+    # 快照
+    # ------------------------------------------------------------------------
+
+    def write_snapshot(
+        self, path: str, loader_for: Optional[Callable[[str], Optional[str]]] = None
+    ) -> int:
+        """
+        原子写入本worker的热点快照（写到 worker_snapshot_path(path)）
+
+        Args:
+            path: 配置的快照路径
+            loader_for: 模式 → 加载函数标识 的查找函数
+
+        Returns:
+            写入的条目数（没有热点时不写文件，返回0）
+        """
+        entries = self.top()
+        if not entries:
+            return 0
+        for entry in entries:
+            entry["loader"] = loader_for(entry["pattern"]) if loader_for else None
+
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "written_at": time.time(),
+            "pid": os.getpid(),
+            "entries": entries,
+        }
+        target = worker_snapshot_path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(target.parent), prefix=f".{target.name}.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, target)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        with self._lock:
+            self.stats["snapshots_written"] += 1
+            self.stats["last_snapshot_at"] = snapshot["written_at"]
+            self.stats["last_snapshot_size"] = len(entries)
+        self.decay()
+        self._remove_expired(path, keep=target)
+        logger.debug(f"💾 热点快照已写入: {target} ({len(entries)}个键)")
+        return len(entries)
+
+    def _remove_expired(self, path: str, keep: Path):
+        """删除超过有效期的worker快照（已退出的worker留下的文件）"""
+        cutoff = time.time() - self.max_age
+        for file in snapshot_files(path):
+            if file == keep:
+                continue
+            try:
+                if file.stat().st_mtime < cutoff:
+                    file.unlink()
+            except OSError:
+                pass
+
+    def read_snapshot(self, path: str) -> List[Dict[str, Any]]:
+        """
+        读取并合并所有worker的热点快照
+
+        同一个键在多个worker中出现时计数累加；超过有效期、损坏或版本不符的文件忽略
+
+        Args:
+            path: 配置的快照路径
+
+        Returns:
+            按合并热度降序的条目列表（最多 top_k 个）
+        """
+        cutoff = time.time() - self.max_age
+        merged: Dict[str, Dict[str, Any]] = {}
+        for file in snapshot_files(path):
+            try:
+                if file.stat().st_mtime < cutoff:
+                    continue
+                with open(file, "r", encoding="utf-8") as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ 热点快照无法读取: {file}: {e}")
+                continue
+            if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+                logger.warning(f"⚠️ 热点快照版本不符，已忽略: {file}")
+                continue
+
+            for entry in snapshot.get("entries") or []:
+                existing = merged.get(entry.get("key"))
+                if existing is None:
+                    merged[entry.get("key")] = dict(entry)
+                else:
+                    existing["score"] += entry.get("score", 0)
+
+        ranked = sorted(merged.values(), key=lambda entry: entry.get("score", 0), reverse=True)
+        return ranked[: self.top_k]
+
+    def start_snapshots(
+        self,
+        path: str,
+        interval: float,
+        loader_for: Optional[Callable[[str], Optional[str]]] = None,
+    ):
+        """
+        启动定期快照线程（进程退出时再写一次）
+
+        Args:
+            path: 配置的快照路径（每个worker写入各自的文件）
+            interval: 写入间隔（秒）
+            loader_for: 模式 → 加载函数标识 的查找函数
+        """
+        if self._snapshot_thread is not None and self._snapshot_thread.is_alive():
+            return
+
+        def write():
+            try:
+                self.write_snapshot(path, loader_for)
+            except Exception as e:
+                logger.warning(f"⚠️ 热点快照写入失败: {e}")
+
+        def worker():
+            while not self._stop.wait(interval):
+                write()
+
+        self._stop.clear()
+        self._snapshot_thread = threading.Thread(
+            target=worker, name="cache-hotkey-snapshot", daemon=True
+        )
+        self._snapshot_thread.start()
+        atexit.register(write)
+        logger.info(f"✅ 热点快照已启用: {path} (每{int(interval)}秒)")
+
+    def stop_snapshots(self):
+        """停止定期快照线程"""
+        self._stop.set()
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join(timeout=5)
+        self._snapshot_thread = None
+
+    # ------------------------------------------------------------------------
+    # 预热覆盖率
+    # ------------------------------------------------------------------------
+
+    def watch(self, warmed_keys: Set[str]):
+        """开始统计命中落在已预热键上的比例"""
+        with self._lock:
+            self._watched = set(warmed_keys)
+            self.coverage = {
+                "hits": 0,
+                "warmed_hits": 0,
+                "misses": 0,
+                "watch_started": time.time(),
+            }
+
+    def add_watched(self, key: str):
+        """追加已预热的键"""
+        with self._lock:
+            if self._watched is not None:
+                self._watched.add(key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取追踪统计及预热覆盖率"""
+        with self._lock:
+            coverage = dict(self.coverage)
+            hits = coverage["hits"]
+            coverage["warmed_keys"] = len(self._watched) if self._watched is not None else 0
+            coverage["coverage"] = (
+                f"{coverage['warmed_hits'] / hits * 100:.1f}%" if hits else "0.0%"
+            )
+            return dict(self.stats, candidates=len(self._candidates), coverage=coverage)
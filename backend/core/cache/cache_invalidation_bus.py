@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+L1失效总线（Redis Pub/Sub）
+==========================
+
+每个gunicorn worker都有自己的L1，某个worker处理写请求后只能清掉自己的L1，
+其他worker会继续返回旧数据直到 l1_ttl 过期。失效总线把失效操作广播给所有worker：
+
+- 发布：失效操作先进入本地队列，由发布线程按时间窗口合并去重后一次 PUBLISH
+- 订阅：每个worker一个订阅线程，收到批次后应用到本进程L1（忽略自己发出的消息）
+- 指标：发布/接收批次、从入队到应用的延迟（最近/平均/最大）、重连次数
+- fork安全：ensure_running() 发现进程号变化时在子进程中重启线程
+
+消息格式（JSON）:
+    {"o": <来源ID>, "m": [{"op": "p", "pt": "events.*", "kw": {"game_gid": 1}, "t": <入队时间>},
+                          {"op": "k", "k": "dwd_gen:v3:games.detail:id:1", "t": ...},
+                          {"op": "c", "t": ...}]}
+
+使用示例:
+    from backend.core.cache.cache_invalidation_bus import InvalidationBus
+
+    bus = InvalidationBus(channel="dwd_gen:v3:bus:l1")
+    bus.start(redis_client, handler=lambda messages: apply(messages))
+    bus.publish_pattern("events.*", {"game_gid": 1})
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 消息类型
+OP_PATTERN = "p"  # 模式失效
+OP_KEY = "k"  # 单键失效
+OP_CLEAR = "c"  # 清空L1
+
+
+class InvalidationBus:
+    """
+    基于Redis Pub/Sub的L1失效总线
+
+    任何实现了 publish() / pubsub() 的客户端均可使用（redis-py、fakeredis）
+    """
+
+    def __init__(self, channel: str, batch_interval: float = 0.02, max_batch: int = 200):
+        """
+        初始化失效总线
+
+        Args:
+            channel: Pub/Sub频道名
+            batch_interval: 发布合并窗口（秒），窗口内的失效合并为一条消息
+            max_batch: 单条消息最多包含的失效操作数
+        """
+        self.channel = channel
+        self.batch_interval = batch_interval
+        self.max_batch = max_batch
+        self.origin = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._client = None
+        self._handler: Optional[Callable[[List[Dict[str, Any]]], None]] = None
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._lag_total_ms = 0.0
+        self.stats = {
+            "published": 0,
+            "publish_batches": 0,
+            "publish_errors": 0,
+            "received": 0,
+            "receive_batches": 0,
+            "apply_errors": 0,
+            "reconnects": 0,
+            "lag_ms_last": 0.0,
+            "lag_ms_max": 0.0,
+        }
+
+    # ------------------------------------------------------------------------
+    # 生命周期
+    # ------------------------------------------------------------------------
+
+    def start(self, client, handler: Callable[[List[Dict[str, Any]]], None]) -> bool:
+        """
+        启动发布线程和订阅线程
+
+        Args:
+            client: Redis客户端
+            handler: 收到其他worker的失效批次时的回调（接收消息列表）
+
+        Returns:
+            是否已在运行
+        """
+        self._client = client
+        self._handler = handler
+        return self.ensure_running()
+
+    def ensure_running(self) -> bool:
+        """确保当前进程的总线线程在运行（gunicorn preload fork后自动重启）"""
+        if self._client is None:
+            return False
+        pid = os.getpid()
+        if self._pid == pid and all(t.is_alive() for t in self._threads):
+            return True
+
+        with self._lock:
+            if self._pid == pid and all(t.is_alive() for t in self._threads):
+                return True
+            if self._pid != pid:
+                # fork后的子进程：父进程的队列内容和来源ID都不属于自己
+                self.origin = f"{pid}:{uuid.uuid4().hex[:8]}"
+                self._queue = queue.Queue()
+            self._stop.clear()
+            self._threads = [
+                threading.Thread(target=self._publish_loop, name="cache-bus-pub", daemon=True),
+                threading.Thread(target=self._subscribe_loop, name="cache-bus-sub", daemon=True),
+            ]
+            for thread in self._threads:
+                thread.start()
+            self._pid = pid
+        logger.info(f"✅ L1失效总线已启动: channel={self.channel}, origin={self.origin}")
+        return True
+
+    def stop(self, timeout: float = 2.0):
+        """停止总线线程（先发送队列中剩余的消息）"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self._pid = None
+
+    @property
+    def running(self) -> bool:
+        return self._pid == os.getpid() and any(t.is_alive() for t in self._threads)
+
+    # ------------------------------------------------------------------------
+    # 发布
+    # ------------------------------------------------------------------------
+
+    def publish_pattern(self, pattern: str, params: Optional[Dict[str, Any]] = None):
+        """广播模式失效"""
+        self._enqueue({"op": OP_PATTERN, "pt": pattern, "kw": params or {}})
+
+    def publish_key(self, key: str):
+        """广播单键失效"""
+        self._enqueue({"op": OP_KEY, "k": key})
+
+    def publish_clear(self):
+        """广播清空L1"""
+        self._enqueue({"op": OP_CLEAR})
+
+    def _enqueue(self, message: Dict[str, Any]):
+        if not self.running:
+            return
+        message["t"] = time.time()
+        self._queue.put(message)
+
+    def _publish_loop(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return
+                continue
+
+            batch = [first]
+            deadline = time.monotonic() + self.batch_interval
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._flush(batch)
+
+    def _flush(self, batch: List[Dict[str, Any]]):
+        # 同一窗口内重复的失效只发送一次（保留最早的入队时间用于延迟统计）
+        unique: Dict[str, Dict[str, Any]] = {}
+        for message in batch:
+            ident = json.dumps(
+                {k: v for k, v in message.items() if k != "t"}, sort_keys=True, default=str
+            )
+            unique.setdefault(ident, message)
+        messages = list(unique.values())
+        if any(m["op"] == OP_CLEAR for m in messages):
+            messages = [next(m for m in messages if m["op"] == OP_CLEAR)]
+
+        payload = json.dumps({"o": self.origin, "m": messages}, default=str)
+        try:
+            self._client.publish(self.channel, payload)
+            with self._lock:
+                self.stats["published"] += len(messages)
+                self.stats["publish_batches"] += 1
+        except Exception as e:
+            with self._lock:
+                self.stats["publish_errors"] += 1
+            logger.warning(f"⚠️ L1失效广播失败: {e}")
+
+    # ------------------------------------------------------------------------
+    # 订阅
+    # ------------------------------------------------------------------------
+
+    def _subscribe_loop(self):
+        backoff = 0.5
+        while not self._stop.is_set():
+            pubsub = None
+            try:
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                backoff = 0.5
+                while not self._stop.is_set():
+                    raw = pubsub.get_message(timeout=0.5)
+                    if raw is not None and raw.get("type") == "message":
+                        self._receive(raw["data"])
+            except Exception as e:
+                with self._lock:
+                    self.stats["reconnects"] += 1
+                logger.warning(f"⚠️ L1失效总线订阅中断，{backoff}s后重连: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def _receive(self, data):
+        try:
+            envelope = json.loads(data.decode("utf-8") if isinstance(data, bytes) else data)
+        except (ValueError, UnicodeDecodeError):
+            logger.warning("⚠️ 无法解析的L1失效消息，已忽略")
+            return
+        if envelope.get("o") == self.origin:
+            return
+
+        messages = envelope.get("m") or []
+        try:
+            self._handler(messages)
+        except Exception as e:
+            with self._lock:
+                self.stats["apply_errors"] += 1
+            logger.warning(f"⚠️ 应用L1失效消息失败: {e}")
+            return
+
+        now = time.time()
+        lags = [(now - m.get("t", now)) * 1000 for m in messages]
+        with self._lock:
+            self.stats["received"] += len(messages)
+            self.stats["receive_batches"] += 1
+            if lags:
+                self._lag_total_ms += sum(lags)
+                self.stats["lag_ms_last"] = round(lags[-1], 3)
+                self.stats["lag_ms_max"] = round(max(self.stats["lag_ms_max"], max(lags)), 3)
+
+    # ------------------------------------------------------------------------
+    # 统计
+    # ------------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取总线统计"""
+        with self._lock:
+            received = self.stats["received"]
+            return dict(
+                self.stats,
+                running=self.running,
+                channel=self.channel,
+                queue_depth=self._queue.qsize(),
+                lag_ms_avg=round(self._lag_total_ms / received, 3) if received else 0.0,
+            )
+
+    def reset_stats(self):
+        """重置统计"""
+        with self._lock:
+            for name in self.stats:
+                self.stats[name] = 0.0 if name.startswith("lag_") else 0
+            self._lag_total_ms = 0.0
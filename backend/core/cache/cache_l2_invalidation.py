@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+L2缓存标签失效子系统
+====================
+
+替代 Redis KEYS 的L2批量失效方案
+
+原理:
+- 写入L2时，用一个Pipeline把缓存键 ZADD 到若干标签有序集合，分数为数据的过期时间:
+    - ns:<命名空间>    模式的每一级命名空间（events / events.list）
+    - game_id:<值> / game_gid:<值> / event_id:<值>   实体标签
+- 同一个Pipeline里 ZREMRANGEBYSCORE 移除已过期的成员，热门标签不会积累死成员；
+  成员数超过上限时 ZPOPMIN 弹出最早过期的成员并 UNLINK 对应数据键（提前过期，
+  只是多一次未命中，不会留下失效时找不到的键）
+- 失效时选成员最少的标签，用 ZSCAN 游标分批取出未过期成员，按批次 Pipeline UNLINK，
+  每批大小有上限，不会长时间阻塞共享Redis
+- 对没有标签的历史键（上线前写入、或绕过HierarchicalCache写入的键），
+  使用游标 SCAN 分批删除，同样不会阻塞
+
+使用示例:
+    from backend.core.cache.cache_l2_invalidation import L2TagInvalidator
+
+    tagger = L2TagInvalidator(key_namespace=CacheKeyBuilder.PREFIX)
+    tagger.record(client, "dwd_gen:v3:", key, "events.list", {"game_gid": 1}, ttl=3600)
+    tagger.invalidate(client, "dwd_gen:v3:", "events.*", {"game_gid": 1})
+    tagger.scan_delete(client, "dwd_gen:v3:*")
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def escape_key_value(value: Any) -> str:
+    """
+    缓存键中的参数值：转义 '%' 和 ':'
+
+    键按 ':' 拆成 名称/值 对；值里的 ':' 不转义时，{"q": "a:b:1"} 与
+    {"q": "a", "b": "1"} 会生成同一个键，失效时也会拆错参数
+    """
+    return str(value).replace("%", "%25").replace(":", "%3A")
+
+
+class L2TagInvalidator:
+    """
+    基于Redis标签集合的L2失效器
+
+    所有方法都接收 (client, key_prefix)：client 为 redis-py 客户端，
+    key_prefix 为Flask-Caching在写入Redis时附加的前缀
+    """
+
+    # 有序集合标签（旧版 "tag:" 普通集合不再写入，按自身TTL过期）
+    TAG_NAMESPACE = "ztag:"
+
+    # 会生成实体标签的参数
+    ENTITY_PARAMS = ("game_id", "game_gid", "event_id")
+
+    # 详情类模式的 id 参数视为对应实体
+    DETAIL_ENTITIES = {
+        "games.detail": "game_id",
+        "events.detail": "event_id",
+    }
+
+    def __init__(
+        self,
+        key_namespace: str,
+        batch_size: int = 500,
+        tag_ttl_factor: int = 2,
+        max_tag_members: int = 50000,
+    ):
+        """
+        初始化L2标签失效器
+
+        Args:
+            key_namespace: 缓存键命名空间（CacheKeyBuilder.PREFIX）
+            batch_size: 每批 UNLINK / SCAN 的键数量上限
+            tag_ttl_factor: 标签集合TTL相对数据TTL的倍数（保证标签比数据活得久）
+            max_tag_members: 单个标签集合的成员上限
+        """
+        self.key_namespace = key_namespace
+        self.batch_size = batch_size
+        self.tag_ttl_factor = tag_ttl_factor
+        self.max_tag_members = max_tag_members
+        self._lock = threading.Lock()
+        self.stats = {
+            "tag_writes": 0,
+            "tag_members_pruned": 0,
+            "tag_members_evicted": 0,
+            "tag_invalidations": 0,
+            "scan_invalidations": 0,
+            "keys_unlinked": 0,
+            "batches": 0,
+            "last_invalidation_ms": 0.0,
+        }
+
+    # ------------------------------------------------------------------------
+    # 标签计算
+    # ------------------------------------------------------------------------
+
+    @classmethod
+    def entity_tags(cls, pattern: str, params: Dict[str, Any]) -> List[str]:
+        """
+        计算实体标签（仅包含值确定的参数）
+
+        Args:
+            pattern: 缓存模式
+            params: 参数键值对
+
+        Returns:
+            标签列表，如 ['game_gid:10000147']
+        """
+        tags = []
+        for name in cls.ENTITY_PARAMS:
+            value = params.get(name)
+            if value is not None and value != "*":
+                tags.append(f"{name}:{value}")
+
+        detail_entity = cls.DETAIL_ENTITIES.get(pattern)
+        if detail_entity and params.get("id") not in (None, "*"):
+            tag = f"{detail_entity}:{params['id']}"
+            if tag not in tags:
+                tags.append(tag)
+        return tags
+
+    @classmethod
+    def tags_for(cls, pattern: str, params: Dict[str, Any]) -> List[str]:
+        """
+        计算写入时需要记录的全部标签
+
+        Example:
+            >>> L2TagInvalidator.tags_for('events.list', {'game_gid': 1, 'page': 2})
+            ['ns:events', 'ns:events.list', 'game_gid:1']
+        """
+        parts = pattern.split(".")
+        tags = [f"ns:{'.'.join(parts[: i + 1])}" for i in range(len(parts))]
+        return tags + cls.entity_tags(pattern, params)
+
+    def _tag_key(self, key_prefix: str, tag: str) -> str:
+        return f"{key_prefix}{self.TAG_NAMESPACE}{tag}"
+
+    # ------------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------------
+
+    def record(
+        self,
+        client,
+        key_prefix: str,
+        key: str,
+        pattern: str,
+        params: Dict[str, Any],
+        ttl: int,
+    ):
+        """
+        记录缓存键的标签，同时清理过期成员（通常单次Pipeline往返）
+
+        Args:
+            client: Redis客户端
+            key_prefix: Flask-Caching键前缀
+            key: HierarchicalCache缓存键（不含Flask-Caching前缀）
+            pattern: 缓存模式
+            params: 参数键值对
+            ttl: 数据TTL（秒）
+        """
+        raw_key = f"{key_prefix}{key}"
+        now = time.time()
+        ttl = max(int(ttl), 1)
+        tag_ttl = ttl * self.tag_ttl_factor
+        tag_keys = [self._tag_key(key_prefix, tag) for tag in self.tags_for(pattern, params)]
+
+        pipe = client.pipeline(transaction=False)
+        for tag_key in tag_keys:
+            pipe.zadd(tag_key, {raw_key: now + ttl})
+            pipe.zremrangebyscore(tag_key, "-inf", now)
+            pipe.zcard(tag_key)
+            pipe.expire(tag_key, tag_ttl)
+        results = pipe.execute()
+
+        pruned = sum(results[i + 1] or 0 for i in range(0, len(results), 4))
+        overflow = {
+            tag_key: results[i * 4 + 2] - self.max_tag_members
+            for i, tag_key in enumerate(tag_keys)
+            if results[i * 4 + 2] > self.max_tag_members
+        }
+        evicted = self._evict_overflow(client, overflow) if overflow else 0
+
+        with self._lock:
+            self.stats["tag_writes"] += 1
+            self.stats["tag_members_pruned"] += pruned
+            self.stats["tag_members_evicted"] += evicted
+
+    def _evict_overflow(self, client, overflow: Dict[str, int]) -> int:
+        """弹出超出上限的最早过期成员，并删除对应的数据键（失效时不会漏掉它们）"""
+        pipe = client.pipeline(transaction=False)
+        for tag_key, count in overflow.items():
+            pipe.zpopmin(tag_key, count)
+        members = [member for popped in pipe.execute() for member, _ in popped]
+        for i in range(0, len(members), self.batch_size):
+            client.unlink(*members[i : i + self.batch_size])
+        return len(members)
+
+    # ------------------------------------------------------------------------
+    # 失效
+    # ------------------------------------------------------------------------
+
+    def invalidate(
+        self,
+        client,
+        key_prefix: str,
+        pattern: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """
+        按模式和参数失效L2键（ZSCAN 最小的标签集合 + 分批 UNLINK）
+
+        候选键取自成员最少的查询标签，再用 member_matches 检查命名空间和
+        全部参数约束，结果等同于各标签集合的交集。
+
+        Args:
+            client: Redis客户端
+            key_prefix: Flask-Caching键前缀
+            pattern: 缓存模式（支持 'events.*' 前缀通配）
+            params: 参数约束（值为None或'*'表示只要求参数存在）
+
+        Returns:
+            删除的键数量
+        """
+        params = params or {}
+        start = time.perf_counter()
+
+        glob = pattern.endswith(".*")
+        namespace = pattern[:-2] if glob else pattern
+        query_tags = [f"ns:{namespace}"] + self.entity_tags(pattern, params)
+        tag_keys = [self._tag_key(key_prefix, tag) for tag in query_tags]
+
+        if len(tag_keys) == 1:
+            source = tag_keys[0]
+        else:
+            pipe = client.pipeline(transaction=False)
+            for tag_key in tag_keys:
+                pipe.zcard(tag_key)
+            sizes = pipe.execute()
+            source = tag_keys[sizes.index(min(sizes))]
+
+        now = time.time()
+        key_head = f"{key_prefix}{self.key_namespace}"
+        matched = []
+        for member, expires_at in client.zscan_iter(source, count=self.batch_size):
+            if expires_at < now:
+                continue
+            name = member.decode("utf-8") if isinstance(member, bytes) else member
+            if self.member_matches(name, key_head, namespace, glob, params):
+                matched.append(name)
+
+        deleted = self._unlink_batches(client, matched, tag_keys)
+
+        with self._lock:
+            self.stats["tag_invalidations"] += 1
+            self.stats["last_invalidation_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        return deleted
+
+    def member_matches(
+        self,
+        raw_key: str,
+        key_head: str,
+        namespace: str,
+        glob: bool,
+        params: Dict[str, Any],
+    ) -> bool:
+        """检查标签成员是否满足模式前缀及非实体参数约束"""
+        if not raw_key.startswith(key_head):
+            return False
+
+        parts = raw_key[len(key_head) :].split(":")
+        key_pattern = parts[0]
+        if glob:
+            if not key_pattern.startswith(namespace + "."):
+                return False
+        elif key_pattern != namespace and not key_pattern.startswith(namespace + "."):
+            return False
+
+        if not params:
+            return True
+
+        key_params = {parts[i]: parts[i + 1] for i in range(1, len(parts) - 1, 2)}
+        for name, value in params.items():
+            if name not in key_params:
+                return False
+            if value is not None and value != "*" and key_params[name] != escape_key_value(value):
+                return False
+        return True
+
+    def _unlink_batches(self, client, raw_keys: List[str], tag_keys: Iterable[str]) -> int:
+        """分批 UNLINK 数据键，并从查询用到的标签集合中移除"""
+        tag_keys = list(tag_keys)
+        deleted = 0
+        for i in range(0, len(raw_keys), self.batch_size):
+            batch = raw_keys[i : i + self.batch_size]
+            pipe = client.pipeline(transaction=False)
+            pipe.unlink(*batch)
+            for tag_key in tag_keys:
+                pipe.zrem(tag_key, *batch)
+            results = pipe.execute()
+            deleted += results[0] or 0
+            with self._lock:
+                self.stats["batches"] += 1
+
+        with self._lock:
+            self.stats["keys_unlinked"] += deleted
+        return deleted
+
+    def scan_invalidate(
+        self,
+        client,
+        key_prefix: str,
+        pattern: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """
+        按模式和参数用 SCAN 失效没有标签的历史键
+
+        Args:
+            client: Redis客户端
+            key_prefix: Flask-Caching键前缀
+            pattern: 缓存模式（支持 'events.*' 前缀通配）
+            params: 参数约束
+
+        Returns:
+            删除的键数量
+        """
+        params = params or {}
+        glob = pattern.endswith(".*")
+        namespace = pattern[:-2] if glob else pattern
+        key_head = f"{key_prefix}{self.key_namespace}"
+
+        return self.scan_delete(
+            client,
+            f"{key_head}{namespace}*",
+            key_filter=lambda raw: self.member_matches(raw, key_head, namespace, glob, params),
+        )
+
+    def scan_delete(
+        self,
+        client,
+        match: str,
+        count: Optional[int] = None,
+        key_filter: Optional[Callable[[str], bool]] = None,
+    ) -> int:
+        """
+        使用游标 SCAN 分批删除匹配的键（用于没有标签的历史键）
+
+        Args:
+            client: Redis客户端
+            match: SCAN MATCH 模式（如 'dwd_gen:v3:*'）
+            count: 每次SCAN的提示数量，默认等于batch_size
+            key_filter: 额外的键过滤函数（接收解码后的键名）
+
+        Returns:
+            删除的键数量
+        """
+        count = count or self.batch_size
+        start = time.perf_counter()
+        deleted = 0
+        batch: List[Any] = []
+
+        for key in client.scan_iter(match=match, count=count):
+            if key_filter is not None:
+                name = key.decode("utf-8") if isinstance(key, bytes) else key
+                if not key_filter(name):
+                    continue
+            batch.append(key)
+            if len(batch) >= self.batch_size:
+                deleted += client.unlink(*batch) or 0
+                batch = []
+                with self._lock:
+                    self.stats["batches"] += 1
+        if batch:
+            deleted += client.unlink(*batch) or 0
+            with self._lock:
+                self.stats["batches"] += 1
+
+        with self._lock:
+            self.stats["scan_invalidations"] += 1
+            self.stats["keys_unlinked"] += deleted
+            self.stats["last_invalidation_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        return deleted
+
+    def prune_tag(self, client, key_prefix: str, tag: str) -> int:
+        """
+        立即移除标签集合中已过期的成员（record() 写入时也会顺带清理）
+
+        Args:
+            client: Redis客户端
+            key_prefix: Flask-Caching键前缀
+            tag: 标签名（如 'ns:events.list'）
+
+        Returns:
+            移除的成员数量
+        """
+        removed = client.zremrangebyscore(self._tag_key(key_prefix, tag), "-inf", time.time())
+        with self._lock:
+            self.stats["tag_members_pruned"] += removed
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取L2失效统计"""
+        with self._lock:
+            return dict(self.stats, batch_size=self.batch_size)
+
+
+def resolve_tag_backend(cache) -> Optional[Any]:
+    """
+    取出自带标签失效能力的非Redis后端（如 SQLiteCache）
+
+    Args:
+        cache: Flask-Caching实例（current_app.cache）
+
+    Returns:
+        实现了 record_tags / invalidate_tags 的后端；否则返回None
+    """
+    backend = getattr(cache, "cache", None)
+    if hasattr(backend, "record_tags") and hasattr(backend, "invalidate_tags"):
+        return backend
+    return None
+
+
+def resolve_redis_backend(cache) -> Tuple[Optional[Any], str]:
+    """
+    从Flask-Caching实例中取出底层Redis客户端和键前缀
+
+    Args:
+        cache: Flask-Caching实例（current_app.cache）
+
+    Returns:
+        (client, key_prefix)；非Redis后端时返回 (None, "")
+    """
+    backend = getattr(cache, "cache", None)
+    client = getattr(backend, "_write_client", None) or getattr(backend, "_client", None)
+    if client is None or not hasattr(client, "pipeline"):
+        return None, ""
+
+    key_prefix = getattr(backend, "key_prefix", "") or ""
+    if callable(key_prefix):
+        key_prefix = key_prefix()
+    return client, key_prefix
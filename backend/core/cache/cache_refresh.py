@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台刷新器（Stale-While-Revalidate）
+===================================
+
+L1条目超过软TTL后仍可直接返回旧值，同时把刷新任务交给本模块的
+有界线程池在后台重新加载；超过硬TTL才让调用方同步等待回源。
+
+- 同一键同时只排队一个刷新任务（去重）
+- 排队中 + 执行中的任务数有上限，超出时丢弃（旧值继续服务，直到硬TTL）
+- 线程池按需创建，未启用SWR时不占用线程
+
+使用示例:
+    from backend.core.cache.cache_refresh import BackgroundRefresher
+
+    refresher = BackgroundRefresher(max_workers=4, max_pending=256)
+    refresher.schedule("dwd_gen:v3:games.detail:id:1", lambda: reload_game(1))
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundRefresher:
+    """
+    有界后台刷新线程池（线程安全）
+
+    统计项:
+    - scheduled: 已提交的刷新任务数
+    - completed: 成功完成的刷新数
+    - failed: 加载函数抛出异常的刷新数
+    - deduplicated: 因同键已在队列中而跳过的次数
+    - dropped: 因队列已满而丢弃的次数
+    """
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 256):
+        """
+        初始化后台刷新器
+
+        Args:
+            max_workers: 刷新线程数
+            max_pending: 排队中 + 执行中的刷新任务上限
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Set[Any] = set()
+        self._lock = threading.Lock()
+        self.stats = {
+            "scheduled": 0,
+            "completed": 0,
+            "failed": 0,
+            "deduplicated": 0,
+            "dropped": 0,
+        }
+
+    def schedule(self, key: Any, fn: Callable[[], Any]) -> bool:
+        """
+        提交刷新任务
+
+        Args:
+            key: 去重键（通常是缓存键）
+            fn: 刷新函数（无参数），负责加载并回写缓存
+
+        Returns:
+            是否已提交（重复或队列已满时返回False）
+        """
+        with self._lock:
+            if key in self._pending:
+                self.stats["deduplicated"] += 1
+                return False
+            if len(self._pending) >= self.max_pending:
+                self.stats["dropped"] += 1
+                logger.debug(f"🚫 刷新队列已满，丢弃: {key}")
+                return False
+            self._pending.add(key)
+            self.stats["scheduled"] += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="cache-refresh"
+                )
+            executor = self._executor
+
+        try:
+            executor.submit(self._run, key, fn)
+        except RuntimeError:
+            # 解释器退出中，线程池已关闭
+            with self._lock:
+                self._pending.discard(key)
+            return False
+        return True
+
+    def _run(self, key: Any, fn: Callable[[], Any]):
+        try:
+            fn()
+            outcome = "completed"
+            logger.debug(f"🔄 后台刷新完成: {key}")
+        except Exception as e:
+            outcome = "failed"
+            logger.warning(f"⚠️ 后台刷新失败: {key}: {e}")
+        with self._lock:
+            self._pending.discard(key)
+            self.stats[outcome] += 1
+
+    @property
+    def queue_depth(self) -> int:
+        """排队中 + 执行中的刷新任务数"""
+        return len(self._pending)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取刷新统计"""
+        with self._lock:
+            return dict(
+                self.stats,
+                queue_depth=len(self._pending),
+                max_pending=self.max_pending,
+                workers=self.max_workers,
+            )
+
+    def reset_stats(self):
+        """重置统计"""
+        with self._lock:
+            for name in self.stats:
+                self.stats[name] = 0
+
+    def shutdown(self, wait: bool = True):
+        """关闭线程池"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
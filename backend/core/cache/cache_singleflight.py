@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+缓存未命中合并（Single-Flight）
+==============================
+
+热点键过期时，所有并发请求会同时未命中并执行同一条重查询（缓存击穿）。
+SingleFlight 保证同一个键同一时刻只有一个调用方真正执行加载函数：
+
+- 进程内：第一个调用方成为 leader 执行加载，其他线程等待并共享结果
+- 跨进程（可选）：leader 通过 Redis SET NX PX 抢锁，其他 gunicorn worker
+  轮询缓存等待结果；等待超时或锁异常时退化为直接计算，保证可用性
+
+使用示例:
+    from backend.core.cache.cache_singleflight import SingleFlight
+
+    flight = SingleFlight(wait_timeout=10)
+    games = flight.do("games:list:v1", load_games_from_db)
+"""
+
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 仅当锁仍归自己所有时才释放（避免误删其他worker续上的锁）
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class _Flight:
+    """一次进行中的加载"""
+
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    未命中请求合并器（线程安全）
+
+    统计项:
+    - leaders: 实际执行加载函数的次数
+    - coalesced: 进程内等待并复用leader结果的次数（省下的数据库往返）
+    - distributed_coalesced: 跨worker等待后从缓存拿到结果的次数
+    - timeouts: 等待超时后退化为直接计算的次数
+    - lock_errors: Redis锁操作失败的次数
+    """
+
+    def __init__(
+        self, wait_timeout: float = 10.0, lock_ttl: float = 30.0, poll_interval: float = 0.05
+    ):
+        """
+        初始化合并器
+
+        Args:
+            wait_timeout: follower 最长等待时间（秒），超时后直接计算
+            lock_ttl: 分布式锁过期时间（秒），防止leader崩溃后锁永久残留
+            poll_interval: 跨worker等待时轮询缓存的间隔（秒）
+        """
+        self.wait_timeout = wait_timeout
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+        self._flights: Dict[Any, _Flight] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            "leaders": 0,
+            "coalesced": 0,
+            "distributed_coalesced": 0,
+            "timeouts": 0,
+            "lock_errors": 0,
+        }
+
+    def _incr(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def do(
+        self,
+        key: Any,
+        fn: Callable[[], Any],
+        redis_client=None,
+        lock_key: Optional[str] = None,
+        check: Optional[Callable[[], Tuple[bool, Any]]] = None,
+    ) -> Any:
+        """
+        执行加载函数，同一键的并发调用只执行一次
+
+        Args:
+            key: 合并键（通常是缓存键）
+            fn: 加载函数（无参数），其结果会共享给所有等待者
+            redis_client: Redis客户端；提供时启用跨worker合并
+            lock_key: 分布式锁的Redis键
+            check: 跨worker等待期间的缓存探测函数，返回 (是否命中, 值)
+
+        Returns:
+            加载函数的结果
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+
+        if not leader:
+            if not flight.event.wait(self.wait_timeout):
+                self._incr("timeouts")
+                logger.warning(f"⏱️ 等待合并结果超时，直接计算: {key}")
+                return fn()
+            if flight.error is not None:
+                # leader失败，不共享异常，由自己重新计算
+                return fn()
+            self._incr("coalesced")
+            return flight.result
+
+        try:
+            if redis_client is not None and lock_key is not None:
+                flight.result = self._lead_distributed(fn, redis_client, lock_key, check)
+            else:
+                self._incr("leaders")
+                flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.event.set()
+
+    def _lead_distributed(self, fn, redis_client, lock_key: str, check) -> Any:
+        """进程内leader再与其他worker竞争Redis锁"""
+        token = uuid.uuid4().hex
+        try:
+            acquired = redis_client.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+        except Exception as e:
+            self._incr("lock_errors")
+            logger.warning(f"⚠️ 分布式锁获取失败，直接计算: {e}")
+            self._incr("leaders")
+            return fn()
+
+        if acquired:
+            try:
+                self._incr("leaders")
+                return fn()
+            finally:
+                self._release(redis_client, lock_key, token)
+
+        # 其他worker正在计算：轮询缓存直到结果出现、锁被释放或超时
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            if check is not None:
+                try:
+                    hit, value = check()
+                except Exception:
+                    hit, value = False, None
+                if hit:
+                    self._incr("distributed_coalesced")
+                    return value
+            try:
+                if not redis_client.exists(lock_key):
+                    break
+            except Exception:
+                self._incr("lock_errors")
+                break
+        else:
+            self._incr("timeouts")
+            logger.warning(f"⏱️ 等待其他worker结果超时，直接计算: {lock_key}")
+
+        self._incr("leaders")
+        return fn()
+
+    def _release(self, redis_client, lock_key: str, token: str):
+        try:
+            redis_client.eval(_RELEASE_SCRIPT, 1, lock_key, token)
+        except Exception:
+            # 不支持Lua的环境：非原子的比较删除（锁有TTL兜底）
+            try:
+                current = redis_client.get(lock_key)
+                if current is not None and current.decode("utf-8") == token:
+                    redis_client.delete(lock_key)
+            except Exception as e:
+                self._incr("lock_errors")
+                logger.warning(f"⚠️ 分布式锁释放失败: {e}")
+
+    @property
+    def in_flight(self) -> int:
+        """当前进行中的加载数量"""
+        return len(self._flights)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取合并统计"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats["saved_calls"] = stats["coalesced"] + stats["distributed_coalesced"]
+        stats["in_flight"] = self.in_flight
+        return stats
+
+    def reset_stats(self):
+        """重置统计"""
+        with self._lock:
+            for name in self.stats:
+                self.stats[name] = 0
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite文件L2缓存后端
+====================
+
+没有Redis的单机部署中，Flask-Caching 通常退化为每个进程一份的 SimpleCache，
+每个gunicorn worker各自预热、各自未命中。本模块提供一个基于 WAL 模式
+SQLite 文件的共享L2后端，同一台机器上的所有worker共享同一份缓存：
+
+- 与 Flask-Caching 后端接口兼容（get / set / delete / delete_many / clear ...），
+  可直接作为 CACHE_TYPE 使用，current_app.cache 的所有调用方都受益
+- 过期时间列 + 索引，读取时过滤过期条目，写入时按时间间隔分批清理
+- 标签表实现与 Redis 标签集合相同的模式失效契约（record_tags / invalidate_tags）
+- WAL 模式下读写互不阻塞，busy_timeout 处理多进程写冲突
+
+使用示例:
+    # 显式启用
+    CACHE_TYPE=backend.core.cache.cache_sqlite_l2.SQLiteCache
+
+    # 或保持 RedisCache，Redis不可用时 web_app 自动切换（CACHE_L2_FALLBACK=sqlite）
+"""
+
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from flask_caching.backends.base import BaseCache
+
+from backend.core.cache.cache_l2_invalidation import L2TagInvalidator
+
+logger = logging.getLogger(__name__)
+
+# 永不过期条目的过期时间（9999-12-31）
+_NEVER = 253402300799.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_cache_entries_expires ON cache_entries(expires_at);
+CREATE TABLE IF NOT EXISTS cache_tags (
+    tag TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (tag, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_cache_tags_key ON cache_tags(key);
+"""
+
+
+class SQLiteCache(BaseCache):
+    """
+    多进程共享的SQLite文件缓存（线程安全，每线程一个连接）
+
+    Args:
+        path: SQLite文件路径
+        default_timeout: 默认TTL（秒），0表示永不过期
+        key_prefix: 键前缀（与Flask-Caching CACHE_KEY_PREFIX一致）
+        key_namespace: HierarchicalCache键命名空间（CacheKeyBuilder.PREFIX），用于标签失效匹配
+        threshold: 条目上限，清理时超出部分按过期时间从早到晚淘汰；0表示不限制
+        sweep_interval: 过期清理间隔（秒）
+        sweep_batch: 每批清理的条目数
+        busy_timeout_ms: 写锁等待时间（毫秒）
+    """
+
+    def __init__(
+        self,
+        path: str,
+        default_timeout: int = 300,
+        key_prefix: str = "",
+        key_namespace: str = "",
+        threshold: int = 0,
+        sweep_interval: float = 60.0,
+        sweep_batch: int = 1000,
+        busy_timeout_ms: int = 5000,
+        **kwargs,
+    ):
+        super().__init__(default_timeout=default_timeout)
+        self.path = str(path)
+        self.key_prefix = key_prefix
+        self.threshold = threshold
+        self.sweep_interval = sweep_interval
+        self.sweep_batch = sweep_batch
+        self.busy_timeout_ms = busy_timeout_ms
+        self._tagger = L2TagInvalidator(key_namespace=key_namespace, batch_size=500)
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self.stats = {
+            "sweeps": 0,
+            "expired_removed": 0,
+            "evicted": 0,
+            "tag_invalidations": 0,
+            "keys_deleted": 0,
+        }
+
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        logger.info(f"✅ SQLite L2缓存: {self.path}")
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        """Flask-Caching后端工厂（CACHE_TYPE指向本类时调用）"""
+        from backend.core.cache.cache_system import CacheKeyBuilder
+        from backend.core.config.config import CacheConfig
+
+        kwargs.update(
+            path=config.get("CACHE_SQLITE_PATH", CacheConfig.CACHE_SQLITE_PATH),
+            key_prefix=config.get("CACHE_KEY_PREFIX", ""),
+            key_namespace=CacheKeyBuilder.PREFIX,
+            threshold=config.get("CACHE_THRESHOLD", 0) or 0,
+            sweep_interval=CacheConfig.CACHE_SQLITE_SWEEP_INTERVAL,
+        )
+        return cls(*args, **kwargs)
+
+    # ------------------------------------------------------------------------
+    # 连接
+    # ------------------------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        # fork后的子进程不能复用父进程的连接
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000)
+            conn.isolation_level = None  # 自动提交，多语句操作显式 BEGIN
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _full_key(self, key: str) -> str:
+        return f"{self.key_prefix}{key}"
+
+    def _expires_at(self, timeout: Optional[int]) -> float:
+        timeout = self._normalize_timeout(timeout)
+        return _NEVER if timeout == 0 else time.time() + timeout
+
+    # ------------------------------------------------------------------------
+    # Flask-Caching 接口
+    # ------------------------------------------------------------------------
+
+    def get(self, key: str) -> Any:
+        row = (
+            self._conn()
+            .execute(
+                "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?",
+                (self._full_key(key), time.time()),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        try:
+            return pickle.loads(row[0])
+        except Exception:
+            return None
+
+    def set(self, key: str, value: Any, timeout: Optional[int] = None) -> bool:
+        payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        self._conn().execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+            (self._full_key(key), sqlite3.Binary(payload), self._expires_at(timeout)),
+        )
+        self._maybe_sweep()
+        return True
+
+    def add(self, key: str, value: Any, timeout: Optional[int] = None) -> bool:
+        full_key = self._full_key(key)
+        payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # 已过期的条目视为不存在
+            conn.execute(
+                "DELETE FROM cache_entries WHERE key = ? AND expires_at <= ?",
+                (full_key, time.time()),
+            )
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+                (full_key, sqlite3.Binary(payload), self._expires_at(timeout)),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return cursor.rowcount == 1
+
+    def has(self, key: str) -> bool:
+        row = (
+            self._conn()
+            .execute(
+                "SELECT 1 FROM cache_entries WHERE key = ? AND expires_at > ?",
+                (self._full_key(key), time.time()),
+            )
+            .fetchone()
+        )
+        return row is not None
+
+    def delete(self, key: str) -> bool:
+        return self._delete_full_keys([self._full_key(key)]) > 0
+
+    def delete_many(self, *keys: str) -> List[str]:
+        self._delete_full_keys([self._full_key(key) for key in keys])
+        return list(keys)
+
+    def clear(self) -> bool:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self.key_prefix:
+                head = (len(self.key_prefix), self.key_prefix)
+                conn.execute("DELETE FROM cache_entries WHERE substr(key, 1, ?) = ?", head)
+                conn.execute("DELETE FROM cache_tags WHERE substr(key, 1, ?) = ?", head)
+            else:
+                conn.execute("DELETE FROM cache_entries")
+                conn.execute("DELETE FROM cache_tags")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return True
+
+    # ------------------------------------------------------------------------
+    # 标签失效（与 L2TagInvalidator 的Redis实现契约一致）
+    # ------------------------------------------------------------------------
+
+    def record_tags(self, key: str, pattern: str, params: Dict[str, Any], ttl: int):
+        """
+        记录缓存键的标签
+
+        Args:
+            key: HierarchicalCache缓存键
+            pattern: 缓存模式
+            params: 参数键值对
+            ttl: 数据TTL（标签随数据过期清理，此处不使用）
+        """
+        full_key = self._full_key(key)
+        rows = [(tag, full_key) for tag in self._tagger.tags_for(pattern, params)]
+        conn = self._conn()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany("INSERT OR IGNORE INTO cache_tags (tag, key) VALUES (?, ?)", rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def invalidate_tags(self, pattern: str, params: Optional[Dict[str, Any]] = None) -> int:
+        """
+        按模式和参数失效键（标签交集 + 分批删除）
+
+        Args:
+            pattern: 缓存模式（支持 'events.*' 前缀通配）
+            params: 参数约束（值为None或'*'表示只要求参数存在）
+
+        Returns:
+            删除的键数量
+        """
+        params = params or {}
+        glob = pattern.endswith(".*")
+        namespace = pattern[:-2] if glob else pattern
+        query_tags = [f"ns:{namespace}"] + self._tagger.entity_tags(pattern, params)
+
+        sql = " INTERSECT ".join(["SELECT key FROM cache_tags WHERE tag = ?"] * len(query_tags))
+        members = [row[0] for row in self._conn().execute(sql, query_tags)]
+
+        key_head = f"{self.key_prefix}{self._tagger.key_namespace}"
+        matched = [
+            member
+            for member in members
+            if self._tagger.member_matches(member, key_head, namespace, glob, params)
+        ]
+        deleted = self._delete_full_keys(matched)
+
+        with self._stats_lock:
+            self.stats["tag_invalidations"] += 1
+        return deleted
+
+    def _delete_full_keys(self, full_keys: List[str]) -> int:
+        """分批删除条目及其标签"""
+        deleted = 0
+        conn = self._conn()
+        batch_size = self._tagger.batch_size
+        for i in range(0, len(full_keys), batch_size):
+            batch = full_keys[i : i + batch_size]
+            placeholders = ",".join("?" * len(batch))
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = conn.execute(
+                    f"DELETE FROM cache_entries WHERE key IN ({placeholders})", batch
+                )
+                conn.execute(f"DELETE FROM cache_tags WHERE key IN ({placeholders})", batch)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            deleted += cursor.rowcount
+        with self._stats_lock:
+            self.stats["keys_deleted"] += deleted
+        return deleted
+
+    # ------------------------------------------------------------------------
+    # 过期清理
+    # ------------------------------------------------------------------------
+
+    def _maybe_sweep(self):
+        now = time.monotonic()
+        if now - self._last_sweep < self.sweep_interval:
+            return
+        self._last_sweep = now
+        try:
+            self.sweep()
+        except sqlite3.OperationalError as e:
+            # 其他进程正持有写锁，下个周期再清理
+            logger.debug(f"SQLite L2清理跳过: {e}")
+
+    def sweep(self) -> int:
+        """
+        分批清理过期条目（及超出threshold的条目）
+
+        Returns:
+            清理的条目数量
+        """
+        conn = self._conn()
+        removed = 0
+        while True:
+            keys = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT key FROM cache_entries WHERE expires_at <= ? LIMIT ?",
+                    (time.time(), self.sweep_batch),
+                )
+            ]
+            if not keys:
+                break
+            removed += self._delete_full_keys(keys)
+            if len(keys) < self.sweep_batch:
+                break
+
+        evicted = 0
+        if self.threshold:
+            (count,) = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()
+            overflow = count - self.threshold
+            if overflow > 0:
+                keys = [
+                    row[0]
+                    for row in conn.execute(
+                        "SELECT key FROM cache_entries ORDER BY expires_at LIMIT ?", (overflow,)
+                    )
+                ]
+                evicted = self._delete_full_keys(keys)
+
+        with self._stats_lock:
+            self.stats["sweeps"] += 1
+            self.stats["expired_removed"] += removed
+            self.stats["evicted"] += evicted
+        return removed + evicted
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取后端统计（条目数、文件大小、清理次数等）"""
+        (entries,) = self._conn().execute("SELECT COUNT(*) FROM cache_entries").fetchone()
+        try:
+            file_bytes = os.path.getsize(self.path)
+        except OSError:
+            file_bytes = 0
+        with self._stats_lock:
+            return dict(self.stats, entries=entries, file_bytes=file_bytes, path=self.path)
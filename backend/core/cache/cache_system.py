@@ -16,6 +16,7 @@
 - 缓存预热（启动预热、定时预热、分阶段预热）
 - 统计监控（命中率、性能指标、容量监控）
 - 穿透保护（空值缓存）
+- 击穿保护（未命中合并，进程内 + 跨worker Redis锁）
 - TTL随机化（防止雪崩）
 
 使用示例:
@@ -37,7 +38,22 @@ import logging
 import random
 import threading
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.core.cache.cache_codec import UNDECODABLE, CacheCodec
+from backend.core.cache.cache_engine import L1CacheEngine
+from backend.core.cache.cache_generation import GenerationStore
+from backend.core.cache.cache_hotkeys import HotKeyTracker, loader_identity
+from backend.core.cache.cache_invalidation_bus import OP_CLEAR, OP_KEY, OP_PATTERN, InvalidationBus
+from backend.core.cache.cache_l2_invalidation import (
+    L2TagInvalidator,
+    escape_key_value,
+    resolve_redis_backend,
+    resolve_tag_backend,
+)
+from backend.core.cache.cache_refresh import BackgroundRefresher
+from backend.core.cache.cache_singleflight import SingleFlight
+from backend.core.cache.cache_tag_index import CacheTagIndex
 
 logger = logging.getLogger(__name__)
 
@@ -55,11 +71,15 @@ class CacheKeyBuilder:
     - 层次化命名: dwd_gen:v3:module:entity:identifier:variant
     - 版本控制: 避免脏读
     - 参数排序: 确保一致性
+    - 实体代数: 键中嵌入所依赖游戏/事件的当前代数，递增代数即可O(1)失效
     """
 
     PREFIX = "dwd_gen:v3:"
     VERSION = "3.0"
 
+    # 实体代数存储（由全局 hierarchical_cache 注入），None表示不嵌入代数
+    generations: Optional[GenerationStore] = None
+
     @classmethod
     def build(cls, pattern: str, **kwargs) -> str:
         """
@@ -77,13 +97,19 @@ class CacheKeyBuilder:
             'dwd_gen:v3:events.list:game_id:1:page:1'
             >>> CacheKeyBuilder.build('events.list', page=1, game_id=1)
             'dwd_gen:v3:events.list:game_id:1:page:1'  # 参数顺序不影响
+            >>> # game_id=1 的代数递增到2之后
+            >>> CacheKeyBuilder.build('events.list', game_id=1, page=1)
+            'dwd_gen:v3:events.list:_gen_game_id:2:game_id:1:page:1'
         """
         if not kwargs:
             return f"{cls.PREFIX}{pattern}"
 
-        # 参数排序确保一致性
+        if cls.generations is not None:
+            kwargs = cls.generations.stamp(pattern, kwargs)
+
+        # 参数排序确保一致性；值中的 ':' 转义，键可以无歧义地拆回参数
         sorted_params = sorted(kwargs.items())
-        param_str = ":".join(f"{k}:{v}" for k, v in sorted_params)
+        param_str = ":".join(f"{k}:{escape_key_value(v)}" for k, v in sorted_params)
         return f"{cls.PREFIX}{pattern}:{param_str}"
 
     @classmethod
@@ -125,24 +151,99 @@ class HierarchicalCache:
     优势:
     - 热点数据极快访问（L1）
     - 大容量缓存存储（L2）
-    - 自动LRU淘汰，节省内存
+    - O(1) LRU淘汰 + 字节预算，节省内存
+    - 可选TinyLFU准入，一次性扫描不会冲刷热点键
     - L2命中自动回填L1
+    - 未命中合并（Single-Flight），热点键过期时只有一个调用方回源
+    - Stale-While-Revalidate：L1超过软TTL后先返回旧值并后台刷新，超过硬TTL才阻塞回源
+    - 跨worker L1一致性：失效操作经Redis Pub/Sub广播到所有worker
+    - L2载荷列式编码 + 超过阈值压缩，减少网络传输和Redis内存
+    - 热点键频率追踪：定期写快照，重启后按热度预热
     """
 
-    def __init__(self, l1_size=1000, l1_ttl=60, l2_ttl=3600):
+    # 分布式Single-Flight锁的键命名空间
+    LOCK_NAMESPACE = "lock:"
+
+    # L1失效总线频道（附加Flask-Caching键前缀）
+    BUS_CHANNEL = "bus:l1-invalidation"
+
+    def __init__(
+        self,
+        l1_size=1000,
+        l1_ttl=60,
+        l2_ttl=3600,
+        l1_max_bytes=None,
+        l1_admission=None,
+        l1_hard_ttl=None,
+    ):
         """
         初始化分层缓存
 
         Args:
             l1_size: L1缓存大小（条数），默认1000
-            l1_ttl: L1缓存TTL（秒），默认60
+            l1_ttl: L1缓存TTL（秒），默认60；启用SWR时作为软TTL
             l2_ttl: L2缓存TTL（秒），默认3600
+            l1_max_bytes: L1字节预算，None则使用CacheConfig.CACHE_L1_MAX_BYTES
+            l1_admission: 是否启用TinyLFU准入，None则使用CacheConfig.CACHE_L1_ADMISSION
+            l1_hard_ttl: L1硬TTL（秒），None则使用CacheConfig.CACHE_L1_HARD_TTL；
+                不大于l1_ttl时关闭Stale-While-Revalidate
         """
+        from backend.core.config.config import CacheConfig
+
+        if l1_max_bytes is None:
+            l1_max_bytes = CacheConfig.CACHE_L1_MAX_BYTES
+        if l1_admission is None:
+            l1_admission = CacheConfig.CACHE_L1_ADMISSION
+        if l1_hard_ttl is None:
+            l1_hard_ttl = CacheConfig.CACHE_L1_HARD_TTL
+
         self.l1_size = l1_size
         self.l1_ttl = l1_ttl
+        self.l1_hard_ttl = l1_hard_ttl
         self.l2_ttl = l2_ttl
-        self.l1_cache: Dict[str, Any] = {}  # 简单字典缓存（带TTL）
-        self.l1_timestamps: Dict[str, float] = {}
+        self.l1 = L1CacheEngine(max_entries=l1_size, max_bytes=l1_max_bytes, admission=l1_admission)
+        # (pattern, param, value) → 键集合，驱动模式失效（L1 + L2）
+        self.tag_index = CacheTagIndex()
+        # Redis标签集合，覆盖其他worker写入的L2键
+        self.l2_tags = L2TagInvalidator(
+            key_namespace=CacheKeyBuilder.PREFIX,
+            batch_size=CacheConfig.CACHE_L2_INVALIDATION_BATCH,
+            max_tag_members=CacheConfig.CACHE_L2_TAG_MAX_MEMBERS,
+        )
+        # 未命中合并：singleflight合并回源加载，_l2_flight合并进程内的L2读取
+        self.singleflight = SingleFlight(
+            wait_timeout=CacheConfig.CACHE_SINGLEFLIGHT_TIMEOUT,
+            lock_ttl=CacheConfig.CACHE_SINGLEFLIGHT_LOCK_TTL,
+        )
+        self._l2_flight = SingleFlight(wait_timeout=CacheConfig.CACHE_SINGLEFLIGHT_TIMEOUT)
+        # Stale-While-Revalidate：模式 → (加载函数, TTL)，由 cached_hierarchical 注册
+        self._loaders: Dict[str, Tuple[Callable[..., Any], Optional[int]]] = {}
+        self.refresher = BackgroundRefresher(
+            max_workers=CacheConfig.CACHE_REFRESH_WORKERS,
+            max_pending=CacheConfig.CACHE_REFRESH_QUEUE_SIZE,
+        )
+        # L2载荷编解码（L1保存原始对象，不经过编码）
+        self.codec = CacheCodec(
+            compress_threshold=CacheConfig.CACHE_L2_COMPRESS_THRESHOLD,
+            algorithm=CacheConfig.CACHE_L2_COMPRESSION,
+        )
+        # 跨worker L1失效总线，由 init_invalidation_bus() 启动
+        self.bus = InvalidationBus(
+            channel=f"{CacheKeyBuilder.PREFIX}{self.BUS_CHANNEL}",
+            batch_interval=CacheConfig.CACHE_BUS_BATCH_MS / 1000,
+            max_batch=CacheConfig.CACHE_BUS_MAX_BATCH,
+        )
+        # 实体代数（游戏/事件级O(1)失效），递增后经失效总线通知其他worker
+        self.generations = GenerationStore(
+            cache_getter=self._get_cache,
+            mirror_ttl=CacheConfig.CACHE_GENERATION_MIRROR_TTL,
+            counter_ttl=CacheConfig.CACHE_GENERATION_TTL,
+            on_bump=self.bus.publish_key,
+        )
+        # 热点键频率追踪，定期写快照供重启后预热
+        self.hotkeys = HotKeyTracker(
+            top_k=CacheConfig.CACHE_HOTKEY_TOP_K, max_age=CacheConfig.CACHE_HOTKEY_SNAPSHOT_MAX_AGE
+        )
         self._lock = threading.RLock()  # 线程安全锁
 
         # 空值缓存标记
@@ -153,14 +254,98 @@ class HierarchicalCache:
             "l1_hits": 0,
             "l2_hits": 0,
             "misses": 0,
-            "l1_evictions": 0,
             "l1_sets": 0,
             "l2_sets": 0,
             "empty_hits": 0,  # 空值缓存命中次数
+            "stale_served": 0,  # 超过软TTL仍返回旧值的次数
         }
 
         logger.info(f"✅ 三级缓存初始化: " f"L1={l1_size}条/{l1_ttl}秒, " f"L2={l2_ttl}秒")
 
+    @property
+    def swr_enabled(self) -> bool:
+        """是否启用Stale-While-Revalidate"""
+        return self.l1_hard_ttl > self.l1_ttl
+
+    def register_loader(self, pattern: str, loader: Callable[..., Any], ttl: Optional[int] = None):
+        """
+        注册模式的加载函数，供L1软过期后的后台刷新使用
+
+        Args:
+            pattern: 缓存模式 (如 'games.detail')
+            loader: 加载函数，以缓存参数作为关键字参数调用，如 loader(id=1)
+            ttl: 刷新后写入的TTL（秒），None则使用默认l2_ttl
+        """
+        self._loaders[pattern] = (loader, ttl)
+
+    def loader_for(self, pattern: str) -> Optional[str]:
+        """
+        返回模式已注册加载函数的标识（写入热点快照）
+
+        Args:
+            pattern: 缓存模式
+
+        Returns:
+            "module:qualname"，未注册时返回None
+        """
+        registered = self._loaders.get(pattern)
+        return loader_identity(registered[0]) if registered else None
+
+    def init_invalidation_bus(self, app, client=None) -> bool:
+        """
+        启动跨worker L1失效总线
+
+        在应用创建时调用；同时注册 before_request 钩子，
+        gunicorn preload 模式下fork出的worker会在首个请求时重启总线线程
+
+        Args:
+            app: Flask应用（需已挂载 app.cache）
+            client: Redis客户端，None则从 app.cache 解析
+
+        Returns:
+            总线是否已启动（非Redis后端或未启用时返回False）
+        """
+        from backend.core.config.config import CacheConfig
+
+        if not CacheConfig.CACHE_BUS_ENABLED:
+            return False
+
+        key_prefix = ""
+        if client is None:
+            client, key_prefix = resolve_redis_backend(getattr(app, "cache", None))
+        if client is None:
+            logger.info("ℹ️ 非Redis缓存后端，跳过L1失效总线")
+            return False
+
+        self.bus.channel = f"{key_prefix}{self.BUS_CHANNEL}"
+        app.before_request(self.bus.ensure_running)
+        return self.bus.start(client, self._apply_remote_invalidations)
+
+    def _apply_remote_invalidations(self, messages: List[Dict[str, Any]]):
+        """
+        应用其他worker广播的失效（仅L1，L2已由发布方处理）
+
+        Args:
+            messages: 失效消息列表
+        """
+        for message in messages:
+            op = message.get("op")
+            if op == OP_PATTERN:
+                self._invalidate_l1(message.get("pt", ""), message.get("kw") or {})
+            elif op == OP_KEY:
+                key = message.get("k") or ""
+                if key.startswith(GenerationStore.NAMESPACE):
+                    # 其他worker递增了实体代数，丢弃本进程镜像
+                    self.generations.forget(key)
+                    continue
+                with self._lock:
+                    self.l1.delete(key)
+                self.tag_index.remove(key)
+            elif op == OP_CLEAR:
+                with self._lock:
+                    self.l1.clear()
+                self.tag_index.clear()
+
     def get(self, pattern: str, **kwargs) -> Optional[Any]:
         """
         三级缓存查询
@@ -173,6 +358,7 @@ class HierarchicalCache:
         特性:
         - 支持空值缓存（防止缓存穿透）
         - L2命中自动回填L1
+        - 同一键的并发L2读取合并为一次往返
 
         Args:
             pattern: 缓存模式 (如 'events.list')
@@ -182,36 +368,149 @@ class HierarchicalCache:
             缓存数据或None（未命中）
         """
         key = CacheKeyBuilder.build(pattern, **kwargs)
+        hit, value = self._lookup(key, pattern, kwargs)
+        self.hotkeys.record(key, pattern, kwargs, hit)
+        return value
+
+    def get_or_load(
+        self, pattern: str, loader: Callable[[], Any], ttl: Optional[int] = None, **kwargs
+    ) -> Any:
+        """
+        查询缓存，未命中时加载并回写（Single-Flight）
+
+        同一键的并发未命中只执行一次 loader：本进程内其他线程等待共享结果；
+        启用分布式合并时，其他worker通过Redis锁等待L2出现结果，
+        等待超时或锁异常时退化为直接加载
+
+        Args:
+            pattern: 缓存模式 (如 'parameters.all')
+            loader: 加载函数（无参数），返回值写入缓存（None按空值缓存）
+            ttl: TTL时间（秒），None则使用默认l2_ttl
+            **kwargs: 参数键值对
+
+        Returns:
+            缓存数据或加载结果
+
+        Example:
+            >>> hierarchical_cache.get_or_load('games.detail', lambda: load_game(1), id=1)
+        """
+        key = CacheKeyBuilder.build(pattern, **kwargs)
+        hit, value = self._lookup(key, pattern, kwargs, loader=loader, ttl=ttl)
+        self.hotkeys.record(key, pattern, kwargs, hit)
+        if hit:
+            return value
+
+        def load():
+            # 排队期间前一个leader可能已经写入
+            hit, value = self._lookup(key, pattern, kwargs, count_miss=False)
+            if hit:
+                return value
+            value = loader()
+            self.set(pattern, value, ttl=ttl, **kwargs)
+            return value
+
+        redis_client, lock_key = None, None
+        cache = self._get_cache()
+        if cache is not None:
+            redis_client, lock_key = _distributed_lock(cache, key)
+
+        return self.singleflight.do(
+            key,
+            load,
+            redis_client=redis_client,
+            lock_key=lock_key,
+            check=lambda: self._lookup(key, pattern, kwargs, count_miss=False),
+        )
+
+    def warm(
+        self, pattern: str, loader: Callable[..., Any], ttl: Optional[int] = None, **kwargs
+    ) -> Tuple[str, bool]:
+        """
+        预热单个键：已缓存时跳过，否则以缓存参数调用 loader 并写入
+
+        不计入未命中和热点频率，避免预热本身扭曲下一次快照
+
+        Args:
+            pattern: 缓存模式
+            loader: 加载函数，以缓存参数作为关键字参数调用
+            ttl: TTL时间（秒），None则使用默认l2_ttl
+            **kwargs: 参数键值对
+
+        Returns:
+            (缓存键, 是否执行了加载)
+        """
+        key = CacheKeyBuilder.build(pattern, **kwargs)
+        hit, _ = self._lookup(key, pattern, kwargs, count_miss=False)
+        if hit:
+            return key, False
+        self.set(pattern, loader(**kwargs), ttl=ttl, **kwargs)
+        return key, True
+
+    def _lookup(
+        self,
+        key: str,
+        pattern: str,
+        kwargs: Dict[str, Any],
+        count_miss: bool = True,
+        loader: Optional[Callable[[], Any]] = None,
+        ttl: Optional[int] = None,
+    ) -> Tuple[bool, Any]:
+        """
+        查询L1/L2，区分"命中空值"和"未命中"
+
+        Args:
+            key: 缓存键
+            pattern: 缓存模式
+            kwargs: 参数键值对
+            count_miss: 未命中时是否计入misses（合并等待期间的探测不计入）
+            loader: 软过期时用于后台刷新的加载函数，None则查找已注册的加载函数
+            ttl: 后台刷新写入的TTL（秒）
 
+        Returns:
+            (是否命中, 数据)；命中空值缓存时为 (True, None)
+        """
         with self._lock:
             # L1: 内存热点缓存
-            if key in self.l1_cache:
-                timestamp = self.l1_timestamps.get(key, 0)
-                if time.time() - timestamp < self.l1_ttl:
-                    cached_data = self.l1_cache[key]
+            entry = self.l1.get(key)
+            if entry is not None:
+                age = time.time() - entry.timestamp
+                if age < self.l1_ttl or (
+                    age < self.l1_hard_ttl
+                    and self._schedule_refresh(key, pattern, kwargs, loader, ttl)
+                ):
+                    if age >= self.l1_ttl:
+                        # 软过期：返回旧值，后台刷新已排队
+                        self.stats["stale_served"] += 1
+                        logger.debug(f"♻️ L1 STALE → 后台刷新: {key}")
+                    cached_data = entry.value
 
                     # 检查是否是空值缓存标记
                     if cached_data == self._EMPTY_MARKER:
                         self.stats["empty_hits"] = self.stats.get("empty_hits", 0) + 1
                         self.stats["l1_hits"] += 1
                         logger.debug(f"✅ L1 HIT (空值): {key}")
-                        return None
+                        return True, None
 
                     self.stats["l1_hits"] += 1
                     logger.debug(f"✅ L1 HIT: {key}")
-                    return cached_data
+                    return True, cached_data
                 else:
                     # L1过期，删除
-                    del self.l1_cache[key]
-                    del self.l1_timestamps[key]
+                    self.l1.delete(key)
                     logger.debug(f"⏰ L1过期: {key}")
 
-        # L2: Redis缓存
+        # L2: Redis缓存（并发读取同一键时只发一次请求和一次解码）
         cache = self._get_cache()
         if cache is not None:
             try:
-                cached = cache.get(key)
+                cached = self._l2_flight.do(key, lambda: self.codec.decode(cache.get(key), pattern))
+                if cached is UNDECODABLE:
+                    # 其他版本写入的载荷，按未命中处理并由回源覆盖
+                    cached = None
                 if cached is not None:
+                    # 其他进程写入的键同样需要能被模式失效
+                    self.tag_index.add(key, pattern, kwargs, self.l2_ttl)
+
                     # 回填L1
                     with self._lock:
                         # 检查是否是空值缓存
@@ -219,19 +518,58 @@ class HierarchicalCache:
                             self.stats["empty_hits"] = self.stats.get("empty_hits", 0) + 1
                             self.stats["l2_hits"] += 1
                             logger.debug(f"✅ L2 HIT (空值) → L1回填: {key}")
-                            return None
+                            return True, None
 
                         self._set_l1(key, cached)
                     self.stats["l2_hits"] += 1
                     logger.debug(f"✅ L2 HIT → L1回填: {key}")
-                    return cached
+                    return True, cached
             except Exception as e:
                 logger.warning(f"⚠️ L2缓存读取失败: {e}")
 
-        # L3: 缓存未命中，返回None
-        self.stats["misses"] += 1
-        logger.debug(f"❌ CACHE MISS: {key}")
-        return None
+        # L3: 缓存未命中
+        if count_miss:
+            self.stats["misses"] += 1
+            logger.debug(f"❌ CACHE MISS: {key}")
+        return False, None
+
+    def _schedule_refresh(
+        self,
+        key: str,
+        pattern: str,
+        kwargs: Dict[str, Any],
+        loader: Optional[Callable[[], Any]],
+        ttl: Optional[int],
+    ) -> bool:
+        """
+        为软过期条目安排后台刷新
+
+        队列已满时刷新会被丢弃，但旧值仍继续服务直到硬TTL
+
+        Returns:
+            是否有可用的加载函数（False表示按硬过期处理）
+        """
+        if not self.swr_enabled:
+            return False
+        if loader is None:
+            registered = self._loaders.get(pattern)
+            if registered is None:
+                return False
+            load_fn, ttl = registered
+            loader = lambda: load_fn(**kwargs)  # noqa: E731
+
+        app = self._get_app()
+
+        def refresh():
+            if app is None:
+                self.set(pattern, loader(), ttl=ttl, **kwargs)
+                return
+            # 后台线程没有应用上下文，需要推入才能写L2
+            with app.app_context():
+                self.set(pattern, loader(), ttl=ttl, **kwargs)
+
+        self.refresher.schedule(key, refresh)
+        return True
 
     def set(self, pattern: str, data: Any, ttl: Optional[int] = None, **kwargs):
         """
@@ -275,38 +613,41 @@ class HierarchicalCache:
         # 写入L1
         with self._lock:
             self._set_l1(key, data)
+        self.tag_index.add(key, pattern, kwargs, ttl)
 
         # 写入L2
         cache = self._get_cache()
         if cache is not None:
             try:
-                cache.set(key, data, timeout=ttl)
+                cache.set(key, self.codec.encode(data, pattern), timeout=ttl)
                 self.stats["l2_sets"] += 1
                 logger.debug(f"💾 L2 SET: {key} (TTL={ttl}s)")
+
+                client, key_prefix = resolve_redis_backend(cache)
+                if client is not None:
+                    self.l2_tags.record(client, key_prefix, key, pattern, kwargs, ttl)
+                else:
+                    tag_backend = resolve_tag_backend(cache)
+                    if tag_backend is not None:
+                        tag_backend.record_tags(key, pattern, kwargs, ttl)
             except Exception as e:
                 logger.warning(f"⚠️ L2缓存写入失败: {e}")
 
     def _set_l1(self, key: str, data: Any):
         """
-        写入L1缓存（带LRU淘汰）
+        写入L1缓存（O(1) LRU淘汰）
 
-        当L1缓存满时，删除最旧的条目
+        当L1缓存超过条数上限或字节预算时，淘汰最久未使用的条目；
+        启用TinyLFU时，访问频率不高于淘汰候选者的新键不会被接纳
 
         Args:
             key: 缓存键
             data: 缓存数据
         """
-        # 如果L1已满，删除最旧的条目
-        if len(self.l1_cache) >= self.l1_size:
-            oldest_key = min(self.l1_timestamps, key=self.l1_timestamps.get)
-            del self.l1_cache[oldest_key]
-            del self.l1_timestamps[oldest_key]
-            self.stats["l1_evictions"] += 1
-            logger.debug(f"🗑️ L1淘汰: {oldest_key}")
-
-        self.l1_cache[key] = data
-        self.l1_timestamps[key] = time.time()
-        self.stats["l1_sets"] += 1
+        if self.l1.set(key, data):
+            self.stats["l1_sets"] += 1
+        else:
+            logger.debug(f"🚫 L1拒绝写入: {key}")
 
     def delete(self, pattern: str, **kwargs):
         """
@@ -320,10 +661,10 @@ class HierarchicalCache:
 
         # 删除L1
         with self._lock:
-            if key in self.l1_cache:
-                del self.l1_cache[key]
-                del self.l1_timestamps[key]
+            if self.l1.delete(key):
                 logger.debug(f"🗑️ L1删除: {key}")
+        self.tag_index.remove(key)
+        self.bus.publish_key(key)
 
         # 删除L2
         cache = self._get_cache()
@@ -336,103 +677,66 @@ class HierarchicalCache:
 
     def invalidate_pattern(self, pattern: str, **kwargs) -> int:
         """
-        失效匹配模式的所有L1缓存键
+        失效匹配模式的所有缓存键（L1和L2）
+
+        通过标签倒排索引定位键，开销为 O(匹配键数)，不依赖 Redis KEYS；
+        L2为Redis时再通过标签集合失效其他worker写入的键
 
         Args:
-            pattern: 缓存模式
-            **kwargs: 要匹配的参数
+            pattern: 缓存模式（支持 'events.*' 前缀通配）
+            **kwargs: 要匹配的参数（值为None或'*'表示任意值）
 
         Returns:
             失效的键数量
+
+        Example:
+            >>> hierarchical_cache.invalidate_pattern('parameters.all', game_id=1)
+            3  # 仅失效game_id=1的各分页，其他游戏不受影响
         """
-        wildcard = CacheKeyBuilder.build_pattern(pattern, **kwargs)
-        count = 0
+        from backend.core.config.config import CacheConfig
 
-        with self._lock:
-            # 收集要删除的键
-            keys_to_delete = []
-            for key in self.l1_cache:
-                if self._match_pattern(key, wildcard):
-                    keys_to_delete.append(key)
-
-            # 删除匹配的键
-            for key in keys_to_delete:
-                del self.l1_cache[key]
-                del self.l1_timestamps[key]
-                count += 1
-                logger.debug(f"🗑️ L1模式失效: {key}")
+        # 删除L1（本进程 + 广播给其他worker）
+        keys = self._invalidate_l1(pattern, kwargs)
+        count = len(keys)
+        self.bus.publish_pattern(pattern, kwargs)
+
+        # 删除L2
+        cache = self._get_cache()
+        if cache is not None:
+            try:
+                client, key_prefix = resolve_redis_backend(cache)
+                if client is not None:
+                    # 标签集合包含本进程写入的键，无需再逐个删除
+                    count = max(count, self.l2_tags.invalidate(client, key_prefix, pattern, kwargs))
+                    if CacheConfig.CACHE_L2_LEGACY_SCAN:
+                        count += self.l2_tags.scan_invalidate(client, key_prefix, pattern, kwargs)
+                elif resolve_tag_backend(cache) is not None:
+                    # 共享SQLite文件：标签表覆盖同机其他worker写入的键
+                    tag_backend = resolve_tag_backend(cache)
+                    count = max(count, tag_backend.invalidate_tags(pattern, kwargs))
+                elif keys:
+                    cache.delete_many(*keys)
+            except Exception as e:
+                logger.warning(f"⚠️ L2模式失效失败: {e}")
 
+        if count:
+            logger.debug(f"🗑️ 模式失效: {pattern} {kwargs} ({count}个键)")
         return count
 
-    def _match_pattern(self, key: str, pattern: str) -> bool:
+    def _invalidate_l1(self, pattern: str, kwargs: Dict[str, Any]) -> List[str]:
         """
-        参数感知的通配符匹配
-
-        匹配逻辑:
-        - 从pattern中提取指定的参数约束（如 game_id:*)
-        - 检查key中是否满足这些约束
-        - 忽略key中的其他参数
-
-        Args:
-            key: 缓存键（如 'dwd_gen:v3:test.key:event_id:0:game_id:1'）
-            pattern: 通配符模式（如 'dwd_gen:v3:test.key:game_id:*'）
+        按模式失效本进程L1
 
         Returns:
-            是否匹配
-
-        Example:
-            >>> key = 'dwd_gen:v3:test.key:event_id:0:game_id:1'
-            >>> pattern = 'dwd_gen:v3:test.key:game_id:*'
-            >>> _match_pattern(key, pattern)
-            True  # game_id=1匹配，忽略event_id参数
-        """
-        # Remove common prefix
-        prefix = CacheKeyBuilder.PREFIX
-        if not key.startswith(prefix) or not pattern.startswith(prefix):
-            return False
-
-        key_suffix = key[len(prefix) :]
-        pattern_suffix = pattern[len(prefix) :]
-
-        # Split by ':' to get components
-        key_parts = key_suffix.split(":")
-        pattern_parts = pattern_suffix.split(":")
-
-        # The format is: base_pattern:param1:value1:param2:value2:...
-        # pattern_parts: ['test.key', 'game_id', '*']
-        # key_parts: ['test.key', 'event_id', '0', 'game_id', '1']
-
-        # Base pattern is always the first part
-        base_pattern = pattern_parts[0]
-
-        # Check base pattern matches
-        if key_parts[0] != base_pattern:
-            return False
-
-        # Extract parameter constraints from pattern (key:value pairs where value is '*')
-        pattern_constraints = {}
-        for i in range(1, len(pattern_parts), 2):
-            if i + 1 < len(pattern_parts):
-                param_name = pattern_parts[i]
-                if pattern_parts[i + 1] == "*":
-                    pattern_constraints[param_name] = None  # Wildcard value
-                else:
-                    pattern_constraints[param_name] = pattern_parts[i + 1]
-
-        # Extract parameters from key (key:value pairs starting from index 1)
-        key_params = {}
-        for i in range(1, len(key_parts), 2):
-            if i + 1 < len(key_parts):
-                key_params[key_parts[i]] = key_parts[i + 1]
-
-        # Check if all pattern constraints are satisfied in key
-        for param_name, param_value in pattern_constraints.items():
-            if param_name not in key_params:
-                return False
-            if param_value is not None and key_params[param_name] != param_value:
-                return False
-
-        return True
+            失效的键列表
+        """
+        keys = self.tag_index.match(pattern, kwargs)
+        if keys:
+            with self._lock:
+                for key in keys:
+                    self.l1.delete(key)
+            self.tag_index.remove_many(keys)
+        return keys
 
     def get_stats(self) -> dict:
         """
@@ -449,46 +753,79 @@ class HierarchicalCache:
             else:
                 hit_rate = (self.stats["l1_hits"] + self.stats["l2_hits"]) / total_requests * 100
 
+            l1_stats = self.l1.get_stats()
+            singleflight_stats = self.singleflight.get_stats()
+            refresh_stats = self.refresher.get_stats()
+
             return {
-                "l1_size": len(self.l1_cache),
+                "l1_size": l1_stats["entries"],
                 "l1_capacity": self.l1_size,
-                "l1_usage": f"{len(self.l1_cache) / self.l1_size * 100:.1f}%",
+                "l1_usage": f"{l1_stats['entries'] / self.l1_size * 100:.1f}%",
+                "l1_bytes": l1_stats["bytes_used"],
+                "l1_max_bytes": l1_stats["max_bytes"],
+                "l1_admission": l1_stats["admission"],
+                "l1_admission_rejects": l1_stats["admission_rejects"],
                 "l1_hits": self.stats["l1_hits"],
                 "l2_hits": self.stats["l2_hits"],
                 "misses": self.stats["misses"],
                 "hit_rate": f"{hit_rate:.2f}%",
-                "l1_evictions": self.stats["l1_evictions"],
+                "l1_evictions": l1_stats["evictions"],
                 "l1_sets": self.stats["l1_sets"],
                 "l2_sets": self.stats["l2_sets"],
+                "tag_index_keys": len(self.tag_index),
+                "l2_invalidation": self.l2_tags.get_stats(),
+                "singleflight": singleflight_stats,
+                # 被合并掉的数据库往返次数
+                "coalesced_db_calls": singleflight_stats["saved_calls"],
+                "coalesced_l2_reads": self._l2_flight.get_stats()["coalesced"],
+                "swr_enabled": self.swr_enabled,
+                "stale_served": self.stats["stale_served"],
+                "refresh": refresh_stats,
+                "invalidation_bus": self.bus.get_stats(),
+                # 分模式的L2压缩率和编码/解码耗时
+                "l2_codec": self.codec.get_stats(),
+                "generations": self.generations.get_stats(),
+                "hotkeys": self.hotkeys.get_stats(),
                 "total_requests": total_requests,
                 # 新增：空值缓存统计
                 "empty_hits": self.stats.get("empty_hits", 0),
             }
 
     def clear_l1(self):
-        """清空L1缓存"""
+        """清空L1缓存（同时广播给其他worker）"""
         with self._lock:
-            self.l1_cache.clear()
-            self.l1_timestamps.clear()
+            self.l1.clear()
+        self.bus.publish_clear()
         logger.info("🗑️ L1缓存已清空")
 
-    def clear_l2(self):
-        """清空L2缓存"""
+    def clear_l2(self) -> int:
+        """
+        清空L2缓存（游标SCAN + 分批UNLINK，不使用KEYS）
+
+        Returns:
+            删除的键数量
+        """
+        deleted = 0
         cache = self._get_cache()
         if cache is not None:
             try:
-                # 清空所有dwd_gen:v3:开头的键
-                import redis
-
-                redis_client = self._get_redis_client()
-                if redis_client:
-                    pattern = f"{CacheKeyBuilder.PREFIX}*"
-                    keys = redis_client.keys(pattern)
-                    if keys:
-                        redis_client.delete(*keys)
-                        logger.info(f"🗑️ L2缓存已清空: {len(keys)}个键")
+                client, key_prefix = resolve_redis_backend(cache)
+                if client is not None:
+                    # 数据键（dwd_gen:v3:*）和标签集合
+                    deleted += self.l2_tags.scan_delete(
+                        client, f"{key_prefix}{CacheKeyBuilder.PREFIX}*"
+                    )
+                    deleted += self.l2_tags.scan_delete(
+                        client, f"{key_prefix}{L2TagInvalidator.TAG_NAMESPACE}*"
+                    )
+                    logger.info(f"🗑️ L2缓存已清空: {deleted}个键")
+                elif resolve_tag_backend(cache) is not None:
+                    cache.clear()
+                    logger.info("🗑️ L2缓存已清空")
+                self.tag_index.clear()
             except Exception as e:
                 logger.warning(f"⚠️ L2缓存清空失败: {e}")
+        return deleted
 
     def clear_all(self):
         """清空所有缓存（L1和L2）"""
@@ -502,10 +839,18 @@ class HierarchicalCache:
                 "l1_hits": 0,
                 "l2_hits": 0,
                 "misses": 0,
-                "l1_evictions": 0,
                 "l1_sets": 0,
                 "l2_sets": 0,
+                "empty_hits": 0,
+                "stale_served": 0,
             }
+            self.l1.reset_stats()
+            self.singleflight.reset_stats()
+            self._l2_flight.reset_stats()
+            self.refresher.reset_stats()
+            self.bus.reset_stats()
+            self.codec.reset_stats()
+            self.generations.reset_stats()
         logger.info("📊 缓存统计已重置")
 
     def _get_cache(self):
@@ -516,6 +861,13 @@ class HierarchicalCache:
             # 不在Flask应用上下文中
             return None
 
+    def _get_app(self):
+        """获取当前Flask应用对象（供后台线程推入应用上下文）"""
+        try:
+            return current_app._get_current_object()
+        except (AttributeError, RuntimeError):
+            return None
+
     def _get_redis_client(self):
         """获取Redis客户端"""
         try:
@@ -563,7 +915,7 @@ class CacheInvalidator:
 
     def invalidate_pattern(self, pattern: str, **kwargs) -> int:
         """
-        模式失效（L1）
+        模式失效（L1和L2，基于标签索引）
 
         Args:
             pattern: 缓存模式
@@ -602,10 +954,10 @@ class CacheInvalidator:
 
                     # 同时删除L1
                     with self.cache._lock:
-                        if key in self.cache.l1_cache:
-                            del self.cache.l1_cache[key]
-                            del self.cache.l1_timestamps[key]
+                        if self.cache.l1.delete(key):
                             total_count += 1
+                    self.cache.tag_index.remove(key)
+                    self.cache.bus.publish_key(key)
 
                 pipe.execute()
                 logger.info(f"🗑️ 批量失效: {len(patterns)}个键")
@@ -619,41 +971,82 @@ class CacheInvalidator:
 
         return total_count
 
-    def invalidate_game(self, game_id: int):
+    def bump_game(self, game_id: Optional[int] = None, game_gid: Any = None) -> Dict[str, int]:
         """
-        失效游戏相关的所有缓存
+        递增游戏的两个代数（game_id 键和 game_gid 键），O(1)，不扫描键
+
+        两者取值不同（自增ID vs 业务GID），只给出一个时从 games 表查出另一个；
+        游戏已删除查不到时只递增已知的那个
 
         Args:
             game_id: 游戏ID
+            game_gid: 游戏GID
+
+        Returns:
+            {实体类型: 新代数}
         """
-        patterns = [
-            ("games.detail", {"id": game_id}),
-            ("games.list", {}),
-            ("events.list", {"game_id": game_id}),
-            ("events.*", {"game_id": game_id}),
-        ]
+        if (game_id is None) != (game_gid is None):
+            game_id, game_gid = _resolve_game_ids(game_id, game_gid)
 
-        for pattern, kwargs in patterns:
-            self.invalidate_pattern(pattern, **kwargs)
+        generations = {}
+        if game_id is not None:
+            generations["game"] = self.cache.generations.bump("game", game_id)
+        if game_gid is not None:
+            generations["game_gid"] = self.cache.generations.bump("game_gid", game_gid)
+        return generations
+
+    def invalidate_game(self, game_id: Optional[int] = None, game_gid: Any = None):
+        """
+        失效游戏相关的所有缓存
 
-        logger.info(f"🗑️ 游戏缓存已失效: game_id={game_id}")
+        递增游戏代数（见 bump_game）：带 game_id / game_gid 参数的键
+        以及 games.detail 全部换代；不含游戏参数的 games.list 仍按模式失效
+
+        Args:
+            game_id: 游戏ID
+            game_gid: 游戏GID（至少给出一个）
+        """
+        generations = self.bump_game(game_id=game_id, game_gid=game_gid)
+        self.invalidate_pattern("games.list")
+
+        logger.info(
+            f"🗑️ 游戏缓存已失效: game_id={game_id}, game_gid={game_gid} (代数→{generations})"
+        )
 
     def invalidate_event(self, event_id: int):
         """
-        失效事件相关的所有缓存
+        失效事件相关的所有缓存（递增事件代数，O(1)）
 
         Args:
             event_id: 事件ID
         """
-        patterns = [
-            ("events.detail", {"id": event_id}),
-            ("params.*", {"event_id": event_id}),
-        ]
+        generation = self.cache.generations.bump("event", event_id)
 
-        for pattern, kwargs in patterns:
-            self.invalidate_pattern(pattern, **kwargs)
+        logger.info(f"🗑️ 事件缓存已失效: event_id={event_id} (代数→{generation})")
 
-        logger.info(f"🗑️ 事件缓存已失效: event_id={event_id}")
+
+def _resolve_game_ids(game_id: Optional[int], game_gid: Any) -> Tuple[Optional[int], Any]:
+    """
+    用 games 表补全游戏ID/GID中缺失的一个
+
+    Args:
+        game_id: 游戏ID（可为None）
+        game_gid: 游戏GID（可为None）
+
+    Returns:
+        (game_id, game_gid)；查询失败或游戏不存在时缺失项仍为None
+    """
+    from backend.core.utils import fetch_one_as_dict
+
+    try:
+        if game_id is None:
+            row = fetch_one_as_dict("SELECT id FROM games WHERE gid = ?", (str(game_gid),))
+            return (row["id"] if row else None), game_gid
+        row = fetch_one_as_dict("SELECT gid FROM games WHERE id = ?", (game_id,))
+        return game_id, (row["gid"] if row else None)
+    except Exception as e:
+        logger.warning(f"⚠️ 游戏ID/GID映射失败: game_id={game_id}, game_gid={game_gid}: {e}")
+        return game_id, game_gid
 
 
 # ============================================================================
@@ -691,23 +1084,61 @@ def cached(pattern: str, timeout: Optional[int] = None):
             except (AttributeError, RuntimeError):
                 pass
 
-            # 执行函数
-            result = f(*args, **kwargs)
+            if cache is None:
+                return f(*args, **kwargs)
+
+            def load():
+                # 排队期间前一个leader可能已经写入
+                try:
+                    cached = cache.get(key)
+                    if cached is not None:
+                        return cached
+                except Exception:
+                    pass
+
+                # 执行函数
+                result = f(*args, **kwargs)
 
-            # 写入缓存
-            if cache is not None:
+                # 写入缓存
                 try:
                     cache.set(key, result, timeout=timeout)
                 except Exception as e:
                     logger.warning(f"⚠️ 缓存写入失败: {e}")
+                return result
 
-            return result
+            # 未命中合并：同一键只有一个调用方执行函数
+            redis_client, lock_key = _distributed_lock(cache, key)
+            return hierarchical_cache.singleflight.do(
+                key,
+                load,
+                redis_client=redis_client,
+                lock_key=lock_key,
+                check=lambda: _probe(cache, key),
+            )
 
         return wrapper
 
     return decorator
 
 
+def _distributed_lock(cache, key: str) -> Tuple[Optional[Any], Optional[str]]:
+    """返回分布式Single-Flight所需的 (redis_client, lock_key)，不可用时为 (None, None)"""
+    from backend.core.config.config import CacheConfig
+
+    if not CacheConfig.CACHE_SINGLEFLIGHT_DISTRIBUTED:
+        return None, None
+    client, key_prefix = resolve_redis_backend(cache)
+    if client is None:
+        return None, None
+    return client, f"{key_prefix}{HierarchicalCache.LOCK_NAMESPACE}{key}"
+
+
+def _probe(cache, key: str) -> Tuple[bool, Any]:
+    """跨worker等待期间探测Flask-Cache是否已有结果"""
+    cached = cache.get(key)
+    return cached is not None, cached
+
+
 def cached_hierarchical(pattern: str):
     """
     分层缓存装饰器（使用三级缓存）
@@ -722,20 +1153,13 @@ def cached_hierarchical(pattern: str):
     """
 
     def decorator(f):
+        # 被装饰函数即该模式的加载函数，L1软过期后用于后台刷新
+        hierarchical_cache.register_loader(pattern, f)
+
         @wraps(f)
         def wrapper(*args, **kwargs):
-            # 尝试从缓存获取
-            result = hierarchical_cache.get(pattern, **kwargs)
-            if result is not None:
-                return result
-
-            # 执行函数
-            result = f(*args, **kwargs)
-
-            # 写入缓存
-            hierarchical_cache.set(pattern, result, **kwargs)
-
-            return result
+            # 查询缓存，未命中时合并并发回源（Single-Flight）
+            return hierarchical_cache.get_or_load(pattern, lambda: f(*args, **kwargs), **kwargs)
 
         return wrapper
 
@@ -752,6 +1176,9 @@ hierarchical_cache = HierarchicalCache()
 # 全局缓存失效管理器
 cache_invalidator = CacheInvalidator(hierarchical_cache)
 
+# 缓存键嵌入全局实例的实体代数
+CacheKeyBuilder.generations = hierarchical_cache.generations
+
 
 logger.info("✅ 统一缓存系统已加载 (3.0.0)")
 
@@ -787,7 +1214,7 @@ def cache_result(cache_key_pattern, timeout=None):
     return cached(pattern, timeout=timeout)
 
 
-def clear_game_cache(game_id=None):
+def clear_game_cache(game_id=None, game_gid=None):
     """
     清除游戏相关缓存（兼容性包装器）
 
@@ -795,12 +1222,13 @@ def clear_game_cache(game_id=None):
     新代码应该直接使用 cache_invalidator。
 
     Args:
-        game_id: 游戏ID（None表示清除所有游戏缓存）
+        game_id: 游戏ID
+        game_gid: 游戏GID（两者都为None表示清除所有游戏缓存）
     """
-    if game_id is not None:
+    if game_id is not None or game_gid is not None:
         # 清除特定游戏的缓存
-        cache_invalidator.invalidate_game(game_id)
-        logger.info(f"🗑️ 游戏缓存已清除: game_id={game_id}")
+        cache_invalidator.invalidate_game(game_id=game_id, game_gid=game_gid)
+        logger.info(f"🗑️ 游戏缓存已清除: game_id={game_id}, game_gid={game_gid}")
     else:
         # 清除所有游戏相关缓存
         patterns = [
@@ -880,7 +1308,9 @@ def get_redis_client():
         cache = get_cache()
         if cache and hasattr(cache, "cache"):
             # Flask-Caching with Redis
-            return cache.cache._client
+            client, _ = resolve_redis_backend(cache)
+            if client is not None:
+                return client
     except Exception:
         pass
 
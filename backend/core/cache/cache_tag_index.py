@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+缓存标签倒排索引
+================
+
+在 set() 时记录 (pattern, param, value) → 缓存键集合，
+使模式失效的开销为 O(匹配键数) 而不是 O(缓存大小)
+
+索引覆盖本进程写入（或从L2回填）的所有键，生命周期跟随L2 TTL，
+因此既能驱动L1删除，也能驱动L2精确删除（无需Redis KEYS）
+
+模式匹配规则（与 CacheInvalidator 的用法一致）:
+- 'events.list'   匹配 events.list 及其子命名空间（events.list.xxx）
+- 'events.*'      匹配所有以 'events.' 开头的模式
+- 参数值为 None 或 '*' 时只要求键包含该参数，否则要求值相等（按字符串比较）
+
+add() 对已存在的键只延长过期时间，依赖一个键只对应一组参数：
+CacheKeyBuilder.build() 转义参数值中的 ':'，不同参数组合不会拼出同一个键
+"""
+
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+# 每写入多少次检查一次过期索引项
+_PRUNE_INTERVAL = 1024
+
+
+class CacheTagIndex:
+    """缓存标签倒排索引（线程安全）"""
+
+    def __init__(self):
+        self._by_pattern: Dict[str, Set[str]] = {}
+        self._by_param: Dict[Tuple[str, str], Set[str]] = {}
+        self._by_value: Dict[Tuple[str, str, str], Set[str]] = {}
+        # key -> (pattern, params, expires_at)
+        self._key_tags: Dict[str, Tuple[str, Tuple[Tuple[str, str], ...], float]] = {}
+        self._lock = threading.Lock()
+        self._adds_since_prune = 0
+
+    def __len__(self) -> int:
+        return len(self._key_tags)
+
+    def add(self, key: str, pattern: str, params: Dict[str, Any], ttl: float):
+        """
+        记录缓存键的标签
+
+        Args:
+            key: 完整缓存键
+            pattern: 缓存模式 (如 'events.list')
+            params: 构建缓存键时使用的参数
+            ttl: 索引项存活时间（秒），通常等于L2 TTL
+        """
+        tags = tuple(sorted((name, str(value)) for name, value in params.items()))
+        expires_at = time.time() + ttl
+
+        with self._lock:
+            existing = self._key_tags.get(key)
+            if existing is not None:
+                # 同一键的标签只与键本身相关，只需延长过期时间
+                self._key_tags[key] = (existing[0], existing[1], max(existing[2], expires_at))
+                return
+
+            self._key_tags[key] = (pattern, tags, expires_at)
+            self._by_pattern.setdefault(pattern, set()).add(key)
+            for name, value in tags:
+                self._by_param.setdefault((pattern, name), set()).add(key)
+                self._by_value.setdefault((pattern, name, value), set()).add(key)
+
+            self._adds_since_prune += 1
+            if self._adds_since_prune >= _PRUNE_INTERVAL:
+                self._adds_since_prune = 0
+                self._prune_locked(time.time())
+
+    def remove(self, key: str) -> bool:
+        """
+        移除缓存键的全部索引项
+
+        Args:
+            key: 完整缓存键
+
+        Returns:
+            键是否存在于索引中
+        """
+        with self._lock:
+            return self._remove_locked(key)
+
+    def remove_many(self, keys: Iterable[str]):
+        """批量移除缓存键的索引项"""
+        with self._lock:
+            for key in keys:
+                self._remove_locked(key)
+
+    def _remove_locked(self, key: str) -> bool:
+        tags = self._key_tags.pop(key, None)
+        if tags is None:
+            return False
+
+        pattern, params, _ = tags
+        self._discard(self._by_pattern, pattern, key)
+        for name, value in params:
+            self._discard(self._by_param, (pattern, name), key)
+            self._discard(self._by_value, (pattern, name, value), key)
+        return True
+
+    @staticmethod
+    def _discard(index: Dict, tag, key: str):
+        keys = index.get(tag)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del index[tag]
+
+    def match(self, pattern: str, params: Optional[Dict[str, Any]] = None) -> Set[str]:
+        """
+        查找匹配模式和参数约束的缓存键
+
+        Args:
+            pattern: 缓存模式（支持 'xxx.*' 前缀通配）
+            params: 参数约束（值为None或'*'表示只要求参数存在）
+
+        Returns:
+            匹配的缓存键集合（副本）
+        """
+        params = params or {}
+        now = time.time()
+        result: Set[str] = set()
+
+        with self._lock:
+            for name in self._matching_patterns(pattern):
+                result |= self._match_one(name, params)
+
+            # 过滤已过期的索引项（L2中已不存在）
+            expired = [key for key in result if self._key_tags[key][2] <= now]
+            for key in expired:
+                self._remove_locked(key)
+                result.discard(key)
+
+        return result
+
+    def _matching_patterns(self, pattern: str):
+        if pattern.endswith(".*"):
+            prefix = pattern[:-1]
+            return [name for name in self._by_pattern if name.startswith(prefix)]
+
+        namespace = pattern + "."
+        return [name for name in self._by_pattern if name == pattern or name.startswith(namespace)]
+
+    def _match_one(self, pattern: str, params: Dict[str, Any]) -> Set[str]:
+        if not params:
+            return set(self._by_pattern.get(pattern, ()))
+
+        candidates = []
+        for name, value in params.items():
+            if value is None or value == "*":
+                keys = self._by_param.get((pattern, name))
+            else:
+                keys = self._by_value.get((pattern, name, str(value)))
+            if not keys:
+                return set()
+            candidates.append(keys)
+
+        # 从最小集合开始求交集
+        candidates.sort(key=len)
+        result = set(candidates[0])
+        for keys in candidates[1:]:
+            result &= keys
+            if not result:
+                break
+        return result
+
+    def prune_expired(self) -> int:
+        """
+        清理已过期的索引项
+
+        Returns:
+            清理的键数量
+        """
+        with self._lock:
+            return self._prune_locked(time.time())
+
+    def _prune_locked(self, now: float) -> int:
+        expired = [key for key, tags in self._key_tags.items() if tags[2] <= now]
+        for key in expired:
+            self._remove_locked(key)
+        return len(expired)
+
+    def clear(self):
+        """清空索引"""
+        with self._lock:
+            self._by_pattern.clear()
+            self._by_param.clear()
+            self._by_value.clear()
+            self._key_tags.clear()
+            self._adds_since_prune = 0
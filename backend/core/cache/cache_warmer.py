@@ -5,12 +5,18 @@
 ===========
 应用启动时和定时自动预热热点数据，确保缓存命中率高
 
-版本: 1.0.0
+启动预热在后台线程执行，不阻塞应用就绪：
+1. 回放热点快照（hierarchical_cache.hotkeys 定期写入的上次运行Top-K键），
+   按热度顺序在线程池中加载
+2. 预热固定的基线数据（游戏列表、游戏详情、热门事件、参数模板、分类）
+
+版本: 1.1.0
 日期: 2026-01-20
 """
 
-from backend.core.cache.cache_hierarchical import hierarchical_cache
+from backend.core.cache.cache_system import CacheKeyBuilder, hierarchical_cache
 from backend.core.utils import fetch_all_as_dict, fetch_one_as_dict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
 import threading
 import time
@@ -27,12 +33,37 @@ class CacheWarmer:
     - 支持选择性预热（游戏、事件、参数模板）
     """
 
+    # 没有注册加载函数时，详情类模式按id直接查询
+    DETAIL_QUERIES = {
+        "games.detail": "SELECT * FROM games WHERE id = ?",
+        "events.detail": "SELECT * FROM log_events WHERE id = ?",
+        "param_templates.detail": "SELECT * FROM param_templates WHERE id = ?",
+    }
+
     def __init__(self):
         self.warmed_games = 0
         self.warmed_events = 0
         self.warmed_templates = 0
         self._warming_thread = None
+        self._startup_thread = None
         self._stop_event = threading.Event()
+        self.snapshot_stats = self._empty_snapshot_stats()
+
+    @staticmethod
+    def _empty_snapshot_stats() -> dict:
+        return {
+            "entries": 0,
+            "warmed": 0,
+            "already_cached": 0,
+            "skipped": 0,
+            "failed": 0,
+            "duration_ms": 0.0,
+        }
+
+    def _set(self, pattern: str, value, ttl=None, **kwargs):
+        """写入缓存并登记为已预热键（用于统计重启后的命中覆盖率）"""
+        hierarchical_cache.set(pattern, value, ttl=ttl, **kwargs)
+        hierarchical_cache.hotkeys.add_watched(CacheKeyBuilder.build(pattern, **kwargs))
 
     def warmup_games(self):
         """预热游戏列表（所有游戏）"""
@@ -40,7 +71,7 @@ class CacheWarmer:
         try:
             games = fetch_all_as_dict("SELECT * FROM games ORDER BY id")
             for game in games:
-                hierarchical_cache.set("games.detail", game, id=game["id"])
+                self._set("games.detail", game, id=game["id"])
 
             self.warmed_games = len(games)
             logger.info(f"✅ 预热游戏列表完成: {len(games)}个游戏")
@@ -71,13 +102,13 @@ class CacheWarmer:
                 LEFT JOIN log_events le ON le.game_gid = g.gid
                 LEFT JOIN event_params ep ON ep.event_id = le.id
                 LEFT JOIN event_node_configs enc ON enc.game_gid = CAST(g.gid AS INTEGER)
-                LEFT JOIN flow_templates ft ON ft.game_id = g.id  # Note: flow_templates uses game_id FK
+                LEFT JOIN flow_templates ft ON ft.game_id = g.id  -- flow_templates uses game_id FK
                 GROUP BY g.id, g.gid, g.name, g.ods_db, g.icon_path, g.created_at, g.updated_at
                 ORDER BY g.id
             """)
 
             # Cache with 1 hour TTL (static data)
-            hierarchical_cache.set("games.list", games, ttl=CacheConfig.CACHE_TIMEOUT_STATIC)
+            self._set("games.list", games, ttl=CacheConfig.CACHE_TIMEOUT_STATIC)
 
             logger.info(f"✅ 预热游戏列表API完成: {len(games)}个游戏")
 
@@ -95,7 +126,7 @@ class CacheWarmer:
         try:
             events = fetch_all_as_dict("SELECT * FROM log_events ORDER BY id LIMIT ?", (limit,))
             for event in events:
-                hierarchical_cache.set("events.detail", event, id=event["id"])
+                self._set("events.detail", event, id=event["id"])
 
             self.warmed_events = len(events)
             logger.info(f"✅ 预热热门事件完成: {len(events)}个事件")
@@ -109,7 +140,7 @@ class CacheWarmer:
         try:
             templates = fetch_all_as_dict("SELECT * FROM param_templates WHERE is_system = 1")
             for template in templates:
-                hierarchical_cache.set("param_templates.detail", template, id=template["id"])
+                self._set("param_templates.detail", template, id=template["id"])
 
             self.warmed_templates = len(templates)
             logger.info(f"✅ 预热参数模板完成: {len(templates)}个模板")
@@ -122,7 +153,7 @@ class CacheWarmer:
         logger.info("🔥 预热分类列表...")
         try:
             categories = fetch_all_as_dict("SELECT * FROM event_categories ORDER BY id")
-            hierarchical_cache.set("categories.list", categories)
+            self._set("categories.list", categories)
 
             logger.info(f"✅ 预热分类列表完成: {len(categories)}个分类")
 
@@ -152,16 +183,16 @@ class CacheWarmer:
             )
 
             for event in events:
-                hierarchical_cache.set("events.detail", event, id=event["id"])
+                self._set("events.detail", event, id=event["id"])
 
             logger.info(f"✅ 预热游戏{game_gid}事件完成: " f"{len(events)}个事件")
 
         except Exception as e:
             logger.error(f"❌ 预热游戏{game_gid}事件失败: {e}")
 
-    def warmup_on_startup(self, warm_all_events=False):
+    def warmup_baseline(self, warm_all_events=False):
         """
-        应用启动时预热
+        预热固定的基线数据
 
         Args:
             warm_all_events: 是否预热所有事件（默认仅Top 100）
@@ -182,7 +213,7 @@ class CacheWarmer:
                 logger.info("预热所有事件...")
                 events = fetch_all_as_dict("SELECT * FROM log_events ORDER BY id")
                 for event in events:
-                    hierarchical_cache.set("events.detail", event, id=event["id"])
+                    self._set("events.detail", event, id=event["id"])
                 logger.info(f"✅ 预热所有事件完成: {len(events)}个事件")
             else:
                 # 仅预热热门事件
@@ -207,6 +238,116 @@ class CacheWarmer:
 
             traceback.print_exc()
 
+    def _resolve_loader(self, entry: dict):
+        """
+        解析快照条目的加载函数
+
+        顺序: 已注册的加载函数（路由模块导入时注册，如 parameters.all / events.count）
+        → 详情类模式的按id查询。快照中的 loader 标识只用于诊断，不会按它导入模块
+
+        Returns:
+            (加载函数, TTL)；无法解析时返回 (None, None)
+        """
+        pattern = entry.get("pattern")
+        registered = hierarchical_cache._loaders.get(pattern)
+        if registered is not None:
+            return registered
+
+        query = self.DETAIL_QUERIES.get(pattern)
+        if query is not None and set(entry.get("params") or {}) == {"id"}:
+            return (lambda id: fetch_one_as_dict(query, (id,))), None
+        return None, None
+
+    def warmup_from_snapshot(self, path=None, max_workers=None) -> dict:
+        """
+        按热度顺序回放热点快照
+
+        快照条目按热度降序提交到线程池，热度最高的键最先加载；
+        已在L2中的键（其他worker已写入）只回填L1，不访问数据库
+
+        Args:
+            path: 快照文件路径，None则使用CacheConfig.CACHE_HOTKEY_SNAPSHOT_PATH
+            max_workers: 线程数，None则使用CacheConfig.CACHE_WARMUP_WORKERS
+
+        Returns:
+            回放统计
+        """
+        from backend.core.config.config import CacheConfig
+        from flask import current_app
+
+        path = path or CacheConfig.CACHE_HOTKEY_SNAPSHOT_PATH
+        max_workers = max_workers or CacheConfig.CACHE_WARMUP_WORKERS
+        stats = self._empty_snapshot_stats()
+        self.snapshot_stats = stats
+
+        entries = hierarchical_cache.hotkeys.read_snapshot(path)
+        stats["entries"] = len(entries)
+        if not entries:
+            logger.info("ℹ️ 没有热点快照，跳过快照预热")
+            return stats
+
+        logger.info(f"🔥 回放热点快照: {len(entries)}个键 ({max_workers}线程)")
+        start = time.perf_counter()
+        app = current_app._get_current_object()
+
+        def warm(entry):
+            loader, ttl = self._resolve_loader(entry)
+            if loader is None:
+                return "skipped"
+            with app.app_context():
+                key, loaded = hierarchical_cache.warm(
+                    entry["pattern"], loader, ttl=ttl, **(entry.get("params") or {})
+                )
+            hierarchical_cache.hotkeys.add_watched(key)
+            return "warmed" if loaded else "already_cached"
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cache-warmup") as pool:
+            futures = {pool.submit(warm, entry): entry for entry in entries}
+            for future in as_completed(futures):
+                try:
+                    stats[future.result()] += 1
+                except Exception as e:
+                    stats["failed"] += 1
+                    logger.debug(f"⚠️ 快照键预热失败: {futures[future].get('key')}: {e}")
+
+        stats["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        logger.info(
+            f"✅ 快照预热完成: 加载{stats['warmed']}个, 已缓存{stats['already_cached']}个, "
+            f"跳过{stats['skipped']}个, 失败{stats['failed']}个 ({stats['duration_ms']}ms)"
+        )
+        return stats
+
+    def warmup_on_startup(self, warm_all_events=False, background=True):
+        """
+        应用启动时预热（需在应用上下文中调用）
+
+        先回放热点快照，再预热基线数据；同时开始统计重启后命中落在已预热键上的比例
+
+        Args:
+            warm_all_events: 是否预热所有事件（默认仅Top 100）
+            background: 是否在后台线程执行（默认True，不阻塞应用就绪）
+        """
+        from flask import current_app
+
+        app = current_app._get_current_object()
+        hierarchical_cache.hotkeys.watch(set())
+
+        def run():
+            with app.app_context():
+                try:
+                    self.warmup_from_snapshot()
+                except Exception as e:
+                    logger.error(f"❌ 快照预热失败: {e}")
+                self.warmup_baseline(warm_all_events=warm_all_events)
+
+        if not background:
+            run()
+            return
+
+        self._startup_thread = threading.Thread(target=run, name="CacheWarmerStartup", daemon=True)
+        self._startup_thread.start()
+        logger.info("🚀 启动预热已在后台执行")
+
     def start_periodic_warmup(self, interval_hours=1):
         """
         启动定时预热（使用后台线程）
@@ -235,7 +376,7 @@ class CacheWarmer:
 
                 # 执行预热
                 try:
-                    self.warmup_on_startup(warm_all_events=False)
+                    self.warmup_baseline(warm_all_events=False)
                 except Exception as e:
                     logger.error(f"❌ 定时预热失败: {e}")
 
@@ -269,13 +410,16 @@ class CacheWarmer:
         获取预热统计信息
 
         Returns:
-            统计信息字典
+            统计信息字典；snapshot 为快照回放统计，
+            coverage 为重启后命中中落在已预热键上的比例
         """
         return {
             "warmed_games": self.warmed_games,
             "warmed_events": self.warmed_events,
             "warmed_templates": self.warmed_templates,
             "total": self.warmed_games + self.warmed_events + self.warmed_templates,
+            "snapshot": dict(self.snapshot_stats),
+            "coverage": hierarchical_cache.hotkeys.get_stats()["coverage"],
         }
 
     def reset_stats(self):
@@ -283,6 +427,7 @@ class CacheWarmer:
         self.warmed_games = 0
         self.warmed_events = 0
         self.warmed_templates = 0
+        self.snapshot_stats = self._empty_snapshot_stats()
         logger.info("📊 预热统计已重置")
 
 
@@ -290,4 +435,4 @@ class CacheWarmer:
 cache_warmer = CacheWarmer()
 
 
-logger.info("✅ 缓存预热系统已加载 (1.0.0)")
+logger.info("✅ 缓存预热系统已加载 (1.1.0)")
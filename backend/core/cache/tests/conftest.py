@@ -0,0 +1,43 @@
+"""
+缓存测试夹具：fakeredis 作为L2，独立的 HierarchicalCache 实例
+"""
+
+import fakeredis
+import pytest
+from flask import Flask
+from flask_caching import Cache
+
+from backend.core.cache.cache_system import CacheKeyBuilder, HierarchicalCache
+from backend.core.config.config import CacheConfig
+
+KEY_PREFIX = "flask_cache_"
+
+
+@pytest.fixture
+def redis_client():
+    """内存Redis"""
+    return fakeredis.FakeStrictRedis()
+
+
+@pytest.fixture
+def app(redis_client):
+    """挂载 RedisCache（底层客户端替换为fakeredis）的Flask应用"""
+    app = Flask(__name__)
+    app.cache = Cache(app, config={"CACHE_TYPE": "RedisCache", "CACHE_KEY_PREFIX": KEY_PREFIX})
+    app.cache.cache._write_client = redis_client
+    app.cache.cache._read_client = redis_client
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """独立的分层缓存（不使用全局实例），缓存键嵌入本实例的代数"""
+    monkeypatch.setattr(CacheConfig, "CACHE_JITTER_PCT", 0)
+    instance = HierarchicalCache(
+        l1_size=100, l1_ttl=60, l2_ttl=300, l1_max_bytes=None, l1_admission=False, l1_hard_ttl=0
+    )
+    monkeypatch.setattr(CacheKeyBuilder, "generations", instance.generations)
+    yield instance
+    instance.bus.stop()
+    instance.refresher.shutdown()
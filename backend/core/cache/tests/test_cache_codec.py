@@ -0,0 +1,83 @@
+"""
+L2载荷编解码测试
+"""
+
+import pickle
+
+from backend.core.cache.cache_codec import (
+    FLAG_COLUMNAR,
+    FLAG_ZLIB,
+    HEADER_SIZE,
+    MAGIC,
+    UNDECODABLE,
+    CacheCodec,
+)
+
+ROWS = [{"id": i, "name": f"param_{i}", "type": "string"} for i in range(200)]
+
+
+class TestCacheCodec:
+    """测试编解码往返"""
+
+    def test_columnar_compressed_round_trip(self):
+        """测试字段一致的 list[dict] 列式编码 + 压缩后原样还原"""
+        codec = CacheCodec(compress_threshold=256)
+
+        payload = codec.encode(ROWS, "parameters.all")
+
+        assert payload[:2] == MAGIC
+        assert payload[3] & FLAG_COLUMNAR and payload[3] & FLAG_ZLIB
+        assert len(payload) < len(pickle.dumps(ROWS))
+        assert codec.decode(payload, "parameters.all") == ROWS
+
+    def test_nested_wrapper_round_trip(self):
+        """测试 {"parameters": [...], "total": n} 外层包装中的列表也列式编码"""
+        codec = CacheCodec(compress_threshold=1 << 20)
+        value = {"parameters": ROWS, "total": len(ROWS), "page": 1}
+
+        payload = codec.encode(value)
+
+        assert payload[3] & FLAG_COLUMNAR
+        assert not payload[3] & FLAG_ZLIB
+        assert codec.decode(payload) == value
+
+    def test_heterogeneous_rows_round_trip(self):
+        """测试字段不一致的行不做列式转换，仍可还原"""
+        codec = CacheCodec()
+        value = [{"a": 1}, {"a": 1, "b": 2}, {"b": 2}]
+
+        payload = codec.encode(value)
+
+        assert not payload[3] & FLAG_COLUMNAR
+        assert codec.decode(payload) == value
+
+    def test_scalars_pass_through(self):
+        """测试短字符串和标量不加信封"""
+        codec = CacheCodec(compress_threshold=64)
+
+        assert codec.encode("__EMPTY__") == "__EMPTY__"
+        assert codec.encode(42) == 42
+        assert codec.decode(b"raw bytes") == b"raw bytes"
+
+    def test_unknown_version_undecodable(self):
+        """测试未知版本的载荷视为未命中"""
+        codec = CacheCodec()
+        payload = codec.encode(ROWS)
+
+        assert codec.decode(payload[:2] + bytes((99,)) + payload[3:]) is UNDECODABLE
+
+    def test_corrupt_body_undecodable(self):
+        """测试载荷损坏时视为未命中"""
+        codec = CacheCodec(compress_threshold=256)
+        payload = codec.encode(ROWS)
+
+        assert codec.decode(payload[:HEADER_SIZE] + b"garbage") is UNDECODABLE
+
+    def test_stats_per_pattern(self):
+        """测试按模式统计压缩率"""
+        codec = CacheCodec(compress_threshold=256)
+        codec.decode(codec.encode(ROWS, "parameters.all"), "parameters.all")
+
+        stats = codec.get_stats()["parameters.all"]
+        assert stats["encodes"] == stats["decodes"] == 1
+        assert stats["compression_ratio"] > 1
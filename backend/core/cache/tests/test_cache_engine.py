@@ -0,0 +1,106 @@
+"""
+L1缓存引擎测试（LRU / 字节预算 / TinyLFU）
+"""
+
+from backend.core.cache import cache_engine
+from backend.core.cache.cache_engine import FrequencySketch, L1CacheEngine, estimate_size
+
+
+class TestEstimateSize:
+    """测试载荷大小估算"""
+
+    def test_scalar(self):
+        """测试标量直接取 getsizeof"""
+        assert estimate_size(1) > 0
+        assert estimate_size("a" * 1000) > 1000
+
+    def test_large_list_extrapolated(self):
+        """测试大列表按采样外推，结果与元素数成正比"""
+        small = estimate_size([{"id": i, "name": "x" * 20} for i in range(100)])
+        large = estimate_size([{"id": i, "name": "x" * 20} for i in range(10000)])
+
+        assert 80 < large / small < 120
+
+    def test_nested_samples_capped_per_call(self, monkeypatch):
+        """测试嵌套结构的采样总数受单次预算限制，而不是每层64个相乘"""
+        calls = []
+        original = cache_engine._estimate
+
+        def counting(obj, depth, budget):
+            calls.append(depth)
+            return original(obj, depth, budget)
+
+        monkeypatch.setattr(cache_engine, "_estimate", counting)
+        payload = [[[["x" * 10] * 64] * 64] * 64] * 64
+
+        assert estimate_size(payload) > 64**4 * 10
+        assert len(calls) <= cache_engine._SIZE_TOTAL_SAMPLE_LIMIT + 1
+
+
+class TestL1CacheEngine:
+    """测试L1引擎容量管理"""
+
+    def test_lru_eviction(self):
+        """测试超出条数上限时淘汰最久未使用的条目"""
+        engine = L1CacheEngine(max_entries=2)
+        engine.set("a", 1)
+        engine.set("b", 2)
+        engine.get("a")
+        engine.set("c", 3)
+
+        assert "a" in engine and "c" in engine
+        assert "b" not in engine
+        assert engine.get_stats()["evictions"] == 1
+
+    def test_byte_budget(self):
+        """测试字节预算：单条超预算拒绝，总量超预算淘汰"""
+        engine = L1CacheEngine(max_entries=100, max_bytes=3000)
+
+        assert engine.set("huge", "x" * 5000) is False
+        for i in range(5):
+            engine.set(f"k{i}", "x" * 900)
+
+        assert engine.bytes_used <= 3000
+        assert "k4" in engine
+        assert "k0" not in engine
+
+    def test_overwrite_updates_bytes(self):
+        """测试覆盖写入时字节数按新值计算"""
+        engine = L1CacheEngine(max_entries=10, max_bytes=10000)
+        engine.set("k", "x" * 2000)
+        engine.set("k", "x" * 100)
+
+        assert engine.bytes_used == estimate_size("x" * 100)
+
+    def test_tinylfu_rejects_one_off_scan(self, monkeypatch):
+        """测试TinyLFU：一次性扫描的新键不会冲刷热点键"""
+        # 每个键独占一个计数槽，排除 hash() 随机化带来的碰撞
+        slots = {}
+        monkeypatch.setattr(
+            FrequencySketch,
+            "_indexes",
+            lambda self, key: [slots.setdefault(key, len(slots))] * self.DEPTH,
+        )
+        engine = L1CacheEngine(max_entries=10, admission=True)
+        for i in range(10):
+            engine.set(f"hot{i}", i)
+        for _ in range(5):
+            for i in range(10):
+                engine.get(f"hot{i}")
+
+        for i in range(30):
+            engine.set(f"scan{i}", i)
+
+        assert all(f"hot{i}" in engine for i in range(10))
+        assert engine.get_stats()["admission_rejects"] == 30
+
+    def test_frequency_sketch_ages(self):
+        """测试频率草图在达到采样数后计数减半"""
+        sketch = FrequencySketch(16)
+        for _ in range(10):
+            sketch.increment("key")
+        before = sketch.estimate("key")
+        for i in range(sketch.sample_size):
+            sketch.increment(f"other{i}")
+
+        assert sketch.estimate("key") < before
@@ -0,0 +1,74 @@
+"""
+热点快照回放测试
+"""
+
+import importlib
+
+import pytest
+
+from backend.core.cache import cache_warmer as warmer_module
+from backend.core.cache.cache_hotkeys import HotKeyTracker
+from backend.core.cache.cache_warmer import CacheWarmer
+
+
+@pytest.fixture
+def warmer(cache, monkeypatch):
+    """使用独立分层缓存的预热器"""
+    monkeypatch.setattr(warmer_module, "hierarchical_cache", cache)
+    return CacheWarmer()
+
+
+def write_worker_snapshots(path, monkeypatch, workers):
+    """模拟多个worker各自写入快照"""
+    for pid, entries in workers.items():
+        tracker = HotKeyTracker(top_k=10)
+        for pattern, params, times in entries:
+            key = f"{pattern}:{sorted(params.items())}"
+            for _ in range(times):
+                tracker.record(key, pattern, params, True)
+        with monkeypatch.context() as m:
+            m.setattr("backend.core.cache.cache_hotkeys.os.getpid", lambda: pid)
+            tracker.write_snapshot(path)
+
+
+class TestWarmupFromSnapshot:
+    """测试按合并后的热点快照预热"""
+
+    def test_list_loaders_replayed(self, app, cache, warmer, tmp_path, monkeypatch):
+        """测试注册了加载函数的列表模式按快照参数回放，未注册的模式跳过且不导入模块"""
+        path = str(tmp_path / "hotkeys.json")
+        write_worker_snapshots(
+            path,
+            monkeypatch,
+            {
+                1: [("events.count", {"game_gid": 1, "search": ""}, 6)],
+                2: [
+                    ("events.count", {"game_gid": 2, "search": ""}, 4),
+                    ("unknown.list", {"page": 1}, 3),
+                ],
+            },
+        )
+        calls = []
+        cache.register_loader("events.count", lambda game_gid, search: calls.append(game_gid) or 7)
+        imported = []
+        monkeypatch.setattr(importlib, "import_module", imported.append)
+
+        stats = warmer.warmup_from_snapshot(path=path, max_workers=1)
+
+        assert stats["entries"] == 3
+        assert stats["warmed"] == 2
+        assert stats["skipped"] == 1
+        assert sorted(calls) == [1, 2]
+        assert imported == []
+        assert cache.get("events.count", game_gid=1, search="") == 7
+
+    def test_already_cached_not_reloaded(self, app, cache, warmer, tmp_path, monkeypatch):
+        """测试已在缓存中的键只计为已缓存"""
+        path = str(tmp_path / "hotkeys.json")
+        write_worker_snapshots(path, monkeypatch, {1: [("games.detail", {"id": 1}, 5)]})
+        cache.set("games.detail", {"id": 1}, id=1)
+
+        stats = warmer.warmup_from_snapshot(path=path, max_workers=1)
+
+        assert stats["already_cached"] == 1
+        assert stats["warmed"] == 0
@@ -0,0 +1,212 @@
+"""
+分层缓存测试：L2往返、Stale-While-Revalidate、实体代数失效
+"""
+
+import inspect
+
+from backend.core.cache import cache_system
+from backend.core.cache.cache_system import CacheInvalidator, CacheKeyBuilder, HierarchicalCache
+
+from .conftest import KEY_PREFIX
+
+ROWS = [{"id": i, "name": f"param_{i}"} for i in range(500)]
+
+
+def age_entry(cache, pattern, seconds, **kwargs):
+    """把L1条目的写入时间提前 seconds 秒"""
+    cache.l1.get(CacheKeyBuilder.build(pattern, **kwargs)).timestamp -= seconds
+
+
+class TestL2RoundTrip:
+    """测试经fakeredis的L2读写"""
+
+    def test_l2_hit_backfills_l1(self, app, cache, redis_client):
+        """测试L1清空后从L2读回（经编解码），并回填L1"""
+        cache.set("parameters.all", ROWS, game_gid=1)
+        cache.l1.clear()
+
+        assert cache.get("parameters.all", game_gid=1) == ROWS
+        assert cache.stats["l2_hits"] == 1
+        assert len(cache.l1) == 1
+        raw = redis_client.get(f"{KEY_PREFIX}dwd_gen:v3:parameters.all:game_gid:1")
+        assert raw is not None
+
+    def test_empty_value_cached(self, app, cache):
+        """测试空值缓存命中返回None且不计为未命中"""
+        cache.set("games.detail", None, id=404)
+        cache.l1.clear()
+
+        assert cache.get("games.detail", id=404) is None
+        assert cache.stats["empty_hits"] == 1
+        assert cache.stats["misses"] == 0
+
+    def test_invalidate_pattern_removes_other_worker_keys(self, app, cache):
+        """测试模式失效通过L2标签删除其他worker写入的键"""
+        cache.set("events.list", [1], game_gid=1, page=1)
+        cache.set("events.list", [2], game_gid=2, page=1)
+        # 模拟其他worker：本进程L1和标签索引都没有这个键
+        cache.l1.clear()
+        cache.tag_index.clear()
+
+        assert cache.invalidate_pattern("events.list", game_gid=1) == 1
+        assert cache.get("events.list", game_gid=1, page=1) is None
+        assert cache.get("events.list", game_gid=2, page=1) == [2]
+
+    def test_invalidate_value_containing_colon(self, app, cache):
+        """测试参数值含 ':' 的键不与其他参数组合冲突，可按该值失效"""
+        cache.set("events.search", ["colon"], game_gid=1, keyword="x:page:2")
+        cache.set("events.search", ["page"], game_gid=1, keyword="x", page=2)
+        cache.l1.clear()
+        cache.tag_index.clear()
+
+        assert cache.invalidate_pattern("events.search", keyword="x:page:2") == 1
+        assert cache.get("events.search", game_gid=1, keyword="x:page:2") is None
+        assert cache.get("events.search", game_gid=1, keyword="x", page=2) == ["page"]
+
+
+class TestStaleWhileRevalidate:
+    """测试软TTL / 硬TTL"""
+
+    def make_cache(self, monkeypatch):
+        cache = HierarchicalCache(
+            l1_size=100, l1_ttl=60, l2_ttl=300, l1_max_bytes=None, l1_hard_ttl=300
+        )
+        monkeypatch.setattr(CacheKeyBuilder, "generations", cache.generations)
+        return cache
+
+    def test_soft_expired_served_stale_and_refreshed(self, monkeypatch):
+        """测试软过期后返回旧值，后台刷新写入新值"""
+        cache = self.make_cache(monkeypatch)
+        cache.register_loader("games.detail", lambda id: {"id": id, "version": 2})
+        cache.set("games.detail", {"id": 1, "version": 1}, id=1)
+        age_entry(cache, "games.detail", 120, id=1)
+
+        assert cache.get("games.detail", id=1) == {"id": 1, "version": 1}
+        cache.refresher.shutdown(wait=True)
+
+        assert cache.stats["stale_served"] == 1
+        assert cache.get("games.detail", id=1) == {"id": 1, "version": 2}
+
+    def test_hard_expired_is_miss(self, monkeypatch):
+        """测试超过硬TTL后不再返回旧值，也不安排刷新"""
+        cache = self.make_cache(monkeypatch)
+        cache.register_loader("games.detail", lambda id: {"id": id})
+        cache.set("games.detail", {"id": 1}, id=1)
+        age_entry(cache, "games.detail", 301, id=1)
+
+        assert cache.get("games.detail", id=1) is None
+        assert cache.stats["stale_served"] == 0
+        assert cache.refresher.get_stats()["scheduled"] == 0
+
+    def test_soft_expired_without_loader_is_miss(self, monkeypatch):
+        """测试没有加载函数的模式软过期即未命中"""
+        cache = self.make_cache(monkeypatch)
+        cache.set("events.list", [1], game_gid=1)
+        age_entry(cache, "events.list", 120, game_gid=1)
+
+        assert cache.get("events.list", game_gid=1) is None
+
+    def test_get_or_load_passes_loader(self, monkeypatch):
+        """测试 get_or_load 的加载函数用于软过期刷新"""
+        cache = self.make_cache(monkeypatch)
+        versions = iter([1, 2])
+
+        def load():
+            return next(versions)
+
+        assert cache.get_or_load("events.count", load, game_gid=1) == 1
+        age_entry(cache, "events.count", 120, game_gid=1)
+
+        assert cache.get_or_load("events.count", load, game_gid=1) == 1
+        cache.refresher.shutdown(wait=True)
+        assert cache.get("events.count", game_gid=1) == 2
+
+    def test_request_path_patterns_have_loaders(self):
+        """测试默认开启SWR时，请求路径上的缓存模式都注册了可按缓存参数调用的加载函数"""
+        from backend.api.routes import events, parameters  # noqa: F401
+        from backend.core.cache.cache_system import hierarchical_cache
+
+        cache_params = {
+            "parameters.all": {
+                "game_id": 1,
+                "search": "",
+                "param_type": "",
+                "page": 1,
+                "cursor": None,
+                "limit": 50,
+                "include_total": True,
+            },
+            "events.count": {"game_gid": 1, "search": ""},
+        }
+
+        assert hierarchical_cache.swr_enabled
+        for pattern, params in cache_params.items():
+            loader, _ = hierarchical_cache._loaders[pattern]
+            inspect.signature(loader).bind(**params)
+
+    def test_disabled_when_hard_ttl_not_above_soft(self, cache):
+        """测试硬TTL不大于软TTL时关闭SWR"""
+        assert cache.swr_enabled is False
+
+
+class TestGenerations:
+    """测试实体代数失效"""
+
+    def test_bump_invalidates_entity_keys(self, app, cache):
+        """测试递增游戏代数后该游戏的键全部失效，其他游戏不受影响"""
+        cache.set("events.list", [1], game_gid=1, page=1)
+        cache.set("events.list", [2], game_gid=2, page=1)
+
+        cache.generations.bump("game_gid", 1)
+
+        assert cache.get("events.list", game_gid=1, page=1) is None
+        assert cache.get("events.list", game_gid=2, page=1) == [2]
+        assert "_gen_game_gid:1" in CacheKeyBuilder.build("events.list", game_gid=1, page=1)
+
+    def test_game_id_and_gid_counters_separate(self, app, cache):
+        """测试 game_id 与 game_gid 各用一个代数：GID为1的游戏不会失效ID为1的另一个游戏"""
+        cache.set("parameters.all", [1], game_id=1)
+        cache.set("events.count", 5, game_gid=1)
+
+        cache.generations.bump("game_gid", 1)
+
+        assert cache.get("parameters.all", game_id=1) == [1]
+        assert cache.get("events.count", game_gid=1) is None
+
+    def test_bump_game_maps_gid_to_id(self, app, cache, monkeypatch):
+        """测试按GID失效游戏时查出ID，两类键一起换代"""
+        invalidator = CacheInvalidator(cache)
+        monkeypatch.setattr(
+            cache_system, "_resolve_game_ids", lambda game_id, game_gid: (3, game_gid)
+        )
+        cache.set("parameters.all", [1], game_id=3)
+        cache.set("events.count", 5, game_gid=10000147)
+
+        assert invalidator.bump_game(game_gid=10000147) == {"game": 1, "game_gid": 1}
+        assert cache.get("parameters.all", game_id=3) is None
+        assert cache.get("events.count", game_gid=10000147) is None
+
+    def test_bump_shared_through_l2(self, app, cache, redis_client):
+        """测试代数存储在L2，其他worker丢弃镜像后读到新代数"""
+        assert cache.generations.current("event", 7) == 0
+
+        other = HierarchicalCache(l1_max_bytes=None, l1_hard_ttl=0)
+        assert other.generations.bump("event", 7) == 1
+
+        # 镜像未过期时仍是旧代数，收到总线消息后立即丢弃
+        assert cache.generations.current("event", 7) == 0
+        cache._apply_remote_invalidations([{"op": "k", "k": "gen:event:7"}])
+        assert cache.generations.current("event", 7) == 1
+        assert redis_client.get(f"{KEY_PREFIX}gen:event:7") == b"1"
+
+    def test_detail_id_stamped(self, app, cache):
+        """测试详情模式的 id 参数按实体嵌入代数"""
+        cache.set("games.detail", {"id": 3}, id=3)
+        cache.generations.bump("game", 3)
+
+        assert cache.get("games.detail", id=3) is None
+
+    def test_local_counter_without_app(self, cache):
+        """测试没有应用上下文时退化为进程内计数"""
+        assert cache.generations.bump("game", 1) == 1
+        assert cache.generations.bump("game", 1) == 2
@@ -0,0 +1,106 @@
+"""
+热点键追踪与快照测试
+"""
+
+import os
+import time
+
+from backend.core.cache.cache_hotkeys import HotKeyTracker, loader_identity, worker_snapshot_path
+
+
+def record(tracker, key, times, hit=True):
+    for _ in range(times):
+        tracker.record(key, "events.detail", {"id": key}, hit)
+
+
+class TestHotKeyTracker:
+    """测试频率追踪"""
+
+    def test_one_off_keys_not_admitted(self):
+        """测试只出现一次的键不成为候选"""
+        tracker = HotKeyTracker(top_k=10)
+        record(tracker, "once", 1)
+        record(tracker, "hot", 5)
+
+        assert [entry["key"] for entry in tracker.top()] == ["hot"]
+
+    def test_top_ordered_by_score(self):
+        """测试Top-K按热度降序"""
+        tracker = HotKeyTracker(top_k=2)
+        record(tracker, "a", 3)
+        record(tracker, "b", 10)
+        record(tracker, "c", 6)
+
+        assert [entry["key"] for entry in tracker.top()] == ["b", "c"]
+
+    def test_snapshot_round_trip_and_decay(self, tmp_path):
+        """测试快照写入后可读回，并且计数减半"""
+        tracker = HotKeyTracker(top_k=10)
+        record(tracker, "a", 8)
+        path = str(tmp_path / "hotkeys.json")
+
+        assert tracker.write_snapshot(path, loader_for=lambda pattern: "mod:fn") == 1
+        entries = tracker.read_snapshot(path)
+
+        assert entries[0]["key"] == "a"
+        assert entries[0]["loader"] == "mod:fn"
+        assert tracker.top()[0]["score"] == entries[0]["score"] // 2
+
+    def test_workers_merged(self, tmp_path, monkeypatch):
+        """测试每个worker写各自的文件，读取时按键累加计数"""
+        path = str(tmp_path / "hotkeys.json")
+        for pid, counts in ((101, {"a": 10, "b": 4}), (102, {"b": 9, "c": 3})):
+            monkeypatch.setattr("backend.core.cache.cache_hotkeys.os.getpid", lambda: pid)
+            tracker = HotKeyTracker(top_k=10)
+            for key, times in counts.items():
+                record(tracker, key, times)
+            tracker.write_snapshot(path)
+
+        assert sorted(f.name for f in tmp_path.iterdir()) == [
+            "hotkeys.101.json",
+            "hotkeys.102.json",
+        ]
+        entries = HotKeyTracker(top_k=2).read_snapshot(path)
+        assert [(e["key"], e["score"]) for e in entries] == [("b", 13), ("a", 10)]
+
+    def test_expired_worker_snapshots_ignored_and_removed(self, tmp_path, monkeypatch):
+        """测试过期的worker快照读取时忽略，写入时删除"""
+        path = str(tmp_path / "hotkeys.json")
+        stale = worker_snapshot_path(path, 99)
+        stale.write_text('{"version": 1, "entries": [{"key": "old", "score": 100}]}')
+        os.utime(stale, (time.time() - 7200, time.time() - 7200))
+        tracker = HotKeyTracker(top_k=10, max_age=3600)
+
+        assert tracker.read_snapshot(path) == []
+        record(tracker, "a", 3)
+        tracker.write_snapshot(path)
+        assert not stale.exists()
+        assert [e["key"] for e in tracker.read_snapshot(path)] == ["a"]
+
+    def test_read_missing_or_corrupt_snapshot(self, tmp_path):
+        """测试快照不存在或损坏时返回空列表"""
+        path = str(tmp_path / "hotkeys.json")
+        tracker = HotKeyTracker()
+        assert tracker.read_snapshot(path) == []
+
+        worker_snapshot_path(path, 1).write_text("{not json")
+        assert tracker.read_snapshot(path) == []
+
+    def test_coverage(self):
+        """测试预热覆盖率统计"""
+        tracker = HotKeyTracker()
+        tracker.watch({"warm"})
+        tracker.record("warm", "games.list", {}, True)
+        tracker.record("cold", "games.list", {}, True)
+        tracker.record("miss", "games.list", {}, False)
+
+        coverage = tracker.get_stats()["coverage"]
+        assert coverage["warmed_hits"] == 1
+        assert coverage["coverage"] == "50.0%"
+
+    def test_loader_identity(self):
+        """测试lambda等无法导入的加载函数没有标识"""
+        assert loader_identity(loader_identity) == (
+            "backend.core.cache.cache_hotkeys:loader_identity"
+        )
+        assert loader_identity(lambda: 1) is None
@@ -0,0 +1,133 @@
+"""
+L1失效总线测试（fakeredis Pub/Sub）
+"""
+
+import json
+import threading
+import time
+
+import pytest
+
+from backend.core.cache.cache_invalidation_bus import OP_CLEAR, OP_PATTERN, InvalidationBus
+
+CHANNEL = "test:bus"
+
+
+def wait_for(predicate, timeout=3.0):
+    """轮询直到条件成立或超时"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def buses(redis_client):
+    """同一频道上的两个worker"""
+    received = {"a": [], "b": []}
+    bus_a = InvalidationBus(CHANNEL, batch_interval=0.05)
+    bus_b = InvalidationBus(CHANNEL, batch_interval=0.05)
+    bus_a.start(redis_client, received["a"].extend)
+    bus_b.start(redis_client, received["b"].extend)
+    # 等待订阅生效
+    assert wait_for(lambda: redis_client.pubsub_numsub(CHANNEL)[0][1] == 2)
+    yield bus_a, bus_b, received
+    bus_a.stop()
+    bus_b.stop()
+
+
+class TestInvalidationBus:
+    """测试发布、合并与应用"""
+
+    def test_publish_reaches_other_worker_only(self, buses):
+        """测试失效广播到其他worker，发布方忽略自己的消息"""
+        bus_a, bus_b, received = buses
+
+        bus_a.publish_pattern("events.*", {"game_gid": 1})
+
+        assert wait_for(lambda: received["b"])
+        assert received["b"][0]["op"] == OP_PATTERN
+        assert received["b"][0]["pt"] == "events.*"
+        assert received["b"][0]["kw"] == {"game_gid": 1}
+        time.sleep(0.1)
+        assert received["a"] == []
+        assert bus_b.get_stats()["receive_batches"] == 1
+
+    def test_window_coalesces_duplicates(self, buses):
+        """测试合并窗口内的重复失效只发送一次，且合并为一条消息"""
+        bus_a, bus_b, received = buses
+
+        for _ in range(20):
+            bus_a.publish_pattern("events.list", {"game_gid": 1})
+        bus_a.publish_key("dwd_gen:v3:games.detail:id:1")
+
+        assert wait_for(lambda: len(received["b"]) == 2)
+        stats = bus_a.get_stats()
+        assert stats["publish_batches"] == 1
+        assert stats["published"] == 2
+
+    def test_clear_supersedes_batch(self, redis_client):
+        """测试批次中有清空操作时只发送清空"""
+        bus = InvalidationBus(CHANNEL)
+        bus._client = redis_client
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(CHANNEL)
+
+        bus._flush(
+            [
+                {"op": OP_PATTERN, "pt": "events.*", "kw": {}, "t": time.time()},
+                {"op": OP_CLEAR, "t": time.time()},
+            ]
+        )
+
+        message = None
+        deadline = time.monotonic() + 1
+        while message is None and time.monotonic() < deadline:
+            message = pubsub.get_message(timeout=0.1)
+        assert [m["op"] for m in json.loads(message["data"])["m"]] == [OP_CLEAR]
+
+    def test_handler_error_counted(self, redis_client):
+        """测试应用失败计入 apply_errors，订阅线程继续运行"""
+        bus = InvalidationBus(CHANNEL)
+        calls = threading.Event()
+
+        def handler(messages):
+            calls.set()
+            raise RuntimeError("boom")
+
+        bus._handler = handler
+        bus._receive(json.dumps({"o": "other", "m": [{"op": OP_CLEAR, "t": time.time()}]}))
+
+        assert calls.is_set()
+        assert bus.get_stats()["apply_errors"] == 1
+
+    def test_not_running_publish_is_noop(self):
+        """测试未启动时发布不入队"""
+        bus = InvalidationBus(CHANNEL)
+        bus.publish_clear()
+
+        assert bus.get_stats()["queue_depth"] == 0
+
+
+class TestApplyRemoteInvalidations:
+    """测试 HierarchicalCache 应用其他worker的失效"""
+
+    def test_pattern_key_and_clear(self, cache):
+        """测试模式/单键/清空消息分别作用于本进程L1"""
+        cache.set("events.list", [1], game_gid=1)
+        cache.set("events.list", [2], game_gid=2)
+        cache.set("games.list", [3])
+
+        cache._apply_remote_invalidations(
+            [{"op": OP_PATTERN, "pt": "events.list", "kw": {"game_gid": 1}}]
+        )
+        assert cache.get("events.list", game_gid=1) is None
+        assert cache.get("events.list", game_gid=2) == [2]
+
+        cache._apply_remote_invalidations([{"op": "k", "k": "dwd_gen:v3:games.list"}])
+        assert cache.get("games.list") is None
+
+        cache._apply_remote_invalidations([{"op": OP_CLEAR}])
+        assert len(cache.l1) == 0
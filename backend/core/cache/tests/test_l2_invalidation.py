@@ -0,0 +1,152 @@
+"""
+L2标签失效器测试（fakeredis）
+"""
+
+import fakeredis
+import pytest
+
+from backend.core.cache.cache_l2_invalidation import L2TagInvalidator, escape_key_value
+
+PREFIX = "flask_cache_"
+NAMESPACE = "dwd_gen:v3:"
+
+
+@pytest.fixture
+def client():
+    """内存Redis"""
+    return fakeredis.FakeStrictRedis()
+
+
+def store(client, invalidator, key, pattern, params, ttl=60):
+    """写入数据键并记录标签（与 HierarchicalCache 写L2的顺序一致）"""
+    client.set(f"{PREFIX}{key}", b"v", ex=ttl)
+    invalidator.record(client, PREFIX, key, pattern, params, ttl)
+
+
+class TestL2TagInvalidator:
+    """测试有序集合标签索引"""
+
+    def test_invalidate_by_entity(self, client):
+        """测试按实体参数只删除匹配的键"""
+        invalidator = L2TagInvalidator(NAMESPACE)
+        store(
+            client,
+            invalidator,
+            f"{NAMESPACE}events.list:game_gid:1",
+            "events.list",
+            {"game_gid": 1},
+        )
+        store(
+            client,
+            invalidator,
+            f"{NAMESPACE}events.list:game_gid:2",
+            "events.list",
+            {"game_gid": 2},
+        )
+
+        deleted = invalidator.invalidate(client, PREFIX, "events.list", {"game_gid": 1})
+
+        assert deleted == 1
+        assert not client.exists(f"{PREFIX}{NAMESPACE}events.list:game_gid:1")
+        assert client.exists(f"{PREFIX}{NAMESPACE}events.list:game_gid:2")
+
+    def test_invalidate_glob_namespace(self, client):
+        """测试 'events.*' 删除整个命名空间"""
+        invalidator = L2TagInvalidator(NAMESPACE)
+        store(
+            client,
+            invalidator,
+            f"{NAMESPACE}events.list:game_gid:1",
+            "events.list",
+            {"game_gid": 1},
+        )
+        store(client, invalidator, f"{NAMESPACE}events.detail:id:5", "events.detail", {"id": 5})
+        store(client, invalidator, f"{NAMESPACE}games.list", "games.list", {})
+
+        assert invalidator.invalidate(client, PREFIX, "events.*") == 2
+        assert client.exists(f"{PREFIX}{NAMESPACE}games.list")
+
+    def test_tags_are_scored_by_expiry(self, client):
+        """测试标签使用有序集合，分数为数据过期时间"""
+        invalidator = L2TagInvalidator(NAMESPACE)
+        store(client, invalidator, f"{NAMESPACE}games.list", "games.list", {}, ttl=60)
+
+        tag_key = f"{PREFIX}{L2TagInvalidator.TAG_NAMESPACE}ns:games.list"
+        assert client.type(tag_key) == b"zset"
+        assert client.ttl(tag_key) == 120
+
+    def test_record_prunes_expired_members(self, client, monkeypatch):
+        """测试写入时移除已过期的成员，标签集合不会无限增长"""
+        invalidator = L2TagInvalidator(NAMESPACE)
+        clock = [1000.0]
+        monkeypatch.setattr("backend.core.cache.cache_l2_invalidation.time.time", lambda: clock[0])
+
+        for i in range(5):
+            invalidator.record(
+                client, PREFIX, f"{NAMESPACE}games.list:page:{i}", "games.list", {}, 10
+            )
+        clock[0] += 11
+        invalidator.record(client, PREFIX, f"{NAMESPACE}games.list:page:9", "games.list", {}, 10)
+
+        tag_key = f"{PREFIX}{L2TagInvalidator.TAG_NAMESPACE}ns:games.list"
+        assert client.zcard(tag_key) == 1
+        assert invalidator.get_stats()["tag_members_pruned"] >= 5
+
+    def test_prune_tag(self, client, monkeypatch):
+        """测试 prune_tag 按分数清理过期成员"""
+        invalidator = L2TagInvalidator(NAMESPACE)
+        clock = [1000.0]
+        monkeypatch.setattr("backend.core.cache.cache_l2_invalidation.time.time", lambda: clock[0])
+        invalidator.record(client, PREFIX, f"{NAMESPACE}games.list", "games.list", {}, 10)
+        clock[0] += 11
+
+        assert invalidator.prune_tag(client, PREFIX, "ns:games.list") == 1
+
+    def test_member_cap_evicts_oldest_keys(self, client):
+        """测试超出成员上限时淘汰最早过期的键，并删除对应的数据键"""
+        invalidator = L2TagInvalidator(NAMESPACE, max_tag_members=3)
+        for i in range(5):
+            store(
+                client, invalidator, f"{NAMESPACE}games.list:page:{i}", "games.list", {}, ttl=60 + i
+            )
+
+        tag_key = f"{PREFIX}{L2TagInvalidator.TAG_NAMESPACE}ns:games.list"
+        assert client.zcard(tag_key) == 3
+        assert not client.exists(f"{PREFIX}{NAMESPACE}games.list:page:0")
+        assert not client.exists(f"{PREFIX}{NAMESPACE}games.list:page:1")
+        assert client.exists(f"{PREFIX}{NAMESPACE}games.list:page:4")
+
+        # 剩余的键仍然可以按标签失效
+        assert invalidator.invalidate(client, PREFIX, "games.list") == 3
+
+    def test_invalidate_in_batches(self, client):
+        """测试大标签集合分批删除"""
+        invalidator = L2TagInvalidator(NAMESPACE, batch_size=7)
+        for i in range(30):
+            store(
+                client,
+                invalidator,
+                f"{NAMESPACE}events.list:game_gid:1:page:{i}",
+                "events.list",
+                {"game_gid": 1, "page": i},
+            )
+
+        assert invalidator.invalidate(client, PREFIX, "events.list", {"game_gid": 1}) == 30
+        assert invalidator.get_stats()["batches"] == 5
+
+    def test_values_containing_colon(self, client):
+        """测试参数值含 ':' 时按转义后的值匹配，不会被拆成其他参数"""
+        invalidator = L2TagInvalidator(NAMESPACE)
+        keyword_key = f"{NAMESPACE}events.search:keyword:{escape_key_value('a:page:2')}"
+        page_key = f"{NAMESPACE}events.search:keyword:a:page:2"
+        store(client, invalidator, keyword_key, "events.search", {"keyword": "a:page:2"})
+        store(client, invalidator, page_key, "events.search", {"keyword": "a", "page": 2})
+
+        assert keyword_key != page_key
+        assert invalidator.invalidate(client, PREFIX, "events.search", {"page": 2}) == 1
+        assert client.exists(f"{PREFIX}{keyword_key}")
+        assert (
+            invalidator.scan_invalidate(client, PREFIX, "events.search", {"keyword": "a:page:2"})
+            == 1
+        )
+        assert not client.exists(f"{PREFIX}{keyword_key}")
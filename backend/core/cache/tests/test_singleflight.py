@@ -0,0 +1,137 @@
+"""
+未命中合并测试（进程内 + fakeredis分布式锁）
+"""
+
+import threading
+import time
+
+from backend.core.cache.cache_singleflight import SingleFlight
+
+
+class TestInProcess:
+    """测试进程内合并"""
+
+    def test_concurrent_calls_share_one_load(self):
+        """测试并发调用只执行一次加载函数"""
+        flight = SingleFlight(wait_timeout=5)
+        calls = []
+        release = threading.Event()
+
+        def load():
+            calls.append(1)
+            release.wait(2)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(flight.do("k", load))) for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        while flight.get_stats()["in_flight"] == 0:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        release.set()
+        for t in threads:
+            t.join()
+
+        assert results == ["value"] * 8
+        assert len(calls) == 1
+        assert flight.get_stats()["coalesced"] == 7
+
+    def test_leader_error_not_shared(self):
+        """测试leader失败时等待者自行计算，异常不共享"""
+        flight = SingleFlight(wait_timeout=5)
+        started = threading.Event()
+        results = []
+
+        def failing():
+            started.set()
+            time.sleep(0.1)
+            raise RuntimeError("boom")
+
+        def leader():
+            try:
+                flight.do("k", failing)
+            except RuntimeError:
+                results.append("error")
+
+        t = threading.Thread(target=leader)
+        t.start()
+        started.wait(2)
+        results.append(flight.do("k", lambda: "recomputed"))
+        t.join()
+
+        assert sorted(results) == ["error", "recomputed"]
+
+
+class TestDistributedLock:
+    """测试跨worker的Redis锁"""
+
+    def test_lock_released_after_load(self, redis_client):
+        """测试leader完成后释放自己的锁"""
+        flight = SingleFlight(lock_ttl=30)
+
+        assert flight.do("k", lambda: 1, redis_client=redis_client, lock_key="lock:k") == 1
+        assert not redis_client.exists("lock:k")
+        assert flight.get_stats()["leaders"] == 1
+
+    def test_follower_uses_result_from_other_worker(self, redis_client):
+        """测试锁被其他worker持有时轮询缓存拿到结果"""
+        flight = SingleFlight(wait_timeout=2, poll_interval=0.01)
+        redis_client.set("lock:k", "other-worker", px=5000)
+        probes = []
+
+        def check():
+            probes.append(1)
+            return (len(probes) >= 3, "from-other-worker")
+
+        result = flight.do(
+            "k", lambda: "computed", redis_client=redis_client, lock_key="lock:k", check=check
+        )
+
+        assert result == "from-other-worker"
+        assert flight.get_stats()["distributed_coalesced"] == 1
+
+    def test_expired_lock_lets_follower_compute(self, redis_client):
+        """测试持锁worker崩溃后，锁按TTL过期，等待者不会一直等到超时"""
+        flight = SingleFlight(wait_timeout=5, poll_interval=0.01)
+        redis_client.set("lock:k", "crashed-worker", px=150)
+
+        start = time.monotonic()
+        result = flight.do(
+            "k",
+            lambda: "computed",
+            redis_client=redis_client,
+            lock_key="lock:k",
+            check=lambda: (False, None),
+        )
+
+        assert result == "computed"
+        assert time.monotonic() - start < 2
+        stats = flight.get_stats()
+        assert stats["timeouts"] == 0
+        assert stats["leaders"] == 1
+
+    def test_wait_timeout_falls_back_to_compute(self, redis_client):
+        """测试等待超时后退化为直接计算"""
+        flight = SingleFlight(wait_timeout=0.1, poll_interval=0.01)
+        redis_client.set("lock:k", "slow-worker", px=10000)
+
+        result = flight.do("k", lambda: "computed", redis_client=redis_client, lock_key="lock:k")
+
+        assert result == "computed"
+        assert flight.get_stats()["timeouts"] == 1
+
+    def test_release_keeps_lock_taken_over_by_other_worker(self, redis_client):
+        """测试锁过期后被其他worker重新获取时，原leader不会误删"""
+        flight = SingleFlight(lock_ttl=30)
+
+        def load():
+            # 模拟锁过期后其他worker抢到了锁
+            redis_client.set("lock:k", "new-owner")
+            return 1
+
+        flight.do("k", load, redis_client=redis_client, lock_key="lock:k")
+
+        assert redis_client.get("lock:k") == b"new-owner"
@@ -0,0 +1,73 @@
+"""
+SQLite文件L2后端测试
+"""
+
+import time
+
+import pytest
+
+from backend.core.cache.cache_sqlite_l2 import SQLiteCache
+
+NAMESPACE = "dwd_gen:v3:"
+
+
+@pytest.fixture
+def backend(tmp_path):
+    """临时文件上的SQLite L2"""
+    return SQLiteCache(
+        str(tmp_path / "l2.db"), default_timeout=60, key_prefix="p_", key_namespace=NAMESPACE
+    )
+
+
+class TestSQLiteCache:
+    """测试Flask-Caching接口与标签失效"""
+
+    def test_set_get_delete(self, backend):
+        """测试基本读写"""
+        backend.set("k", {"a": [1, 2]})
+
+        assert backend.get("k") == {"a": [1, 2]}
+        assert backend.has("k")
+        assert backend.delete("k")
+        assert backend.get("k") is None
+
+    def test_expired_entries_invisible(self, backend, monkeypatch):
+        """测试过期条目读取不到，add可以覆盖"""
+        backend.set("k", 1, timeout=10)
+        now = time.time()
+        monkeypatch.setattr("backend.core.cache.cache_sqlite_l2.time.time", lambda: now + 11)
+
+        assert backend.get("k") is None
+        assert backend.add("k", 2)
+        assert not backend.add("k", 3)
+        assert backend.get("k") == 2
+
+    def test_shared_between_instances(self, backend, tmp_path):
+        """测试同一文件的两个实例（两个worker）共享数据"""
+        other = SQLiteCache(str(tmp_path / "l2.db"), key_prefix="p_", key_namespace=NAMESPACE)
+        backend.set("k", "v")
+
+        assert other.get("k") == "v"
+
+    def test_invalidate_tags(self, backend):
+        """测试按模式和实体参数失效"""
+        for gid in (1, 2):
+            key = f"{NAMESPACE}events.list:game_gid:{gid}"
+            backend.set(key, [gid])
+            backend.record_tags(key, "events.list", {"game_gid": gid}, 60)
+
+        assert backend.invalidate_tags("events.list", {"game_gid": 1}) == 1
+        assert backend.get(f"{NAMESPACE}events.list:game_gid:1") is None
+        assert backend.get(f"{NAMESPACE}events.list:game_gid:2") == [2]
+        assert backend.invalidate_tags("events.*") == 1
+
+    def test_sweep_threshold(self, tmp_path):
+        """测试清理时超出条目上限的部分按过期时间淘汰"""
+        backend = SQLiteCache(str(tmp_path / "l2.db"), threshold=3)
+        for i in range(5):
+            backend.set(f"k{i}", i, timeout=100 + i)
+
+        assert backend.sweep() == 2
+        assert backend.get("k0") is None
+        assert backend.get("k4") == 4
+        assert backend.get_stats()["entries"] == 3
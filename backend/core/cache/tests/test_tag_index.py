@@ -0,0 +1,76 @@
+"""
+缓存标签倒排索引测试
+"""
+
+from backend.core.cache.cache_tag_index import CacheTagIndex
+
+
+def build_index():
+    """两个游戏的 events.list 分页 + events.detail + games.list"""
+    index = CacheTagIndex()
+    index.add("e1p1", "events.list", {"game_gid": 1, "page": 1}, 60)
+    index.add("e1p2", "events.list", {"game_gid": 1, "page": 2}, 60)
+    index.add("e2p1", "events.list", {"game_gid": 2, "page": 1}, 60)
+    index.add("ed5", "events.detail", {"id": 5}, 60)
+    index.add("gl", "games.list", {}, 60)
+    return index
+
+
+class TestCacheTagIndex:
+    """测试模式/参数匹配"""
+
+    def test_match_by_value(self):
+        """测试按参数值匹配（值按字符串比较）"""
+        index = build_index()
+
+        assert index.match("events.list", {"game_gid": 1}) == {"e1p1", "e1p2"}
+        assert index.match("events.list", {"game_gid": "2", "page": 1}) == {"e2p1"}
+
+    def test_match_wildcard_value(self):
+        """测试参数值为通配符时只要求参数存在"""
+        index = build_index()
+
+        assert index.match("events.list", {"page": "*"}) == {"e1p1", "e1p2", "e2p1"}
+        assert index.match("events.detail", {"page": None}) == set()
+
+    def test_match_glob_namespace(self):
+        """测试 'events.*' 匹配所有 events 子模式"""
+        index = build_index()
+
+        assert index.match("events.*") == {"e1p1", "e1p2", "e2p1", "ed5"}
+        assert index.match("events") == {"e1p1", "e1p2", "e2p1", "ed5"}
+
+    def test_remove(self):
+        """测试移除后不再匹配"""
+        index = build_index()
+        index.remove_many(["e1p1", "e2p1"])
+
+        assert index.match("events.list") == {"e1p2"}
+        assert len(index) == 3
+
+    def test_expired_entries_pruned(self):
+        """测试过期索引项在匹配和清理时移除"""
+        index = CacheTagIndex()
+        index.add("old", "games.list", {}, -1)
+        index.add("new", "games.list", {}, 60)
+
+        assert index.match("games.list") == {"new"}
+        index.add("old2", "games.list", {}, -1)
+        assert index.prune_expired() == 1
+        assert len(index) == 1
+
+
+class TestCacheKeys:
+    """测试分层缓存写入的键与参数组合一一对应"""
+
+    def test_colon_values_do_not_share_key(self, cache):
+        """测试参数值含 ':' 时不与其他参数组合生成同一个键，标签按各自参数失效"""
+        cache.set("events.search", ["colon"], keyword="x:page:2")
+        cache.set("events.search", ["page"], keyword="x", page=2)
+
+        assert cache.get("events.search", keyword="x:page:2") == ["colon"]
+
+        cache.invalidate_pattern("events.search", page=2)
+
+        assert cache.get("events.search", keyword="x", page=2) is None
+        assert cache.get("events.search", keyword="x:page:2") == ["colon"]
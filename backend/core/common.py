@@ -131,6 +131,8 @@ def clear_entity_caches(entity_type: str, entity_id: int, game_gid: Optional[int
     """
     通用的实体缓存清理函数
 
+    通过递增实体代数实现O(1)失效（见 backend.core.cache.cache_generation）
+
     Args:
         entity_type: 实体类型 ('event', 'game', 'parameter', etc.)
         entity_id: 实体ID
@@ -144,25 +146,25 @@ def clear_entity_caches(entity_type: str, entity_id: int, game_gid: Optional[int
         >>> clear_entity_caches('game', game_id)
     """
     try:
-        # 导入缓存函数（延迟导入避免循环依赖）
+        # 导入缓存实例（延迟导入避免循环依赖）
         try:
-            from backend.core.cache.cache_system import clear_cache_pattern
+            from backend.core.cache.cache_system import cache_invalidator, hierarchical_cache
         except ImportError:
-            # Fallback: 使用空操作
-            def clear_cache_pattern(pattern):
-                pass
+            return
 
-        # 清理实体特定缓存
+        # 递增实体代数：依赖该实体的缓存键整体换代，无需扫描/删除键；
+        # 游戏的 game_id 键和 game_gid 键各有一个代数，由 bump_game 一并递增
+        generations = hierarchical_cache.generations
         if entity_type == "event":
-            clear_cache_pattern(f"event:*:{entity_id}")
+            generations.bump("event", entity_id)
             if game_gid:
-                clear_cache_pattern(f"game:{game_gid}:events*")
+                cache_invalidator.bump_game(game_gid=game_gid)
         elif entity_type == "game":
-            clear_cache_pattern(f"game:{entity_id}:*")
+            cache_invalidator.bump_game(game_id=entity_id)
         elif entity_type == "parameter":
-            clear_cache_pattern(f"param:*:{entity_id}")
+            generations.bump("parameter", entity_id)
             if game_gid:
-                clear_cache_pattern(f"game:{game_gid}:params*")
+                cache_invalidator.bump_game(game_gid=game_gid)
         else:
             logger.warning(f"Unknown entity type for cache clearing: {entity_type}")
 
@@ -23,6 +23,8 @@ from .config import (
     LogConfig,
     CommonParamConfig,
     HQLConfig,
+    AsyncTaskConfig,
+    DatabaseConfig,
     CacheConfig,
     # Functions
     ensure_directories,
@@ -43,6 +45,8 @@ __all__ = [
     "LogConfig",
     "CommonParamConfig",
     "HQLConfig",
+    "AsyncTaskConfig",
+    "DatabaseConfig",
     "CacheConfig",
     "ensure_directories",
 ]
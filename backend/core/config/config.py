@@ -162,6 +162,128 @@ class HQLConfig:
         "alter": "ALTER TABLE语句",
     }
 
+    # generate-batch: maximum configurations per request
+    BATCH_MAX_ITEMS = int(os.getenv("HQL_BATCH_MAX_ITEMS", 20000))
+    # generate-batch: worker pool size (default: CPU cores)
+    BATCH_WORKERS = int(os.getenv("HQL_BATCH_WORKERS", os.cpu_count() or 1))
+    # generate-batch: use a process pool instead of threads (server-side only)
+    BATCH_USE_PROCESSES = os.getenv("HQL_BATCH_USE_PROCESSES", "False").lower() == "true"
+
+
+# Async task configuration
+class AsyncTaskConfig:
+    """Background job queue (async_tasks table) configuration"""
+
+    # Worker threads per process running queued tasks
+    WORKERS = int(os.getenv("ASYNC_TASK_WORKERS", 2))
+    # Start the workers when the blueprint is registered, so tasks left behind by a
+    # crashed process resume at startup (False: start on the first submitted task)
+    AUTOSTART = os.getenv("ASYNC_TASK_AUTOSTART", "True").lower() == "true"
+    # Seconds an idle worker sleeps between polls of the table (submits wake it early)
+    POLL_INTERVAL = float(os.getenv("ASYNC_TASK_POLL_INTERVAL", 2))
+    # A running task whose heartbeat is older than this (seconds) is requeued
+    STALE_SECONDS = int(os.getenv("ASYNC_TASK_STALE_SECONDS", 60))
+    # Events loaded, generated and checkpointed per step of a DWD bundle build
+    PAGE_SIZE = int(os.getenv("ASYNC_TASK_PAGE_SIZE", 200))
+    # Directory holding one sub-directory per bundle
+    BUNDLE_DIR = Path(os.getenv("ASYNC_TASK_BUNDLE_DIR", str(OUTPUT_DIR / "bundles")))
+
+
+# Database configuration
+class DatabaseConfig:
+    """SQLite connection pool and performance profile configuration"""
+
+    # Pool connections returned by get_db_connection() (False: one connection per call)
+    DB_POOL_ENABLED = os.getenv("DB_POOL_ENABLED", "True").lower() == "true"
+    # Idle connections kept open per database file
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 8))
+    # Checkouts allowed beyond the pool size (closed on release) before acquire() waits
+    DB_POOL_MAX_OVERFLOW = int(os.getenv("DB_POOL_MAX_OVERFLOW", 16))
+    # Seconds acquire() waits for a released connection before raising PoolTimeoutError
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    # Idle seconds after which a connection is pinged before reuse
+    DB_POOL_HEALTH_CHECK_INTERVAL = float(os.getenv("DB_POOL_HEALTH_CHECK_INTERVAL", 30))
+    # Seconds after which a connection is closed instead of reused
+    DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", 3600))
+    # Prepared statements cached per connection (sqlite3 default is 128)
+    DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 256))
+
+    # Lock wait (busy_timeout PRAGMA) of the default and read_heavy profiles, in ms
+    DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", 5000))
+    # Retries of an operation that still failed with SQLITE_BUSY after busy_timeout
+    DB_BUSY_RETRIES = int(os.getenv("DB_BUSY_RETRIES", 3))
+    # First retry delay in ms; doubled on every further attempt (with jitter)
+    DB_BUSY_BACKOFF_MS = float(os.getenv("DB_BUSY_BACKOFF_MS", 50))
+
+    # Read/write split: fetch helpers read through a pool of query_only connections,
+    # writes go through one serialized writer connection per database file
+    # (False: reads and writes both use get_db_connection())
+    DB_RW_SPLIT_ENABLED = os.getenv("DB_RW_SPLIT_ENABLED", "True").lower() == "true"
+    # Idle reader connections kept open per database file
+    DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", max(4, os.cpu_count() or 1)))
+
+    # Performance profiles: per-connection PRAGMAs applied by get_db_connection()
+    # (journal_mode / synchronous stay in PRAGMA_SETTINGS and apply to every profile)
+    # - mmap_size: bytes of the file read through memory-mapped I/O (0 disables)
+    # - cache_size: page cache per connection; negative values are KiB
+    # - temp_store: 2 = MEMORY for sorts, GROUP BY and temp indexes
+    # - wal_autocheckpoint: WAL pages before an automatic checkpoint
+    # - busy_timeout: milliseconds to wait for a lock before SQLITE_BUSY
+    DB_PROFILES = {
+        "default": {
+            "mmap_size": 64 * 1024 * 1024,
+            "cache_size": -16000,
+            "temp_store": 2,
+            "wal_autocheckpoint": 1000,
+            "busy_timeout": DB_BUSY_TIMEOUT_MS,
+        },
+        # Large scans / aggregations over event_params and hql_history
+        "read_heavy": {
+            "mmap_size": 512 * 1024 * 1024,
+            "cache_size": -65536,
+            "temp_store": 2,
+            "wal_autocheckpoint": 1000,
+            "busy_timeout": DB_BUSY_TIMEOUT_MS,
+        },
+        # Per-operation switch for imports: bigger cache, rare checkpoints, long lock waits
+        "bulk_import": {
+            "mmap_size": 512 * 1024 * 1024,
+            "cache_size": -131072,
+            "temp_store": 2,
+            "wal_autocheckpoint": 10000,
+            "busy_timeout": 30000,
+        },
+    }
+    # Profile applied to every connection unless a caller asks for another one
+    DB_PROFILE = os.getenv("DB_PROFILE", "default")
+
+    # FTS5 search indexes for keyword search (False: LIKE '%kw%' everywhere)
+    DB_FTS_ENABLED = os.getenv("DB_FTS_ENABLED", "True").lower() == "true"
+    # Keywords matching more rows than this use LIKE (an ordered page scan stops early)
+    DB_FTS_MAX_MATCHES = int(os.getenv("DB_FTS_MAX_MATCHES", 5000))
+
+    # Startup skips init_db/migrate_db/create_indexes when the stored schema fingerprint
+    # matches (False: run the full setup in every worker, as before)
+    DB_SCHEMA_FAST_PATH = os.getenv("DB_SCHEMA_FAST_PATH", "True").lower() == "true"
+
+    # Write-behind queue: small writes (history, usage counters) are group-committed by
+    # one writer thread (False: every submit_write() commits synchronously)
+    DB_WRITE_BEHIND_ENABLED = os.getenv("DB_WRITE_BEHIND_ENABLED", "False").lower() == "true"
+    # A batch is committed after this many milliseconds or statements, whichever first
+    DB_WRITE_BEHIND_BATCH_MS = float(os.getenv("DB_WRITE_BEHIND_BATCH_MS", 20))
+    DB_WRITE_BEHIND_BATCH_SIZE = int(os.getenv("DB_WRITE_BEHIND_BATCH_SIZE", 200))
+
+    # Query profiler (per-statement latency, EXPLAIN QUERY PLAN for slow statements)
+    DB_PROFILER_ENABLED = os.getenv("DB_PROFILER_ENABLED", "False").lower() == "true"
+    # Statements slower than this (ms) get their query plan captured
+    DB_PROFILER_SLOW_MS = float(os.getenv("DB_PROFILER_SLOW_MS", 100))
+    # Full scans of tables with at least this many rows are flagged
+    DB_PROFILER_LARGE_TABLE_ROWS = int(os.getenv("DB_PROFILER_LARGE_TABLE_ROWS", 10000))
+    # Distinct (endpoint, statement) groups tracked
+    DB_PROFILER_MAX_STATEMENTS = int(os.getenv("DB_PROFILER_MAX_STATEMENTS", 2000))
+    # Latency samples kept per group for percentiles
+    DB_PROFILER_SAMPLES = int(os.getenv("DB_PROFILER_SAMPLES", 512))
+
 
 # Cache configuration
 class CacheConfig:
@@ -227,9 +349,74 @@ class CacheConfig:
     # L1: 内存热点缓存
     CACHE_L1_SIZE = 1000  # L1缓存大小（条数）
     CACHE_L1_TTL = 60  # L1缓存TTL（秒）
+    # L1字节预算（按估算载荷大小），默认64MB
+    CACHE_L1_MAX_BYTES = int(os.getenv("CACHE_L1_MAX_BYTES", 64 * 1024 * 1024))
+    # L1准入过滤：启用TinyLFU后一次性扫描（如全量预热）不会冲刷热点键
+    CACHE_L1_ADMISSION = os.getenv("CACHE_L1_ADMISSION", "True").lower() == "true"
+    # L1硬TTL（秒）：CACHE_L1_TTL 作为软TTL，软过期后先返回旧值并后台刷新，
+    # 超过硬TTL才同步回源；不大于 CACHE_L1_TTL 时关闭 Stale-While-Revalidate。
+    # 仅对有加载函数的模式生效（register_loader / get_or_load / cached_hierarchical），
+    # 其余模式在软TTL到期时照常过期
+    CACHE_L1_HARD_TTL = int(os.getenv("CACHE_L1_HARD_TTL", 300))
+    # 后台刷新线程数和队列上限
+    CACHE_REFRESH_WORKERS = int(os.getenv("CACHE_REFRESH_WORKERS", 4))
+    CACHE_REFRESH_QUEUE_SIZE = int(os.getenv("CACHE_REFRESH_QUEUE_SIZE", 256))
+    # 实体代数（游戏/事件级O(1)失效）：本进程镜像TTL（秒）和L2计数器TTL（秒，需大于数据TTL）
+    CACHE_GENERATION_MIRROR_TTL = float(os.getenv("CACHE_GENERATION_MIRROR_TTL", 2))
+    CACHE_GENERATION_TTL = int(os.getenv("CACHE_GENERATION_TTL", 86400))
+    # 跨worker L1失效总线（Redis Pub/Sub）
+    CACHE_BUS_ENABLED = os.getenv("CACHE_BUS_ENABLED", "True").lower() == "true"
+    # 发布合并窗口（毫秒）和单条消息最多包含的失效操作数
+    CACHE_BUS_BATCH_MS = int(os.getenv("CACHE_BUS_BATCH_MS", 20))
+    CACHE_BUS_MAX_BATCH = int(os.getenv("CACHE_BUS_MAX_BATCH", 200))
 
     # L2: Redis共享缓存
     CACHE_L2_TTL = 3600  # L2缓存TTL（秒）
+    # L2标签失效：每批 UNLINK / SCAN 的键数量
+    CACHE_L2_INVALIDATION_BATCH = int(os.getenv("CACHE_L2_INVALIDATION_BATCH", 500))
+    # L2标签集合的成员上限：超出时最早过期的键提前淘汰
+    CACHE_L2_TAG_MAX_MEMBERS = int(os.getenv("CACHE_L2_TAG_MAX_MEMBERS", 50000))
+    # 模式失效时是否额外SCAN没有标签的历史键（上线过渡期开启）
+    CACHE_L2_LEGACY_SCAN = os.getenv("CACHE_L2_LEGACY_SCAN", "False").lower() == "true"
+    # L2载荷编码：编码后超过阈值（字节）才压缩；算法 'zlib' / 'lz4'（需安装lz4） / 'none'
+    CACHE_L2_COMPRESS_THRESHOLD = int(os.getenv("CACHE_L2_COMPRESS_THRESHOLD", 4096))
+    CACHE_L2_COMPRESSION = os.getenv("CACHE_L2_COMPRESSION", "zlib").lower()
+
+    # 单机共享L2：WAL模式SQLite文件（无Redis时多个worker共享同一份缓存）
+    # 显式启用: CACHE_TYPE=backend.core.cache.cache_sqlite_l2.SQLiteCache
+    CACHE_TYPE_SQLITE = "backend.core.cache.cache_sqlite_l2.SQLiteCache"
+    CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", str(BASE_DIR / "data" / "cache_l2.db"))
+    # 过期条目分批清理间隔（秒）
+    CACHE_SQLITE_SWEEP_INTERVAL = float(os.getenv("CACHE_SQLITE_SWEEP_INTERVAL", 60))
+    # Redis不可用时的L2降级方案：'sqlite'（共享文件）或 'none'（保持原后端）
+    CACHE_L2_FALLBACK = os.getenv("CACHE_L2_FALLBACK", "sqlite").lower()
+
+    # ============================================================================
+    # 未命中合并（Single-Flight，防止击穿）
+    # ============================================================================
+    # 等待其他调用方加载结果的最长时间（秒），超时后直接查询数据库
+    CACHE_SINGLEFLIGHT_TIMEOUT = float(os.getenv("CACHE_SINGLEFLIGHT_TIMEOUT", 10))
+    # 跨worker加载锁的TTL（秒），leader崩溃后锁自动释放
+    CACHE_SINGLEFLIGHT_LOCK_TTL = float(os.getenv("CACHE_SINGLEFLIGHT_LOCK_TTL", 30))
+    # 是否通过Redis锁在gunicorn worker之间合并
+    CACHE_SINGLEFLIGHT_DISTRIBUTED = (
+        os.getenv("CACHE_SINGLEFLIGHT_DISTRIBUTED", "True").lower() == "true"
+    )
+
+    # ============================================================================
+    # 热点快照预热
+    # ============================================================================
+    # 快照保留的热点键数量
+    CACHE_HOTKEY_TOP_K = int(os.getenv("CACHE_HOTKEY_TOP_K", 500))
+    # 快照文件路径和写入间隔（秒）
+    CACHE_HOTKEY_SNAPSHOT_PATH = os.getenv(
+        "CACHE_HOTKEY_SNAPSHOT_PATH", str(BASE_DIR / "data" / "cache_hotkeys.json")
+    )
+    CACHE_HOTKEY_SNAPSHOT_INTERVAL = float(os.getenv("CACHE_HOTKEY_SNAPSHOT_INTERVAL", 300))
+    # worker快照有效期（秒）：每个worker写各自的文件，读取时合并未过期的文件
+    CACHE_HOTKEY_SNAPSHOT_MAX_AGE = float(os.getenv("CACHE_HOTKEY_SNAPSHOT_MAX_AGE", 86400))
+    # 启动预热线程数（快照回放在后台执行，不阻塞应用就绪）
+    CACHE_WARMUP_WORKERS = int(os.getenv("CACHE_WARMUP_WORKERS", 4))
 
     # ============================================================================
     # 缓存选项
@@ -428,39 +428,38 @@ class GenericRepository:
         if not records:
             return []
 
-        # 获取数据库连接以支持事务
-        from backend.core.database.database import get_db_connection
-
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        # 经由串行写连接执行；批量写入使用 bulk_import 性能配置（连接归还时恢复默认配置）
+        from backend.core.database.routing import write_transaction
 
         inserted_ids = []
 
         try:
-            # 获取所有字段名（从所有记录中）
-            all_fields = set()
-            for record in records:
-                all_fields.update(record.keys())
-            all_fields.discard("id")  # 移除id字段（自动生成）
+            with write_transaction(profile="bulk_import") as conn:
+                cursor = conn.cursor()
 
-            field_list = list(all_fields)
-            field_names = ", ".join(field_list)
-            placeholders = ", ".join(["?" for _ in field_list])
+                # 获取所有字段名（从所有记录中）
+                all_fields = set()
+                for record in records:
+                    all_fields.update(record.keys())
+                all_fields.discard("id")  # 移除id字段（自动生成）
 
-            # 构建单条插入SQL
-            insert_sql = f"INSERT INTO {self.table_name} ({field_names}) VALUES ({placeholders})"
+                field_list = list(all_fields)
+                field_names = ", ".join(field_list)
+                placeholders = ", ".join(["?" for _ in field_list])
 
-            # 在单个事务中循环插入所有记录
-            for record in records:
-                # 按字段顺序准备值
-                values = [record.get(field) for field in field_list]
-                cursor.execute(insert_sql, tuple(values))
+                # 构建单条插入SQL
+                insert_sql = (
+                    f"INSERT INTO {self.table_name} ({field_names}) VALUES ({placeholders})"
+                )
 
-                # 收集插入的ID
-                inserted_ids.append(cursor.lastrowid)
+                # 在单个事务中循环插入所有记录（退出时提交，异常时回滚）
+                for record in records:
+                    # 按字段顺序准备值
+                    values = [record.get(field) for field in field_list]
+                    cursor.execute(insert_sql, tuple(values))
 
-            # 提交事务
-            conn.commit()
+                    # 收集插入的ID
+                    inserted_ids.append(cursor.lastrowid)
 
             # 清除缓存
             if self.enable_cache and self._cache:
@@ -477,12 +476,8 @@ class GenericRepository:
             return inserted_ids
 
         except Exception as e:
-            # 回滚事务
-            conn.rollback()
             logger.error(f"Error in create_batch for {self.table_name}: {e}")
             raise
-        finally:
-            conn.close()
 
 
 class Repositories:
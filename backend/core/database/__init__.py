@@ -12,6 +12,24 @@ from .database import (
     migrate_db,
     create_indexes,
 )
+from .connection_pool import (
+    PoolTimeoutError,
+    close_all_pools,
+    get_pool_stats,
+    init_connection_pool,
+)
+from .fulltext import ensure_search_indexes, match_condition, search_ids
+from .stats import ensure_stats_tables, repair_stats
+from .bootstrap import ensure_schema
+from .pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    keyset_condition,
+    paginate_rows,
+)
+from .routing import get_read_connection, retry_on_busy, write_transaction
+from .write_behind import WriteResult, flush_writes, submit_write, synchronous_writes
 
 # Import DB_PATH from config
 from ..config import DB_PATH
@@ -22,5 +40,27 @@ __all__ = [
     "init_db",
     "migrate_db",
     "create_indexes",
+    "PoolTimeoutError",
+    "close_all_pools",
+    "get_pool_stats",
+    "init_connection_pool",
+    "ensure_search_indexes",
+    "match_condition",
+    "search_ids",
+    "ensure_stats_tables",
+    "repair_stats",
+    "ensure_schema",
+    "InvalidCursorError",
+    "decode_cursor",
+    "encode_cursor",
+    "keyset_condition",
+    "paginate_rows",
+    "get_read_connection",
+    "retry_on_busy",
+    "write_transaction",
+    "WriteResult",
+    "flush_writes",
+    "submit_write",
+    "synchronous_writes",
     "DB_PATH",
 ]
@@ -8,21 +8,56 @@ import sqlite3
 from typing import Optional
 from pathlib import Path
 
+from backend.core.config import DatabaseConfig
 from backend.core.logging import get_logger
 from ._constants import PRAGMA_SETTINGS
 
 logger = get_logger(__name__)
 
 
-def _apply_pragma_settings(conn: sqlite3.Connection) -> None:
+def _apply_pragma_settings(conn: sqlite3.Connection, profile: Optional[str] = None) -> None:
     """
-    Apply SQLite PRAGMA settings to a connection
+    Apply SQLite PRAGMA settings and a performance profile to a connection
 
     Args:
         conn: SQLite connection
+        profile: Profile name from DatabaseConfig.DB_PROFILES (default: DB_PROFILE)
     """
     for key, value in PRAGMA_SETTINGS.items():
         conn.execute(f"PRAGMA {key}={value}")
+    _apply_profile(conn, profile or DatabaseConfig.DB_PROFILE)
+
+
+def _apply_profile(conn: sqlite3.Connection, profile: str) -> None:
+    """
+    Apply a performance profile's per-connection PRAGMAs
+
+    Args:
+        conn: SQLite connection
+        profile: Profile name from DatabaseConfig.DB_PROFILES
+
+    Raises:
+        ValueError: Unknown profile name
+    """
+    settings = DatabaseConfig.DB_PROFILES.get(profile)
+    if settings is None:
+        raise ValueError(f"Unknown SQLite profile: {profile}")
+    for key, value in settings.items():
+        conn.execute(f"PRAGMA {key}={int(value)}")
+    if hasattr(conn, "profile"):
+        # Pooled connections remember their profile so release() can restore the default
+        conn.profile = profile
+
+
+def _restore_default_profile(conn: sqlite3.Connection) -> None:
+    """
+    Switch a pooled connection back to the default profile (pool release hook)
+
+    Args:
+        conn: Pooled SQLite connection
+    """
+    if getattr(conn, "profile", None) != DatabaseConfig.DB_PROFILE:
+        _apply_profile(conn, DatabaseConfig.DB_PROFILE)
 
 
 def _execute_sql_file(conn: sqlite3.Connection, sql_file: Path) -> None:
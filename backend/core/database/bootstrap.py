@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Startup schema management with a fingerprint fast path
+
+Every worker used to run init_db(), migrate_db(), create_indexes() and the FTS /
+stats setup on import: dozens of sqlite_master probes and CREATE ... IF NOT EXISTS
+statements, each taking the write lock while the other workers wait on it.
+
+ensure_schema() records a fingerprint once the schema is complete:
+
+- the hash of the modules that define the schema (database.py, _constants.py,
+  fulltext.py, stats.py) and of DB_FTS_ENABLED, so a deploy that changes any of
+  them re-runs setup
+- PRAGMA schema_version, which SQLite bumps on every DDL statement, so tables or
+  indexes changed outside the application are noticed too
+
+When the stored fingerprint matches, startup costs one read-only query. Otherwise
+the first worker takes an exclusive file lock (<db>.schema.lock) and runs the full
+setup; workers that waited on the lock re-check the fingerprint and skip it.
+
+Usage:
+    from backend.core.database.bootstrap import ensure_schema
+
+    report = ensure_schema()   # {"path": "fast", "total_ms": 0.4, ...}
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from backend.core.config import DatabaseConfig, get_db_path
+from backend.core.logging import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server, no cross-worker lock needed
+    fcntl = None
+
+logger = get_logger(__name__)
+
+# Modules whose source defines the schema; editing any of them invalidates the fingerprint
+SCHEMA_MODULES = ("database.py", "_constants.py", "fulltext.py", "stats.py")
+
+SCHEMA_META_SQL = """
+    CREATE TABLE IF NOT EXISTS schema_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+_code_hash: Optional[str] = None
+
+
+def code_fingerprint() -> str:
+    """Hash of the schema-defining modules (computed once per process)"""
+    global _code_hash
+    if _code_hash is None:
+        digest = hashlib.sha256()
+        package_dir = Path(__file__).parent
+        for name in SCHEMA_MODULES:
+            digest.update(name.encode("utf-8"))
+            digest.update((package_dir / name).read_bytes())
+        # Settings that decide which objects exist
+        digest.update(f"fts={DatabaseConfig.DB_FTS_ENABLED}".encode("utf-8"))
+        _code_hash = digest.hexdigest()[:16]
+    return _code_hash
+
+
+def _fingerprint_matches(db_path: Path) -> bool:
+    """Read-only check: stored fingerprint equals code hash + current schema_version"""
+    if not db_path.exists():
+        return False
+    conn = sqlite3.connect(str(db_path))
+    try:
+        row = conn.execute("SELECT value FROM schema_meta WHERE key = 'fingerprint'").fetchone()
+        schema_version = conn.execute("PRAGMA schema_version").fetchone()[0]
+    except sqlite3.OperationalError:
+        # No schema_meta table yet
+        return False
+    finally:
+        conn.close()
+    return row is not None and row[0] == f"{code_fingerprint()}:{schema_version}"
+
+
+def _store_fingerprint(db_path: Path) -> None:
+    conn = sqlite3.connect(str(db_path))
+    try:
+        conn.execute(SCHEMA_META_SQL)
+        conn.commit()
+        # Read after the CREATE TABLE above: the row write itself is not DDL
+        schema_version = conn.execute("PRAGMA schema_version").fetchone()[0]
+        conn.execute(
+            "INSERT OR REPLACE INTO schema_meta (key, value, updated_at) "
+            "VALUES ('fingerprint', ?, CURRENT_TIMESTAMP)",
+            (f"{code_fingerprint()}:{schema_version}",),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+@contextmanager
+def _schema_lock(db_path: Path) -> Iterator[float]:
+    """Exclusive cross-process lock next to the database file; yields seconds waited"""
+    if fcntl is None:
+        yield 0.0
+        return
+    lock_path = db_path.with_name(db_path.name + ".schema.lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(str(lock_path), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        start = time.perf_counter()
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield time.perf_counter() - start
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def _run_setup(db_path: Path, timings: Dict[str, float]) -> bool:
+    """
+    Full schema setup; returns False when an optional step failed
+
+    Migration errors propagate (the application cannot run on a half-migrated
+    schema); index, search-index and counter failures are logged and retried on
+    the next start because the fingerprint is not stored. The search-index and
+    counter steps report per-object status instead of raising, so a "failed"
+    entry counts as a failure too. ("skipped" entries wait for a missing table;
+    creating that table changes schema_version, which re-runs setup anyway.)
+    """
+    from .database import create_indexes, init_db, migrate_db
+    from .fulltext import ensure_search_indexes
+    from .stats import ensure_stats_tables
+
+    def timed(name, fn):
+        start = time.perf_counter()
+        try:
+            return fn()
+        finally:
+            timings[name] = round((time.perf_counter() - start) * 1000, 2)
+
+    timed("init_db_ms", lambda: init_db(db_path))
+    timed("migrate_db_ms", lambda: migrate_db(db_path))
+
+    complete = True
+    optional_steps = (
+        ("create_indexes_ms", "database indexes", lambda: create_indexes(db_path)),
+        ("search_indexes_ms", "search indexes", lambda: ensure_search_indexes(db_path)),
+        ("stats_tables_ms", "stats counters", lambda: ensure_stats_tables(db_path)),
+    )
+    for name, label, fn in optional_steps:
+        try:
+            status = timed(name, fn)
+        except Exception as e:
+            logger.warning(f"Could not create {label}: {e}")
+            complete = False
+            continue
+        failed = [
+            f"{key}: {result}"
+            for key, result in (status or {}).items()
+            if result.startswith("failed")
+        ]
+        if failed:
+            logger.warning(f"Could not create {label}: {'; '.join(failed)}")
+            complete = False
+    return complete
+
+
+def ensure_schema(db_path: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Bring the database schema up to date, skipping all work when nothing changed
+
+    Args:
+        db_path: Optional database path. If not provided, uses get_db_path()
+
+    Returns:
+        Report with "path" ("fast" | "waited" | "full"), "created" (new database file),
+        "lock_wait_ms", "total_ms" and per-step timings for a full run
+    """
+    db_path = Path(db_path or get_db_path())
+    start = time.perf_counter()
+    report: Dict[str, Any] = {
+        "path": "fast",
+        "created": not db_path.exists(),
+        "lock_wait_ms": 0.0,
+    }
+
+    fast_path = DatabaseConfig.DB_SCHEMA_FAST_PATH
+    if not (fast_path and _fingerprint_matches(db_path)):
+        with _schema_lock(db_path) as waited:
+            report["lock_wait_ms"] = round(waited * 1000, 2)
+            # Another worker may have finished the setup while we waited
+            if fast_path and _fingerprint_matches(db_path):
+                report["path"] = "waited"
+            else:
+                report["path"] = "full"
+                if _run_setup(db_path, report):
+                    _store_fingerprint(db_path)
+
+    report["total_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return report
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pooled SQLite connections
+
+get_db_connection() used to open a fresh sqlite3 connection, re-run every
+PRAGMA and close it after a single query. Callers keep the same
+``conn = get_db_connection() ... conn.close()`` shape; the connection they get
+back is a PooledConnection whose close() hands it back to a bounded idle pool
+instead of closing the file handle.
+
+- One pool per database file, created lazily
+- Idle connections are reused LIFO (the warmest page cache first)
+- Connections idle longer than the health-check interval are pinged before reuse;
+  connections older than the max lifetime are recycled
+- On release the connection is reset: pending transaction rolled back,
+  row_factory restored to sqlite3.Row, on_release hook run (default profile)
+- Up to max_overflow checkouts beyond the pool size are allowed (nested helpers
+  do not block) and are closed on release when the idle pool is already full;
+  past that acquire() waits for a release and raises PoolTimeoutError after
+  DB_POOL_TIMEOUT seconds, so a burst of requests cannot open unbounded handles
+- Pools are discarded after fork (gunicorn --preload), and idle connections are
+  dropped when the database file is replaced (tests recreating a temp database)
+- init_connection_pool() registers a Flask teardown hook that returns connections a request
+  forgot to close
+
+Usage:
+    from backend.core.database import get_db_connection
+
+    conn = get_db_connection()
+    try:
+        rows = conn.execute("SELECT * FROM games").fetchall()
+    finally:
+        conn.close()  # back to the pool
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Optional
+
+from backend.core.logging import get_logger
+
+from .query_profiler import ProfiledConnection
+
+logger = get_logger(__name__)
+
+
+class PoolTimeoutError(sqlite3.OperationalError):
+    """No connection was released within the checkout timeout"""
+
+
+class PooledConnection(ProfiledConnection):
+    """sqlite3.Connection whose close() returns it to its pool"""
+
+    _pool: Optional["ConnectionPool"] = None
+    _file_id: Optional[tuple] = None
+    # Performance profile currently applied (see DatabaseConfig.DB_PROFILES)
+    profile: Optional[str] = None
+    _created_at: float = 0.0
+    _released_at: float = 0.0
+    # Frees the checkout slot once: on release, or when a leaked checkout is collected
+    _slot: Optional[weakref.finalize] = None
+
+    def close(self):
+        pool = self._pool
+        if pool is None:
+            super().close()
+        else:
+            pool.release(self)
+
+    def really_close(self):
+        """Close the underlying file handle"""
+        self._pool = None
+        super().close()
+
+
+class ConnectionPool:
+    """
+    Bounded pool of SQLite connections for one database file (thread-safe)
+
+    Args:
+        db_path: Database file path
+        configure: Called once on every new connection (PRAGMA settings)
+        on_release: Called on every returned connection before it goes idle
+        max_size: Maximum number of idle connections kept open
+        max_overflow: Checkouts allowed beyond max_size (closed on release)
+        timeout: Seconds acquire() waits for a free checkout slot
+        health_check_interval: Idle seconds after which a connection is pinged before reuse
+        max_lifetime: Seconds after which a connection is closed instead of reused
+        cached_statements: Size of sqlite3's per-connection prepared statement cache
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        configure: Optional[Callable[[sqlite3.Connection], None]] = None,
+        on_release: Optional[Callable[[sqlite3.Connection], None]] = None,
+        max_size: int = 8,
+        max_overflow: int = 16,
+        timeout: float = 30.0,
+        health_check_interval: float = 30.0,
+        max_lifetime: float = 3600.0,
+        cached_statements: int = 256,
+    ):
+        self.db_path = db_path
+        self.configure = configure
+        self.on_release = on_release
+        self.max_size = max_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.max_lifetime = max_lifetime
+        self.cached_statements = cached_statements
+        self._idle: Deque[PooledConnection] = deque()
+        self._in_use: "weakref.WeakSet[PooledConnection]" = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size + max_overflow)
+        self._pid = os.getpid()
+        self.stats = {
+            "created": 0,
+            "reused": 0,
+            "released": 0,
+            "closed": 0,
+            "health_check_failures": 0,
+            "recycled": 0,
+            "rollbacks": 0,
+            "timeouts": 0,
+        }
+
+    def acquire(self) -> PooledConnection:
+        """
+        Check out a connection (reused when an idle one is healthy)
+
+        Returns:
+            PooledConnection with sqlite3.Row row factory
+
+        Raises:
+            PoolTimeoutError: max_size + max_overflow connections stayed checked out
+                for the whole timeout
+        """
+        self._check_fork()
+        slots = self._slots
+        if not slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self.stats["timeouts"] += 1
+            raise PoolTimeoutError(
+                f"No pooled connection to {self.db_path} released within {self.timeout}s "
+                f"({self.max_size + self.max_overflow} checked out)"
+            )
+        try:
+            conn = self._checkout()
+        except BaseException:
+            slots.release()
+            raise
+        conn._slot = weakref.finalize(conn, slots.release)
+        return conn
+
+    def _checkout(self) -> PooledConnection:
+        now = time.monotonic()
+        file_id = self._file_id()
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                break
+            if conn._file_id != file_id or now - conn._created_at > self.max_lifetime:
+                self._discard(conn, "recycled")
+                continue
+            if now - conn._released_at > self.health_check_interval and not self._ping(conn):
+                self._discard(conn, "health_check_failures")
+                continue
+            with self._lock:
+                self.stats["reused"] += 1
+                self._in_use.add(conn)
+            return conn
+
+        conn = self._connect()
+        with self._lock:
+            self.stats["created"] += 1
+            self._in_use.add(conn)
+        return conn
+
+    def release(self, conn: PooledConnection) -> bool:
+        """
+        Return a connection; it is reset and kept idle, or closed when the pool is full
+
+        Args:
+            conn: Connection obtained from acquire()
+
+        Returns:
+            False when the connection was not checked out (double close, or pre-fork)
+        """
+        with self._lock:
+            if conn not in self._in_use:
+                return False
+            self._in_use.discard(conn)
+        if conn._slot is not None:
+            conn._slot()
+
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+                with self._lock:
+                    self.stats["rollbacks"] += 1
+            conn.row_factory = sqlite3.Row
+            if conn.isolation_level != "":
+                conn.isolation_level = ""
+            if self.on_release is not None:
+                self.on_release(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Discarding pooled connection that failed to reset: {e}")
+            self._discard(conn, "health_check_failures")
+            return True
+
+        conn._released_at = time.monotonic()
+        with self._lock:
+            self.stats["released"] += 1
+            if os.getpid() == self._pid and len(self._idle) < self.max_size:
+                self._idle.append(conn)
+                return True
+        self._discard(conn, "closed")
+        return True
+
+    def close_all(self):
+        """Close every idle connection (checked-out connections close on release)"""
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+        for conn in idle:
+            self._discard(conn, "closed")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool counters plus current idle / in-use sizes"""
+        with self._lock:
+            return dict(
+                self.stats,
+                idle=len(self._idle),
+                in_use=len(self._in_use),
+                max_size=self.max_size,
+                max_overflow=self.max_overflow,
+            )
+
+    def _connect(self) -> PooledConnection:
+        conn = sqlite3.connect(
+            self.db_path,
+            factory=PooledConnection,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,
+        )
+        conn.row_factory = sqlite3.Row
+        if self.configure is not None:
+            self.configure(conn)
+        conn._pool = self
+        conn._file_id = self._file_id()
+        conn._created_at = conn._released_at = time.monotonic()
+        return conn
+
+    def _file_id(self) -> Optional[tuple]:
+        try:
+            st = os.stat(self.db_path)
+        except OSError:
+            return None
+        return (st.st_dev, st.st_ino)
+
+    @staticmethod
+    def _ping(conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn: PooledConnection, reason: str):
+        with self._lock:
+            self.stats[reason] += 1
+        try:
+            conn.really_close()
+        except sqlite3.Error:
+            pass
+
+    def _check_fork(self):
+        """A forked child must not reuse the parent's file handles"""
+        if os.getpid() == self._pid:
+            return
+        with self._lock:
+            if os.getpid() == self._pid:
+                return
+            # Drop without closing: the parent still owns these handles
+            self._idle.clear()
+            self._in_use = weakref.WeakSet()
+            self._slots = threading.BoundedSemaphore(self.max_size + self.max_overflow)
+            self._pid = os.getpid()
+
+
+# ============================================================================
+# Module-level pool registry
+# ============================================================================
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(
+    db_path: Path,
+    configure: Optional[Callable[[sqlite3.Connection], None]] = None,
+    on_release: Optional[Callable[[sqlite3.Connection], None]] = None,
+    role: str = "default",
+    max_size: Optional[int] = None,
+):
+    """
+    Get (or lazily create) the pool for a database file
+
+    Args:
+        db_path: Database file path
+        configure: Called once on every new connection
+        on_release: Called on every returned connection before it goes idle
+        role: Separate pools for the same file ("default", "read", "write")
+        max_size: Idle connections kept open (default: DB_POOL_SIZE)
+
+    Returns:
+        ConnectionPool
+    """
+    key = str(db_path) if role == "default" else f"{db_path}#{role}"
+    pool = _pools.get(key)
+    if pool is not None:
+        return pool
+
+    from backend.core.config.config import DatabaseConfig
+
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(
+                str(db_path),
+                configure=configure,
+                on_release=on_release,
+                max_size=DatabaseConfig.DB_POOL_SIZE if max_size is None else max_size,
+                max_overflow=DatabaseConfig.DB_POOL_MAX_OVERFLOW,
+                timeout=DatabaseConfig.DB_POOL_TIMEOUT,
+                health_check_interval=DatabaseConfig.DB_POOL_HEALTH_CHECK_INTERVAL,
+                max_lifetime=DatabaseConfig.DB_POOL_MAX_LIFETIME,
+                cached_statements=DatabaseConfig.DB_STATEMENT_CACHE_SIZE,
+            )
+            _pools[key] = pool
+    return pool
+
+
+def close_all_pools():
+    """Close idle connections of every pool (tests, shutdown, after schema changes)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_all()
+
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats of every pool, keyed by database path (plus "#read" / "#write" for role pools)"""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {path: pool.get_stats() for path, pool in pools.items()}
+
+
+# ============================================================================
+# Flask integration
+# ============================================================================
+
+
+def track_request_connection(conn: PooledConnection):
+    """Remember a checkout on flask.g so the teardown hook can return it"""
+    try:
+        from flask import g, has_app_context
+
+        if not has_app_context():
+            return
+        tracked = g.setdefault("_pooled_db_connections", weakref.WeakSet())
+        tracked.add(conn)
+    except ImportError:
+        pass
+
+
+def release_request_connections(exc: Optional[BaseException] = None):
+    """
+    Teardown hook: return connections a request left checked out
+
+    Pending transactions on those connections are rolled back by release().
+    """
+    from flask import g
+
+    tracked = g.pop("_pooled_db_connections", None)
+    if not tracked:
+        return
+    leaked = 0
+    for conn in list(tracked):
+        pool = conn._pool
+        if pool is not None and pool.release(conn):
+            leaked += 1
+    if leaked:
+        logger.debug(f"Returned {leaked} unclosed connection(s) to the pool at teardown")
+
+
+def init_connection_pool(app):
+    """
+    Register the pool's teardown hook on a Flask app
+
+    Args:
+        app: Flask application
+    """
+    app.teardown_appcontext(release_request_connections)
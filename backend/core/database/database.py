@@ -12,11 +12,15 @@ from contextlib import contextmanager
 from typing import Generator, Optional
 from pathlib import Path
 
-from backend.core.config import get_db_path
+from backend.core.config import DatabaseConfig, get_db_path
 from backend.core.logging import get_logger
 from backend.core.database._constants import ALL_TABLES_SQL, INDEXES_SQL
+from backend.core.database.connection_pool import get_pool, track_request_connection
+from backend.core.database.query_profiler import ProfiledConnection
 from backend.core.database._helpers import (
     _apply_pragma_settings,
+    _apply_profile,
+    _restore_default_profile,
     _create_table_if_not_exists,
     _create_index_if_not_exists,
     _execute_sql_file,
@@ -25,12 +29,19 @@ from backend.core.database._helpers import (
 logger = get_logger(__name__)
 
 
-def get_db_connection(db_path: Optional[Path] = None) -> sqlite3.Connection:
+def get_db_connection(
+    db_path: Optional[Path] = None, profile: Optional[str] = None
+) -> sqlite3.Connection:
     """
     Get database connection with row factory and WAL mode
 
+    Connections come from a per-file pool (see connection_pool); close() returns
+    them to the pool instead of closing the file handle.
+
     Args:
         db_path: Optional database path. If not provided, uses get_db_path()
+        profile: Optional performance profile for this operation (e.g. 'bulk_import').
+            Pooled connections are switched back to DatabaseConfig.DB_PROFILE on close().
 
     Returns:
         SQLite connection with Row factory
@@ -38,30 +49,45 @@ def get_db_connection(db_path: Optional[Path] = None) -> sqlite3.Connection:
     if db_path is None:
         db_path = get_db_path()
 
-    conn = sqlite3.connect(str(db_path))
+    if DatabaseConfig.DB_POOL_ENABLED:
+        # close() returns the connection to the pool; PRAGMAs ran when it was created
+        conn = get_pool(db_path, _apply_pragma_settings, _restore_default_profile).acquire()
+        track_request_connection(conn)
+        if profile is not None and profile != conn.profile:
+            try:
+                _apply_profile(conn, profile)
+            except Exception:
+                conn.close()
+                raise
+        return conn
+
+    conn = sqlite3.connect(str(db_path), factory=ProfiledConnection)
     conn.row_factory = sqlite3.Row
-    _apply_pragma_settings(conn)
+    _apply_pragma_settings(conn, profile)
 
     return conn
 
 
 @contextmanager
-def get_db(db_path: Optional[Path] = None) -> Generator[sqlite3.Connection, None, None]:
+def get_db(
+    db_path: Optional[Path] = None, profile: Optional[str] = None
+) -> Generator[sqlite3.Connection, None, None]:
     """
     Context manager for database connections with WAL mode
 
     Args:
         db_path: Optional database path. If not provided, uses get_db_path()
+        profile: Optional performance profile for this operation
 
     Yields:
         SQLite connection with Row factory
-    """
-    if db_path is None:
-        db_path = get_db_path()
 
-    conn = sqlite3.connect(str(db_path))
-    conn.row_factory = sqlite3.Row
-    _apply_pragma_settings(conn)
+    Example:
+        with get_db(profile="bulk_import") as conn:
+            conn.executemany("INSERT INTO event_params (...) VALUES (...)", rows)
+            conn.commit()
+    """
+    conn = get_db_connection(db_path, profile)
 
     try:
         yield conn
@@ -1510,7 +1536,7 @@ def migrate_db(db_path: Optional[Path] = None):
         # Get current database version
         cursor.execute("PRAGMA user_version")
         current_version = cursor.fetchone()[0]
-        target_version = 19  # Increment this for each migration
+        target_version = 20  # Increment this for each migration
 
         if current_version >= target_version:
             logger.info(f"Database is up to date (version {current_version})")
@@ -2734,6 +2760,34 @@ def migrate_db(db_path: Optional[Path] = None):
             conn.commit()
             logger.info("Migration v19 completed: event_params json_path support added")
 
+        # Migration 20: Job queue columns for async_tasks
+        if current_version < 20:
+            logger.info("Migration v20: Adding job queue columns to async_tasks...")
+
+            try:
+                cursor.execute("PRAGMA table_info(async_tasks)")
+                columns = [column[1] for column in cursor.fetchall()]
+
+                # params: job input, checkpoint: resume state,
+                # worker_id/heartbeat_at: which worker owns a running task and when it last
+                # reported (stale heartbeats mean the worker died and the task is requeued)
+                for column, column_type in (
+                    ("params", "TEXT"),
+                    ("checkpoint", "TEXT"),
+                    ("worker_id", "TEXT"),
+                    ("heartbeat_at", "TIMESTAMP"),
+                ):
+                    if column not in columns:
+                        cursor.execute(f"ALTER TABLE async_tasks ADD COLUMN {column} {column_type}")
+
+                logger.info("Migration v20: async_tasks job queue columns added")
+
+            except Exception as e:
+                logger.warning(f"Migration v20: Could not add async_tasks columns: {e}")
+
+            conn.commit()
+            logger.info("Migration v20 completed: async task queue support added")
+
         # Update database version (PRAGMA doesn't support parameters in SQLite)
         cursor.execute(f"PRAGMA user_version = {target_version}")
         conn.commit()
@@ -2747,9 +2801,14 @@ def migrate_db(db_path: Optional[Path] = None):
         conn.close()
 
 
-def create_indexes():
-    """Create database indexes for performance optimization"""
-    conn = get_db_connection()
+def create_indexes(db_path: Optional[Path] = None):
+    """
+    Create database indexes for performance optimization
+
+    Args:
+        db_path: Optional database path. If not provided, uses get_db_path()
+    """
+    conn = get_db_connection(db_path)
     cursor = conn.cursor()
 
     # Indexes for log_events table
@@ -2781,10 +2840,8 @@ def create_indexes():
         "CREATE INDEX IF NOT EXISTS idx_param_library_param_name ON param_library(param_name)",
         "CREATE INDEX IF NOT EXISTS idx_param_library_category ON param_library(category)",
         "CREATE INDEX IF NOT EXISTS idx_param_library_template_id ON param_library(template_id)",
-        "CREATE INDEX IF NOT EXISTS idx_event_params_event_id ON event_params(event_id)",
         "CREATE INDEX IF NOT EXISTS idx_event_params_library_id ON event_params(library_id)",
         "CREATE INDEX IF NOT EXISTS idx_event_params_template_id ON event_params(template_id)",
-        "CREATE INDEX IF NOT EXISTS idx_event_params_param_name ON event_params(param_name)",
         "CREATE INDEX IF NOT EXISTS idx_event_params_is_active ON event_params(is_active)",
         "CREATE INDEX IF NOT EXISTS idx_param_versions_event_param_id ON param_versions(event_param_id)",
         "CREATE INDEX IF NOT EXISTS idx_param_versions_version ON param_versions(event_param_id, version)",
@@ -2810,6 +2867,17 @@ def create_indexes():
         # **性能优化**: Event node copy optimization (2026-01-22)
         "CREATE INDEX IF NOT EXISTS idx_event_node_configs_game_gid_event_id ON event_node_configs(game_gid, event_id)",
         "CREATE INDEX IF NOT EXISTS idx_event_params_event_id_template ON event_params(event_id, template_id)",
+        # Query shapes found by scripts/performance/index_advisor.py
+        # Events list: WHERE le.game_gid = ? ORDER BY le.id DESC (id is the rowid, which every
+        # index already ends with, so (game_gid) also serves the ordering)
+        "CREATE INDEX IF NOT EXISTS idx_log_events_game_gid ON log_events(game_gid)",
+        # HQL history: WHERE user_id = ? ORDER BY created_at DESC, retention by created_at
+        "CREATE INDEX IF NOT EXISTS idx_hql_history_user_created ON hql_history(user_id, created_at DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_hql_history_created_at ON hql_history(created_at)",
+        # HQL history by session: WHERE session_id = ? ORDER BY created_at DESC (keyset pages)
+        "CREATE INDEX IF NOT EXISTS idx_hql_history_session_created ON hql_history(session_id, created_at DESC)",
+        # Event node list: ORDER BY en.updated_at DESC LIMIT 100
+        "CREATE INDEX IF NOT EXISTS idx_event_nodes_updated_at ON event_nodes(updated_at)",
     ]
 
     for index_sql in indexes:
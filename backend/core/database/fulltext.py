@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FTS5 full-text search indexes
+
+Keyword search used leading-wildcard LIKE '%kw%', which always scans the whole
+table (the HQL history page scans every stored HQL body). Each searchable table
+gets an external-content FTS5 table kept in sync by triggers, and callers ask
+this module for ranked IDs or an ``id IN (...)`` condition instead.
+
+- Trigram tokenizer (SQLite >= 3.34): substring semantics like LIKE '%kw%', works
+  for Chinese names such as event_name_cn; keywords shorter than 3 characters
+  fall back to LIKE
+- Older SQLite without trigram: no index is built and search stays on LIKE (a
+  unicode61 prefix query only matches token prefixes, not substrings)
+- Indexes whose base table does not exist yet are skipped and created on the next
+  ensure_search_indexes() call; a missing index is looked up again after
+  MISSING_INDEX_RECHECK_SECONDS, so other workers pick it up without a restart
+- When an index is missing, DB_FTS_ENABLED is off or the keyword matches more than
+  DB_FTS_MAX_MATCHES rows, match_condition() returns the original LIKE condition,
+  so callers never need two code paths
+
+Usage:
+    from backend.core.database.fulltext import match_condition, search_ids
+
+    condition, params = match_condition(
+        "events", keyword, "le.id", ["le.event_name", "le.event_name_cn"]
+    )
+    ids = search_ids("hql_history", keyword, limit=100)  # best match first
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from backend.core.config import DatabaseConfig, get_db_path
+from backend.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# name -> (base table, indexed columns); the base table's INTEGER PRIMARY KEY is "id"
+SEARCH_INDEXES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "events": ("log_events", ("event_name", "event_name_cn")),
+    "params": ("event_params", ("param_name", "param_name_cn")),
+    "hql_history": ("hql_history", ("hql", "name_en", "name_cn")),
+}
+
+# Trigram tokens are 3 characters; shorter keywords cannot match
+TRIGRAM_MIN_LENGTH = 3
+
+# Seconds before a missing index is looked up in sqlite_master again
+MISSING_INDEX_RECHECK_SECONDS = 30.0
+
+# (db path, name) -> (tokenizer or None when missing, monotonic time of the lookup)
+_tokenizers: Dict[Tuple[str, str], Tuple[Optional[str], float]] = {}
+_lock = threading.Lock()
+
+
+def fts_table(name: str) -> str:
+    """FTS5 table name for a search index"""
+    return f"{SEARCH_INDEXES[name][0]}_fts"
+
+
+def _connect(db_path: Optional[Path]) -> sqlite3.Connection:
+    from .database import get_db_connection
+
+    return get_db_connection(db_path)
+
+
+def _trigram_supported(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp._fts_probe USING fts5(x, tokenize='trigram')")
+        conn.execute("DROP TABLE temp._fts_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def _create_index(conn: sqlite3.Connection, name: str) -> str:
+    table, wanted = SEARCH_INDEXES[name]
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if not existing:
+        return "skipped (no table)"
+    columns = [c for c in wanted if c in existing]
+    if not columns:
+        return "skipped (no columns)"
+
+    fts = fts_table(name)
+    cols = ", ".join(columns)
+    new_values = ", ".join(f"new.{c}" for c in columns)
+    old_values = ", ".join(f"old.{c}" for c in columns)
+    # One transaction: readers keep using LIKE until the index is complete
+    conn.executescript(f"""
+        BEGIN;
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+            {cols}, content='{table}', content_rowid='id', tokenize='trigram'
+        );
+        CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values});
+        END;
+        CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values});
+        END;
+        CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values});
+        END;
+        INSERT INTO {fts}({fts}) VALUES ('rebuild');
+        COMMIT;
+    """)
+    return f"created (trigram: {cols})"
+
+
+def ensure_search_indexes(db_path: Optional[Path] = None) -> Dict[str, str]:
+    """
+    Create missing FTS5 indexes and their sync triggers (idempotent)
+
+    Args:
+        db_path: Optional database path. If not provided, uses get_db_path()
+
+    Returns:
+        Status per index name
+    """
+    status = {}
+    if not DatabaseConfig.DB_FTS_ENABLED:
+        return {name: "disabled" for name in SEARCH_INDEXES}
+
+    conn = _connect(db_path)
+    try:
+        trigram = _trigram_supported(conn)
+        for name in SEARCH_INDEXES:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (fts_table(name),)
+            ).fetchone()
+            if exists:
+                status[name] = "exists"
+                continue
+            if not trigram:
+                status[name] = "skipped (no trigram tokenizer)"
+                continue
+            try:
+                status[name] = _create_index(conn, name)
+            except sqlite3.OperationalError as e:
+                # SQLite built without FTS5
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                status[name] = f"failed ({e})"
+    finally:
+        conn.close()
+
+    with _lock:
+        _tokenizers.clear()
+    for name, result in status.items():
+        if result.startswith(("created", "failed")):
+            logger.info(f"Search index {name}: {result}")
+    return status
+
+
+def rebuild_search_index(name: str, db_path: Optional[Path] = None) -> None:
+    """
+    Rebuild an FTS5 index from its base table (after bulk loads with triggers dropped)
+
+    Args:
+        name: Search index name (key of SEARCH_INDEXES)
+        db_path: Optional database path
+    """
+    fts = fts_table(name)
+    conn = _connect(db_path)
+    try:
+        conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+        conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('optimize')")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _tokenizer(name: str, db_path: Optional[Path]) -> Optional[str]:
+    """Tokenizer of an existing index ("trigram" / "unicode61"), None when missing"""
+    key = (str(db_path or get_db_path()), name)
+    now = time.monotonic()
+    cached = _tokenizers.get(key)
+    if cached is not None and (
+        cached[0] is not None or now - cached[1] < MISSING_INDEX_RECHECK_SECONDS
+    ):
+        return cached[0]
+    conn = _connect(db_path)
+    try:
+        row = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (fts_table(name),)
+        ).fetchone()
+    finally:
+        conn.close()
+    tokenizer = None
+    if row is not None:
+        tokenizer = "trigram" if "trigram" in row[0] else "unicode61"
+    with _lock:
+        _tokenizers[key] = (tokenizer, now)
+    return tokenizer
+
+
+def _match_query(keyword: str, tokenizer: Optional[str]) -> Optional[str]:
+    """FTS5 MATCH expression for a keyword, None when the index cannot answer it"""
+    keyword = keyword.strip()
+    # Only trigram has LIKE '%kw%' semantics; unicode61 indexes built by older
+    # versions would match token prefixes only
+    if tokenizer != "trigram" or len(keyword) < TRIGRAM_MIN_LENGTH:
+        return None
+    return '"' + keyword.replace('"', '""') + '"'
+
+
+def search_ids(
+    name: str, keyword: str, limit: Optional[int] = None, db_path: Optional[Path] = None
+) -> Optional[List[int]]:
+    """
+    Ranked row IDs matching a keyword (best bm25 match first)
+
+    Args:
+        name: Search index name (events / params / hql_history)
+        keyword: Search keyword (substring semantics with the trigram tokenizer)
+        limit: Maximum number of IDs
+        db_path: Optional database path
+
+    Returns:
+        List of base-table IDs, or None when the index cannot answer the query
+        (index missing or not trigram, FTS disabled, keyword too short) and the caller should use LIKE
+    """
+    if not DatabaseConfig.DB_FTS_ENABLED:
+        return None
+    query = _match_query(keyword, _tokenizer(name, db_path))
+    if query is None:
+        return None
+
+    fts = fts_table(name)
+    sql = f"SELECT rowid FROM {fts} WHERE {fts} MATCH ? ORDER BY rank"
+    params: list = [query]
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    conn = _connect(db_path)
+    try:
+        return [row[0] for row in conn.execute(sql, params).fetchall()]
+    finally:
+        conn.close()
+
+
+def match_condition(
+    name: str,
+    keyword: str,
+    id_column: str,
+    like_columns: Sequence[str],
+    db_path: Optional[Path] = None,
+) -> Tuple[str, list]:
+    """
+    WHERE condition selecting rows that match a keyword
+
+    Args:
+        name: Search index name (events / params / hql_history)
+        keyword: Search keyword
+        id_column: Column holding the base-table ID in the caller's query (e.g. "le.id")
+        like_columns: Columns for the LIKE fallback (e.g. ["le.event_name", "le.event_name_cn"])
+        db_path: Optional database path
+
+    Returns:
+        (condition SQL, parameters): an FTS5 subquery when the index can answer the
+        keyword selectively, otherwise the equivalent LIKE condition
+    """
+    query = None
+    if DatabaseConfig.DB_FTS_ENABLED:
+        query = _match_query(keyword, _tokenizer(name, db_path))
+
+    if query is not None:
+        fts = fts_table(name)
+        # A keyword matching most rows is cheaper as LIKE: the caller's ORDER BY ... LIMIT
+        # stops the scan after a page, while the FTS subquery materializes every match
+        conn = _connect(db_path)
+        try:
+            matches = conn.execute(
+                f"SELECT COUNT(*) FROM (SELECT 1 FROM {fts} WHERE {fts} MATCH ? LIMIT ?)",
+                (query, DatabaseConfig.DB_FTS_MAX_MATCHES + 1),
+            ).fetchone()[0]
+        finally:
+            conn.close()
+        if matches <= DatabaseConfig.DB_FTS_MAX_MATCHES:
+            return f"{id_column} IN (SELECT rowid FROM {fts} WHERE {fts} MATCH ?)", [query]
+
+    pattern = f"%{keyword}%"
+    condition = " OR ".join(f"{column} LIKE ?" for column in like_columns)
+    return f"({condition})", [pattern] * len(like_columns)
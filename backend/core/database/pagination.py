@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Keyset (cursor) pagination helpers
+
+LIMIT ? OFFSET ? makes SQLite produce and discard every row before the page, so
+page N costs O(N * per_page). Keyset pagination remembers the sort key of the
+last row returned and asks for rows strictly after it, which the index serving
+the ORDER BY answers in O(per_page) regardless of depth.
+
+The sort key is handed to clients as an opaque ``cursor`` token (URL-safe
+base64 of a small JSON document); clients only pass it back.
+
+Usage:
+    keys = [("le.id", "DESC")]
+    condition, params = keyset_condition(keys, decode_cursor(token, len(keys)))
+    rows = fetch_all_as_dict(f"... WHERE {condition} ORDER BY le.id DESC LIMIT ?",
+                             params + [per_page + 1])
+    rows, next_cursor = paginate_rows(rows, per_page, lambda row: [row["id"]])
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+CURSOR_VERSION = 1
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor token cannot be decoded"""
+
+    pass
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encode the sort key of the last row of a page as an opaque token
+
+    Args:
+        values: Sort key values, in ORDER BY order (JSON-serializable)
+
+    Returns:
+        URL-safe token without padding
+    """
+    payload = json.dumps({"v": CURSOR_VERSION, "k": list(values)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: Optional[str], size: int) -> Optional[List[Any]]:
+    """
+    Decode a cursor token produced by encode_cursor()
+
+    Args:
+        token: Cursor token from the client; empty/None means "first page"
+        size: Expected number of sort key values
+
+    Returns:
+        Sort key values, or None for the first page
+
+    Raises:
+        InvalidCursorError: Token is malformed or was built for a different sort key
+    """
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {e}") from e
+
+    if not isinstance(payload, dict) or payload.get("v") != CURSOR_VERSION:
+        raise InvalidCursorError("Invalid cursor: unsupported version")
+    values = payload.get("k")
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursorError("Invalid cursor: sort key mismatch")
+    return values
+
+
+def keyset_condition(
+    keys: Sequence[Tuple[str, str]], values: Optional[Sequence[Any]]
+) -> Tuple[str, list]:
+    """
+    Condition selecting the rows that sort strictly after a cursor
+
+    Mixed directions are supported by expanding the row comparison:
+    (a DESC, b ASC) after (x, y) -> a <= x AND (a < x OR (a = x AND b > y)).
+    Sort key values must not be NULL; wrap nullable columns in COALESCE() both
+    here and in the ORDER BY.
+
+    Args:
+        keys: (SQL expression, "ASC" | "DESC") pairs matching the ORDER BY
+        values: Decoded cursor values, None for the first page
+
+    Returns:
+        (condition SQL, parameters); "1=1" when values is None
+    """
+    if values is None:
+        return "1=1", []
+
+    operators = ["<" if direction.upper() == "DESC" else ">" for _, direction in keys]
+    if len(keys) == 1:
+        return f"{keys[0][0]} {operators[0]} ?", [values[0]]
+
+    clauses = []
+    params: list = []
+    for i, (expression, _) in enumerate(keys):
+        parts = [f"{keys[j][0]} = ?" for j in range(i)] + [f"{expression} {operators[i]} ?"]
+        clauses.append("(" + " AND ".join(parts) + ")")
+        params.extend(values[: i + 1])
+    # The redundant bound on the first key gives the planner an index range to seek to
+    condition = f"({keys[0][0]} {operators[0]}= ? AND ({' OR '.join(clauses)}))"
+    return condition, [values[0]] + params
+
+
+def paginate_rows(
+    rows: List[Any], per_page: int, key_fn: Callable[[Any], Sequence[Any]]
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Trim a page fetched with LIMIT per_page + 1 and build the next cursor
+
+    Args:
+        rows: Rows fetched with one extra row to detect whether more exist
+        per_page: Page size
+        key_fn: Returns the sort key values of a row
+
+    Returns:
+        (rows of this page, next cursor or None on the last page)
+    """
+    if len(rows) <= per_page:
+        return rows, None
+    rows = rows[:per_page]
+    return rows, encode_cursor(key_fn(rows[-1]))
@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Connection-level SQL profiler
+
+PerformanceMonitor only times functions decorated with @monitor_query. This
+profiler sits under every connection handed out by get_db_connection():
+ProfiledConnection.cursor() returns a ProfilingCursor that times execute() plus
+the fetches that follow it, so conn.execute(...).fetchall() is measured end to end.
+
+- Statements are grouped by endpoint (Flask request.endpoint) and normalized SQL
+  (literals replaced by ?, IN lists collapsed, whitespace squashed)
+- Per group: calls, rows returned, total / max latency, p50 / p95 / p99 over a
+  bounded sample window
+- Statements slower than the threshold get EXPLAIN QUERY PLAN captured once per
+  group; full scans of tables above the large-table threshold are flagged
+- Disabled by default (DB_PROFILER_ENABLED); when disabled the only cost is one
+  attribute check per cursor
+
+Usage:
+    from backend.core.database.query_profiler import query_profiler
+
+    query_profiler.enable()
+    ...
+    report = query_profiler.get_report(sort="p95_ms", limit=20)
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from backend.core.config import DatabaseConfig
+from backend.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Normalization patterns (compiled once)
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(
+    r"\bVALUES\s*(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))+",
+    re.IGNORECASE,
+)
+_WHITESPACE = re.compile(r"\s+")
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+# "SCAN t", "SCAN TABLE t" (SQLite < 3.36), optionally "USING [COVERING] INDEX ..."
+_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+
+NO_ENDPOINT = "<no-request>"
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Normalize SQL text so statements differing only in literals group together
+
+    Args:
+        sql: Raw SQL text
+
+    Returns:
+        Normalized single-line SQL
+    """
+    sql = _COMMENT.sub(" ", sql)
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _WHITESPACE.sub(" ", sql).strip()
+    sql = _IN_LIST.sub("IN (?+)", sql)
+    return _VALUES_LIST.sub(r"VALUES \1+", sql)
+
+
+def _current_endpoint() -> str:
+    try:
+        from flask import has_request_context, request
+
+        if has_request_context():
+            return request.endpoint or request.path
+    except ImportError:
+        pass
+    return NO_ENDPOINT
+
+
+def _percentile(sorted_samples: List[float], pct: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(round(pct / 100 * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+class _StatementStats:
+    __slots__ = ("calls", "rows", "total_ms", "max_ms", "samples", "sql", "plan", "full_scans")
+
+    def __init__(self, sql: str, sample_size: int):
+        self.sql = sql
+        self.calls = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.samples: Deque[float] = deque(maxlen=sample_size)
+        self.plan: Optional[List[str]] = None
+        self.full_scans: List[Dict[str, Any]] = []
+
+
+class QueryProfiler:
+    """
+    Aggregates per-statement latency and plan information (thread-safe)
+
+    Args:
+        enabled: Start recording immediately
+        slow_ms: Statements slower than this get EXPLAIN QUERY PLAN captured
+        large_table_rows: Full scans of tables with at least this many rows are flagged
+        max_statements: Maximum (endpoint, sql) groups tracked; further groups are dropped
+        sample_size: Latency samples kept per group for percentiles
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        slow_ms: float = 100.0,
+        large_table_rows: int = 10000,
+        max_statements: int = 2000,
+        sample_size: int = 512,
+    ):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.large_table_rows = large_table_rows
+        self.max_statements = max_statements
+        self.sample_size = sample_size
+        self._stats: Dict[Tuple[str, str], _StatementStats] = {}
+        self._normalized: Dict[str, str] = {}
+        self._table_rows: Dict[str, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+        self._started_at = time.time()
+        self.dropped = 0
+        self.plans_captured = 0
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """Drop all recorded statistics"""
+        with self._lock:
+            self._stats.clear()
+            self._table_rows.clear()
+            self._started_at = time.time()
+            self.dropped = 0
+            self.plans_captured = 0
+
+    # ------------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------------
+
+    def normalize(self, sql: str) -> str:
+        """normalize_sql() with a small memo (the same SQL strings repeat constantly)"""
+        normalized = self._normalized.get(sql)
+        if normalized is None:
+            normalized = normalize_sql(sql)
+            if len(self._normalized) >= self.max_statements * 4:
+                self._normalized.clear()
+            self._normalized[sql] = normalized
+        return normalized
+
+    def record(
+        self,
+        conn: Optional[sqlite3.Connection],
+        sql: str,
+        params: Any,
+        elapsed_ms: float,
+        rows: int,
+        endpoint: Optional[str] = None,
+    ):
+        """
+        Record one statement execution
+
+        Args:
+            conn: Connection it ran on (used for EXPLAIN QUERY PLAN); None skips plan capture
+            sql: Raw SQL text
+            params: Bound parameters
+            elapsed_ms: execute() plus fetch time
+            rows: Rows fetched (or rowcount for writes)
+            endpoint: Endpoint name; defaults to the current Flask endpoint
+        """
+        normalized = self.normalize(sql)
+        key = (endpoint or _current_endpoint(), normalized)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= self.max_statements:
+                    self.dropped += 1
+                    return
+                stats = self._stats[key] = _StatementStats(normalized, self.sample_size)
+            stats.calls += 1
+            stats.rows += max(rows, 0)
+            stats.total_ms += elapsed_ms
+            stats.samples.append(elapsed_ms)
+            if elapsed_ms > stats.max_ms:
+                stats.max_ms = elapsed_ms
+            capture = conn is not None and elapsed_ms >= self.slow_ms and stats.plan is None
+            if capture:
+                # Claim the capture so concurrent slow calls do not all EXPLAIN
+                stats.plan = []
+
+        if capture:
+            self._capture_plan(conn, stats, sql, params)
+
+    def _capture_plan(self, conn: sqlite3.Connection, stats: _StatementStats, sql, params):
+        verb = sql.split(None, 1)[0].upper() if sql.strip() else ""
+        if verb not in ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT"):
+            return
+        try:
+            cursor = sqlite3.Cursor(conn)
+            plan_rows = cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params or ()).fetchall()
+            cursor.close()
+        except sqlite3.Error as e:
+            logger.debug(f"EXPLAIN QUERY PLAN failed: {e}")
+            return
+
+        plan = [row[3] for row in plan_rows]
+        full_scans = []
+        for detail in plan:
+            match = _SCAN.match(detail)
+            if match is None:
+                continue
+            table = match.group(1)
+            rows = self._estimate_rows(conn, table)
+            if rows is not None and rows >= self.large_table_rows:
+                full_scans.append({"table": table, "rows": rows, "detail": detail.strip()})
+
+        with self._lock:
+            stats.plan = plan
+            stats.full_scans = full_scans
+            self.plans_captured += 1
+        if full_scans:
+            tables = ", ".join(f"{s['table']}({s['rows']})" for s in full_scans)
+            logger.warning(f"Full scan on large table: {tables}: {stats.sql[:200]}")
+
+    def _estimate_rows(self, conn: sqlite3.Connection, table: str) -> Optional[int]:
+        """MAX(rowid) as a cheap row-count estimate, cached for 10 minutes"""
+        now = time.monotonic()
+        cached = self._table_rows.get(table)
+        if cached is not None and now - cached[1] < 600:
+            return cached[0]
+        try:
+            cursor = sqlite3.Cursor(conn)
+            row = cursor.execute(f'SELECT MAX(rowid) FROM "{table}"').fetchone()
+            cursor.close()
+        except sqlite3.Error:
+            # WITHOUT ROWID tables, views, CTE names
+            return None
+        rows = int(row[0] or 0)
+        self._table_rows[table] = (rows, now)
+        return rows
+
+    # ------------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------------
+
+    def get_report(
+        self, sort: str = "total_ms", limit: int = 50, endpoint: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the profile report
+
+        Args:
+            sort: Sort key (total_ms, avg_ms, p50_ms, p95_ms, p99_ms, max_ms, calls, rows)
+            limit: Maximum statements returned
+            endpoint: Only statements recorded under this endpoint
+
+        Returns:
+            {summary, statements: [...], endpoints: {endpoint: {calls, total_ms}}}
+        """
+        with self._lock:
+            items = [
+                (key, stats, sorted(stats.samples))
+                for key, stats in self._stats.items()
+                if endpoint is None or key[0] == endpoint
+            ]
+            dropped, plans_captured = self.dropped, self.plans_captured
+            started_at = self._started_at
+
+        statements = []
+        endpoints: Dict[str, Dict[str, Any]] = {}
+        for (ep, _), stats, samples in items:
+            statements.append(
+                {
+                    "endpoint": ep,
+                    "sql": stats.sql,
+                    "calls": stats.calls,
+                    "rows": stats.rows,
+                    "total_ms": round(stats.total_ms, 3),
+                    "avg_ms": round(stats.total_ms / stats.calls, 3) if stats.calls else 0.0,
+                    "p50_ms": round(_percentile(samples, 50), 3),
+                    "p95_ms": round(_percentile(samples, 95), 3),
+                    "p99_ms": round(_percentile(samples, 99), 3),
+                    "max_ms": round(stats.max_ms, 3),
+                    "plan": stats.plan or None,
+                    "full_scans": stats.full_scans,
+                }
+            )
+            summary = endpoints.setdefault(ep, {"statements": 0, "calls": 0, "total_ms": 0.0})
+            summary["statements"] += 1
+            summary["calls"] += stats.calls
+            summary["total_ms"] = round(summary["total_ms"] + stats.total_ms, 3)
+
+        statements.sort(key=lambda s: s.get(sort, 0), reverse=True)
+        return {
+            "summary": {
+                "enabled": self.enabled,
+                "since": started_at,
+                "statements": len(statements),
+                "calls": sum(s["calls"] for s in statements),
+                "total_ms": round(sum(s["total_ms"] for s in statements), 3),
+                "slow_ms": self.slow_ms,
+                "plans_captured": plans_captured,
+                "full_scan_statements": sum(1 for s in statements if s["full_scans"]),
+                "dropped": dropped,
+            },
+            "statements": statements[:limit],
+            "endpoints": endpoints,
+        }
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    """
+    Cursor that reports each statement (execute + subsequent fetches) to the profiler
+
+    A statement is finalized when the cursor is exhausted, re-executed, closed or
+    garbage-collected.
+    """
+
+    _pending: Optional[list] = None  # [sql, params, elapsed_ms, rows]
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._pending = [sql, parameters, (time.perf_counter() - start) * 1000, 0]
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            rows = self.rowcount
+            self._pending = [sql, None, (time.perf_counter() - start) * 1000, rows]
+            self._finish(explain=False)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._account(start, 0 if row is None else 1, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._account(start, len(rows), not rows)
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._account(start, len(rows), True)
+        return rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._account(start, 0, True)
+            raise
+        self._account(start, 1, False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # No plan capture during garbage collection
+        self._finish(explain=False)
+
+    def _account(self, start: float, rows: int, done: bool):
+        pending = self._pending
+        if pending is None:
+            return
+        pending[2] += (time.perf_counter() - start) * 1000
+        pending[3] += rows
+        if done:
+            self._finish()
+
+    def _finish(self, explain: bool = True):
+        pending = self._pending
+        if pending is None:
+            return
+        self._pending = None
+        sql, params, elapsed_ms, rows = pending
+        if rows == 0 and self.description is None and self.rowcount > 0:
+            rows = self.rowcount
+        try:
+            query_profiler.record(
+                self.connection if explain else None, sql, params, elapsed_ms, rows
+            )
+        except Exception as e:
+            logger.debug(f"Query profiler record failed: {e}")
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """sqlite3.Connection whose cursors report to query_profiler while it is enabled"""
+
+    def cursor(self, factory=None):
+        if factory is None:
+            factory = ProfilingCursor if query_profiler.enabled else sqlite3.Cursor
+        return super().cursor(factory)
+
+    # Connection.execute()/executemany() create their cursor in C without calling
+    # self.cursor(), so route them through it explicitly while profiling
+    def execute(self, sql, parameters=()):
+        if not query_profiler.enabled:
+            return super().execute(sql, parameters)
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        if not query_profiler.enabled:
+            return super().executemany(sql, seq_of_parameters)
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+# Global profiler
+query_profiler = QueryProfiler(
+    enabled=DatabaseConfig.DB_PROFILER_ENABLED,
+    slow_ms=DatabaseConfig.DB_PROFILER_SLOW_MS,
+    large_table_rows=DatabaseConfig.DB_PROFILER_LARGE_TABLE_ROWS,
+    max_statements=DatabaseConfig.DB_PROFILER_MAX_STATEMENTS,
+    sample_size=DatabaseConfig.DB_PROFILER_SAMPLES,
+)
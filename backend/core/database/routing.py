@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Read/write connection routing
+
+SQLite in WAL mode serves any number of readers alongside one writer. Every helper
+used to take a connection from the same pool and write whenever it liked, so a
+long BEGIN IMMEDIATE transaction (cascade delete, bulk import) left other writers
+spinning in busy_timeout and, once it ran out, failing with "database is locked".
+
+- get_read_connection(): pooled connections opened with PRAGMA query_only, sized
+  DB_READ_POOL_SIZE; a write through them fails instead of taking the write lock
+- write_transaction(): the single writer connection of this process for a database
+  file. A per-file lock serializes writers in the process, the transaction starts
+  with BEGIN IMMEDIATE (the lock is taken up front, so a busy error can be retried
+  safely), commits on success and rolls back on error. Nested calls in the same
+  thread join the outer transaction through a SAVEPOINT.
+- retry_on_busy(): re-runs an operation that failed with SQLITE_BUSY after
+  busy_timeout ran out, DB_BUSY_RETRIES times with exponential backoff and jitter
+
+With DB_RW_SPLIT_ENABLED off both paths use get_db_connection() (writes still run
+in BEGIN IMMEDIATE with busy retries and nest through SAVEPOINTs, without the
+in-process writer lock).
+
+Usage:
+    from backend.core.database.routing import get_read_connection, write_transaction
+
+    conn = get_read_connection()
+    try:
+        rows = conn.execute("SELECT * FROM games").fetchall()
+    finally:
+        conn.close()
+
+    with write_transaction() as conn:
+        conn.execute("DELETE FROM log_events WHERE game_gid = ?", (gid,))
+"""
+
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar
+
+from backend.core.config import DatabaseConfig, get_db_path
+from backend.core.logging import get_logger
+
+from ._helpers import _apply_pragma_settings, _apply_profile, _restore_default_profile
+from .connection_pool import get_pool, track_request_connection
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+_BUSY_MESSAGES = ("database is locked", "database is busy", "database table is locked")
+
+
+def is_busy_error(error: BaseException) -> bool:
+    """True for SQLITE_BUSY / SQLITE_LOCKED errors"""
+    return isinstance(error, sqlite3.OperationalError) and any(
+        message in str(error) for message in _BUSY_MESSAGES
+    )
+
+
+def retry_on_busy(
+    fn: Callable[[], T], retries: Optional[int] = None, backoff_ms: Optional[float] = None
+) -> T:
+    """
+    Run an operation, retrying it while SQLite reports the database as locked
+
+    The operation must be safe to repeat: a read, or a whole write transaction.
+
+    Args:
+        fn: Operation to run
+        retries: Attempts after the first one (default: DB_BUSY_RETRIES)
+        backoff_ms: First delay in ms, doubled per attempt (default: DB_BUSY_BACKOFF_MS)
+
+    Returns:
+        Result of fn()
+    """
+    if retries is None:
+        retries = DatabaseConfig.DB_BUSY_RETRIES
+    if backoff_ms is None:
+        backoff_ms = DatabaseConfig.DB_BUSY_BACKOFF_MS
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except sqlite3.OperationalError as e:
+            if attempt >= retries or not is_busy_error(e):
+                raise
+            delay = backoff_ms * (2**attempt) * random.uniform(0.5, 1.5) / 1000
+            attempt += 1
+            with _stats_lock:
+                _stats["busy_retries"] += 1
+            logger.debug(f"Database busy, retry {attempt}/{retries} in {delay * 1000:.0f}ms")
+            time.sleep(delay)
+
+
+# ============================================================================
+# Readers
+# ============================================================================
+
+
+def _configure_reader(conn: sqlite3.Connection) -> None:
+    _apply_pragma_settings(conn)
+    conn.execute("PRAGMA query_only=1")
+
+
+def get_read_connection(db_path: Optional[Path] = None) -> sqlite3.Connection:
+    """
+    Get a query_only connection for reads (close() returns it to the reader pool)
+
+    Args:
+        db_path: Optional database path. If not provided, uses get_db_path()
+
+    Returns:
+        SQLite connection with Row factory
+    """
+    from .database import get_db_connection
+
+    if not (DatabaseConfig.DB_RW_SPLIT_ENABLED and DatabaseConfig.DB_POOL_ENABLED):
+        return get_db_connection(db_path)
+
+    pool = get_pool(
+        db_path or get_db_path(),
+        _configure_reader,
+        _restore_default_profile,
+        role="read",
+        max_size=DatabaseConfig.DB_READ_POOL_SIZE,
+    )
+    conn = pool.acquire()
+    track_request_connection(conn)
+    return conn
+
+
+# ============================================================================
+# Writer
+# ============================================================================
+
+
+class _Writer:
+    """Per-file writer lock plus the write transaction each thread has open on the file"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # .conn / .depth of the calling thread's write_transaction(); tracked in both
+        # modes because without the split several threads can be writing at once
+        self.active = threading.local()
+
+
+_writers: Dict[str, _Writer] = {}
+_writers_lock = threading.Lock()
+_stats = {"transactions": 0, "busy_retries": 0, "lock_wait_ms": 0.0, "max_lock_wait_ms": 0.0}
+# Writers of different database files and busy retries in reader threads update _stats
+# concurrently; "+=" on a dict entry is not atomic
+_stats_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    # A lock held by a parent thread at fork time would never be released in the child
+    os.register_at_fork(after_in_child=_writers.clear)
+
+
+def _get_writer(key: str) -> _Writer:
+    writer = _writers.get(key)
+    if writer is None:
+        with _writers_lock:
+            writer = _writers.setdefault(key, _Writer())
+    return writer
+
+
+def _open_writer_connection(db_path: Path, profile: Optional[str]) -> sqlite3.Connection:
+    from .database import get_db_connection
+
+    if not (DatabaseConfig.DB_RW_SPLIT_ENABLED and DatabaseConfig.DB_POOL_ENABLED):
+        return get_db_connection(db_path, profile)
+
+    # One idle connection: the writer lock means at most one is checked out
+    conn = get_pool(
+        db_path, _apply_pragma_settings, _restore_default_profile, role="write", max_size=1
+    ).acquire()
+    if profile is not None and profile != conn.profile:
+        try:
+            _apply_profile(conn, profile)
+        except Exception:
+            conn.close()
+            raise
+    return conn
+
+
+def _begin(db_path: Path, profile: Optional[str]) -> sqlite3.Connection:
+    """Open the writer connection and take the database write lock"""
+    conn = _open_writer_connection(db_path, profile)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+    except Exception:
+        conn.close()
+        raise
+    return conn
+
+
+@contextmanager
+def write_transaction(
+    db_path: Optional[Path] = None, profile: Optional[str] = None
+) -> Iterator[sqlite3.Connection]:
+    """
+    Run a write transaction on the serialized writer connection
+
+    Commits when the block exits normally and rolls back when it raises. Taking the
+    write lock (BEGIN IMMEDIATE) is retried on busy errors; the block itself is not.
+
+    Args:
+        db_path: Optional database path. If not provided, uses get_db_path()
+        profile: Optional performance profile for this transaction (e.g. 'bulk_import')
+
+    Yields:
+        SQLite connection inside an open transaction
+
+    Example:
+        with write_transaction(profile="bulk_import") as conn:
+            conn.executemany("INSERT INTO event_params (...) VALUES (...)", rows)
+    """
+    db_path = Path(db_path or get_db_path())
+    split = DatabaseConfig.DB_RW_SPLIT_ENABLED
+    writer = _get_writer(str(db_path))
+    active = writer.active
+
+    if getattr(active, "conn", None) is not None:
+        # Nested call in a thread that already has a transaction open on this file:
+        # join it (a second connection would wait on our own write lock)
+        conn = active.conn
+        active.depth += 1
+        savepoint = f"write_tx_{active.depth}"
+        conn.execute(f"SAVEPOINT {savepoint}")
+        try:
+            yield conn
+            conn.execute(f"RELEASE {savepoint}")
+        except BaseException:
+            conn.execute(f"ROLLBACK TO {savepoint}")
+            conn.execute(f"RELEASE {savepoint}")
+            raise
+        finally:
+            active.depth -= 1
+        return
+
+    if split:
+        start = time.perf_counter()
+        writer.lock.acquire()
+        waited_ms = (time.perf_counter() - start) * 1000
+        with _stats_lock:
+            _stats["lock_wait_ms"] += waited_ms
+            _stats["max_lock_wait_ms"] = max(_stats["max_lock_wait_ms"], waited_ms)
+    try:
+        conn = retry_on_busy(lambda: _begin(db_path, profile))
+        active.conn, active.depth = conn, 0
+        try:
+            yield conn
+            conn.commit()
+            with _stats_lock:
+                _stats["transactions"] += 1
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            active.conn = None
+            conn.close()
+    finally:
+        if split:
+            writer.lock.release()
+
+
+def in_write_transaction(db_path: Optional[Path] = None) -> bool:
+    """Whether the calling thread has a write_transaction() open on the database file"""
+    writer = _writers.get(str(Path(db_path or get_db_path())))
+    return writer is not None and getattr(writer.active, "conn", None) is not None
+
+
+def get_routing_stats() -> Dict[str, Any]:
+    """Writer transaction / busy-retry counters of this process"""
+    with _stats_lock:
+        return {key: round(value, 2) for key, value in _stats.items()}
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Trigger-maintained statistics counters
+
+The games list aggregated event/parameter/node/template counts with COUNT(DISTINCT)
+over a games x log_events x event_params x event_node_configs x flow_templates
+fan-out, and the events list ran a correlated COUNT(*) over event_params per row.
+Both now read precomputed counters:
+
+- game_stats(game_id, event_count, param_count, event_node_count, flow_template_count)
+- event_stats(event_id, param_count)
+
+SQLite triggers on the source tables apply +1/-1 deltas in the writing transaction,
+so the counters are exact as long as every write goes through SQLite. Bulk loads
+that drop triggers, manual edits or a restored backup can still leave drift;
+repair_stats() recomputes everything in one pass and reports what it corrected
+(run it from scripts/tools/repair_stats.py or cron).
+
+Counting rules match the queries they replace:
+- param_count counts active (is_active = 1) parameters of existing events
+- flow_template_count counts active templates
+- log_events.game_gid and event_node_configs.game_gid join to games.gid
+
+Usage:
+    from backend.core.database.stats import ensure_stats_tables, repair_stats
+
+    ensure_stats_tables()   # startup: creates tables/triggers, backfills once
+    repair_stats()          # maintenance: {"games": 0, "events": 0} when in sync
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from backend.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+STATS_TABLES_SQL = """
+    CREATE TABLE IF NOT EXISTS game_stats (
+        game_id INTEGER PRIMARY KEY,
+        event_count INTEGER NOT NULL DEFAULT 0,
+        param_count INTEGER NOT NULL DEFAULT 0,
+        event_node_count INTEGER NOT NULL DEFAULT 0,
+        flow_template_count INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS event_stats (
+        event_id INTEGER PRIMARY KEY,
+        param_count INTEGER NOT NULL DEFAULT 0
+    );
+"""
+
+# Game row of a log_events / event_node_configs row (same joins as the old list query)
+_EVENT_GAME = "(SELECT id FROM games WHERE gid = {ref})"
+_NODE_GAME = "(SELECT id FROM games WHERE CAST(gid AS INTEGER) = {ref})"
+_PARAM_GAME = (
+    "(SELECT g.id FROM log_events le JOIN games g ON g.gid = le.game_gid WHERE le.id = {ref})"
+)
+
+
+def _game_delta(column: str, delta: str, game: str) -> str:
+    return f"UPDATE game_stats SET {column} = {column} + ({delta}) WHERE game_id = {game};"
+
+
+def _event_delta(delta: str, event_id: str) -> str:
+    return (
+        f"UPDATE event_stats SET param_count = param_count + ({delta})"
+        f" WHERE event_id = {event_id};"
+    )
+
+
+# (table, required columns) -> trigger name -> (trigger header, body)
+STATS_TRIGGERS: Dict[Tuple[str, Tuple[str, ...]], Dict[str, Tuple[str, str]]] = {
+    ("games", ("id", "gid")): {
+        "games_stats_ai": (
+            "AFTER INSERT ON games",
+            "INSERT OR REPLACE INTO game_stats {game_counts} WHERE g.id = NEW.id;",
+        ),
+        "games_stats_au": (
+            "AFTER UPDATE OF gid ON games",
+            "INSERT OR REPLACE INTO game_stats {game_counts} WHERE g.id = NEW.id;",
+        ),
+        "games_stats_ad": (
+            "AFTER DELETE ON games",
+            "DELETE FROM game_stats WHERE game_id = OLD.id;",
+        ),
+    },
+    ("log_events", ("id", "game_gid")): {
+        "log_events_stats_ai": (
+            "AFTER INSERT ON log_events",
+            "INSERT OR REPLACE INTO event_stats (event_id, param_count) VALUES (NEW.id, ("
+            "SELECT COUNT(*) FROM event_params WHERE event_id = NEW.id AND is_active = 1));"
+            + _game_delta("event_count", "1", _EVENT_GAME.format(ref="NEW.game_gid"))
+            + _game_delta(
+                "param_count",
+                "SELECT param_count FROM event_stats WHERE event_id = NEW.id",
+                _EVENT_GAME.format(ref="NEW.game_gid"),
+            ),
+        ),
+        # BEFORE: with foreign_keys=ON the ON DELETE CASCADE of event_params runs after the
+        # event row is gone, so those parameter triggers can no longer find the game
+        "log_events_stats_bd": (
+            "BEFORE DELETE ON log_events",
+            _game_delta(
+                "param_count",
+                "-COALESCE((SELECT param_count FROM event_stats WHERE event_id = OLD.id), 0)",
+                _EVENT_GAME.format(ref="OLD.game_gid"),
+            ),
+        ),
+        "log_events_stats_ad": (
+            "AFTER DELETE ON log_events",
+            _game_delta("event_count", "-1", _EVENT_GAME.format(ref="OLD.game_gid"))
+            + "DELETE FROM event_stats WHERE event_id = OLD.id;",
+        ),
+        "log_events_stats_au": (
+            "AFTER UPDATE OF game_gid ON log_events WHEN OLD.game_gid IS NOT NEW.game_gid",
+            _game_delta("event_count", "-1", _EVENT_GAME.format(ref="OLD.game_gid"))
+            + _game_delta(
+                "param_count",
+                "-COALESCE((SELECT param_count FROM event_stats WHERE event_id = OLD.id), 0)",
+                _EVENT_GAME.format(ref="OLD.game_gid"),
+            )
+            + _game_delta("event_count", "1", _EVENT_GAME.format(ref="NEW.game_gid"))
+            + _game_delta(
+                "param_count",
+                "COALESCE((SELECT param_count FROM event_stats WHERE event_id = NEW.id), 0)",
+                _EVENT_GAME.format(ref="NEW.game_gid"),
+            ),
+        ),
+    },
+    ("event_params", ("event_id", "is_active")): {
+        "event_params_stats_ai": (
+            "AFTER INSERT ON event_params WHEN NEW.is_active = 1",
+            _event_delta("1", "NEW.event_id")
+            + _game_delta("param_count", "1", _PARAM_GAME.format(ref="NEW.event_id")),
+        ),
+        "event_params_stats_ad": (
+            "AFTER DELETE ON event_params WHEN OLD.is_active = 1",
+            _event_delta("-1", "OLD.event_id")
+            + _game_delta("param_count", "-1", _PARAM_GAME.format(ref="OLD.event_id")),
+        ),
+        "event_params_stats_au": (
+            "AFTER UPDATE OF event_id, is_active ON event_params "
+            "WHEN OLD.event_id IS NOT NEW.event_id OR OLD.is_active IS NOT NEW.is_active",
+            _event_delta("-(OLD.is_active IS 1)", "OLD.event_id")
+            + _game_delta(
+                "param_count", "-(OLD.is_active IS 1)", _PARAM_GAME.format(ref="OLD.event_id")
+            )
+            + _event_delta("NEW.is_active IS 1", "NEW.event_id")
+            + _game_delta(
+                "param_count", "NEW.is_active IS 1", _PARAM_GAME.format(ref="NEW.event_id")
+            ),
+        ),
+    },
+    ("event_node_configs", ("game_gid",)): {
+        "event_node_configs_stats_ai": (
+            "AFTER INSERT ON event_node_configs",
+            _game_delta("event_node_count", "1", _NODE_GAME.format(ref="NEW.game_gid")),
+        ),
+        "event_node_configs_stats_ad": (
+            "AFTER DELETE ON event_node_configs",
+            _game_delta("event_node_count", "-1", _NODE_GAME.format(ref="OLD.game_gid")),
+        ),
+        "event_node_configs_stats_au": (
+            "AFTER UPDATE OF game_gid ON event_node_configs "
+            "WHEN OLD.game_gid IS NOT NEW.game_gid",
+            _game_delta("event_node_count", "-1", _NODE_GAME.format(ref="OLD.game_gid"))
+            + _game_delta("event_node_count", "1", _NODE_GAME.format(ref="NEW.game_gid")),
+        ),
+    },
+    ("flow_templates", ("game_id", "is_active")): {
+        "flow_templates_stats_ai": (
+            "AFTER INSERT ON flow_templates WHEN NEW.is_active = 1",
+            _game_delta("flow_template_count", "1", "NEW.game_id"),
+        ),
+        "flow_templates_stats_ad": (
+            "AFTER DELETE ON flow_templates WHEN OLD.is_active = 1",
+            _game_delta("flow_template_count", "-1", "OLD.game_id"),
+        ),
+        "flow_templates_stats_au": (
+            "AFTER UPDATE OF game_id, is_active ON flow_templates "
+            "WHEN OLD.game_id IS NOT NEW.game_id OR OLD.is_active IS NOT NEW.is_active",
+            _game_delta("flow_template_count", "-(OLD.is_active IS 1)", "OLD.game_id")
+            + _game_delta("flow_template_count", "NEW.is_active IS 1", "NEW.game_id"),
+        ),
+    },
+}
+
+
+def _connect(db_path: Optional[Path]) -> sqlite3.Connection:
+    from .database import get_db_connection
+
+    return get_db_connection(db_path)
+
+
+def _available_sources(conn: sqlite3.Connection) -> List[Tuple[str, Tuple[str, ...]]]:
+    """Source tables (with the columns the triggers need) present in this database"""
+    available = []
+    for table, columns in STATS_TRIGGERS:
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if existing and set(columns) <= existing:
+            available.append((table, columns))
+    return available
+
+
+def _game_counts_select(tables: set) -> str:
+    """SELECT producing game_stats rows from the source tables (missing tables count 0)"""
+    events = "(SELECT COUNT(*) FROM log_events le WHERE le.game_gid = g.gid)"
+    params = (
+        "(SELECT COUNT(*) FROM log_events le JOIN event_params ep ON ep.event_id = le.id"
+        " WHERE le.game_gid = g.gid AND ep.is_active = 1)"
+    )
+    nodes = (
+        "(SELECT COUNT(*) FROM event_node_configs enc"
+        " WHERE enc.game_gid = CAST(g.gid AS INTEGER))"
+    )
+    templates = (
+        "(SELECT COUNT(*) FROM flow_templates ft WHERE ft.game_id = g.id AND ft.is_active = 1)"
+    )
+    return (
+        "SELECT g.id AS game_id, "
+        f"{events if 'log_events' in tables else 0} AS event_count, "
+        f"{params if {'log_events', 'event_params'} <= tables else 0} AS param_count, "
+        f"{nodes if 'event_node_configs' in tables else 0} AS event_node_count, "
+        f"{templates if 'flow_templates' in tables else 0} AS flow_template_count "
+        "FROM games g"
+    )
+
+
+def _event_counts_select(tables: set) -> str:
+    """SELECT producing event_stats rows"""
+    if "event_params" not in tables:
+        return "SELECT le.id AS event_id, 0 AS param_count FROM log_events le"
+    return (
+        "SELECT le.id AS event_id, COUNT(ep.id) AS param_count FROM log_events le"
+        " LEFT JOIN event_params ep ON ep.event_id = le.id AND ep.is_active = 1"
+        " GROUP BY le.id"
+    )
+
+
+def ensure_stats_tables(db_path: Optional[Path] = None) -> Dict[str, str]:
+    """
+    Create the counter tables and any missing triggers (idempotent)
+
+    Triggers are only created for source tables that exist; a table added by a later
+    migration gets its triggers on the next call. Whenever a trigger is created the
+    counters are recomputed, since writes made before it existed were not counted.
+
+    Args:
+        db_path: Optional database path. If not provided, uses get_db_path()
+
+    Returns:
+        Status per source table
+    """
+    conn = _connect(db_path)
+    try:
+        table_names = {
+            row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        }
+        if not {"games", "log_events"} <= table_names:
+            return {"game_stats": "skipped (no games/log_events)"}
+
+        existing = set()
+        if {"game_stats", "event_stats"} <= table_names:
+            existing = {
+                row[0]
+                for row in conn.execute("SELECT name FROM sqlite_master WHERE type='trigger'")
+            }
+        sources = _available_sources(conn)
+        tables = {table for table, _ in sources}
+        game_counts = _game_counts_select(tables)
+
+        status = {}
+        missing = {}
+        for key, triggers in STATS_TRIGGERS.items():
+            if key not in sources:
+                status[key[0]] = "skipped (no table)"
+                continue
+            missing[key] = [name for name in triggers if name not in existing]
+            status[key[0]] = f"created ({len(missing[key])} triggers)" if missing[key] else "exists"
+
+        if any(missing.values()):
+            statements = [STATS_TABLES_SQL]
+            for key, names in missing.items():
+                for name, (header, body) in STATS_TRIGGERS[key].items():
+                    # Recompute triggers embed the source-table list; rebuild them too
+                    if name not in names and "{game_counts}" not in body:
+                        continue
+                    body = body.replace("{game_counts}", game_counts)
+                    statements.append(f"DROP TRIGGER IF EXISTS {name};")
+                    statements.append(f"CREATE TRIGGER {name} {header} BEGIN {body} END;")
+            # One transaction: tables, triggers and backfill become visible together
+            script = "\n".join(statements) + "\n" + _repair_sql(tables)
+            conn.executescript(f"BEGIN;\n{script}COMMIT;")
+    finally:
+        conn.close()
+
+    for table, result in status.items():
+        if result.startswith("created"):
+            logger.info(f"Stats triggers on {table}: {result}")
+    return status
+
+
+def _repair_sql(tables: set) -> str:
+    return (
+        "DELETE FROM game_stats;\n"
+        f"INSERT INTO game_stats {_game_counts_select(tables)};\n"
+        "DELETE FROM event_stats;\n"
+        f"INSERT INTO event_stats {_event_counts_select(tables)};\n"
+    )
+
+
+def _drift(conn: sqlite3.Connection, table: str, key: str) -> int:
+    """Rows of main.<table> that differ from, or are missing in, temp.<table>_fresh"""
+    changed = conn.execute(
+        f"SELECT COUNT(*) FROM (SELECT * FROM temp.{table}_fresh EXCEPT SELECT * FROM main.{table})"
+    ).fetchone()[0]
+    stale = conn.execute(
+        f"SELECT COUNT(*) FROM main.{table}"
+        f" WHERE {key} NOT IN (SELECT {key} FROM temp.{table}_fresh)"
+    ).fetchone()[0]
+    return changed + stale
+
+
+def repair_stats(db_path: Optional[Path] = None) -> Dict[str, int]:
+    """
+    Recompute all counters in bulk and report how many rows had drifted
+
+    Args:
+        db_path: Optional database path. If not provided, uses get_db_path()
+
+    Returns:
+        {"games": corrected game_stats rows, "events": corrected event_stats rows}
+    """
+    ensure_stats_tables(db_path)
+    conn = _connect(db_path)
+    try:
+        tables = {table for table, _ in _available_sources(conn)}
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DROP TABLE IF EXISTS temp.game_stats_fresh")
+            conn.execute("DROP TABLE IF EXISTS temp.event_stats_fresh")
+            conn.execute(f"CREATE TEMP TABLE game_stats_fresh AS {_game_counts_select(tables)}")
+            conn.execute(f"CREATE TEMP TABLE event_stats_fresh AS {_event_counts_select(tables)}")
+            drift = {
+                "games": _drift(conn, "game_stats", "game_id"),
+                "events": _drift(conn, "event_stats", "event_id"),
+            }
+            if drift["games"] or drift["events"]:
+                conn.execute("DELETE FROM main.game_stats")
+                conn.execute("INSERT INTO main.game_stats SELECT * FROM temp.game_stats_fresh")
+                conn.execute("DELETE FROM main.event_stats")
+                conn.execute("INSERT INTO main.event_stats SELECT * FROM temp.event_stats_fresh")
+            conn.execute("DROP TABLE temp.game_stats_fresh")
+            conn.execute("DROP TABLE temp.event_stats_fresh")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    finally:
+        conn.close()
+
+    if drift["games"] or drift["events"]:
+        logger.warning(
+            f"Stats counters repaired: {drift['games']} games, {drift['events']} events had drifted"
+        )
+    return drift
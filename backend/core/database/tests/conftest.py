@@ -0,0 +1,26 @@
+"""
+数据库测试夹具：临时数据库
+"""
+
+import pytest
+
+from backend.core.config import config as config_module
+from backend.core.database import close_all_pools
+from backend.core.database.bootstrap import ensure_schema
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """尚未建表的临时数据库路径"""
+    return tmp_path / "schema.db"
+
+
+@pytest.fixture
+def app_db(tmp_path, monkeypatch):
+    """建好表的临时数据库，并设为 get_db_path() 的默认数据库"""
+    path = tmp_path / "app.db"
+    monkeypatch.setenv("FLASK_ENV", "testing")
+    monkeypatch.setattr(config_module, "TEST_DB_PATH", path)
+    ensure_schema(path)
+    yield path
+    close_all_pools()
@@ -0,0 +1,39 @@
+"""
+启动建表与指纹快速路径测试
+"""
+
+from backend.core.database import bootstrap, fulltext
+from backend.core.database.bootstrap import ensure_schema
+
+
+class TestEnsureSchema:
+    """测试指纹只在建表完整时写入"""
+
+    def test_fingerprint_stored_after_full_setup(self, db_path):
+        """测试完整建表后写入指纹，再次启动走快速路径"""
+        assert ensure_schema(db_path)["path"] == "full"
+        assert ensure_schema(db_path)["path"] == "fast"
+
+    def test_failed_search_index_not_fingerprinted(self, db_path, monkeypatch):
+        """测试全文索引创建失败（返回状态而不抛异常）时不写入指纹，下次启动重试"""
+        monkeypatch.setattr(
+            fulltext,
+            "ensure_search_indexes",
+            lambda db_path=None: {"events": "failed (no such module: fts5)"},
+        )
+
+        assert ensure_schema(db_path)["path"] == "full"
+        assert not bootstrap._fingerprint_matches(db_path)
+        assert ensure_schema(db_path)["path"] == "full"
+
+    def test_skipped_search_index_not_failure(self, db_path, monkeypatch):
+        """测试基础表不存在而跳过的索引不阻止写入指纹（建表会改变schema_version）"""
+        monkeypatch.setattr(
+            fulltext,
+            "ensure_search_indexes",
+            lambda db_path=None: {"hql_history": "skipped (no table)"},
+        )
+
+        ensure_schema(db_path)
+
+        assert bootstrap._fingerprint_matches(db_path)
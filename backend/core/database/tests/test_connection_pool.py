@@ -0,0 +1,221 @@
+"""
+连接池测试
+"""
+
+import gc
+import sqlite3
+import threading
+
+import pytest
+from flask import Flask
+
+from backend.core.database import close_all_pools, get_db_connection, init_connection_pool
+from backend.core.database.connection_pool import ConnectionPool, PoolTimeoutError, get_pool
+
+
+@pytest.fixture
+def items_db(db_path):
+    """带数据表的临时数据库"""
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    return db_path
+
+
+@pytest.fixture
+def make_pool(items_db):
+    """按参数创建连接池，测试结束时关闭空闲连接"""
+    pools = []
+
+    def make(**kwargs):
+        pool = ConnectionPool(str(items_db), **kwargs)
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.close_all()
+
+
+def count_items(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+
+class TestReuse:
+    """测试空闲连接复用与淘汰"""
+
+    def test_released_connection_reused(self, make_pool):
+        """测试归还的连接被下一次借出复用（LIFO）"""
+        pool = make_pool()
+        first, second = pool.acquire(), pool.acquire()
+        second.close()
+        first.close()
+
+        assert pool.acquire() is first
+        assert pool.get_stats()["created"] == 2
+        assert pool.get_stats()["reused"] == 1
+
+    def test_double_close_ignored(self, make_pool):
+        """测试重复close()不会把同一连接放回两次"""
+        pool = make_pool()
+        conn = pool.acquire()
+        conn.close()
+
+        assert pool.release(conn) is False
+        assert pool.get_stats()["idle"] == 1
+
+    def test_failed_health_check_discarded(self, make_pool, monkeypatch):
+        """测试空闲超过检查间隔且探活失败的连接被关闭并新建"""
+        pool = make_pool(health_check_interval=0)
+        conn = pool.acquire()
+        conn.close()
+        monkeypatch.setattr(pool, "_ping", lambda conn: False)
+
+        assert pool.acquire() is not conn
+        assert pool.get_stats()["health_check_failures"] == 1
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+    def test_max_lifetime_recycled(self, make_pool):
+        """测试超过最大存活时间的连接不再复用"""
+        pool = make_pool(max_lifetime=0)
+        conn = pool.acquire()
+        conn.close()
+
+        assert pool.acquire() is not conn
+        assert pool.get_stats()["recycled"] == 1
+
+
+class TestInvalidation:
+    """测试数据库文件被替换或fork后不复用旧连接"""
+
+    def test_replaced_file_not_reused(self, items_db, make_pool):
+        """测试文件被删除重建（inode变化）后空闲连接被回收，新连接看到新文件"""
+        pool = make_pool()
+        conn = pool.acquire()
+        conn.close()
+        items_db.unlink()
+        with sqlite3.connect(items_db) as new_conn:
+            new_conn.execute("CREATE TABLE replaced (id INTEGER PRIMARY KEY)")
+
+        fresh = pool.acquire()
+
+        assert fresh is not conn
+        assert pool.get_stats()["recycled"] == 1
+        assert fresh.execute("SELECT name FROM sqlite_master").fetchone()[0] == "replaced"
+
+    def test_forked_child_drops_parent_connections(self, make_pool, monkeypatch):
+        """测试fork后子进程不复用父进程的连接，也不关闭它们"""
+        pool = make_pool()
+        idle, in_use = pool.acquire(), pool.acquire()
+        idle.close()
+        # 模拟在子进程中：进程号与创建连接池时不同
+        monkeypatch.setattr(pool, "_pid", -1)
+
+        conn = pool.acquire()
+
+        assert conn is not idle
+        assert pool.release(in_use) is False
+        assert idle.execute("SELECT 1").fetchone()[0] == 1
+        idle.really_close()
+        in_use.really_close()
+
+
+class TestRelease:
+    """测试归还时重置连接状态"""
+
+    def test_pending_transaction_rolled_back(self, items_db, make_pool):
+        """测试未提交的事务在归还时回滚，行工厂恢复，on_release钩子执行"""
+        released = []
+        pool = make_pool(on_release=released.append)
+        conn = pool.acquire()
+        conn.row_factory = None
+        conn.execute("INSERT INTO items (name) VALUES ('pending')")
+        conn.close()
+
+        reused = pool.acquire()
+
+        assert reused is conn
+        assert not reused.in_transaction
+        assert reused.row_factory is sqlite3.Row
+        assert released == [conn]
+        assert pool.get_stats()["rollbacks"] == 1
+        assert count_items(items_db) == 0
+
+    def test_overflow_closed_when_idle_full(self, make_pool):
+        """测试超出空闲上限的连接归还时直接关闭"""
+        pool = make_pool(max_size=1)
+        first, second = pool.acquire(), pool.acquire()
+        first.close()
+        second.close()
+
+        stats = pool.get_stats()
+        assert stats["idle"] == 1
+        assert stats["closed"] == 1
+
+
+class TestCheckoutCap:
+    """测试借出数量上限（max_size + max_overflow）"""
+
+    def test_acquire_times_out(self, make_pool):
+        """测试借出达到上限时等待超时后抛出 PoolTimeoutError，归还后可再借出"""
+        pool = make_pool(max_size=1, max_overflow=1, timeout=0.05)
+        first, second = pool.acquire(), pool.acquire()
+
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire()
+        assert pool.get_stats()["timeouts"] == 1
+
+        first.close()
+        third = pool.acquire()
+        third.close()
+        second.close()
+
+    def test_waiting_acquire_gets_released(self, make_pool):
+        """测试等待中的借出在其他线程归还后拿到连接"""
+        pool = make_pool(max_size=1, max_overflow=0, timeout=10)
+        conn = pool.acquire()
+        acquired = []
+        waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+        waiter.start()
+        waiter.join(0.05)
+        assert not acquired
+
+        conn.close()
+        waiter.join(10)
+
+        assert acquired == [conn]
+        acquired[0].close()
+
+    def test_leaked_checkout_frees_slot(self, make_pool):
+        """测试未归还就被回收的连接释放借出名额"""
+        pool = make_pool(max_size=1, max_overflow=0, timeout=0.05)
+        pool.acquire()
+        gc.collect()
+
+        pool.acquire().close()
+
+
+class TestTeardownHook:
+    """测试请求结束时归还请求中未关闭的连接"""
+
+    def test_unclosed_connection_returned(self, items_db):
+        """测试请求内借出未关闭的连接在teardown时归还并回滚"""
+        app = Flask(__name__)
+        init_connection_pool(app)
+
+        @app.route("/leak")
+        def leak():
+            conn = get_db_connection(items_db)
+            conn.execute("INSERT INTO items (name) VALUES ('leaked')")
+            return "ok"
+
+        try:
+            assert app.test_client().get("/leak").status_code == 200
+
+            stats = get_pool(items_db).get_stats()
+            assert stats["in_use"] == 0
+            assert stats["rollbacks"] == 1
+            assert count_items(items_db) == 0
+        finally:
+            close_all_pools()
@@ -0,0 +1,188 @@
+"""
+全文索引与LIKE回退测试
+"""
+
+import sqlite3
+
+import pytest
+
+from backend.core.config.config import DatabaseConfig
+from backend.core.database import fulltext
+from backend.core.database.fulltext import match_condition, search_ids
+
+LIKE_COLUMNS = ["le.event_name", "le.event_name_cn"]
+NAMES = [
+    ("login_success", "登录成功"),
+    ("login_failed", "登录失败"),
+    ("role_levelup", "角色升级"),
+    ("shop_buy", "商城购买"),
+    ("Login_Retry", "重新登录"),
+]
+
+
+@pytest.fixture
+def conn(app_db):
+    """写入事件的连接（索引由触发器同步）"""
+    conn = sqlite3.connect(app_db)
+    game_id = conn.execute(
+        "INSERT INTO games (gid, name, ods_db) VALUES (10000147, 'game', 'ods')"
+    ).lastrowid
+    for name, name_cn in NAMES:
+        conn.execute(
+            """
+            INSERT INTO log_events
+                (game_id, game_gid, event_name, event_name_cn, source_table, target_table)
+            VALUES (?, 10000147, ?, ?, 'ods.src', 'dwd.dst')
+            """,
+            (game_id, name, name_cn),
+        )
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def matching_names(conn, condition, params):
+    """按条件查询事件名"""
+    return sorted(
+        row[0]
+        for row in conn.execute(
+            f"SELECT le.event_name FROM log_events le WHERE {condition}", params
+        ).fetchall()
+    )
+
+
+def like_names(conn, keyword):
+    """LIKE 基准结果"""
+    return matching_names(
+        conn, "(le.event_name LIKE ? OR le.event_name_cn LIKE ?)", [f"%{keyword}%"] * 2
+    )
+
+
+class TestMatchCondition:
+    """测试索引可用时走FTS5，否则回退到等价的LIKE"""
+
+    @pytest.mark.parametrize("keyword", ["login", "LOGIN", "levelup", "登录成", "重新登录"])
+    def test_fts_matches_like(self, app_db, conn, keyword):
+        """测试FTS5子查询与LIKE的结果一致（子串、大小写不敏感、中文）"""
+        condition, params = match_condition("events", keyword, "le.id", LIKE_COLUMNS, app_db)
+
+        assert condition.startswith("le.id IN (SELECT rowid FROM")
+        assert matching_names(conn, condition, params) == like_names(conn, keyword)
+
+    def test_index_follows_updates(self, app_db, conn):
+        """测试改名和删除通过触发器同步到索引"""
+        conn.execute(
+            "UPDATE log_events SET event_name = 'shop_refund' WHERE event_name = 'shop_buy'"
+        )
+        conn.execute("DELETE FROM log_events WHERE event_name = 'login_failed'")
+        conn.commit()
+
+        for keyword in ("refund", "shop_buy", "login"):
+            condition, params = match_condition("events", keyword, "le.id", LIKE_COLUMNS, app_db)
+            assert matching_names(conn, condition, params) == like_names(conn, keyword)
+
+    def test_short_keyword_falls_back(self, app_db, conn):
+        """测试短于三个字符的关键词（trigram无法匹配）回退到LIKE"""
+        condition, params = match_condition("events", "登录", "le.id", LIKE_COLUMNS, app_db)
+
+        assert condition == "(le.event_name LIKE ? OR le.event_name_cn LIKE ?)"
+        assert params == ["%登录%", "%登录%"]
+        assert search_ids("events", "登录", db_path=app_db) is None
+        assert len(matching_names(conn, condition, params)) == 3
+
+    def test_disabled_falls_back(self, app_db, conn, monkeypatch):
+        """测试关闭全文索引时回退到LIKE"""
+        monkeypatch.setattr(DatabaseConfig, "DB_FTS_ENABLED", False)
+
+        condition, _ = match_condition("events", "login", "le.id", LIKE_COLUMNS, app_db)
+
+        assert condition.startswith("(le.event_name LIKE ?")
+        assert search_ids("events", "login", db_path=app_db) is None
+
+    def test_missing_index_falls_back(self, app_db, conn):
+        """测试索引不存在（如未建或已删除）时回退到LIKE"""
+        conn.execute(f"DROP TABLE {fulltext.fts_table('events')}")
+        conn.commit()
+        fulltext._tokenizers.clear()
+
+        condition, params = match_condition("events", "login", "le.id", LIKE_COLUMNS, app_db)
+
+        assert condition.startswith("(le.event_name LIKE ?")
+        assert matching_names(conn, condition, params) == like_names(conn, "login")
+
+    def test_missing_index_rechecked(self, app_db, conn, monkeypatch):
+        """测试索引缺失只短暂缓存，其他进程建好索引后无需重启即可使用"""
+        conn.execute(f"DROP TABLE {fulltext.fts_table('events')}")
+        conn.commit()
+        fulltext._tokenizers.clear()
+        match_condition("events", "login", "le.id", LIKE_COLUMNS, app_db)
+        # 模拟另一个worker建索引：不经过本进程的 ensure_search_indexes()，缓存不会被清空
+        fulltext._create_index(conn, "events")
+
+        cached, _ = match_condition("events", "login", "le.id", LIKE_COLUMNS, app_db)
+        monkeypatch.setattr(fulltext, "MISSING_INDEX_RECHECK_SECONDS", 0)
+        rechecked, params = match_condition("events", "login", "le.id", LIKE_COLUMNS, app_db)
+
+        assert cached.startswith("(le.event_name LIKE ?")
+        assert rechecked.startswith("le.id IN (SELECT rowid FROM")
+        assert matching_names(conn, rechecked, params) == like_names(conn, "login")
+
+    def test_unicode61_index_falls_back(self, app_db, conn):
+        """测试旧版本建的unicode61索引（只能前缀匹配）不再使用，子串查询走LIKE"""
+        fts = fulltext.fts_table("events")
+        conn.executescript(f"""
+            DROP TABLE {fts};
+            CREATE VIRTUAL TABLE {fts} USING fts5(
+                event_name, event_name_cn, content='log_events', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            );
+            INSERT INTO {fts}({fts}) VALUES ('rebuild');
+        """)
+        fulltext._tokenizers.clear()
+
+        condition, params = match_condition("events", "evel", "le.id", LIKE_COLUMNS, app_db)
+
+        assert condition.startswith("(le.event_name LIKE ?")
+        assert matching_names(conn, condition, params) == ["role_levelup"]
+        assert search_ids("events", "evel", db_path=app_db) is None
+
+    def test_no_trigram_skips_index(self, app_db, conn, monkeypatch):
+        """测试SQLite不支持trigram时不建索引，查询走LIKE"""
+        conn.execute(f"DROP TABLE {fulltext.fts_table('events')}")
+        conn.commit()
+        monkeypatch.setattr(fulltext, "_trigram_supported", lambda conn: False)
+
+        status = fulltext.ensure_search_indexes(app_db)
+        condition, _ = match_condition("events", "login", "le.id", LIKE_COLUMNS, app_db)
+
+        assert status["events"] == "skipped (no trigram tokenizer)"
+        assert status["params"] == "exists"
+        assert condition.startswith("(le.event_name LIKE ?")
+
+    def test_unselective_keyword_falls_back(self, app_db, conn, monkeypatch):
+        """测试匹配数超过 DB_FTS_MAX_MATCHES 时回退到LIKE，未超过时仍走FTS5"""
+        monkeypatch.setattr(DatabaseConfig, "DB_FTS_MAX_MATCHES", 2)
+
+        broad, _ = match_condition("events", "login", "le.id", LIKE_COLUMNS, app_db)
+        narrow, _ = match_condition("events", "levelup", "le.id", LIKE_COLUMNS, app_db)
+
+        assert broad.startswith("(le.event_name LIKE ?")
+        assert narrow.startswith("le.id IN (SELECT rowid FROM")
+
+
+class TestSearchIds:
+    """测试排序后的ID检索"""
+
+    def test_ranked_ids(self, app_db, conn):
+        """测试返回匹配的事件ID并受limit限制"""
+        ids = search_ids("events", "login", db_path=app_db)
+        expected = [
+            row[0]
+            for row in conn.execute(
+                "SELECT id FROM log_events WHERE event_name LIKE '%login%' "
+                "OR event_name_cn LIKE '%login%'"
+            )
+        ]
+
+        assert sorted(ids) == sorted(expected)
+        assert len(search_ids("events", "login", limit=1, db_path=app_db)) == 1
@@ -0,0 +1,301 @@
+"""
+索引测试：建库后的索引集合，以及索引顾问脚本的解析与冗余检测
+"""
+
+import argparse
+import importlib.util
+import json
+import random
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from backend.core.database import create_indexes
+from backend.services.hql.migrations.create_hql_history import migrate_hql_history
+
+ADVISOR_PATH = Path(__file__).parents[4] / "scripts" / "performance" / "index_advisor.py"
+
+
+@pytest.fixture(scope="module")
+def advisor_module():
+    """按文件路径加载索引顾问脚本（scripts 不是包）"""
+    spec = importlib.util.spec_from_file_location("index_advisor", ADVISOR_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def conn():
+    """索引顾问解析用的内存库"""
+    conn = sqlite3.connect(":memory:")
+    conn.executescript("""
+        CREATE TABLE log_events (id INTEGER PRIMARY KEY, game_gid INTEGER, event_name TEXT);
+        CREATE TABLE event_params (
+            id INTEGER PRIMARY KEY, event_id INTEGER, param_name TEXT, is_active INTEGER
+        );
+        CREATE TABLE hql_history (
+            id INTEGER PRIMARY KEY, user_id INTEGER, session_id TEXT, created_at TEXT
+        );
+        """)
+    yield conn
+    conn.close()
+
+
+def index_keys(conn, name):
+    """索引的键列 [(列名, 是否DESC)]"""
+    return [
+        (row[2], bool(row[3]))
+        for row in conn.execute(f"PRAGMA index_xinfo('{name}')")
+        if row[5] and row[2] is not None
+    ]
+
+
+class TestCreateIndexes:
+    """测试 init_db / create_indexes 后的索引"""
+
+    @pytest.fixture
+    def schema(self, app_db):
+        """hql_history 由HQL模块的迁移建表，之后 create_indexes() 才会为它建索引"""
+        migrate_hql_history(str(app_db))
+        create_indexes(app_db)
+        conn = sqlite3.connect(app_db)
+        yield conn
+        conn.close()
+
+    @pytest.mark.parametrize(
+        "name, keys",
+        [
+            ("idx_log_events_game_gid", [("game_gid", False)]),
+            ("idx_hql_history_user_created", [("user_id", False), ("created_at", True)]),
+            ("idx_hql_history_created_at", [("created_at", False)]),
+            ("idx_event_nodes_updated_at", [("updated_at", False)]),
+        ],
+    )
+    def test_advised_indexes_exist(self, schema, name, keys):
+        """测试索引顾问推荐的索引已创建，列与方向正确"""
+        assert index_keys(schema, name) == keys
+
+    def test_events_list_avoids_temp_sort(self, schema):
+        """测试事件列表按 game_gid 走索引，ORDER BY id DESC 不需要临时B树"""
+        plan = [
+            row[3]
+            for row in schema.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM log_events le "
+                "WHERE le.game_gid = ? ORDER BY le.id DESC LIMIT 10",
+                (1,),
+            )
+        ]
+
+        assert any(detail.startswith("SEARCH") and "game_gid" in detail for detail in plan)
+        assert not any("TEMP B-TREE" in detail for detail in plan)
+
+
+class TestParseStatement:
+    """测试语句解析：表别名、等值/范围/连接/排序列"""
+
+    def test_where_and_order(self, advisor_module, conn):
+        """测试等值列和单一方向的排序列"""
+        advisor = advisor_module.Advisor(conn)
+        aliases, usage = advisor_module.parse_statement(
+            "SELECT * FROM hql_history WHERE user_id = ? AND created_at >= ? "
+            "ORDER BY created_at DESC LIMIT ? OFFSET ?",
+            advisor,
+        )
+
+        assert aliases == {"hql_history": "hql_history"}
+        assert usage["hql_history"]["eq"] == ["user_id"]
+        assert usage["hql_history"]["range"] == ["created_at"]
+        assert usage["hql_history"]["order"] == [("created_at", False)]
+
+    def test_join_to_rowid(self, advisor_module, conn):
+        """测试别名解析；连接对端是rowid别名时按主键查找，本端的连接列不需要索引"""
+        advisor = advisor_module.Advisor(conn)
+        aliases, usage = advisor_module.parse_statement(
+            "SELECT ep.* FROM event_params ep JOIN log_events le ON ep.event_id = le.id "
+            "WHERE le.game_gid = ? AND ep.is_active = 1",
+            advisor,
+        )
+
+        assert aliases["ep"] == "event_params"
+        assert aliases["le"] == "log_events"
+        assert usage["event_params"]["eq"] == ["is_active"]
+        assert usage["event_params"]["join"] == []
+        assert usage["log_events"]["eq"] == ["game_gid"]
+        assert advisor_module.candidates_for(usage, advisor) == {
+            ("event_params", (("is_active", False),)),
+            ("log_events", (("game_gid", False),)),
+        }
+
+    def test_join_on_plain_columns(self, advisor_module, conn):
+        """测试两端都不是rowid别名时两端的连接列都记录"""
+        advisor = advisor_module.Advisor(conn)
+        _, usage = advisor_module.parse_statement(
+            "SELECT * FROM log_events le JOIN event_params ep ON ep.param_name = le.event_name",
+            advisor,
+        )
+
+        assert usage["event_params"]["join"] == ["param_name"]
+        assert usage["log_events"]["join"] == ["event_name"]
+
+    def test_keyword_not_alias(self, advisor_module, conn):
+        """测试表名后紧跟的关键字不被当作别名，IN 列表算等值"""
+        advisor = advisor_module.Advisor(conn)
+        aliases, usage = advisor_module.parse_statement(
+            "SELECT * FROM log_events WHERE id IN (?) ORDER BY game_gid", advisor
+        )
+
+        assert aliases == {"log_events": "log_events"}
+        assert usage["log_events"]["eq"] == ["id"]
+
+    def test_mixed_order_directions(self, advisor_module, conn):
+        """测试混合方向的排序在索引列上保留DESC"""
+        advisor = advisor_module.Advisor(conn)
+        _, usage = advisor_module.parse_statement(
+            "SELECT * FROM hql_history ORDER BY user_id ASC, created_at DESC", advisor
+        )
+
+        assert usage["hql_history"]["order"] == [("user_id", False), ("created_at", True)]
+
+
+class TestCandidates:
+    """测试候选索引生成"""
+
+    def candidates(self, advisor_module, conn, sql):
+        advisor = advisor_module.Advisor(conn)
+        _, usage = advisor_module.parse_statement(sql, advisor)
+        return advisor_module.candidates_for(usage, advisor)
+
+    def test_equality_then_order(self, advisor_module, conn):
+        """测试等值列在前、排序列在后"""
+        result = self.candidates(
+            advisor_module,
+            conn,
+            "SELECT * FROM hql_history WHERE user_id = ? ORDER BY created_at DESC",
+        )
+
+        assert result == {
+            ("hql_history", (("user_id", False),)),
+            ("hql_history", (("user_id", False), ("created_at", False))),
+        }
+
+    def test_rowid_lookup_needs_no_index(self, advisor_module, conn):
+        """测试按主键查找不生成候选，排序列遇到rowid截断"""
+        assert (
+            self.candidates(advisor_module, conn, "SELECT * FROM log_events WHERE id = ?") == set()
+        )
+        assert self.candidates(
+            advisor_module, conn, "SELECT * FROM log_events WHERE game_gid = ? ORDER BY id DESC"
+        ) == {("log_events", (("game_gid", False),))}
+
+    def test_index_naming(self, advisor_module):
+        """测试索引名与建索引语句"""
+        keys = (("user_id", False), ("created_at", True))
+
+        assert advisor_module.index_name("h", keys) == "idx_h_user_id_created_at_desc"
+        assert (
+            advisor_module.index_sql("idx", "h", keys)
+            == "CREATE INDEX IF NOT EXISTS idx ON h(user_id, created_at DESC)"
+        )
+
+
+class TestWorkload:
+    """测试负载采样"""
+
+    def args(self, **kwargs):
+        defaults = {"profile_url": None, "profile_file": None, "sql_file": None, "top": 200}
+        return argparse.Namespace(**dict(defaults, **kwargs))
+
+    def test_denormalize(self, advisor_module):
+        """测试还原剖析器归一化后的IN/VALUES列表"""
+        assert advisor_module.denormalize("WHERE id IN (?+)") == "WHERE id IN (?)"
+        assert advisor_module.denormalize("VALUES (?, ?)+") == "VALUES (?, ?)"
+
+    def test_profile_file(self, advisor_module, tmp_path):
+        """测试剖析报告按语句合并各端点的调用次数，按权重排序并过滤写入语句"""
+        report = {
+            "data": {
+                "statements": [
+                    {"endpoint": "a", "sql": "SELECT * FROM t WHERE id IN (?+)", "calls": 3},
+                    {"endpoint": "b", "sql": "SELECT * FROM t WHERE id IN (?+)", "calls": 4},
+                    {"endpoint": "a", "sql": "SELECT * FROM u", "calls": 10},
+                    {"endpoint": "a", "sql": "INSERT INTO t VALUES (?)", "calls": 100},
+                ]
+            }
+        }
+        path = tmp_path / "profile.json"
+        path.write_text(json.dumps(report), encoding="utf-8")
+
+        workload = advisor_module.load_workload(self.args(profile_file=str(path)))
+
+        assert workload == [
+            ("SELECT * FROM u", 10, "a"),
+            ("SELECT * FROM t WHERE id IN (?)", 7, "a,b"),
+        ]
+
+    def test_sql_file(self, advisor_module, tmp_path):
+        """测试SQL文件按分号拆分，每条权重为1"""
+        path = tmp_path / "queries.sql"
+        path.write_text("SELECT 1;\n\nDELETE FROM t WHERE id = ?;\n", encoding="utf-8")
+
+        workload = advisor_module.load_workload(self.args(sql_file=str(path), top=1))
+
+        assert workload == [("SELECT 1", 1, str(path))]
+
+
+class TestRedundant:
+    """测试冗余索引检测"""
+
+    def test_duplicate_prefix_and_rowid_suffix(self, advisor_module):
+        """测试前缀索引、仅多一个rowid列的索引、只含rowid的索引被标记"""
+        conn = sqlite3.connect(":memory:")
+        conn.executescript("""
+            CREATE TABLE x (id INTEGER PRIMARY KEY, a INTEGER, b INTEGER);
+            CREATE INDEX idx_x_a ON x(a);
+            CREATE INDEX idx_x_a_id ON x(a, id);
+            CREATE INDEX idx_x_ab ON x(a, b);
+            CREATE INDEX idx_x_b ON x(b);
+            CREATE INDEX idx_x_id ON x(id);
+            CREATE UNIQUE INDEX idx_x_b_unique ON x(b);
+            """)
+        advisor = advisor_module.Advisor(conn)
+        existing = advisor.indexes()
+
+        redundant, unused = advisor_module.find_redundant(existing, advisor, {"idx_x_b"}, {"x"})
+
+        reasons = {name: reason for name, _, reason in redundant}
+        assert set(reasons) == {"idx_x_a", "idx_x_a_id", "idx_x_id"}
+        assert "idx_x_ab" in reasons["idx_x_a"]
+        assert "idx_x_a" in reasons["idx_x_a_id"]
+        assert unused == ["idx_x_ab"]
+        assert advisor_module.served_by_existing("x", (("a", False),), existing)
+        assert not advisor_module.served_by_existing("x", (("b", False), ("a", False)), existing)
+        conn.close()
+
+
+class TestEvaluate:
+    """测试候选索引的代价评估与选择"""
+
+    def test_recommends_composite(self, advisor_module, conn):
+        """测试大表上 等值+排序 的复合索引收益最高并被选中"""
+        rng = random.Random(0)
+        conn.executemany(
+            "INSERT INTO hql_history (user_id, created_at) VALUES (?, ?)",
+            [(rng.randrange(200), f"2026-01-{rng.randrange(1, 29):02d}") for _ in range(5000)],
+        )
+        conn.execute("ANALYZE")
+        advisor = advisor_module.Advisor(conn)
+        sql = "SELECT * FROM hql_history WHERE user_id = ? ORDER BY created_at DESC LIMIT ?"
+        aliases, usage = advisor_module.parse_statement(sql, advisor)
+        statements = [{"sql": sql, "weight": 1, "aliases": aliases, "usage": usage}]
+        baseline, _ = advisor_module.workload_cost(advisor, statements)
+        candidates = {key: [0] for key in advisor_module.candidates_for(usage, advisor)}
+
+        results = advisor_module.evaluate(advisor, statements, candidates, baseline)
+        chosen = advisor_module.select(results, baseline[0][0], 0.01, 10)
+
+        assert [r["name"] for r in chosen] == ["idx_hql_history_user_id_created_at"]
+        assert chosen[0]["after"] < chosen[0]["before"]
+        # 候选索引评估后即删除
+        assert advisor.indexes() == {}
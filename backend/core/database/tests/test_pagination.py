@@ -0,0 +1,250 @@
+"""
+游标（keyset）分页测试：游标遍历与 LIMIT/OFFSET 遍历结果一致
+"""
+
+import sqlite3
+
+import pytest
+from flask import Flask
+
+from backend.api import api_bp
+from backend.api.routes.parameters import load_all_parameters
+from backend.core.cache.cache_system import hierarchical_cache
+from backend.core.database.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    keyset_condition,
+    paginate_rows,
+)
+
+GAME_GID = 10000147
+OTHER_GID = 20000001
+
+
+def walk_cursor(fetch_page):
+    """从第一页开始沿 next_cursor 翻到最后一页，返回所有行"""
+    rows, cursor, pages = [], None, 0
+    while True:
+        page_rows, cursor = fetch_page(cursor)
+        rows.extend(page_rows)
+        pages += 1
+        assert pages < 100
+        if cursor is None:
+            return rows
+
+
+def insert_game(conn, gid):
+    """插入游戏，返回ID"""
+    return conn.execute(
+        "INSERT INTO games (gid, name, ods_db) VALUES (?, ?, 'ieu_ods')", (gid, f"game{gid}")
+    ).lastrowid
+
+
+def insert_event(conn, game_id, gid, name):
+    """插入事件，返回ID"""
+    return conn.execute(
+        """
+        INSERT INTO log_events
+            (game_id, game_gid, event_name, event_name_cn, source_table, target_table)
+        VALUES (?, ?, ?, ?, 'ods.src', 'dwd.dst')
+        """,
+        (game_id, gid, name, f"{name}_cn"),
+    ).lastrowid
+
+
+class TestCursorToken:
+    """测试游标编码"""
+
+    def test_round_trip(self):
+        """测试编码后可解码回原排序键"""
+        assert decode_cursor(encode_cursor([3, "abc", ""]), 3) == [3, "abc", ""]
+
+    def test_empty_token_is_first_page(self):
+        """测试空游标表示第一页"""
+        assert decode_cursor(None, 1) is None
+        assert decode_cursor("", 1) is None
+
+    @pytest.mark.parametrize(
+        "token",
+        ["!!not-base64!!", "bm90IGpzb24", encode_cursor([1, 2]), "eyJ2IjoyLCJrIjpbMV19"],
+    )
+    def test_invalid_token(self, token):
+        """测试损坏、排序键数量不符或版本不符的游标被拒绝"""
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(token, 1)
+
+
+class TestKeysetCondition:
+    """测试混合方向的keyset条件"""
+
+    KEYS = [("score", "DESC"), ("name", "ASC"), ("id", "DESC")]
+    ORDER_BY = "score DESC, name ASC, id DESC"
+
+    @pytest.fixture
+    def conn(self):
+        """大量并列排序键的内存表"""
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, score INTEGER, name TEXT)")
+        conn.executemany(
+            "INSERT INTO t (id, score, name) VALUES (?, ?, ?)",
+            [(i, i % 4, "abc"[i % 3]) for i in range(1, 41)],
+        )
+        yield conn
+        conn.close()
+
+    def test_first_page_unfiltered(self):
+        """测试第一页不加条件"""
+        assert keyset_condition(self.KEYS, None) == ("1=1", [])
+
+    @pytest.mark.parametrize("per_page", [1, 3, 7, 40, 50])
+    def test_mixed_direction_walk_matches_offset(self, conn, per_page):
+        """测试 (DESC, ASC, DESC) 游标遍历与 OFFSET 分页的行和顺序完全一致"""
+
+        def fetch_page(cursor):
+            condition, params = keyset_condition(self.KEYS, decode_cursor(cursor, 3))
+            rows = conn.execute(
+                f"SELECT id, score, name FROM t WHERE {condition} "
+                f"ORDER BY {self.ORDER_BY} LIMIT ?",
+                params + [per_page + 1],
+            ).fetchall()
+            return paginate_rows(rows, per_page, lambda row: [row[1], row[2], row[0]])
+
+        offset_rows = []
+        for offset in range(0, 40, per_page):
+            offset_rows.extend(
+                conn.execute(
+                    f"SELECT id, score, name FROM t ORDER BY {self.ORDER_BY} LIMIT ? OFFSET ?",
+                    (per_page, offset),
+                ).fetchall()
+            )
+
+        assert walk_cursor(fetch_page) == offset_rows
+        assert len(offset_rows) == 40
+
+    def test_last_page_has_no_cursor(self):
+        """测试不足一页时没有下一页游标"""
+        assert paginate_rows([1, 2], 2, lambda row: [row]) == ([1, 2], None)
+        assert paginate_rows([1, 2, 3], 2, lambda row: [row]) == ([1, 2], encode_cursor([2]))
+
+
+class TestEventsCursor:
+    """测试 GET /api/events 的游标模式"""
+
+    @pytest.fixture
+    def client(self, app_db):
+        """注册API蓝图的测试客户端，写入两个游戏的事件"""
+        conn = sqlite3.connect(app_db)
+        game_id = insert_game(conn, GAME_GID)
+        other_id = insert_game(conn, OTHER_GID)
+        for i in range(23):
+            insert_event(conn, game_id, GAME_GID, f"event_{i:02d}")
+            insert_event(conn, other_id, OTHER_GID, f"other_{i:02d}")
+        conn.commit()
+        conn.close()
+
+        hierarchical_cache.clear_l1()
+        app = Flask(__name__)
+        app.register_blueprint(api_bp)
+        return app.test_client()
+
+    def list_events(self, client, **args):
+        response = client.get(
+            "/api/events", query_string={"game_gid": GAME_GID, "include_total": "false", **args}
+        )
+        assert response.status_code == 200
+        return response.get_json()["data"]
+
+    def test_cursor_walk_matches_pages(self, client):
+        """测试沿游标翻页与按页码翻页得到相同事件"""
+
+        def fetch_page(cursor):
+            data = self.list_events(client, per_page=5, cursor=cursor or "")
+            return [event["id"] for event in data["events"]], data["pagination"]["next_cursor"]
+
+        paged = []
+        for page in range(1, 6):
+            data = self.list_events(client, per_page=5, page=page)
+            paged.extend(event["id"] for event in data["events"])
+
+        assert walk_cursor(fetch_page) == paged
+        assert len(paged) == 23
+        assert paged == sorted(paged, reverse=True)
+
+    def test_cursor_mode_skips_total(self, client):
+        """测试游标模式默认不计算总数，页码字段为空"""
+        response = client.get("/api/events", query_string={"game_gid": GAME_GID, "cursor": ""})
+        pagination = response.get_json()["data"]["pagination"]
+
+        assert pagination["page"] is None
+        assert "total" not in pagination
+        assert pagination["has_more"] is True
+
+    def test_invalid_cursor_rejected(self, client):
+        """测试无法解析的游标返回400"""
+        response = client.get("/api/events", query_string={"cursor": "garbage"})
+
+        assert response.status_code == 400
+
+
+class TestParametersCursor:
+    """测试 /api/parameters/all 加载函数的游标模式（聚合值排序键，条件在HAVING中）"""
+
+    # (参数名, 模板ID, 出现次数)；模板1-4分别为 string/int/bigint/float
+    PARAMS = [
+        ("alpha", 1, 3),
+        ("alpha", 2, 3),
+        ("beta", 1, 3),
+        ("theta", 2, 3),
+        ("delta", 1, 2),
+        ("delta", 3, 2),
+        ("gamma", 2, 2),
+        ("eta", 1, 1),
+        ("epsilon", 4, 1),
+        ("zeta", 1, 1),
+    ]
+
+    @pytest.fixture
+    def game_id(self, app_db):
+        """出现次数大量并列；同名不同类型的参数放在另一组事件上（同一事件内参数名唯一）"""
+        conn = sqlite3.connect(app_db)
+        game_id = insert_game(conn, GAME_GID)
+        events = [insert_event(conn, game_id, GAME_GID, f"event_{i}") for i in range(6)]
+        seen = set()
+        for name, template_id, times in self.PARAMS:
+            start = 3 if name in seen else 0
+            seen.add(name)
+            for event_id in events[start : start + times]:
+                conn.execute(
+                    "INSERT INTO event_params (event_id, param_name, template_id) VALUES (?, ?, ?)",
+                    (event_id, name, template_id),
+                )
+        conn.execute(
+            "INSERT INTO event_params (event_id, param_name, template_id, is_active) "
+            "VALUES (?, 'inactive', 1, 0)",
+            (events[0],),
+        )
+        conn.commit()
+        conn.close()
+        return game_id
+
+    @staticmethod
+    def key(row):
+        return (row["param_name"], row["base_type"], row["usage_count"])
+
+    @pytest.mark.parametrize("limit", [1, 2, 3, 4])
+    def test_cursor_walk_matches_pages(self, game_id, limit):
+        """测试游标遍历与页码遍历一致，且按 使用次数 DESC, 参数名 ASC, 类型 ASC 排序"""
+
+        def fetch_page(cursor):
+            result = load_all_parameters(game_id, "", "", None, cursor or "", limit, False)
+            return [self.key(row) for row in result["parameters"]], result["next_cursor"]
+
+        paged = []
+        for page in range(1, len(self.PARAMS) // limit + 2):
+            result = load_all_parameters(game_id, "", "", page, None, limit, False)
+            paged.extend(self.key(row) for row in result["parameters"])
+
+        assert walk_cursor(fetch_page) == paged
+        assert paged == sorted(paged, key=lambda row: (-row[2], row[0], row[1]))
+        assert len(paged) == len(self.PARAMS)
@@ -0,0 +1,84 @@
+"""
+连接性能档位（PRAGMA profile）测试
+"""
+
+import pytest
+
+from backend.core.config import DatabaseConfig
+from backend.core.database import close_all_pools, get_db_connection
+from backend.core.database.connection_pool import get_pool
+from backend.core.database.routing import write_transaction
+
+PRAGMAS = ["cache_size", "temp_store", "wal_autocheckpoint", "busy_timeout"]
+
+
+def pragmas(conn):
+    return {key: conn.execute(f"PRAGMA {key}").fetchone()[0] for key in PRAGMAS}
+
+
+def expected(profile):
+    return {key: DatabaseConfig.DB_PROFILES[profile][key] for key in PRAGMAS}
+
+
+@pytest.fixture
+def pooled_db(db_path, monkeypatch):
+    """开启连接池、默认档位为 default 的临时数据库"""
+    monkeypatch.setattr(DatabaseConfig, "DB_POOL_ENABLED", True)
+    monkeypatch.setattr(DatabaseConfig, "DB_PROFILE", "default")
+    yield db_path
+    close_all_pools()
+
+
+@pytest.mark.parametrize("split", [True, False])
+class TestWriteTransactionProfile:
+    """测试写事务按档位切换PRAGMA，归还的池化连接恢复默认档位（读写分离开关两种取值）"""
+
+    @pytest.fixture(autouse=True)
+    def config(self, monkeypatch, split):
+        monkeypatch.setattr(DatabaseConfig, "DB_RW_SPLIT_ENABLED", split)
+
+    def test_bulk_import_applied_and_restored(self, pooled_db):
+        """测试 bulk_import 写事务内PRAGMA生效，之后复用同一连接时恢复默认值"""
+        with write_transaction(pooled_db, profile="bulk_import") as conn:
+            assert pragmas(conn) == expected("bulk_import")
+            assert conn.profile == "bulk_import"
+            bulk_conn = conn
+
+        with write_transaction(pooled_db) as conn:
+            assert conn is bulk_conn
+            assert conn.profile == "default"
+            assert pragmas(conn) == expected("default")
+
+
+class TestConnectionProfile:
+    """测试 get_db_connection() 的档位参数"""
+
+    def test_profile_restored_on_close(self, pooled_db):
+        """测试按档位借出的连接归还后切回默认档位"""
+        conn = get_db_connection(pooled_db, profile="read_heavy")
+        assert pragmas(conn) == expected("read_heavy")
+        conn.close()
+
+        reused = get_db_connection(pooled_db)
+        try:
+            assert reused is conn
+            assert pragmas(reused) == expected("default")
+        finally:
+            reused.close()
+
+    def test_unknown_profile_rejected(self, pooled_db):
+        """测试未知档位抛出 ValueError，且连接已归还连接池"""
+        with pytest.raises(ValueError):
+            get_db_connection(pooled_db, profile="no_such_profile")
+
+        assert get_pool(pooled_db).get_stats()["in_use"] == 0
+
+    def test_unpooled_connection(self, pooled_db, monkeypatch):
+        """测试关闭连接池时新连接直接应用档位"""
+        monkeypatch.setattr(DatabaseConfig, "DB_POOL_ENABLED", False)
+
+        conn = get_db_connection(pooled_db, profile="bulk_import")
+        try:
+            assert pragmas(conn) == expected("bulk_import")
+        finally:
+            conn.close()
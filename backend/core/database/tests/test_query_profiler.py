@@ -0,0 +1,174 @@
+"""
+连接级SQL性能分析器测试
+"""
+
+import sqlite3
+
+import pytest
+
+from backend.core.database import query_profiler as profiler_module
+from backend.core.database.query_profiler import (
+    ProfiledConnection,
+    ProfilingCursor,
+    QueryProfiler,
+    normalize_sql,
+)
+
+
+@pytest.fixture
+def profiler(monkeypatch):
+    """替换全局分析器：每条语句都算慢查询，5行以上的表算大表"""
+    profiler = QueryProfiler(enabled=True, slow_ms=0, large_table_rows=5)
+    monkeypatch.setattr(profiler_module, "query_profiler", profiler)
+    return profiler
+
+
+@pytest.fixture
+def conn():
+    """带10行数据表的内存连接"""
+    conn = sqlite3.connect(":memory:", factory=ProfiledConnection)
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.executemany("INSERT INTO t (name) VALUES (?)", [(f"n{i}",) for i in range(10)])
+    yield conn
+    conn.close()
+
+
+def statements(profiler):
+    return {s["sql"]: s for s in profiler.get_report()["statements"]}
+
+
+class TestNormalizeSql:
+    """测试SQL归一化"""
+
+    @pytest.mark.parametrize(
+        "sql, normalized",
+        [
+            ("SELECT * FROM t WHERE id = 42", "SELECT * FROM t WHERE id = ?"),
+            ("SELECT * FROM t WHERE x = -1.5", "SELECT * FROM t WHERE x = ?"),
+            ("SELECT * FROM t WHERE name = 'it''s'", "SELECT * FROM t WHERE name = ?"),
+            ("SELECT t1.col2 FROM t1", "SELECT t1.col2 FROM t1"),
+            ("SELECT *\n  FROM t -- note\n WHERE a = 1", "SELECT * FROM t WHERE a = ?"),
+            ("SELECT /* hint */ a FROM t", "SELECT a FROM t"),
+        ],
+    )
+    def test_literals(self, sql, normalized):
+        """测试字符串/数字字面量替换为?，标识符中的数字保留，注释和空白压缩"""
+        assert normalize_sql(sql) == normalized
+
+    def test_in_lists_collapse(self):
+        """测试不同长度的IN列表归为同一语句"""
+        short = normalize_sql("SELECT * FROM t WHERE id IN (?)")
+        long = normalize_sql("SELECT * FROM t WHERE id IN (1, 2, ?, 'x')")
+
+        assert short == long == "SELECT * FROM t WHERE id IN (?+)"
+
+    def test_values_lists_collapse(self):
+        """测试多行VALUES归为同一语句，单行VALUES不变"""
+        many = normalize_sql("INSERT INTO t (a, b) VALUES (1, 'x'), (2, 'y'), (?, ?)")
+        single = normalize_sql("INSERT INTO t (a, b) VALUES (?, ?)")
+
+        assert many == "INSERT INTO t (a, b) VALUES (?, ?)+"
+        assert single == "INSERT INTO t (a, b) VALUES (?, ?)"
+
+
+class TestPercentiles:
+    """测试延迟统计与百分位窗口"""
+
+    def test_window_keeps_latest_samples(self):
+        """测试百分位只取最近 sample_size 个样本，总数/平均/最大值覆盖全部调用"""
+        profiler = QueryProfiler(enabled=True, sample_size=10)
+        for elapsed_ms in range(1, 101):
+            profiler.record(None, "SELECT 1", (), float(elapsed_ms), 1, endpoint="ep")
+
+        stats = profiler.get_report()["statements"][0]
+
+        assert stats["calls"] == 100
+        assert stats["rows"] == 100
+        assert stats["avg_ms"] == 50.5
+        assert stats["max_ms"] == 100
+        assert stats["p50_ms"] == 95
+        assert stats["p99_ms"] == 100
+
+    def test_grouped_by_endpoint(self):
+        """测试同一语句按端点分组，并可按端点过滤"""
+        profiler = QueryProfiler(enabled=True)
+        profiler.record(None, "SELECT 1", (), 1.0, 1, endpoint="a")
+        profiler.record(None, "SELECT 2", (), 3.0, 1, endpoint="b")
+
+        report = profiler.get_report(endpoint="b")
+
+        assert [s["endpoint"] for s in report["statements"]] == ["b"]
+        assert report["summary"]["calls"] == 1
+        assert profiler.get_report()["endpoints"]["a"]["total_ms"] == 1.0
+
+    def test_statement_limit(self):
+        """测试超过 max_statements 的新分组被丢弃并计数"""
+        profiler = QueryProfiler(enabled=True, max_statements=1)
+        profiler.record(None, "SELECT a FROM t", (), 1.0, 1, endpoint="ep")
+        profiler.record(None, "SELECT b FROM t", (), 1.0, 1, endpoint="ep")
+
+        assert profiler.get_report()["summary"]["dropped"] == 1
+
+
+class TestPlanCapture:
+    """测试慢查询的执行计划采集"""
+
+    def test_plan_captured_once(self, profiler, conn):
+        """测试同一归一化语句只采集一次计划，大表全表扫描被标记"""
+        conn.execute("SELECT * FROM t WHERE name = 'n1'").fetchall()
+        conn.execute("SELECT * FROM t WHERE name = 'n2'").fetchall()
+
+        stats = statements(profiler)["SELECT * FROM t WHERE name = ?"]
+
+        assert stats["calls"] == 2
+        assert stats["rows"] == 2
+        assert any(detail.startswith("SCAN") for detail in stats["plan"])
+        assert stats["full_scans"][0]["table"] == "t"
+        assert stats["full_scans"][0]["rows"] == 10
+        assert profiler.get_report()["summary"]["plans_captured"] == 1
+
+    def test_index_lookup_not_flagged(self, profiler, conn):
+        """测试主键查找不算全表扫描"""
+        conn.execute("SELECT name FROM t WHERE id = ?", (3,)).fetchall()
+
+        stats = statements(profiler)["SELECT name FROM t WHERE id = ?"]
+
+        assert stats["plan"]
+        assert stats["full_scans"] == []
+
+    def test_fast_statement_skips_plan(self, profiler, conn):
+        """测试低于 slow_ms 的语句不采集计划"""
+        profiler.slow_ms = 60_000
+        conn.execute("SELECT * FROM t").fetchall()
+
+        assert statements(profiler)["SELECT * FROM t"]["plan"] is None
+        assert profiler.get_report()["summary"]["plans_captured"] == 0
+
+
+class TestProfiledConnection:
+    """测试连接在开启/关闭分析器时使用的游标"""
+
+    def test_disabled_fast_path(self, profiler, conn):
+        """测试关闭时使用普通游标且不记录"""
+        profiler.disable()
+        profiler.reset()
+
+        cursor = conn.execute("SELECT * FROM t")
+
+        assert type(cursor) is sqlite3.Cursor
+        assert type(conn.cursor()) is sqlite3.Cursor
+        assert cursor.fetchall()
+        assert profiler.get_report()["statements"] == []
+
+    def test_enabled_records_rows(self, profiler, conn):
+        """测试开启时按取回行数（迭代、写入rowcount）记录"""
+        profiler.slow_ms = 60_000
+        cursor = conn.execute("SELECT id FROM t")
+        assert isinstance(cursor, ProfilingCursor)
+        assert len(list(cursor)) == 10
+        conn.execute("UPDATE t SET name = 'x' WHERE id <= 3")
+
+        recorded = statements(profiler)
+
+        assert recorded["SELECT id FROM t"]["rows"] == 10
+        assert recorded["UPDATE t SET name = ? WHERE id <= ?"]["rows"] == 3
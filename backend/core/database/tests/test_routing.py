@@ -0,0 +1,114 @@
+"""
+读写路由测试
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from backend.core.config import DatabaseConfig
+from backend.core.database import close_all_pools
+from backend.core.database.routing import get_routing_stats, write_transaction
+
+
+@pytest.fixture
+def counter_db(db_path):
+    """带计数表的临时数据库"""
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE counter (id INTEGER PRIMARY KEY, n INTEGER NOT NULL)")
+        conn.execute("INSERT INTO counter VALUES (1, 0)")
+    yield db_path
+    close_all_pools()
+
+
+def read_counter(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT n FROM counter").fetchone()[0]
+
+
+class TestWriteTransaction:
+    """测试串行写事务"""
+
+    def test_concurrent_writers_counted(self, counter_db):
+        """测试多线程并发写事务全部提交，且统计计数不丢失"""
+        db_path = counter_db
+        before = get_routing_stats()["transactions"]
+
+        def write():
+            for _ in range(25):
+                with write_transaction(db_path) as conn:
+                    conn.execute("UPDATE counter SET n = n + 1 WHERE id = 1")
+
+        threads = [threading.Thread(target=write) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert read_counter(db_path) == 200
+        assert get_routing_stats()["transactions"] - before == 200
+
+
+@pytest.mark.parametrize("split", [True, False])
+class TestNestedWriteTransaction:
+    """测试同一线程内嵌套写事务通过SAVEPOINT加入外层事务（读写分离开关两种取值）"""
+
+    @pytest.fixture(autouse=True)
+    def config(self, monkeypatch, split):
+        monkeypatch.setattr(DatabaseConfig, "DB_RW_SPLIT_ENABLED", split)
+        # 嵌套调用如果另开连接会等待自己持有的写锁，不重试以便立即失败
+        monkeypatch.setattr(DatabaseConfig, "DB_BUSY_RETRIES", 0)
+
+    def test_nested_joins_outer(self, counter_db):
+        """测试内层使用外层连接，外层提交时一并提交"""
+        with write_transaction(counter_db) as outer:
+            outer.execute("UPDATE counter SET n = n + 1")
+            with write_transaction(counter_db) as inner:
+                assert inner is outer
+                inner.execute("UPDATE counter SET n = n + 10")
+            assert read_counter(counter_db) == 0
+
+        assert read_counter(counter_db) == 11
+
+    def test_inner_error_rolls_back_savepoint(self, counter_db):
+        """测试内层异常只回滚内层写入，外层继续并提交"""
+        with write_transaction(counter_db) as outer:
+            outer.execute("UPDATE counter SET n = n + 1")
+            with pytest.raises(ValueError):
+                with write_transaction(counter_db) as inner:
+                    inner.execute("UPDATE counter SET n = n + 10")
+                    raise ValueError("inner")
+            outer.execute("UPDATE counter SET n = n + 100")
+
+        assert read_counter(counter_db) == 101
+
+    def test_outer_error_rolls_back_nested(self, counter_db):
+        """测试外层异常回滚包括已释放的内层写入，之后可以重新开始事务"""
+        with pytest.raises(ValueError):
+            with write_transaction(counter_db) as outer:
+                with write_transaction(counter_db) as inner:
+                    inner.execute("UPDATE counter SET n = n + 10")
+                raise ValueError("outer")
+
+        with write_transaction(counter_db) as conn:
+            conn.execute("UPDATE counter SET n = n + 1")
+        assert read_counter(counter_db) == 1
+
+    def test_other_threads_not_nested(self, counter_db):
+        """测试其他线程的写事务不会加入本线程的事务，而是等外层提交后再开始"""
+        seen = []
+
+        def write():
+            with write_transaction(counter_db) as conn:
+                seen.append(conn.execute("SELECT n FROM counter").fetchone()[0])
+                conn.execute("UPDATE counter SET n = n + 1")
+
+        with write_transaction(counter_db) as outer:
+            outer.execute("UPDATE counter SET n = n + 10")
+            thread = threading.Thread(target=write)
+            thread.start()
+        thread.join()
+
+        assert seen == [10]
+        assert read_counter(counter_db) == 11
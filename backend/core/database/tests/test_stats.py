@@ -0,0 +1,140 @@
+"""
+触发器维护的统计计数测试：增量计数与全量重算一致
+"""
+
+import sqlite3
+
+import pytest
+
+from backend.core.database.stats import repair_stats
+
+GID_A = 10000147
+GID_B = 20000001
+
+
+@pytest.fixture
+def conn(app_db):
+    """开启外键（级联删除也要触发计数更新）的连接"""
+    conn = sqlite3.connect(app_db)
+    conn.execute("PRAGMA foreign_keys = ON")
+    yield conn
+    conn.close()
+
+
+def insert_event(conn, game_id, gid, name):
+    return conn.execute(
+        """
+        INSERT INTO log_events
+            (game_id, game_gid, event_name, event_name_cn, source_table, target_table)
+        VALUES (?, ?, ?, ?, 'ods.src', 'dwd.dst')
+        """,
+        (game_id, gid, name, name),
+    ).lastrowid
+
+
+def insert_param(conn, event_id, name, is_active=1):
+    return conn.execute(
+        "INSERT INTO event_params (event_id, param_name, template_id, is_active) "
+        "VALUES (?, ?, 1, ?)",
+        (event_id, name, is_active),
+    ).lastrowid
+
+
+def insert_node(conn, gid, event_id, name):
+    return conn.execute(
+        "INSERT INTO event_node_configs (game_gid, name_en, name_cn, event_id) "
+        "VALUES (?, ?, ?, ?)",
+        (gid, name, name, event_id),
+    ).lastrowid
+
+
+def insert_flow(conn, game_id, is_active=1):
+    return conn.execute(
+        "INSERT INTO flow_templates (flow_name, flow_graph, game_id, is_active) "
+        "VALUES ('flow', '{}', ?, ?)",
+        (game_id, is_active),
+    ).lastrowid
+
+
+def game_stats(conn, game_id):
+    return conn.execute(
+        "SELECT event_count, param_count, event_node_count, flow_template_count "
+        "FROM game_stats WHERE game_id = ?",
+        (game_id,),
+    ).fetchone()
+
+
+class TestTriggerDeltas:
+    """测试各类写入后触发器增量与 repair_stats() 全量重算无偏差"""
+
+    def test_writes_keep_counters_exact(self, app_db, conn):
+        """测试插入/启停/迁移/级联删除等写入后计数无漂移"""
+        game_a = conn.execute(
+            "INSERT INTO games (gid, name, ods_db) VALUES (?, 'a', 'ods')", (GID_A,)
+        ).lastrowid
+        game_b = conn.execute(
+            "INSERT INTO games (gid, name, ods_db) VALUES (?, 'b', 'ods')", (GID_B,)
+        ).lastrowid
+        events = [insert_event(conn, game_a, GID_A, f"a{i}") for i in range(3)]
+        event_b = insert_event(conn, game_b, GID_B, "b0")
+        params = [insert_param(conn, event_id, "p1") for event_id in events]
+        insert_param(conn, events[0], "p2")
+        insert_param(conn, events[1], "off", is_active=0)
+        insert_param(conn, event_b, "pb")
+        nodes = [insert_node(conn, GID_A, events[i], f"n{i}") for i in range(2)]
+        flows = [insert_flow(conn, game_a), insert_flow(conn, game_a, is_active=0)]
+        conn.commit()
+
+        assert game_stats(conn, game_a) == (3, 4, 2, 1)
+        assert game_stats(conn, game_b) == (1, 1, 0, 0)
+
+        # 参数启停、在跨游戏的事件之间移动、删除
+        conn.execute("UPDATE event_params SET is_active = 0 WHERE id = ?", (params[0],))
+        conn.execute("UPDATE event_params SET is_active = 1 WHERE param_name = 'off'")
+        conn.execute("UPDATE event_params SET event_id = ? WHERE id = ?", (event_b, params[1]))
+        conn.execute("DELETE FROM event_params WHERE id = ?", (params[2],))
+        # 节点和流程模板换游戏、启停、删除
+        conn.execute("UPDATE event_node_configs SET game_gid = ? WHERE id = ?", (GID_B, nodes[1]))
+        conn.execute("DELETE FROM event_node_configs WHERE id = ?", (nodes[0],))
+        conn.execute("UPDATE flow_templates SET is_active = 1 WHERE id = ?", (flows[1],))
+        conn.execute("UPDATE flow_templates SET game_id = ? WHERE id = ?", (game_b, flows[0]))
+        # 事件换游戏、删除事件（参数级联删除）
+        conn.execute("UPDATE log_events SET game_gid = ? WHERE id = ?", (GID_B, events[1]))
+        conn.execute("DELETE FROM log_events WHERE id = ?", (events[0],))
+        conn.commit()
+
+        assert repair_stats(app_db) == {"games": 0, "events": 0}
+
+    def test_game_delete_cascades(self, app_db, conn):
+        """测试删除游戏（事件和参数级联删除）后计数行随之删除"""
+        game_id = conn.execute(
+            "INSERT INTO games (gid, name, ods_db) VALUES (?, 'a', 'ods')", (GID_A,)
+        ).lastrowid
+        insert_param(conn, insert_event(conn, game_id, GID_A, "e"), "p")
+        conn.commit()
+
+        conn.execute("DELETE FROM games WHERE id = ?", (game_id,))
+        conn.commit()
+
+        assert game_stats(conn, game_id) is None
+        assert conn.execute("SELECT COUNT(*) FROM event_stats").fetchone()[0] == 0
+        assert repair_stats(app_db) == {"games": 0, "events": 0}
+
+
+class TestRepairStats:
+    """测试漂移检测与修复"""
+
+    def test_drift_reported_and_repaired(self, app_db, conn):
+        """测试绕过触发器造成的漂移被发现并修复，再次运行无漂移"""
+        game_id = conn.execute(
+            "INSERT INTO games (gid, name, ods_db) VALUES (?, 'a', 'ods')", (GID_A,)
+        ).lastrowid
+        event_id = insert_event(conn, game_id, GID_A, "e")
+        insert_param(conn, event_id, "p")
+        conn.execute("UPDATE game_stats SET event_count = 99 WHERE game_id = ?", (game_id,))
+        conn.execute("DELETE FROM event_stats WHERE event_id = ?", (event_id,))
+        conn.commit()
+
+        assert repair_stats(app_db) == {"games": 1, "events": 1}
+        assert game_stats(conn, game_id) == (1, 1, 0, 0)
+        assert repair_stats(app_db) == {"games": 0, "events": 0}
@@ -0,0 +1,235 @@
+"""
+写后队列（分组提交）测试
+"""
+
+import sqlite3
+import threading
+import time
+from concurrent.futures import wait
+
+import pytest
+
+from backend.core.config import DatabaseConfig
+from backend.core.database import close_all_pools
+from backend.core.database.routing import write_transaction
+from backend.core.database.write_behind import (
+    WriteBehindQueue,
+    get_write_queue_stats,
+    submit_write,
+    synchronous_writes,
+)
+
+INSERT = "INSERT INTO items (name) VALUES (?)"
+
+
+@pytest.fixture
+def items_db(db_path):
+    """带唯一约束表的临时数据库"""
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL)")
+    yield db_path
+    close_all_pools()
+
+
+@pytest.fixture
+def make_queue(items_db):
+    """按参数创建写后队列，测试结束时关闭"""
+    queues = []
+
+    def make(batch_ms=20, batch_size=200):
+        write_queue = WriteBehindQueue(items_db, batch_ms=batch_ms, batch_size=batch_size)
+        queues.append(write_queue)
+        return write_queue
+
+    yield make
+    for write_queue in queues:
+        write_queue.close()
+
+
+def item_names(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return [row[0] for row in conn.execute("SELECT name FROM items ORDER BY id")]
+
+
+def wait_all(futures):
+    """等待全部完成（不调用 result()，以免提前结束正在收集的批次）"""
+    done, not_done = wait(futures, timeout=10)
+    assert not not_done
+    return done
+
+
+class TestBatching:
+    """测试按条数和按时间窗口分批提交"""
+
+    def test_batch_by_size(self, items_db, make_queue):
+        """测试时间窗口很长时按 batch_size 切分批次"""
+        write_queue = make_queue(batch_ms=60_000, batch_size=5)
+
+        wait_all([write_queue.submit(INSERT, (f"item{i}",)) for i in range(10)])
+
+        assert write_queue.stats["batches"] == 2
+        assert write_queue.stats["max_batch"] == 5
+        assert item_names(items_db) == [f"item{i}" for i in range(10)]
+
+    def test_batch_by_time(self, items_db, make_queue):
+        """测试条数未满时在 batch_ms 后把窗口内的写入一次提交"""
+        write_queue = make_queue(batch_ms=200, batch_size=100)
+
+        start = time.monotonic()
+        wait_all([write_queue.submit(INSERT, (f"item{i}",)) for i in range(3)])
+
+        assert time.monotonic() - start >= 0.15
+        assert write_queue.stats["batches"] == 1
+        assert write_queue.stats["statements"] == 3
+
+    def test_result_closes_batch(self, make_queue):
+        """测试 result() 不等满时间窗口"""
+        write_queue = make_queue(batch_ms=60_000)
+
+        start = time.monotonic()
+        result = write_queue.submit(INSERT, ("item",)).result(timeout=10)
+
+        assert result.lastrowid == 1
+        assert result.rowcount == 1
+        assert time.monotonic() - start < 1
+
+    def test_failing_statement_isolated(self, items_db, make_queue):
+        """测试失败语句只回滚自己的SAVEPOINT，同批其他语句照常提交"""
+        write_queue = make_queue(batch_ms=60_000, batch_size=3)
+
+        futures = [write_queue.submit(INSERT, (name,)) for name in ("a", "a", "b")]
+        wait_all(futures)
+
+        assert futures[0].result().lastrowid == 1
+        assert isinstance(futures[1].exception(), sqlite3.IntegrityError)
+        assert futures[2].result().lastrowid == 2
+        assert write_queue.stats["batches"] == 1
+        assert write_queue.stats["failed"] == 1
+        assert item_names(items_db) == ["a", "b"]
+
+
+class TestOrdering:
+    """测试 flush / synchronous 保证之前排队的写入先提交"""
+
+    def test_flush_commits_queued(self, items_db, make_queue):
+        """测试 flush() 返回时之前提交的写入均已落库"""
+        write_queue = make_queue(batch_ms=60_000)
+        futures = [write_queue.submit(INSERT, (f"item{i}",)) for i in range(3)]
+
+        write_queue.flush(timeout=10)
+
+        assert all(future.done() for future in futures)
+        assert item_names(items_db) == ["item0", "item1", "item2"]
+
+    def test_synchronous_pauses_writer(self, items_db, make_queue):
+        """测试 synchronous() 先提交排队写入，期间其他线程的写入等到退出后才提交"""
+        write_queue = make_queue(batch_ms=0)
+        write_queue.submit(INSERT, ("queued",))
+        others = []
+
+        with write_queue.synchronous():
+            assert item_names(items_db) == ["queued"]
+            with write_transaction(items_db) as conn:
+                conn.execute(INSERT, ("own",))
+            thread = threading.Thread(
+                target=lambda: others.append(write_queue.submit(INSERT, ("other",)))
+            )
+            thread.start()
+            thread.join()
+            time.sleep(0.1)
+            assert not others[0].done()
+
+        wait_all(others)
+        assert item_names(items_db) == ["queued", "own", "other"]
+
+
+class TestHeldWriter:
+    """测试持有写锁或 synchronous() 的线程提交写入时内联执行而不是死锁"""
+
+    def test_submit_inside_synchronous(self, items_db, make_queue):
+        """测试 synchronous() 内提交的写入立即执行并提交"""
+        write_queue = make_queue(batch_ms=60_000)
+
+        with write_queue.synchronous():
+            future = write_queue.submit(INSERT, ("inline",))
+            assert future.done()
+            assert future.result().lastrowid == 1
+            assert item_names(items_db) == ["inline"]
+
+        assert write_queue.stats["inline"] == 1
+        assert write_queue.stats["batches"] == 0
+
+    def test_nested_synchronous(self, items_db, make_queue):
+        """测试 synchronous() 可重入"""
+        write_queue = make_queue(batch_ms=60_000)
+
+        with write_queue.synchronous():
+            with write_queue.synchronous():
+                write_queue.submit(INSERT, ("inline",)).result(timeout=1)
+
+        assert item_names(items_db) == ["inline"]
+
+    def test_submit_inside_write_transaction(self, items_db, make_queue):
+        """测试写事务内提交的写入加入该事务，随事务提交"""
+        write_queue = make_queue(batch_ms=60_000)
+
+        with write_transaction(items_db) as conn:
+            conn.execute(INSERT, ("outer",))
+            future = write_queue.submit(INSERT, ("inline",))
+            assert future.result(timeout=1).lastrowid == 2
+            assert item_names(items_db) == []
+
+        assert item_names(items_db) == ["outer", "inline"]
+
+    def test_inline_write_rolls_back_with_transaction(self, items_db, make_queue):
+        """测试外层事务回滚时内联写入一并回滚"""
+        write_queue = make_queue(batch_ms=60_000)
+
+        with pytest.raises(ValueError):
+            with write_transaction(items_db):
+                write_queue.submit(INSERT, ("inline",))
+                raise ValueError("abort")
+
+        assert item_names(items_db) == []
+
+    def test_wait_on_earlier_write_raises(self, items_db, make_queue):
+        """测试在写事务内等待之前排队的写入立即报错，退出事务后可正常等待"""
+        write_queue = make_queue(batch_ms=60_000)
+        future = write_queue.submit(INSERT, ("queued",))
+
+        with write_transaction(items_db):
+            with pytest.raises(RuntimeError):
+                future.result(timeout=10)
+            with pytest.raises(RuntimeError):
+                write_queue.flush(timeout=10)
+
+        assert future.result(timeout=10).lastrowid == 1
+
+    def test_synchronous_inside_write_transaction_raises(self, items_db, make_queue):
+        """测试在写事务内进入 synchronous() 立即报错"""
+        write_queue = make_queue(batch_ms=60_000)
+        write_queue.submit(INSERT, ("queued",))
+
+        with write_transaction(items_db):
+            with pytest.raises(RuntimeError):
+                with write_queue.synchronous():
+                    pass
+
+
+class TestDisabled:
+    """测试关闭写后队列时同步执行"""
+
+    def test_submit_write_runs_synchronously(self, items_db, monkeypatch):
+        """测试关闭时立即执行提交，返回已完成的future，不创建队列"""
+        monkeypatch.setattr(DatabaseConfig, "DB_WRITE_BEHIND_ENABLED", False)
+
+        future = submit_write(INSERT, ("sync",), db_path=items_db)
+        failed = submit_write(INSERT, ("sync",), db_path=items_db)
+        with synchronous_writes(items_db):
+            inline = submit_write(INSERT, ("inside",), db_path=items_db)
+
+        assert future.done() and future.result().lastrowid == 1
+        assert isinstance(failed.exception(), sqlite3.IntegrityError)
+        assert inline.result().lastrowid == 2
+        assert item_names(items_db) == ["sync", "inside"]
+        assert str(items_db) not in get_write_queue_stats()
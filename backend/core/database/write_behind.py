@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Group-commit write-behind queue
+
+execute_write() style helpers run one statement and commit, so every history save
+or usage-counter bump pays its own WAL commit (fsync with synchronous=FULL) and
+takes the write lock on its own; under concurrent editing writers queue up and
+hit "database is locked".
+
+submit_write() hands the statement to a single writer thread per database file.
+The writer drains the queue into one transaction every DB_WRITE_BEHIND_BATCH_MS
+milliseconds or DB_WRITE_BEHIND_BATCH_SIZE statements, whichever comes first, and
+commits once for the whole batch.
+
+- Opt-in: with DB_WRITE_BEHIND_ENABLED off, submit_write() executes and commits
+  synchronously (exactly the old behaviour) and returns a completed future
+- Every call gets a Future resolved after the batch commits with a WriteResult
+  (lastrowid, rowcount); callers that need the new ID call .result(), which
+  closes the batch being collected instead of waiting out the window, so
+  waiting callers batch only with writes already queued behind a commit
+- Statements run in their own SAVEPOINT, so a failing statement only fails its
+  own future; the rest of the batch still commits
+- Fire-and-forget callers may observe their write up to one batch interval later;
+  nobody reads their future's exception, so they attach a done-callback that logs it
+- synchronous_writes() is the bypass for multi-statement transactions (cascade
+  deletes): it commits everything queued so far and pauses the writer while the
+  caller's own transaction runs, so ordering is preserved
+- A thread inside synchronous_writes() or write_transaction() on the same file would
+  deadlock waiting for the writer (which needs the lock that thread holds), so its
+  submit_write() calls run inline on its own transaction instead of being queued;
+  waiting on a write it queued before taking the lock raises RuntimeError, as does
+  entering synchronous_writes() inside write_transaction() (enter it first)
+
+Usage:
+    from backend.core.database.write_behind import submit_write, synchronous_writes
+
+    new_id = submit_write("INSERT INTO hql_history ...", params).result().lastrowid
+    submit_write("UPDATE param_library SET usage_count = ...", params)  # no wait
+
+    with synchronous_writes():
+        conn = get_db_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        ...
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+from backend.core.config import DatabaseConfig, get_db_path
+from backend.core.logging import get_logger
+
+from .routing import in_write_transaction, write_transaction
+
+logger = get_logger(__name__)
+
+
+class WriteResult(NamedTuple):
+    """Outcome of one queued statement"""
+
+    lastrowid: Optional[int]
+    rowcount: int
+
+
+class _Flush(NamedTuple):
+    """Queue marker: resolved once every statement queued before it is committed"""
+
+    future: Future
+
+
+class _WriteFuture(Future):
+    """Future whose result() asks the writer to commit now instead of lingering"""
+
+    def __init__(self, write_queue: "WriteBehindQueue"):
+        super().__init__()
+        self._write_queue = write_queue
+
+    def result(self, timeout=None):
+        if not self.done():
+            self._write_queue._check_can_wait()
+            self._write_queue._nudge()
+        return super().result(timeout)
+
+    def exception(self, timeout=None):
+        if not self.done():
+            self._write_queue._check_can_wait()
+            self._write_queue._nudge()
+        return super().exception(timeout)
+
+
+class _Write(NamedTuple):
+    sql: str
+    params: Sequence[Any]
+    future: Future
+
+
+def _execute_now(db_path: Optional[Path], sql: str, params: Sequence[Any]) -> WriteResult:
+    with write_transaction(db_path) as conn:
+        cursor = conn.execute(sql, params)
+    return WriteResult(cursor.lastrowid, cursor.rowcount)
+
+
+class WriteBehindQueue:
+    """
+    Single writer thread that group-commits queued statements for one database file
+
+    Args:
+        db_path: Database file path
+        batch_ms: Maximum milliseconds a statement waits for companions
+        batch_size: Maximum statements per transaction
+    """
+
+    def __init__(self, db_path: Path, batch_ms: float = 20, batch_size: int = 200):
+        self.db_path = db_path
+        self.batch_ms = batch_ms
+        self.batch_size = batch_size
+        self._queue: "queue.Queue" = queue.Queue()
+        # Held by the writer while it commits a batch and by synchronous_writes()
+        self._commit_lock = threading.RLock()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+        self._pid = os.getpid()
+        # .depth of the calling thread's synchronous() blocks
+        self._local = threading.local()
+        self.stats = {"batches": 0, "statements": 0, "failed": 0, "max_batch": 0, "inline": 0}
+
+    def _ensure_thread(self):
+        # A forked worker inherits the queue object but not the writer thread
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._commit_lock = threading.RLock()
+                self._local = threading.local()
+                self._pid = os.getpid()
+                self._thread = None
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name=f"write-behind:{Path(self.db_path).name}", daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, sql: str, params: Optional[Sequence[Any]] = None) -> Future:
+        """
+        Queue a write statement
+
+        Args:
+            sql: INSERT / UPDATE / DELETE statement
+            params: Statement parameters
+
+        Returns:
+            Future resolving to WriteResult after the batch commits
+        """
+        future: Future = _WriteFuture(self)
+        if self._closed:
+            future.set_exception(RuntimeError("write-behind queue is closed"))
+            return future
+        if self._holds_writer():
+            # The writer thread would wait on the lock this thread holds: run the
+            # statement now, inside the caller's transaction when it has one open
+            try:
+                future.set_result(_execute_now(self.db_path, sql, tuple(params or ())))
+            except Exception as e:
+                future.set_exception(e)
+            self.stats["inline"] += 1
+            return future
+        self._ensure_thread()
+        self._queue.put(_Write(sql, tuple(params or ()), future))
+        return future
+
+    def _holds_writer(self) -> bool:
+        """Whether the calling thread holds what the writer thread needs to commit"""
+        return getattr(self._local, "depth", 0) > 0 or in_write_transaction(self.db_path)
+
+    def _check_can_wait(self) -> None:
+        if self._holds_writer():
+            raise RuntimeError(
+                "waiting on a queued write inside synchronous_writes() or write_transaction() "
+                "on the same database would deadlock"
+            )
+
+    def _nudge(self) -> None:
+        # A flush marker ends the batch being collected without waiting for batch_ms
+        self._queue.put(_Flush(Future()))
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Block until everything queued so far is committed"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._check_can_wait()
+        marker = _Flush(Future())
+        self._queue.put(marker)
+        marker.future.result(timeout)
+
+    @contextmanager
+    def synchronous(self) -> Iterator[None]:
+        """Commit queued writes, then keep the writer paused for the caller's transaction"""
+        depth = getattr(self._local, "depth", 0)
+        if depth == 0:
+            if in_write_transaction(self.db_path):
+                raise RuntimeError(
+                    "synchronous_writes() must be entered before write_transaction(): "
+                    "queued writes cannot commit while this thread holds the write lock"
+                )
+            self.flush()
+        with self._commit_lock:
+            self._local.depth = depth + 1
+            try:
+                yield
+            finally:
+                self._local.depth = depth
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Commit pending writes and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    def _collect(self, first) -> List:
+        """
+        First item plus what follows within batch_ms, up to batch_size
+
+        Everything already queued is taken without waiting; the batch_ms window
+        is only waited out while no flush marker is in the batch, i.e. while no
+        caller is blocked on a result.
+        """
+        batch = [first]
+        flushed = isinstance(first, _Flush)
+        deadline = time.monotonic() + self.batch_ms / 1000
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if flushed or remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if item is None:
+                # close(): finish this batch, then stop
+                self._queue.put(None)
+                break
+            flushed = flushed or isinstance(item, _Flush)
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            writes = [item for item in batch if isinstance(item, _Write)]
+            if writes:
+                with self._commit_lock:
+                    self._commit(writes)
+            for item in batch:
+                if isinstance(item, _Flush):
+                    item.future.set_result(None)
+
+    def _commit(self, writes: List[_Write]):
+        results: List[Any] = []
+        try:
+            with write_transaction(self.db_path) as conn:
+                for write in writes:
+                    conn.execute("SAVEPOINT write_behind")
+                    try:
+                        cursor = conn.execute(write.sql, write.params)
+                        results.append(WriteResult(cursor.lastrowid, cursor.rowcount))
+                        conn.execute("RELEASE write_behind")
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO write_behind")
+                        conn.execute("RELEASE write_behind")
+                        results.append(e)
+        except Exception as e:
+            logger.error(f"Write-behind batch of {len(writes)} statements failed: {e}")
+            self.stats["failed"] += len(writes)
+            for write in writes:
+                write.future.set_exception(e)
+            return
+
+        self.stats["batches"] += 1
+        self.stats["statements"] += len(writes)
+        self.stats["max_batch"] = max(self.stats["max_batch"], len(writes))
+        for write, result in zip(writes, results):
+            if isinstance(result, Exception):
+                self.stats["failed"] += 1
+                write.future.set_exception(result)
+            else:
+                write.future.set_result(result)
+
+
+# ============================================================================
+# Module-level queue registry
+# ============================================================================
+
+_queues: Dict[str, WriteBehindQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def get_write_queue(db_path: Optional[Path] = None) -> WriteBehindQueue:
+    """
+    Get (or lazily create) the write-behind queue for a database file
+
+    Args:
+        db_path: Optional database path. If not provided, uses get_db_path()
+
+    Returns:
+        WriteBehindQueue
+    """
+    key = str(db_path or get_db_path())
+    write_queue = _queues.get(key)
+    if write_queue is not None:
+        return write_queue
+    with _queues_lock:
+        write_queue = _queues.get(key)
+        if write_queue is None:
+            write_queue = WriteBehindQueue(
+                Path(key),
+                batch_ms=DatabaseConfig.DB_WRITE_BEHIND_BATCH_MS,
+                batch_size=DatabaseConfig.DB_WRITE_BEHIND_BATCH_SIZE,
+            )
+            _queues[key] = write_queue
+    return write_queue
+
+
+def submit_write(
+    sql: str, params: Optional[Sequence[Any]] = None, db_path: Optional[Path] = None
+) -> Future:
+    """
+    Queue a small write for group commit (synchronous when write-behind is disabled)
+
+    Args:
+        sql: INSERT / UPDATE / DELETE statement
+        params: Statement parameters
+        db_path: Optional database path. If not provided, uses get_db_path()
+
+    Returns:
+        Future resolving to WriteResult(lastrowid, rowcount)
+    """
+    if not DatabaseConfig.DB_WRITE_BEHIND_ENABLED:
+        future: Future = Future()
+        try:
+            future.set_result(_execute_now(db_path, sql, tuple(params or ())))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    return get_write_queue(db_path).submit(sql, params)
+
+
+@contextmanager
+def synchronous_writes(db_path: Optional[Path] = None) -> Iterator[None]:
+    """
+    Bypass for transactional paths: flush queued writes and pause the writer
+
+    Args:
+        db_path: Optional database path. If not provided, uses get_db_path()
+    """
+    key = str(db_path or get_db_path())
+    write_queue = _queues.get(key)
+    if write_queue is None:
+        yield
+        return
+    with write_queue.synchronous():
+        yield
+
+
+def flush_writes(timeout: Optional[float] = None) -> None:
+    """Block until every queue has committed what was submitted so far"""
+    with _queues_lock:
+        queues = list(_queues.values())
+    for write_queue in queues:
+        write_queue.flush(timeout)
+
+
+def get_write_queue_stats() -> Dict[str, Dict[str, int]]:
+    """Batch statistics of every queue, keyed by database path"""
+    with _queues_lock:
+        queues = dict(_queues)
+    return {path: dict(write_queue.stats) for path, write_queue in queues.items()}
+
+
+@atexit.register
+def _close_queues():
+    with _queues_lock:
+        queues = list(_queues.values())
+    for write_queue in queues:
+        write_queue.close()
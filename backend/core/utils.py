@@ -27,6 +27,7 @@ from contextlib import contextmanager
 from functools import wraps
 
 from backend.core.database import get_db_connection
+from backend.core.database.routing import get_read_connection, retry_on_busy, write_transaction
 from backend.core.logging import get_logger
 from backend.core.config import ODSDatabase, CommonParamConfig
 
@@ -809,12 +810,16 @@ def fetch_all_as_dict(query: str, params: Tuple = None) -> List[Dict[str, Any]]:
     Example:
         games = fetch_all_as_dict('SELECT * FROM games WHERE id = ?', (game_id,))
     """
-    conn = get_db_connection()
-    try:
-        rows = conn.execute(query, params or ()).fetchall()
-        return [dict(row) for row in rows]
-    finally:
-        conn.close()
+
+    def run():
+        conn = get_read_connection()
+        try:
+            rows = conn.execute(query, params or ()).fetchall()
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
+
+    return retry_on_busy(run)
 
 
 def fetch_one_as_dict(query: str, params: Tuple = None) -> Optional[Dict[str, Any]]:
@@ -831,12 +836,16 @@ def fetch_one_as_dict(query: str, params: Tuple = None) -> Optional[Dict[str, An
     Example:
         game = fetch_one_as_dict('SELECT * FROM games WHERE id = ?', (game_id,))
     """
-    conn = get_db_connection()
-    try:
-        row = conn.execute(query, params or ()).fetchone()
-        return dict(row) if row else None
-    finally:
-        conn.close()
+
+    def run():
+        conn = get_read_connection()
+        try:
+            row = conn.execute(query, params or ()).fetchone()
+            return dict(row) if row else None
+        finally:
+            conn.close()
+
+    return retry_on_busy(run)
 
 
 def execute_write(query: str, params: Tuple = None, return_last_id: bool = False) -> int:
@@ -855,13 +864,9 @@ def execute_write(query: str, params: Tuple = None, return_last_id: bool = False
         execute_write('INSERT INTO games (name) VALUES (?)', ('Game1',))
         last_id = execute_write('INSERT INTO games (name) VALUES (?)', ('Game1',), return_last_id=True)
     """
-    conn = get_db_connection()
-    try:
+    with write_transaction() as conn:
         cursor = conn.execute(query, params or ())
-        conn.commit()
-        return cursor.lastrowid if return_last_id else cursor.rowcount
-    finally:
-        conn.close()
+    return cursor.lastrowid if return_last_id else cursor.rowcount
 
 
 def execute_transaction(operations: List[Tuple[str, Tuple]]) -> int:
@@ -880,19 +885,12 @@ def execute_transaction(operations: List[Tuple[str, Tuple]]) -> int:
             ('INSERT INTO logs (user_id, action) VALUES (?, ?)', (1, 'bonus'))
         ])
     """
-    conn = get_db_connection()
-    try:
-        total_affected = 0
+    total_affected = 0
+    with write_transaction() as conn:
         for query, params in operations:
             cursor = conn.execute(query, params or ())
             total_affected += cursor.rowcount
-        conn.commit()
-        return total_affected
-    except Exception:
-        conn.rollback()
-        raise
-    finally:
-        conn.close()
+    return total_affected
 
 
 def get_or_401(
@@ -30,7 +30,7 @@
 
 from typing import Any, Optional, Dict, List, Tuple, Union
 from datetime import datetime
-from backend.core.database import get_db_connection
+from backend.core.database.routing import get_read_connection, retry_on_busy
 from backend.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -462,16 +462,23 @@ def fetch_all_as_dict(query: str, params: Optional[Tuple] = None) -> List[Dict[s
         >>> for event in events:
         ...     print(event['event_name'])
     """
+
+    def run():
+        # 只读连接池（query_only），数据库繁忙时按退避策略重试
+        conn = get_read_connection()
+        try:
+            conn.row_factory = None  # 使用默认的行工厂（归还连接池时恢复）
+            cursor = conn.cursor()
+            cursor.execute(query, params or ())
+            return cursor.fetchall(), cursor.description
+        finally:
+            conn.close()
+
     try:
-        conn = get_db_connection()
-        conn.row_factory = None  # 使用默认的行工厂
-        cursor = conn.cursor()
-        cursor.execute(query, params or ())
-        rows = cursor.fetchall()
-        conn.close()
+        rows, description = retry_on_busy(run)
 
         # 转换为字典列表
-        columns = [desc[0] for desc in cursor.description] if cursor.description else []
+        columns = [desc[0] for desc in description] if description else []
         return [dict(zip(columns, row)) for row in rows]
 
     except Exception as e:
@@ -495,16 +502,22 @@ def fetch_one_as_dict(query: str, params: Optional[Tuple] = None) -> Optional[Di
         >>> if event:
         ...     print(event['event_name'])
     """
+
+    def run():
+        conn = get_read_connection()
+        try:
+            conn.row_factory = None
+            cursor = conn.cursor()
+            cursor.execute(query, params or ())
+            return cursor.fetchone(), cursor.description
+        finally:
+            conn.close()
+
     try:
-        conn = get_db_connection()
-        conn.row_factory = None
-        cursor = conn.cursor()
-        cursor.execute(query, params or ())
-        row = cursor.fetchone()
-        conn.close()
+        row, description = retry_on_busy(run)
 
         if row:
-            columns = [desc[0] for desc in cursor.description] if cursor.description else []
+            columns = [desc[0] for desc in description] if description else []
             return dict(zip(columns, row))
 
         return None
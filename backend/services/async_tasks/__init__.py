@@ -0,0 +1,55 @@
+"""
+Async Tasks Service Module
+
+Background job queue backed by the async_tasks table, executed by a local worker
+thread pool, so long-running generation no longer ties up a request thread.
+
+Available endpoints:
+- POST /api/async-tasks/dwd-bundle - Build DDL + DML + view HQL for every event of a game
+- GET /api/async-tasks - List tasks
+- GET /api/async-tasks/<task_id> - Task status and progress
+- POST /api/async-tasks/<task_id>/cancel - Cancel a task
+- GET /api/async-tasks/<task_id>/bundle/<filename> - Download a file of a finished bundle
+"""
+
+from flask import Blueprint
+
+from backend.core.config import AsyncTaskConfig
+
+from .task_queue import (
+    TaskCancelled,
+    TaskContext,
+    cancel_task,
+    get_task,
+    list_tasks,
+    register_task_type,
+    start_workers,
+    submit_task,
+)
+from . import dwd_bundle
+
+# Create the async tasks blueprint
+async_task_bp = Blueprint("async_tasks", __name__, url_prefix="/api/async-tasks")
+
+
+@async_task_bp.record_once
+def _start_workers_on_register(state):
+    # Workers start with the app so tasks left running by a crashed process resume
+    if AsyncTaskConfig.AUTOSTART:
+        start_workers()
+
+
+# Import routes to register them with the blueprint
+from . import routes  # noqa: E402
+
+__all__ = [
+    "async_task_bp",
+    "TaskCancelled",
+    "TaskContext",
+    "cancel_task",
+    "get_task",
+    "list_tasks",
+    "register_task_type",
+    "start_workers",
+    "submit_task",
+]
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+整游戏DWD构建任务（task_type: dwd_bundle）
+
+为一个游戏的每个事件生成 DDL（DDLGenerator.generate_create_table）、
+DML（DMLBuilderFactory.create_etl_dml）和视图HQL（HQLGenerator），流式写入磁盘上的bundle目录:
+
+    {AsyncTaskConfig.BUNDLE_DIR}/{task_id}/
+        ddl.sql         CREATE TABLE 语句
+        dml.sql         INSERT OVERWRITE 语句
+        views.hql       视图查询
+        errors.ndjson   生成失败的事件（每行一个JSON）
+        manifest.json   完成后写入：游戏、事件数、失败数、各文件大小
+
+- 内存有界：按事件ID分页（AsyncTaskConfig.PAGE_SIZE），每页只加载该页的事件和参数，
+  生成结果按页写入文件
+- 检查点：每页先在内存中生成，确认任务仍属于本worker（TaskContext.ensure_owned）后
+  再写入，flush + fsync，然后保存 last_event_id 和各文件长度
+- 恢复：各文件截断到检查点记录的长度（丢弃崩溃前未保存检查点的半页输出），
+  从 last_event_id 之后继续，每个事件在bundle中恰好出现一次
+- 取消：在页之间生效，删除bundle目录
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from backend.core.common import generate_dwd_table_names
+from backend.core.config import AsyncTaskConfig
+from backend.core.logging import get_logger
+from backend.services.hql.adapters.v1_to_v2_transformer import V1ToV2Transformer
+from backend.services.hql.core.ddl_generator import DDLGenerator
+from backend.services.hql.core.dml_generator import DMLBuilderFactory
+from backend.services.hql.core.generator import HQLGenerator
+from backend.services.hql.models.event import Event, Field
+
+from .task_queue import TaskCancelled, TaskContext, _fetch, register_task_type
+
+logger = get_logger(__name__)
+
+TASK_TYPE = "dwd_bundle"
+
+# 按写入顺序排列；检查点记录的是这些文件的长度
+BUNDLE_FILES = ("ddl.sql", "dml.sql", "views.hql", "errors.ndjson")
+MANIFEST_FILE = "manifest.json"
+
+_SEPARATOR = "-- " + "=" * 76
+
+
+def get_bundle_dir(task_id: str) -> Path:
+    """
+    任务的bundle目录
+
+    Args:
+        task_id: 任务ID
+
+    Returns:
+        Path: bundle目录路径
+    """
+    return Path(AsyncTaskConfig.BUNDLE_DIR) / task_id
+
+
+class _BundleWriter:
+    """以追加方式写bundle文件，打开时截断到检查点记录的长度"""
+
+    def __init__(self, bundle_dir: Path, offsets: Dict[str, int]):
+        bundle_dir.mkdir(parents=True, exist_ok=True)
+        self._files = {}
+        for name in BUNDLE_FILES:
+            handle = open(bundle_dir / name, "ab")
+            handle.truncate(offsets.get(name, 0))
+            self._files[name] = handle
+
+    def write(self, name: str, text: str) -> None:
+        self._files[name].write(text.encode("utf-8"))
+
+    def sync(self) -> Dict[str, int]:
+        """落盘，返回各文件当前长度"""
+        offsets = {}
+        for name, handle in self._files.items():
+            handle.flush()
+            os.fsync(handle.fileno())
+            offsets[name] = handle.tell()
+        return offsets
+
+    def close(self) -> None:
+        for handle in self._files.values():
+            handle.close()
+
+    def __enter__(self) -> "_BundleWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _fetch_event_page(game_gid: int, after_id: int, ctx: TaskContext) -> List[Dict[str, Any]]:
+    """按ID分页读取事件（键集分页，每页代价与页码无关）"""
+    rows = _fetch(
+        """
+        SELECT id, event_name, event_name_cn
+        FROM log_events
+        WHERE game_gid = ? AND id > ?
+        ORDER BY id
+        LIMIT ?
+        """,
+        (game_gid, after_id, AsyncTaskConfig.PAGE_SIZE),
+        ctx.db_path,
+    )
+    return [dict(row) for row in rows]
+
+
+def _fetch_page_params(event_ids: List[int], ctx: TaskContext) -> Dict[int, List[Dict[str, Any]]]:
+    """一次查询读取一页事件的活跃参数"""
+    placeholders = ",".join("?" for _ in event_ids)
+    rows = _fetch(
+        f"""
+        SELECT event_id, param_name, json_path
+        FROM event_params
+        WHERE event_id IN ({placeholders}) AND is_active = 1
+        ORDER BY event_id, id
+        """,
+        tuple(event_ids),
+        ctx.db_path,
+    )
+    params_by_event: Dict[int, List[Dict[str, Any]]] = {}
+    for row in rows:
+        params_by_event.setdefault(row["event_id"], []).append(dict(row))
+    return params_by_event
+
+
+def _event_columns(params: List[Dict[str, Any]]) -> List[Field]:
+    """DWD表字段：标准基础字段（ds为分区字段，不在列中）+ 事件参数"""
+    base_names = [name for name in V1ToV2Transformer.STANDARD_BASE_FIELDS if name != "ds"]
+    columns = [Field(name=name, type="base") for name in base_names]
+    for param in params:
+        name = param["param_name"]
+        if name in V1ToV2Transformer.STANDARD_BASE_FIELDS:
+            continue
+        columns.append(
+            Field(
+                name=name,
+                type="param",
+                json_path=param.get("json_path") or f"$.{name}",
+                alias=name,
+            )
+        )
+    return columns
+
+
+def _build_event(
+    generators: Tuple[DDLGenerator, HQLGenerator],
+    game: Dict[str, Any],
+    event: Dict[str, Any],
+    params: List[Dict[str, Any]],
+    partition_ds: str,
+) -> Tuple[str, str, str]:
+    """生成一个事件的 (DDL, DML, 视图HQL)"""
+    ddl_generator, hql_generator = generators
+    tables = generate_dwd_table_names(game, event["event_name"])
+    source = Event(name=event["event_name"], table_name=tables["source_table"])
+    columns = _event_columns(params)
+
+    ddl = ddl_generator.generate_create_table(
+        tables["target_table"], columns, {"comment": event.get("event_name_cn")}
+    )
+    source_query = hql_generator.generate([source], columns, [], include_comments=False)
+    dml = DMLBuilderFactory.create_etl_dml(
+        dwd_prefix=tables["dwd_prefix"],
+        game_gid=game["gid"],
+        event_name=event["event_name"].replace(".", "_"),
+        source_query=source_query,
+        partition_ds=partition_ds,
+    )
+    view = hql_generator.generate([source], [Field(name="ds", type="base")] + columns, [])
+    return ddl, dml, view
+
+
+def _build_page(
+    generators: Tuple[DDLGenerator, HQLGenerator],
+    game: Dict[str, Any],
+    events: List[Dict[str, Any]],
+    params_by_event: Dict[int, List[Dict[str, Any]]],
+    partition_ds: str,
+) -> Tuple[List[Tuple[str, str]], int]:
+    """生成一页事件的输出，返回 ([(文件名, 文本)...], 失败数)"""
+    chunks = []
+    errors = 0
+    for event in events:
+        try:
+            ddl, dml, view = _build_event(
+                generators, game, event, params_by_event.get(event["id"], []), partition_ds
+            )
+        except Exception as e:
+            errors += 1
+            error = {
+                "event_id": event["id"],
+                "event_name": event["event_name"],
+                "error": str(e),
+                "error_type": type(e).__name__,
+            }
+            chunks.append(("errors.ndjson", json.dumps(error, ensure_ascii=False) + "\n"))
+        else:
+            header = f"{_SEPARATOR}\n-- {event['event_name']} (id={event['id']})\n"
+            chunks.append(("ddl.sql", f"{header}{ddl}\n\n"))
+            chunks.append(("dml.sql", f"{header}{dml.rstrip(';')};\n\n"))
+            chunks.append(("views.hql", f"{header}{view};\n\n"))
+    return chunks, errors
+
+
+@register_task_type(TASK_TYPE)
+def build_dwd_bundle(ctx: TaskContext) -> Dict[str, Any]:
+    """
+    生成整个游戏的DWD bundle
+
+    Args:
+        ctx: 任务上下文，params:
+            - game_gid: 游戏GID
+            - partition_ds: DML分区值（默认 ${ds}）
+
+    Returns:
+        Dict: bundle目录、事件数、失败数、各文件大小
+    """
+    game_gid = int(ctx.params["game_gid"])
+    partition_ds = ctx.params.get("partition_ds") or "${ds}"
+
+    games = _fetch("SELECT gid, name, ods_db FROM games WHERE gid = ?", (game_gid,), ctx.db_path)
+    if not games:
+        raise ValueError(f"Game not found: gid={game_gid}")
+    game = dict(games[0])
+    total = _fetch(
+        "SELECT COUNT(*) AS total FROM log_events WHERE game_gid = ?", (game_gid,), ctx.db_path
+    )[0]["total"]
+
+    checkpoint = ctx.checkpoint or {"last_event_id": 0, "done": 0, "errors": 0, "offsets": {}}
+    if ctx.checkpoint:
+        logger.info(
+            f"Resuming DWD bundle {ctx.task_id} after event {checkpoint['last_event_id']} "
+            f"({checkpoint['done']}/{total} done)"
+        )
+
+    bundle_dir = get_bundle_dir(ctx.task_id)
+    generators = (DDLGenerator(), HQLGenerator())
+    try:
+        # 打开时会截断文件：确认没有被其他worker接管
+        ctx.ensure_owned()
+        with _BundleWriter(bundle_dir, checkpoint["offsets"]) as writer:
+            while True:
+                events = _fetch_event_page(game_gid, checkpoint["last_event_id"], ctx)
+                if not events:
+                    break
+                params_by_event = _fetch_page_params([event["id"] for event in events], ctx)
+
+                chunks, errors = _build_page(
+                    generators, game, events, params_by_event, partition_ds
+                )
+                ctx.ensure_owned()
+                for name, text in chunks:
+                    writer.write(name, text)
+
+                checkpoint["done"] += len(events)
+                checkpoint["errors"] += errors
+                checkpoint["last_event_id"] = events[-1]["id"]
+                checkpoint["offsets"] = writer.sync()
+                # 100 留给写完 manifest 之后
+                ctx.report(min(99, checkpoint["done"] * 100 // max(total, 1)), checkpoint)
+    except TaskCancelled:
+        shutil.rmtree(bundle_dir, ignore_errors=True)
+        raise
+
+    files = {name: (bundle_dir / name).stat().st_size for name in BUNDLE_FILES}
+    manifest = {
+        "task_id": ctx.task_id,
+        "game_gid": game_gid,
+        "game_name": game["name"],
+        "partition_ds": partition_ds,
+        "events": checkpoint["done"],
+        "errors": checkpoint["errors"],
+        "files": files,
+        "generated_at": datetime.now().isoformat(),
+    }
+    manifest_tmp = bundle_dir / f"{MANIFEST_FILE}.tmp"
+    manifest_tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(manifest_tmp, bundle_dir / MANIFEST_FILE)
+
+    logger.info(
+        f"DWD bundle {ctx.task_id} for game {game_gid}: "
+        f"{checkpoint['done']} events, {checkpoint['errors']} errors"
+    )
+    return {
+        "bundle_dir": str(bundle_dir),
+        "game_gid": game_gid,
+        "events": checkpoint["done"],
+        "errors": checkpoint["errors"],
+        "files": files,
+    }
@@ -0,0 +1,148 @@
+"""
+Async Tasks Routes
+
+提交、查询、取消后台任务，下载已完成的DWD bundle文件。
+"""
+
+import re
+
+from flask import request, send_from_directory
+
+from backend.core.logging import get_logger
+from backend.core.utils import (
+    fetch_one_as_dict,
+    json_error_response,
+    json_success_response,
+    validate_json_request,
+)
+
+from . import async_task_bp
+from .dwd_bundle import BUNDLE_FILES, MANIFEST_FILE, TASK_TYPE, get_bundle_dir
+from .task_queue import STATUS_COMPLETED, cancel_task, get_task, list_tasks, submit_task
+
+logger = get_logger(__name__)
+
+# 分区值：YYYYMMDD 或 Hive变量（如 ${ds}、${bizdate}）
+_PARTITION_DS_PATTERN = re.compile(r"^(\d{8}|\$\{\w+\})$")
+
+
+@async_task_bp.route("/dwd-bundle", methods=["POST"])
+def api_submit_dwd_bundle():
+    """
+    API: 提交整游戏DWD构建任务
+
+    Request Body:
+        {
+            "game_gid": 10000147,
+            "partition_ds": "${ds}"  # 可选，DML分区值
+        }
+
+    Returns:
+        202，data: {"task_id": "..."}；通过 GET /api/async-tasks/<task_id> 查询进度
+    """
+    try:
+        is_valid, data, error = validate_json_request(["game_gid"])
+        if not is_valid:
+            return json_error_response(error, status_code=400)
+
+        try:
+            game_gid = int(data["game_gid"])
+        except (ValueError, TypeError):
+            return json_error_response("game_gid must be an integer", status_code=400)
+
+        partition_ds = data.get("partition_ds") or "${ds}"
+        if not _PARTITION_DS_PATTERN.match(str(partition_ds)):
+            return json_error_response(
+                "partition_ds must be YYYYMMDD or a Hive variable like ${ds}", status_code=400
+            )
+
+        if not fetch_one_as_dict("SELECT id FROM games WHERE gid = ?", (game_gid,)):
+            return json_error_response(f"Game not found: gid={game_gid}", status_code=404)
+
+        task_id = submit_task(
+            TASK_TYPE,
+            {"game_gid": game_gid, "partition_ds": partition_ds},
+            created_by=data.get("created_by"),
+        )
+        response, _ = json_success_response(
+            data={"task_id": task_id, "status_url": f"/api/async-tasks/{task_id}"},
+            message="DWD bundle task submitted",
+        )
+        return response, 202
+
+    except Exception as e:
+        logger.error(f"Error submitting DWD bundle task: {e}")
+        return json_error_response(f"Failed to submit task: {str(e)}", status_code=500)
+
+
+@async_task_bp.route("", methods=["GET"])
+def api_list_tasks():
+    """
+    API: 列出任务
+
+    Query Parameters:
+        status: 按状态过滤（pending/running/cancelling/completed/failed/cancelled）
+        task_type: 按任务类型过滤
+        limit: 最多返回条数（默认50，最大500）
+    """
+    try:
+        limit = min(max(request.args.get("limit", 50, type=int), 1), 500)
+        tasks = list_tasks(
+            status=request.args.get("status"),
+            task_type=request.args.get("task_type"),
+            limit=limit,
+        )
+        return json_success_response(data=tasks)
+
+    except Exception as e:
+        logger.error(f"Error listing async tasks: {e}")
+        return json_error_response(f"Failed to list tasks: {str(e)}", status_code=500)
+
+
+@async_task_bp.route("/<task_id>", methods=["GET"])
+def api_get_task(task_id):
+    """API: 查询任务状态、进度和结果"""
+    try:
+        task = get_task(task_id)
+        if task is None:
+            return json_error_response(f"Task not found: {task_id}", status_code=404)
+        return json_success_response(data=task)
+
+    except Exception as e:
+        logger.error(f"Error getting async task {task_id}: {e}")
+        return json_error_response(f"Failed to get task: {str(e)}", status_code=500)
+
+
+@async_task_bp.route("/<task_id>/cancel", methods=["POST"])
+def api_cancel_task(task_id):
+    """
+    API: 取消任务
+
+    pending 任务立即取消；running 任务在当前步骤完成后停止（状态先变为 cancelling）
+    """
+    try:
+        status = cancel_task(task_id)
+        if status is None:
+            return json_error_response(f"Task not found: {task_id}", status_code=404)
+        return json_success_response(data={"task_id": task_id, "status": status})
+
+    except Exception as e:
+        logger.error(f"Error cancelling async task {task_id}: {e}")
+        return json_error_response(f"Failed to cancel task: {str(e)}", status_code=500)
+
+
+@async_task_bp.route("/<task_id>/bundle/<filename>", methods=["GET"])
+def api_download_bundle_file(task_id, filename):
+    """API: 下载已完成bundle中的文件（ddl.sql / dml.sql / views.hql / errors.ndjson / manifest.json）"""
+    if filename not in BUNDLE_FILES + (MANIFEST_FILE,):
+        return json_error_response(f"Unknown bundle file: {filename}", status_code=404)
+
+    task = get_task(task_id)
+    if task is None or task["task_type"] != TASK_TYPE:
+        return json_error_response(f"Bundle not found: {task_id}", status_code=404)
+    if task["status"] != STATUS_COMPLETED:
+        return json_error_response(
+            f"Bundle is not ready (status: {task['status']})", status_code=409
+        )
+
+    return send_from_directory(str(get_bundle_dir(task_id)), filename, as_attachment=True)
@@ -0,0 +1,572 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步任务队列
+
+以 async_tasks 表为队列（迁移V16建表，V20增加 params/checkpoint/worker_id/heartbeat_at），
+由本进程的worker线程池执行，长任务不再占用请求线程。
+
+- submit_task(): 写入一条 pending 任务并唤醒worker，立即返回 task_id
+- worker 在写事务（BEGIN IMMEDIATE）中认领最早的 pending 任务，多个进程共享同一张表
+  也不会重复执行
+- 任务处理函数通过 TaskContext.report() 保存进度和检查点；同一事务内检查
+  是否已请求取消，已请求时抛出 TaskCancelled
+- 心跳：任务执行期间由单独的线程每 STALE_SECONDS/3 秒刷新一次，与两次 report()
+  之间的耗时无关；写输出前调用 TaskContext.ensure_owned()，任务已被其他worker
+  接管时停止，不会两个worker同时写同一份输出
+- 恢复：心跳超过 AsyncTaskConfig.STALE_SECONDS 的 running 任务（worker进程崩溃或被杀）
+  重新置为 pending，下一个worker带着最后保存的检查点继续执行
+- cancel_task(): pending 任务直接取消；running 任务标记为 cancelling，由处理函数在
+  下一次 report() 时停止
+
+状态流转:
+    pending → running → completed / failed / cancelled
+                      ↘ cancelling → cancelled
+    running（心跳超时）→ pending
+
+Usage:
+    from backend.services.async_tasks import register_task_type, submit_task
+
+    @register_task_type("my_job")
+    def my_job(ctx):
+        for i, item in enumerate(items):
+            ...
+            ctx.report(progress=i * 100 // len(items), checkpoint={"next": i + 1})
+        return {"count": len(items)}
+
+    task_id = submit_task("my_job", {"game_gid": 10000147})
+"""
+
+import atexit
+import json
+import os
+import socket
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.core.config import AsyncTaskConfig, get_db_path
+from backend.core.database.routing import get_read_connection, retry_on_busy, write_transaction
+from backend.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_CANCELLING = "cancelling"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+
+FINAL_STATUSES = (STATUS_COMPLETED, STATUS_FAILED, STATUS_CANCELLED)
+
+_TASK_COLUMNS = (
+    "task_id, task_type, status, progress, params, result, error_message, created_by, "
+    "created_at, started_at, completed_at"
+)
+
+_handlers: Dict[str, Callable[["TaskContext"], Any]] = {}
+
+
+class TaskCancelled(Exception):
+    """任务已被请求取消（由 TaskContext.report() 抛出）"""
+
+
+class _OwnershipLost(Exception):
+    """任务已被其他worker接管（本worker心跳超时后被重新排队）"""
+
+
+def register_task_type(task_type: str, handler: Optional[Callable] = None):
+    """
+    注册任务类型的处理函数（可作为装饰器使用）
+
+    Args:
+        task_type: 任务类型名
+        handler: 处理函数，接收 TaskContext，返回可JSON序列化的结果
+
+    Returns:
+        handler 本身（装饰器用法）
+    """
+    if handler is None:
+        return lambda fn: register_task_type(task_type, fn)
+    _handlers[task_type] = handler
+    return handler
+
+
+class TaskContext:
+    """
+    传给任务处理函数的上下文
+
+    Attributes:
+        task_id: 任务ID
+        task_type: 任务类型
+        params: 提交时的参数
+        checkpoint: 上次保存的检查点（首次执行为None，恢复执行时为最后一次 report() 的值）
+    """
+
+    def __init__(self, task: Dict[str, Any], worker_id: str, db_path: Path):
+        self.task_id = task["task_id"]
+        self.task_type = task["task_type"]
+        self.params = json.loads(task["params"]) if task["params"] else {}
+        self.checkpoint = json.loads(task["checkpoint"]) if task["checkpoint"] else None
+        self.worker_id = worker_id
+        self.db_path = db_path
+        # 心跳线程发现任务已不属于本worker时设置
+        self.ownership_lost = threading.Event()
+
+    def ensure_owned(self) -> None:
+        """
+        确认任务仍由本worker执行（写输出之前调用）
+
+        Raises:
+            _OwnershipLost: 任务已被重新排队或由其他worker接管
+        """
+        if not self.ownership_lost.is_set():
+            rows = _fetch(
+                "SELECT worker_id FROM async_tasks WHERE task_id = ?", (self.task_id,), self.db_path
+            )
+            if rows and rows[0]["worker_id"] == self.worker_id:
+                return
+            self.ownership_lost.set()
+        raise _OwnershipLost(self.task_id)
+
+    def report(self, progress: int, checkpoint: Optional[Dict[str, Any]] = None) -> None:
+        """
+        保存进度和检查点，并刷新心跳
+
+        检查点应在对应的输出落盘之后保存：恢复执行时从这里继续。
+
+        Args:
+            progress: 进度（0-100）
+            checkpoint: 恢复执行所需的状态（可JSON序列化）
+
+        Raises:
+            TaskCancelled: 任务已被请求取消
+        """
+        with write_transaction(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT status, worker_id FROM async_tasks WHERE task_id = ?", (self.task_id,)
+            ).fetchone()
+            if row is None or row["worker_id"] != self.worker_id:
+                raise _OwnershipLost(self.task_id)
+            if row["status"] == STATUS_CANCELLING:
+                raise TaskCancelled(self.task_id)
+            conn.execute(
+                """
+                UPDATE async_tasks
+                SET progress = ?, checkpoint = ?, heartbeat_at = CURRENT_TIMESTAMP
+                WHERE task_id = ?
+                """,
+                (
+                    max(0, min(100, int(progress))),
+                    json.dumps(checkpoint) if checkpoint is not None else None,
+                    self.task_id,
+                ),
+            )
+        if checkpoint is not None:
+            self.checkpoint = checkpoint
+
+
+# ============================================================================
+# 任务表操作
+# ============================================================================
+
+
+def _row_to_task(row) -> Dict[str, Any]:
+    task = dict(row)
+    for key in ("params", "result"):
+        if task.get(key):
+            try:
+                task[key] = json.loads(task[key])
+            except ValueError:
+                pass
+    return task
+
+
+def _fetch(sql: str, params: tuple, db_path: Optional[Path]) -> List[Any]:
+    def run():
+        conn = get_read_connection(db_path)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    return retry_on_busy(run)
+
+
+def submit_task(
+    task_type: str,
+    params: Optional[Dict[str, Any]] = None,
+    created_by: Optional[str] = None,
+    db_path: Optional[Path] = None,
+) -> str:
+    """
+    提交任务
+
+    Args:
+        task_type: 已注册的任务类型
+        params: 任务参数（可JSON序列化）
+        created_by: 提交者（可选）
+        db_path: 数据库路径（默认 get_db_path()）
+
+    Returns:
+        str: 任务ID
+
+    Raises:
+        ValueError: 任务类型未注册
+    """
+    if task_type not in _handlers:
+        raise ValueError(f"Unknown task type: {task_type}")
+
+    task_id = uuid.uuid4().hex
+    with write_transaction(db_path) as conn:
+        conn.execute(
+            """
+            INSERT INTO async_tasks (task_id, task_type, status, progress, params, created_by)
+            VALUES (?, ?, ?, 0, ?, ?)
+            """,
+            (task_id, task_type, STATUS_PENDING, json.dumps(params or {}), created_by),
+        )
+    logger.info(f"Submitted async task {task_id} ({task_type})")
+
+    pool = get_worker_pool(db_path)
+    pool.start()
+    pool.wake()
+    return task_id
+
+
+def get_task(task_id: str, db_path: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    """
+    查询任务状态
+
+    Args:
+        task_id: 任务ID
+        db_path: 数据库路径（默认 get_db_path()）
+
+    Returns:
+        Dict: 任务信息（params/result 已解析为对象），不存在时返回None
+    """
+    rows = _fetch(f"SELECT {_TASK_COLUMNS} FROM async_tasks WHERE task_id = ?", (task_id,), db_path)
+    return _row_to_task(rows[0]) if rows else None
+
+
+def list_tasks(
+    status: Optional[str] = None,
+    task_type: Optional[str] = None,
+    limit: int = 50,
+    db_path: Optional[Path] = None,
+) -> List[Dict[str, Any]]:
+    """
+    按创建时间倒序列出任务
+
+    Args:
+        status: 按状态过滤（可选）
+        task_type: 按任务类型过滤（可选）
+        limit: 最多返回条数
+        db_path: 数据库路径（默认 get_db_path()）
+
+    Returns:
+        List[Dict]: 任务列表
+    """
+    clauses, params = [], []
+    if status:
+        clauses.append("status = ?")
+        params.append(status)
+    if task_type:
+        clauses.append("task_type = ?")
+        params.append(task_type)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    rows = _fetch(
+        f"SELECT {_TASK_COLUMNS} FROM async_tasks {where} ORDER BY id DESC LIMIT ?",
+        (*params, limit),
+        db_path,
+    )
+    return [_row_to_task(row) for row in rows]
+
+
+def cancel_task(task_id: str, db_path: Optional[Path] = None) -> Optional[str]:
+    """
+    请求取消任务
+
+    pending 任务立即取消；running 任务标记为 cancelling，处理函数在下一次
+    report() 时停止；已结束的任务不变。
+
+    Args:
+        task_id: 任务ID
+        db_path: 数据库路径（默认 get_db_path()）
+
+    Returns:
+        str: 取消后的状态，任务不存在时返回None
+    """
+    with write_transaction(db_path) as conn:
+        row = conn.execute(
+            "SELECT status FROM async_tasks WHERE task_id = ?", (task_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        status = row["status"]
+        if status == STATUS_PENDING:
+            status = STATUS_CANCELLED
+            conn.execute(
+                """
+                UPDATE async_tasks SET status = ?, completed_at = CURRENT_TIMESTAMP
+                WHERE task_id = ?
+                """,
+                (status, task_id),
+            )
+        elif status == STATUS_RUNNING:
+            status = STATUS_CANCELLING
+            conn.execute("UPDATE async_tasks SET status = ? WHERE task_id = ?", (status, task_id))
+    return status
+
+
+# ============================================================================
+# Worker线程池
+# ============================================================================
+
+
+class _WorkerPool:
+    """一个数据库文件的本地worker线程池"""
+
+    def __init__(self, db_path: Path, size: int):
+        self.db_path = db_path
+        self.size = max(1, size)
+        self._threads: List[threading.Thread] = []
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def start(self) -> None:
+        """启动worker线程（已启动时不做任何事；fork后的子进程中重新启动）"""
+        if self._threads and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                # 父进程的线程不会随fork复制
+                self._threads, self._pid = [], os.getpid()
+                self._stop.clear()
+            if self._threads:
+                return
+            prefix = f"{socket.gethostname()}:{self._pid}"
+            for index in range(self.size):
+                thread = threading.Thread(
+                    target=self._run,
+                    args=(f"{prefix}:{index}",),
+                    name=f"async-task-worker-{index}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+            logger.info(f"Started {self.size} async task workers for {self.db_path}")
+
+    def wake(self) -> None:
+        """唤醒空闲worker立即检查队列"""
+        self._wakeup.set()
+
+    def stop(self, timeout: float = 5) -> None:
+        """停止worker（正在执行的任务执行完当前步骤后由心跳超时恢复）"""
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self._stop.clear()
+
+    def _run(self, worker_id: str) -> None:
+        while not self._stop.is_set():
+            try:
+                task = self._claim(worker_id)
+            except Exception as e:
+                logger.error(f"Async task worker {worker_id} failed to poll: {e}")
+                task = None
+            if task is None:
+                self._wakeup.wait(AsyncTaskConfig.POLL_INTERVAL)
+                self._wakeup.clear()
+                continue
+            self._execute(task, worker_id)
+
+    def _claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """重新排队心跳超时的任务，并认领最早的 pending 任务"""
+        stale_after = f"-{AsyncTaskConfig.STALE_SECONDS} seconds"
+        # 先用只读连接检查，空闲时轮询不占写锁
+        if not _fetch(
+            """
+            SELECT 1 FROM async_tasks
+            WHERE status = ?
+               OR (status IN (?, ?) AND heartbeat_at < datetime('now', ?))
+            LIMIT 1
+            """,
+            (STATUS_PENDING, STATUS_RUNNING, STATUS_CANCELLING, stale_after),
+            self.db_path,
+        ):
+            return None
+
+        with write_transaction(self.db_path) as conn:
+            requeued = conn.execute(
+                """
+                UPDATE async_tasks SET status = ?, worker_id = NULL
+                WHERE status = ? AND heartbeat_at < datetime('now', ?)
+                """,
+                (STATUS_PENDING, STATUS_RUNNING, stale_after),
+            ).rowcount
+            # 取消请求发出后worker就崩溃了：直接结束
+            conn.execute(
+                """
+                UPDATE async_tasks SET status = ?, completed_at = CURRENT_TIMESTAMP
+                WHERE status = ? AND heartbeat_at < datetime('now', ?)
+                """,
+                (STATUS_CANCELLED, STATUS_CANCELLING, stale_after),
+            )
+            if requeued:
+                logger.warning(f"Requeued {requeued} async task(s) with a stale heartbeat")
+
+            row = conn.execute(
+                "SELECT id FROM async_tasks WHERE status = ? ORDER BY id LIMIT 1",
+                (STATUS_PENDING,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                """
+                UPDATE async_tasks
+                SET status = ?, worker_id = ?, heartbeat_at = CURRENT_TIMESTAMP,
+                    started_at = COALESCE(started_at, CURRENT_TIMESTAMP)
+                WHERE id = ?
+                """,
+                (STATUS_RUNNING, worker_id, row["id"]),
+            )
+            task = conn.execute(
+                "SELECT task_id, task_type, params, checkpoint FROM async_tasks WHERE id = ?",
+                (row["id"],),
+            ).fetchone()
+        return dict(task)
+
+    def _execute(self, task: Dict[str, Any], worker_id: str) -> None:
+        task_id = task["task_id"]
+        resumed = " (resuming from checkpoint)" if task["checkpoint"] else ""
+        logger.info(f"Async task {task_id} ({task['task_type']}) started on {worker_id}{resumed}")
+        ctx = TaskContext(task, worker_id, self.db_path)
+        heartbeat_stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat,
+            args=(ctx, heartbeat_stop),
+            name=f"async-task-heartbeat-{task_id[:8]}",
+            daemon=True,
+        )
+        heartbeat.start()
+        try:
+            handler = _handlers.get(task["task_type"])
+            if handler is None:
+                raise ValueError(f"Unknown task type: {task['task_type']}")
+            result = handler(ctx)
+        except TaskCancelled:
+            logger.info(f"Async task {task_id} cancelled")
+            self._finish(task_id, worker_id, STATUS_CANCELLED)
+        except _OwnershipLost:
+            logger.warning(f"Async task {task_id} was requeued while {worker_id} was running it")
+        except Exception as e:
+            logger.error(f"Async task {task_id} failed: {e}", exc_info=True)
+            self._finish(task_id, worker_id, STATUS_FAILED, error_message=str(e))
+        else:
+            logger.info(f"Async task {task_id} completed")
+            self._finish(task_id, worker_id, STATUS_COMPLETED, result=result)
+        finally:
+            heartbeat_stop.set()
+            heartbeat.join()
+
+    def _heartbeat(self, ctx: TaskContext, stop: threading.Event) -> None:
+        """执行期间定期刷新心跳；任务已不属于本worker时设置 ctx.ownership_lost 并退出"""
+        interval = max(AsyncTaskConfig.STALE_SECONDS / 3, 0.1)
+        while not stop.wait(interval):
+            try:
+                with write_transaction(self.db_path) as conn:
+                    updated = conn.execute(
+                        """
+                        UPDATE async_tasks SET heartbeat_at = CURRENT_TIMESTAMP
+                        WHERE task_id = ? AND worker_id = ?
+                        """,
+                        (ctx.task_id, ctx.worker_id),
+                    ).rowcount
+            except Exception as e:
+                # 下一轮重试；连续失败超过 STALE_SECONDS 时任务会被重新排队
+                logger.warning(f"Failed to refresh heartbeat of async task {ctx.task_id}: {e}")
+                continue
+            if not updated:
+                ctx.ownership_lost.set()
+                return
+
+    def _finish(
+        self,
+        task_id: str,
+        worker_id: str,
+        status: str,
+        result: Any = None,
+        error_message: Optional[str] = None,
+    ) -> None:
+        set_progress = "progress = 100," if status == STATUS_COMPLETED else ""
+        try:
+            with write_transaction(self.db_path) as conn:
+                conn.execute(
+                    f"""
+                    UPDATE async_tasks
+                    SET status = ?, result = ?, error_message = ?, {set_progress}
+                        completed_at = CURRENT_TIMESTAMP, heartbeat_at = CURRENT_TIMESTAMP
+                    WHERE task_id = ? AND worker_id = ?
+                    """,
+                    (
+                        status,
+                        json.dumps(result) if result is not None else None,
+                        error_message,
+                        task_id,
+                        worker_id,
+                    ),
+                )
+        except Exception as e:
+            # 状态未写入：心跳超时后任务会被重新执行
+            logger.error(f"Failed to record the outcome of async task {task_id}: {e}")
+
+
+_pools: Dict[str, _WorkerPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_worker_pool(db_path: Optional[Path] = None) -> _WorkerPool:
+    """
+    获取（或创建）数据库文件对应的worker线程池（不会自动启动）
+
+    Args:
+        db_path: 数据库路径（默认 get_db_path()）
+
+    Returns:
+        worker线程池
+    """
+    key = str(db_path or get_db_path())
+    pool = _pools.get(key)
+    if pool is not None:
+        return pool
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _WorkerPool(Path(key), AsyncTaskConfig.WORKERS)
+            _pools[key] = pool
+    return pool
+
+
+def start_workers(db_path: Optional[Path] = None) -> None:
+    """
+    启动本进程的worker（恢复崩溃遗留的任务需要在启动时调用）
+
+    Args:
+        db_path: 数据库路径（默认 get_db_path()）
+    """
+    get_worker_pool(db_path).start()
+
+
+@atexit.register
+def _stop_workers():
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.stop(timeout=0)
@@ -0,0 +1,38 @@
+"""
+异步任务测试夹具：临时数据库，worker线程不自动启动（测试中同步调用认领/执行）
+"""
+
+import sqlite3
+
+import pytest
+
+from backend.core.config import AsyncTaskConfig
+from backend.core.database.database import init_db, migrate_db
+from backend.services.async_tasks import task_queue
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """已建表的临时数据库"""
+    path = tmp_path / "tasks.db"
+    init_db(path)
+    migrate_db(path)
+    monkeypatch.setattr(AsyncTaskConfig, "BUNDLE_DIR", tmp_path / "bundles")
+    monkeypatch.setattr(task_queue._WorkerPool, "start", lambda self: None)
+    yield path
+    task_queue._pools.pop(str(path), None)
+
+
+@pytest.fixture
+def pool(db_path):
+    """不启动线程的worker池"""
+    return task_queue._WorkerPool(db_path, 1)
+
+
+def make_stale(db_path, task_id, seconds=3600):
+    """把任务心跳改到 seconds 秒之前（模拟worker崩溃）"""
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "UPDATE async_tasks SET heartbeat_at = datetime('now', ?) WHERE task_id = ?",
+            (f"-{seconds} seconds", task_id),
+        )
@@ -0,0 +1,153 @@
+"""
+整游戏DWD构建任务测试：检查点截断与恢复
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+from backend.core.config import AsyncTaskConfig
+from backend.services.async_tasks import dwd_bundle
+from backend.services.async_tasks.dwd_bundle import (
+    BUNDLE_FILES,
+    MANIFEST_FILE,
+    TASK_TYPE,
+    _BundleWriter,
+    build_dwd_bundle,
+    get_bundle_dir,
+)
+from backend.services.async_tasks.task_queue import TaskContext, _fetch, submit_task
+
+GAME_GID = 10000147
+
+
+class _Crash(Exception):
+    """模拟worker进程在保存检查点之后崩溃"""
+
+
+@pytest.fixture
+def game_db(db_path, monkeypatch):
+    """一个游戏、7个事件（每个2个参数），每页2个事件"""
+    monkeypatch.setattr(AsyncTaskConfig, "PAGE_SIZE", 2)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "INSERT INTO games (gid, name, ods_db) VALUES (?, 'Test Game', 'ieu_ods')",
+            (str(GAME_GID),),
+        )
+        game_id = conn.execute("SELECT id FROM games").fetchone()[0]
+        for i in range(7):
+            cursor = conn.execute(
+                """
+                INSERT INTO log_events
+                    (game_id, game_gid, event_name, event_name_cn, source_table, target_table)
+                VALUES (?, ?, ?, ?, 's', 't')
+                """,
+                (game_id, GAME_GID, f"event_{i}", f"事件{i}"),
+            )
+            for name in ("zone_id", "level"):
+                conn.execute(
+                    "INSERT INTO event_params (event_id, param_name, template_id) VALUES (?, ?, 1)",
+                    (cursor.lastrowid, name),
+                )
+    return db_path
+
+
+def _context(db_path, pool, worker_id="w1"):
+    """提交并认领一个bundle任务"""
+    submit_task(TASK_TYPE, {"game_gid": GAME_GID}, db_path=db_path)
+    return TaskContext(pool._claim(worker_id), worker_id, db_path)
+
+
+def _read_bundle(task_id):
+    bundle_dir = get_bundle_dir(task_id)
+    return {name: (bundle_dir / name).read_text(encoding="utf-8") for name in BUNDLE_FILES}
+
+
+class TestBundleWriter:
+    """测试bundle文件写入"""
+
+    def test_truncates_to_checkpoint_offsets(self, tmp_path):
+        """测试重新打开时丢弃检查点之后写入的内容"""
+        with _BundleWriter(tmp_path, {}) as writer:
+            writer.write("ddl.sql", "kept;")
+            offsets = writer.sync()
+            writer.write("ddl.sql", "half written")
+            writer.sync()
+
+        with _BundleWriter(tmp_path, offsets) as writer:
+            writer.write("ddl.sql", "next;")
+            writer.sync()
+
+        assert (tmp_path / "ddl.sql").read_text() == "kept;next;"
+
+
+class TestBuildDwdBundle:
+    """测试整游戏构建"""
+
+    def test_full_build(self, game_db, pool):
+        """测试所有事件写入bundle，最后写manifest"""
+        ctx = _context(game_db, pool)
+
+        result = build_dwd_bundle(ctx)
+
+        bundle = _read_bundle(ctx.task_id)
+        assert result["events"] == 7 and result["errors"] == 0
+        for name in ("ddl.sql", "dml.sql", "views.hql"):
+            assert [f"-- event_{i} " in bundle[name] for i in range(7)] == [True] * 7
+        assert bundle["ddl.sql"].count("CREATE TABLE") == 7
+        assert bundle["errors.ndjson"] == ""
+        manifest = json.loads((get_bundle_dir(ctx.task_id) / MANIFEST_FILE).read_text())
+        assert manifest["events"] == 7
+
+    def test_resume_after_crash_matches_clean_build(self, game_db, pool, monkeypatch):
+        """测试崩溃后从检查点恢复：半页输出被截断，每个事件恰好出现一次"""
+        clean = _context(game_db, pool)
+        build_dwd_bundle(clean)
+        expected = _read_bundle(clean.task_id)
+
+        crashed = _context(game_db, pool)
+        original_report = TaskContext.report
+
+        def report_then_crash(self, progress, checkpoint=None):
+            original_report(self, progress, checkpoint)
+            if checkpoint["done"] >= 4:
+                raise _Crash()
+
+        monkeypatch.setattr(TaskContext, "report", report_then_crash)
+        with pytest.raises(_Crash):
+            build_dwd_bundle(crashed)
+        monkeypatch.setattr(TaskContext, "report", original_report)
+
+        # 崩溃前已写入但未保存检查点的下一页
+        with open(get_bundle_dir(crashed.task_id) / "ddl.sql", "a", encoding="utf-8") as f:
+            f.write("-- partial page from the crashed worker\n")
+
+        row = _fetch(
+            "SELECT task_id, task_type, params, checkpoint FROM async_tasks WHERE task_id = ?",
+            (crashed.task_id,),
+            game_db,
+        )[0]
+        resumed = TaskContext(dict(row), "w1", game_db)
+        assert resumed.checkpoint["done"] == 4
+
+        result = build_dwd_bundle(resumed)
+
+        assert result["events"] == 7
+        assert _read_bundle(crashed.task_id) == expected
+
+    def test_stops_when_ownership_lost(self, game_db, pool, monkeypatch):
+        """测试任务被其他worker接管后不再写入"""
+        ctx = _context(game_db, pool)
+        with sqlite3.connect(game_db) as conn:
+            conn.execute(
+                "UPDATE async_tasks SET worker_id = 'w2' WHERE task_id = ?", (ctx.task_id,)
+            )
+        opened = []
+        monkeypatch.setattr(dwd_bundle, "_BundleWriter", lambda *args: opened.append(args))
+
+        with pytest.raises(Exception) as exc_info:
+            build_dwd_bundle(ctx)
+
+        assert type(exc_info.value).__name__ == "_OwnershipLost"
+        assert opened == []
@@ -0,0 +1,205 @@
+"""
+异步任务队列测试
+"""
+
+import threading
+import time
+
+import pytest
+
+from backend.core.config import AsyncTaskConfig
+from backend.services.async_tasks.task_queue import (
+    STATUS_CANCELLED,
+    STATUS_CANCELLING,
+    STATUS_COMPLETED,
+    STATUS_FAILED,
+    STATUS_PENDING,
+    STATUS_RUNNING,
+    TaskCancelled,
+    TaskContext,
+    _OwnershipLost,
+    cancel_task,
+    get_task,
+    list_tasks,
+    register_task_type,
+    submit_task,
+)
+
+from .conftest import make_stale
+
+
+@register_task_type("test_echo")
+def _echo(ctx):
+    ctx.report(50, {"step": 1})
+    return {"echo": ctx.params["value"]}
+
+
+@register_task_type("test_fail")
+def _fail(ctx):
+    raise RuntimeError("boom")
+
+
+@register_task_type("test_wait_cancel")
+def _wait_cancel(ctx):
+    while True:
+        ctx.report(10)
+        time.sleep(0.01)
+
+
+class TestClaim:
+    """测试提交与认领"""
+
+    def test_submit_unknown_type(self, db_path):
+        """测试未注册的任务类型"""
+        with pytest.raises(ValueError, match="Unknown task type"):
+            submit_task("no_such_type", db_path=db_path)
+
+    def test_submit_is_pending(self, db_path):
+        """测试新提交的任务为 pending"""
+        task_id = submit_task("test_echo", {"value": 1}, db_path=db_path)
+
+        assert get_task(task_id, db_path)["status"] == STATUS_PENDING
+        assert [t["task_id"] for t in list_tasks(status=STATUS_PENDING, db_path=db_path)] == [
+            task_id
+        ]
+
+    def test_claim_oldest_pending_once(self, db_path, pool):
+        """测试按提交顺序认领，同一任务只被认领一次"""
+        first = submit_task("test_echo", {"value": 1}, db_path=db_path)
+        second = submit_task("test_echo", {"value": 2}, db_path=db_path)
+
+        claimed = [pool._claim("w1"), pool._claim("w2"), pool._claim("w3")]
+
+        assert [task["task_id"] for task in claimed[:2]] == [first, second]
+        assert claimed[2] is None
+        assert get_task(first, db_path)["status"] == STATUS_RUNNING
+
+    def test_execute_records_result(self, db_path, pool):
+        """测试执行成功后保存结果和进度"""
+        task_id = submit_task("test_echo", {"value": 7}, db_path=db_path)
+
+        pool._execute(pool._claim("w1"), "w1")
+
+        task = get_task(task_id, db_path)
+        assert task["status"] == STATUS_COMPLETED
+        assert task["progress"] == 100
+        assert task["result"] == {"echo": 7}
+
+    def test_execute_records_failure(self, db_path, pool):
+        """测试处理函数异常时任务失败"""
+        task_id = submit_task("test_fail", db_path=db_path)
+
+        pool._execute(pool._claim("w1"), "w1")
+
+        task = get_task(task_id, db_path)
+        assert task["status"] == STATUS_FAILED
+        assert task["error_message"] == "boom"
+
+
+class TestCancel:
+    """测试取消"""
+
+    def test_cancel_pending(self, db_path, pool):
+        """测试 pending 任务直接取消，不会再被认领"""
+        task_id = submit_task("test_echo", {"value": 1}, db_path=db_path)
+
+        assert cancel_task(task_id, db_path) == STATUS_CANCELLED
+        assert pool._claim("w1") is None
+
+    def test_cancel_running_stops_at_report(self, db_path, pool):
+        """测试 running 任务在下一次 report() 时停止"""
+        task_id = submit_task("test_wait_cancel", db_path=db_path)
+        task = pool._claim("w1")
+
+        assert cancel_task(task_id, db_path) == STATUS_CANCELLING
+        pool._execute(task, "w1")
+
+        assert get_task(task_id, db_path)["status"] == STATUS_CANCELLED
+
+    def test_cancel_unknown_and_finished(self, db_path, pool):
+        """测试不存在和已结束的任务"""
+        task_id = submit_task("test_echo", {"value": 1}, db_path=db_path)
+        pool._execute(pool._claim("w1"), "w1")
+
+        assert cancel_task("missing", db_path) is None
+        assert cancel_task(task_id, db_path) == STATUS_COMPLETED
+
+    def test_report_raises_when_cancelling(self, db_path, pool):
+        """测试 report() 发现取消请求时抛出 TaskCancelled"""
+        task_id = submit_task("test_echo", {"value": 1}, db_path=db_path)
+        ctx = TaskContext(pool._claim("w1"), "w1", db_path)
+        cancel_task(task_id, db_path)
+
+        with pytest.raises(TaskCancelled):
+            ctx.report(10)
+
+
+class TestStaleHeartbeat:
+    """测试心跳超时恢复"""
+
+    def test_stale_task_requeued_with_checkpoint(self, db_path, pool):
+        """测试心跳超时的任务由其他worker带着检查点接管"""
+        task_id = submit_task("test_echo", {"value": 1}, db_path=db_path)
+        ctx = TaskContext(pool._claim("w1"), "w1", db_path)
+        ctx.report(40, {"last_event_id": 12})
+        make_stale(db_path, task_id)
+
+        task = pool._claim("w2")
+
+        assert task["task_id"] == task_id
+        assert TaskContext(task, "w2", db_path).checkpoint == {"last_event_id": 12}
+        # 原worker不能再写
+        with pytest.raises(_OwnershipLost):
+            ctx.ensure_owned()
+        with pytest.raises(_OwnershipLost):
+            ctx.report(50)
+
+    def test_stale_cancelling_task_cancelled(self, db_path, pool):
+        """测试请求取消后worker崩溃的任务直接结束"""
+        task_id = submit_task("test_echo", {"value": 1}, db_path=db_path)
+        pool._claim("w1")
+        cancel_task(task_id, db_path)
+        make_stale(db_path, task_id)
+
+        assert pool._claim("w2") is None
+        assert get_task(task_id, db_path)["status"] == STATUS_CANCELLED
+
+    def test_heartbeat_refreshed_between_reports(self, db_path, pool, monkeypatch):
+        """测试两次 report() 间隔超过 STALE_SECONDS 时任务不会被重新排队"""
+        monkeypatch.setattr(AsyncTaskConfig, "STALE_SECONDS", 3)
+        seen = {}
+
+        @register_task_type("test_slow_step")
+        def _slow_step(ctx):
+            time.sleep(AsyncTaskConfig.STALE_SECONDS + 1.5)
+            ctx.ensure_owned()
+            seen["owned"] = True
+
+        task_id = submit_task("test_slow_step", db_path=db_path)
+        task = pool._claim("w1")
+        runner = threading.Thread(target=pool._execute, args=(task, "w1"))
+        runner.start()
+        while runner.is_alive():
+            assert pool._claim("w2") is None
+            time.sleep(0.5)
+        runner.join()
+
+        assert seen == {"owned": True}
+        assert get_task(task_id, db_path)["status"] == STATUS_COMPLETED
+
+    def test_heartbeat_detects_takeover(self, db_path, pool, monkeypatch):
+        """测试任务被接管后心跳线程标记 ownership_lost"""
+        monkeypatch.setattr(AsyncTaskConfig, "STALE_SECONDS", 0.3)
+        task_id = submit_task("test_echo", {"value": 1}, db_path=db_path)
+        ctx = TaskContext(pool._claim("w1"), "w1", db_path)
+        make_stale(db_path, task_id)
+        pool._claim("w2")
+        stop = threading.Event()
+
+        heartbeat = threading.Thread(target=pool._heartbeat, args=(ctx, stop))
+        heartbeat.start()
+        heartbeat.join(timeout=5)
+        stop.set()
+
+        assert ctx.ownership_lost.is_set()
+        assert get_task(task_id, db_path)["status"] == STATUS_RUNNING
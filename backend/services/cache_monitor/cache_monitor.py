@@ -10,7 +10,7 @@ Provides comprehensive cache statistics and monitoring endpoints
 
 API端点:
 - GET /admin/cache/status - 缓存状态（健康检查）
-- GET /admin/cache/stats - 缓存统计信息（L1/L2/预热）
+- GET /admin/cache/stats - 缓存统计信息（L1/L2/后台刷新/预热）
 - GET /admin/cache/performance - 性能指标（响应时间、QPS）
 - GET /admin/cache/keys - 列出所有缓存键
 - POST /admin/cache/clear - 清空所有缓存
@@ -114,7 +114,7 @@ def list_cache_keys():
         key_prefix = CacheConfig.CACHE_KEY_PREFIX
 
         # 获取所有键
-        all_keys = redis_client.keys(f"{key_prefix}*")
+        all_keys = list(redis_client.scan_iter(match=f"{key_prefix}*", count=1000))
 
         # 移除前缀以便显示 (解码bytes为str)
         keys = [
@@ -154,7 +154,7 @@ def cache_stats():
     """
     获取缓存统计信息（v3.0）
 
-    返回L1、L2、预热三方面的统计
+    返回L1、L2、后台刷新（Stale-While-Revalidate）、预热四方面的统计
     """
     try:
         # L1统计（从hierarchical_cache）
@@ -192,8 +192,31 @@ def cache_stats():
                     "hits": l1_stats["l1_hits"],
                     "sets": l1_stats["l1_sets"],
                     "evictions": l1_stats["l1_evictions"],
+                    "bytes_used": l1_stats["l1_bytes"],
+                    "max_bytes": l1_stats["l1_max_bytes"],
+                    "admission": l1_stats["l1_admission"],
+                    "admission_rejects": l1_stats["l1_admission_rejects"],
                 },
                 "l2_cache": l2_stats,
+                "refresh": {
+                    "enabled": l1_stats["swr_enabled"],
+                    "queue_depth": l1_stats["refresh"]["queue_depth"],
+                    "max_queue": l1_stats["refresh"]["max_pending"],
+                    "stale_served": l1_stats["stale_served"],
+                    "scheduled": l1_stats["refresh"]["scheduled"],
+                    "completed": l1_stats["refresh"]["completed"],
+                    "failed": l1_stats["refresh"]["failed"],
+                    "dropped": l1_stats["refresh"]["dropped"],
+                },
+                "invalidation_bus": {
+                    "running": l1_stats["invalidation_bus"]["running"],
+                    "published": l1_stats["invalidation_bus"]["published"],
+                    "received": l1_stats["invalidation_bus"]["received"],
+                    "queue_depth": l1_stats["invalidation_bus"]["queue_depth"],
+                    "lag_ms_avg": l1_stats["invalidation_bus"]["lag_ms_avg"],
+                    "lag_ms_max": l1_stats["invalidation_bus"]["lag_ms_max"],
+                    "reconnects": l1_stats["invalidation_bus"]["reconnects"],
+                },
                 "warmup": {
                     "warmed_games": warmup_stats["warmed_games"],
                     "warmed_events": warmup_stats["warmed_events"],
@@ -324,11 +347,10 @@ def clear_all_cache():
         l2_cleared = 0
         if redis_client:
             try:
+                # 游标SCAN + 分批UNLINK，避免KEYS阻塞共享Redis
                 pattern = f"{CacheConfig.CACHE_KEY_PREFIX}*"
-                keys = redis_client.keys(pattern)
-                if keys:
-                    redis_client.delete(*keys)
-                    l2_cleared = len(keys)
+                l2_cleared = hierarchical_cache.l2_tags.scan_delete(redis_client, pattern)
+                hierarchical_cache.tag_index.clear()
             except Exception as e:
                 logger.warning(f"清空L2缓存失败: {e}")
 
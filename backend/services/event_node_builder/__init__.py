@@ -9,6 +9,7 @@ Event Node Builder Module
 
 from flask import Blueprint, request, jsonify
 from backend.core.logging import get_logger
+from backend.core.database.fulltext import match_condition
 from backend.core.utils import (
     json_success_response,
     json_error_response,
@@ -460,36 +461,46 @@ def search_event_nodes():
         field_count_max = request.args.get('field_count_max', type=int)
         today_modified = request.args.get('today_modified', type=bool)
 
-        # Build query
-        query = """SELECT
-                en.*,
-                e.name as event_name,
-                COUNT(DISTINCT ep.id) as field_count
-            FROM event_nodes en
-            INNER JOIN log_events e ON en.event_id = e.id
-            LEFT JOIN event_params ep ON en.id = ep.event_node_id
-            WHERE e.game_gid = ?
-            GROUP BY en.id
-        """
+        # Build query (filters go before GROUP BY, count filters into HAVING)
+        where_clauses = ["e.game_gid = ?"]
         params = [game_gid]
 
         # Apply filters
         if keyword:
-            query += " AND e.name LIKE ?"
-            params.append(f"%{keyword}%")
+            # Event names via the FTS5 index (LIKE fallback), node names via LIKE
+            name_condition, name_params = match_condition(
+                "events", keyword, "e.id", ["e.event_name", "e.event_name_cn"]
+            )
+            where_clauses.append(f"({name_condition} OR en.name LIKE ?)")
+            params.extend(name_params + [f"%{keyword}%"])
 
         if event_id:
-            query += " AND en.event_id = ?"
+            where_clauses.append("en.event_id = ?")
             params.append(event_id)
 
+        having_clauses = []
         if field_count_min is not None:
-            query += " HAVING COUNT(DISTINCT ep.id) >= ?"
+            having_clauses.append("COUNT(DISTINCT ep.id) >= ?")
             params.append(field_count_min)
 
         if field_count_max is not None:
-            query += " HAVING COUNT(DISTINCT ep.id) <= ?"
+            having_clauses.append("COUNT(DISTINCT ep.id) <= ?")
             params.append(field_count_max)
 
+        query = f"""SELECT
+                en.*,
+                e.event_name,
+                e.event_name_cn,
+                COUNT(DISTINCT ep.id) as field_count
+            FROM event_nodes en
+            INNER JOIN log_events e ON en.event_id = e.id
+            LEFT JOIN event_params ep ON ep.event_id = en.event_id AND ep.is_active = 1
+            WHERE {" AND ".join(where_clauses)}
+            GROUP BY en.id
+        """
+        if having_clauses:
+            query += " HAVING " + " AND ".join(having_clauses)
+
         query += " ORDER BY en.updated_at DESC LIMIT 100"
 
         nodes = fetch_all_as_dict(query, tuple(params))
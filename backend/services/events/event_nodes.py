@@ -222,7 +222,7 @@ def create_event_node():
         save_parameter_aliases(game_id, config["fieldList"])
 
     # Clear cache
-    clear_game_cache(game_gid)
+    clear_game_cache(game_id=game_id, game_gid=game_gid)
 
     node = fetch_one_as_dict("SELECT * FROM event_nodes WHERE id = ?", (node_id,))
     return json_success_response(data={"node": node}, message="Event node created", status_code=201)
@@ -280,7 +280,7 @@ def update_event_node(node_id):
 
         # Clear cache
         if game_gid:
-            clear_game_cache(game_gid)
+            clear_game_cache(game_id=node["game_id"], game_gid=game_gid)
 
     updated_node = fetch_one_as_dict("SELECT * FROM event_nodes WHERE id = ?", (node_id,))
     return json_success_response(data={"node": updated_node}, message="Event node updated")
@@ -302,7 +302,7 @@ def delete_event_node(node_id):
 
     # Clear cache
     if game_gid:
-        clear_game_cache(game_gid)
+        clear_game_cache(game_id=node["game_id"], game_gid=game_gid)
 
     return json_success_response(message="Event node deleted")
 
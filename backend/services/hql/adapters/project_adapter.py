@@ -6,9 +6,12 @@
 负责将当前项目的数据模型转换为抽象的Event/Field/Condition模型
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
 from ..models.event import Event, Field, Condition
-from backend.core.utils import fetch_one_as_dict
+from backend.core.utils import fetch_all_as_dict, fetch_one_as_dict
+
+# IN (...) 列表分块大小（低于SQLite旧版本999个绑定参数的限制）
+_LOOKUP_CHUNK_SIZE = 500
 
 
 class ProjectAdapter:
@@ -65,6 +68,74 @@ class ProjectAdapter:
 
         return Event(name=event["event_name"], table_name=table_name, partition_field="ds")
 
+    @staticmethod
+    def events_from_project_batch(
+        refs: Iterable[Tuple[Any, Any]],
+    ) -> Dict[Tuple[int, int], Union[Event, ValueError]]:
+        """
+        批量构建抽象Event（集合查询，替代逐个调用 event_from_project）
+
+        所有事件和游戏分别用 IN (...) 查询一次（按500个分块），
+        而不是每个事件查询两次。
+
+        Args:
+            refs: (game_gid, event_id) 序列，允许重复
+
+        Returns:
+            Dict: (game_gid, event_id) → Event；无法构建的引用对应
+                event_from_project 会抛出的 ValueError
+        """
+        resolved: Dict[Tuple[int, int], Union[Event, ValueError]] = {}
+        valid_refs = []
+        for raw_gid, raw_event_id in refs:
+            try:
+                ref = (int(raw_gid), int(raw_event_id))
+            except (ValueError, TypeError):
+                resolved[(raw_gid, raw_event_id)] = ValueError(
+                    f"Invalid game_gid or event_id: must be integers, "
+                    f"got game_gid={raw_gid}, event_id={raw_event_id}"
+                )
+                continue
+            valid_refs.append(ref)
+
+        event_names = ProjectAdapter._fetch_by_keys(
+            "SELECT id, event_name FROM log_events WHERE id IN ({})",
+            {event_id for _, event_id in valid_refs},
+            key="id",
+        )
+        games = ProjectAdapter._fetch_by_keys(
+            "SELECT gid, ods_db FROM games WHERE gid IN ({})",
+            {game_gid for game_gid, _ in valid_refs},
+            key="gid",
+        )
+
+        for game_gid, event_id in valid_refs:
+            event = event_names.get(event_id)
+            game = games.get(game_gid)
+            if not event:
+                resolved[(game_gid, event_id)] = ValueError(f"Event not found: id={event_id}")
+            elif not game:
+                resolved[(game_gid, event_id)] = ValueError(f"Game not found: gid={game_gid}")
+            else:
+                resolved[(game_gid, event_id)] = Event(
+                    name=event["event_name"],
+                    table_name=f"{game['ods_db']}.ods_{game['gid']}_all_view",
+                    partition_field="ds",
+                )
+        return resolved
+
+    @staticmethod
+    def _fetch_by_keys(sql: str, keys: set, key: str) -> Dict[int, Dict[str, Any]]:
+        """按键分块执行 IN 查询，返回 int(键) → 行"""
+        rows: Dict[int, Dict[str, Any]] = {}
+        keys = list(keys)
+        for start in range(0, len(keys), _LOOKUP_CHUNK_SIZE):
+            chunk = keys[start:start + _LOOKUP_CHUNK_SIZE]
+            placeholders = ",".join("?" for _ in chunk)
+            for row in fetch_all_as_dict(sql.format(placeholders), tuple(chunk)):
+                rows[int(row[key])] = row
+        return rows
+
     @staticmethod
     def event_from_request_data(data: Dict[str, Any]) -> Event:
         """
@@ -146,7 +217,8 @@ class ProjectAdapter:
             'field': 'role_id',
             'operator': '=',
             'value': 123,
-            'logicalOp': 'AND'
+            'logicalOp': 'AND',
+            'event': 'login'  # 可选，UNION模式下只作用于该事件
         }
 
         OR (snake_case alternative):
@@ -168,25 +240,36 @@ class ProjectAdapter:
             operator=condition_data["operator"],
             value=condition_data.get("value"),
             logical_op=condition_data.get("logicalOp") or condition_data.get("logical_op", "AND"),
+            event=condition_data.get("event") or condition_data.get("eventName"),
         )
 
     @staticmethod
-    def events_from_api_request(events_data: List[Dict[str, Any]]) -> List[Event]:
+    def events_from_api_request(
+        events_data: List[Dict[str, Any]],
+        project_events: Optional[Dict[Tuple[Any, Any], Union[Event, ValueError]]] = None,
+    ) -> List[Event]:
         """
         从API请求数据批量构建Event列表
 
         Args:
             events_data: 事件数据列表
+            project_events: 预先解析的 events_from_project_batch() 结果（批量接口
+                对所有请求项只查询一次）；不提供时按 events_data 批量解析
 
         Returns:
             List[Event]: 事件列表
         """
+        if project_events is None:
+            # 需要查询数据库的事件一次性批量解析
+            project_events = ProjectAdapter.events_from_project_batch(
+                ProjectAdapter.project_refs(events_data)
+            )
+
         events = []
         for event_data in events_data:
             if "game_gid" in event_data and "event_id" in event_data:
-                # 需要查询数据库
-                event = ProjectAdapter.event_from_project(
-                    event_data["game_gid"], event_data["event_id"]
+                event = ProjectAdapter._lookup(
+                    project_events, event_data["game_gid"], event_data["event_id"]
                 )
             else:
                 # 直接使用请求数据
@@ -196,6 +279,41 @@ class ProjectAdapter:
 
         return events
 
+    @staticmethod
+    def project_refs(events_data: List[Dict[str, Any]]) -> List[Tuple[Any, Any]]:
+        """
+        提取需要查询数据库的 (game_gid, event_id) 引用
+
+        Args:
+            events_data: 事件数据列表
+
+        Returns:
+            List[Tuple]: (game_gid, event_id) 列表
+        """
+        return [
+            (event_data["game_gid"], event_data["event_id"])
+            for event_data in events_data
+            if isinstance(event_data, dict)
+            and "game_gid" in event_data
+            and "event_id" in event_data
+        ]
+
+    @staticmethod
+    def _lookup(
+        project_events: Dict[Tuple[Any, Any], Union[Event, ValueError]],
+        game_gid: Any,
+        event_id: Any,
+    ) -> Event:
+        """从 events_from_project_batch 的结果中取出Event，无法构建时抛出对应的ValueError"""
+        try:
+            ref = (int(game_gid), int(event_id))
+        except (ValueError, TypeError):
+            ref = (game_gid, event_id)
+        result = project_events[ref]
+        if isinstance(result, ValueError):
+            raise result
+        return result
+
     @staticmethod
     def fields_from_api_request(fields_data: List[Dict[str, Any]]) -> List[Field]:
         """
@@ -6,10 +6,12 @@ HQL V2 - SQL构建器模块
 - JoinBuilder: 多事件JOIN构建
 - UnionBuilder: 多事件UNION构建
 - WhereBuilder: WHERE条件构建
+- FragmentCache: 字段/条件SQL片段缓存
 """
 
 from .field_builder import FieldBuilder
+from .fragment_cache import FragmentCache, clear_fragment_caches
 from .join_builder import JoinBuilder
 from .where_builder import WhereBuilder
 
-__all__ = ["FieldBuilder", "JoinBuilder", "WhereBuilder"]
+__all__ = ["FieldBuilder", "FragmentCache", "JoinBuilder", "WhereBuilder", "clear_fragment_caches"]
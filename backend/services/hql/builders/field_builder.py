@@ -5,8 +5,14 @@
 """
 
 import re
-from typing import Optional
+from typing import List, Optional
 from ..models.event import Field, FieldType
+from .fragment_cache import FIELD_FRAGMENTS, field_fingerprint
+
+# 合法的SQL标识符
+_IDENTIFIER = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_$]*$")
+# json_tuple 只能取顶层键：$.key 可以合并，嵌套路径（$.a.b、$.a[0]）保留 get_json_object
+_TOP_LEVEL_JSON_PATH = re.compile(r"^\$\.([a-zA-Z_][a-zA-Z0-9_]*)$")
 
 
 class FieldBuilder:
@@ -18,8 +24,18 @@ class FieldBuilder:
     - param: JSON参数字段（如: get_json_object(params, '$.zone_id')）
     - custom: 自定义表达式
     - fixed: 固定常量值
+
+    json_tuple合并：多个顶层参数字段各自调用 get_json_object 时，Hive对每一行
+    把同一个JSON字符串解析多次。json_tuple_keys() + build_lateral_view() 把这些
+    提取合并为一个 LATERAL VIEW json_tuple(...)，每行只解析一次；build() 的
+    context 中传入 {"json_tuple_keys": keys} 时，对应字段引用 json_tuple 的输出列。
     """
 
+    # LATERAL VIEW 表别名及输出列前缀（列名加前缀，避免与基础字段同名产生歧义）
+    JSON_TUPLE_ALIAS = "jt"
+    # 至少这么多个不同的顶层键才合并（只有一个键时 json_tuple 不会更省）
+    JSON_TUPLE_MIN_KEYS = 2
+
     # 危险的SQL关键字（用于custom_expression验证）
     DANGEROUS_KEYWORDS = [
         "DROP",
@@ -48,7 +64,7 @@ class FieldBuilder:
         """
         if not identifier:
             return False
-        return bool(re.match(r"^[a-zA-Z_][a-zA-Z0-9_$]*$", identifier))
+        return bool(_IDENTIFIER.match(identifier))
 
     def _escape_identifier(self, identifier: str) -> str:
         """
@@ -118,11 +134,27 @@ class FieldBuilder:
             >>> field = Field(name="zone_id", type="param", json_path="$.zone_id")
             >>> builder.build(field)
             'get_json_object(params, \'$.zone_id\') AS zone_id'
+
+        同样的字段定义只渲染一次，之后从共享的片段缓存（FIELD_FRAGMENTS）返回
         """
+        fingerprint = field_fingerprint(field)
+        if fingerprint is None:
+            return self._render(field, context)
+
+        json_tuple_keys = tuple(context.get("json_tuple_keys", ())) if context else ()
+        key = (type(self), fingerprint, json_tuple_keys)
+        sql = FIELD_FRAGMENTS.get(key)
+        if sql is None:
+            sql = self._render(field, context)
+            FIELD_FRAGMENTS.put(key, sql)
+        return sql
+
+    def _render(self, field: Field, context: Optional[dict]) -> str:
+        """按字段类型渲染SQL（不经过缓存）"""
         if field.type == FieldType.BASE.value:
             return self._build_base_field(field)
         elif field.type == FieldType.PARAM.value:
-            return self._build_param_field(field)
+            return self._build_param_field(field, context)
         elif field.type == FieldType.CUSTOM.value:
             return self._build_custom_field(field)
         elif field.type == FieldType.FIXED.value:
@@ -153,17 +185,22 @@ class FieldBuilder:
 
         return sql
 
-    def _build_param_field(self, field: Field) -> str:
+    def _build_param_field(self, field: Field, context: Optional[dict] = None) -> str:
         """
         构建参数字段SQL（从JSON提取）
 
         Examples:
             get_json_object(params, '$.zone_id') AS zone_id
             CAST(get_json_object(params, '$.level') AS BIGINT) AS level
+            `jt_zone_id` AS zone_id（context 中的 json_tuple_keys 包含 zone_id 时）
         """
         # 构建JSON提取表达式
-        json_path = field.json_path if field.json_path.startswith("$") else f"$.{field.json_path}"
-        sql = f"get_json_object(params, '{json_path}')"
+        json_path = self.normalize_json_path(field.json_path)
+        key = self.top_level_key(json_path)
+        if context and key in context.get("json_tuple_keys", ()):
+            sql = self._escape_identifier(self.json_tuple_column(key))
+        else:
+            sql = f"get_json_object(params, '{json_path}')"
 
         # 聚合函数
         if field.aggregate_func:
@@ -227,6 +264,73 @@ class FieldBuilder:
 
         return sql
 
+    @staticmethod
+    def normalize_json_path(json_path: str) -> str:
+        """补全JSON路径的 $ 前缀（zone_id → $.zone_id）"""
+        return json_path if json_path.startswith("$") else f"$.{json_path}"
+
+    @staticmethod
+    def top_level_key(json_path: str) -> Optional[str]:
+        """
+        返回顶层JSON路径的键名，嵌套路径返回None
+
+        Examples:
+            >>> FieldBuilder.top_level_key("$.zone_id")
+            'zone_id'
+            >>> FieldBuilder.top_level_key("$.items[0].id") is None
+            True
+        """
+        match = _TOP_LEVEL_JSON_PATH.match(json_path)
+        return match.group(1) if match else None
+
+    @classmethod
+    def json_tuple_column(cls, key: str) -> str:
+        """json_tuple 输出列名"""
+        return f"{cls.JSON_TUPLE_ALIAS}_{key}"
+
+    @classmethod
+    def json_tuple_keys(cls, fields: List[Field]) -> List[str]:
+        """
+        可合并为一个 json_tuple 的顶层参数键（按首次出现顺序去重）
+
+        Args:
+            fields: 字段列表
+
+        Returns:
+            List[str]: 键列表；不同键少于 JSON_TUPLE_MIN_KEYS 个时返回空列表（不合并）
+        """
+        keys = []
+        for field in fields:
+            if field.type != FieldType.PARAM.value:
+                continue
+            key = cls.top_level_key(cls.normalize_json_path(field.json_path))
+            if key and key not in keys:
+                keys.append(key)
+        return keys if len(keys) >= cls.JSON_TUPLE_MIN_KEYS else []
+
+    @classmethod
+    def build_lateral_view(cls, keys: List[str], source: str = "params") -> str:
+        """
+        构建一次性提取所有键的 LATERAL VIEW
+
+        json_tuple 每个输入行恰好输出一行（params 为NULL或缺少键时对应列为NULL，
+        与 get_json_object 相同），因此不会改变行数。
+
+        Args:
+            keys: json_tuple_keys() 返回的键
+            source: JSON列（UNION使用表别名时为 event.params）
+
+        Returns:
+            str: LATERAL VIEW 子句
+
+        Examples:
+            >>> FieldBuilder.build_lateral_view(["zone_id", "level"])
+            "LATERAL VIEW json_tuple(params, 'zone_id', 'level') jt AS jt_zone_id, jt_level"
+        """
+        key_list = ", ".join(f"'{key}'" for key in keys)
+        columns = ", ".join(cls.json_tuple_column(key) for key in keys)
+        return f"LATERAL VIEW json_tuple({source}, {key_list}) {cls.JSON_TUPLE_ALIAS} AS {columns}"
+
     def build_fields(self, fields: list, context: Optional[dict] = None) -> list:
         """
         批量构建字段SQL
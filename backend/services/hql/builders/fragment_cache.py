@@ -0,0 +1,191 @@
+"""
+SQL片段缓存
+
+同样的字段/条件定义（role_id、$.zone_id 等）在成千上万次请求中反复出现，
+而每个请求都会新建 FieldBuilder/WhereBuilder，重复做标识符校验、
+custom_expression 危险关键字扫描和字符串拼接。
+
+这里按字段/条件的不可变指纹缓存渲染好的SQL片段：
+- 指纹是 Field/Condition 全部属性组成的元组（值带上类型名，1、True、"1" 互不混淆）
+- 有界LRU，线程安全；所有构建器实例共享（模块级实例）
+- 只缓存成功的结果，校验失败每次都会重新抛出异常
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from ..models.event import Condition, Field
+
+# 默认最多缓存的片段数
+DEFAULT_MAXSIZE = 4096
+
+
+def _freeze(value: Any) -> Hashable:
+    """
+    把值转换为可哈希、类型敏感的表示
+
+    Raises:
+        TypeError: 值（或其中的元素）无法表示为不可变结构
+    """
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(_freeze(v) for v in value))
+    hash(value)
+    return (type(value).__name__, value)
+
+
+def field_fingerprint(field: Field) -> Optional[tuple]:
+    """
+    字段的不可变指纹
+
+    Args:
+        field: 字段
+
+    Returns:
+        tuple: 指纹；fixed_value 不可哈希时返回None（不缓存）
+    """
+    try:
+        fixed_value = _freeze(field.fixed_value)
+    except TypeError:
+        return None
+    return (
+        field.name,
+        field.type,
+        field.alias,
+        field.aggregate_func,
+        field.json_path,
+        field.custom_expression,
+        fixed_value,
+    )
+
+
+def condition_fingerprint(condition: Condition) -> Optional[tuple]:
+    """
+    条件的不可变指纹（不含 logical_op 和 event，它们不影响单个条件的SQL）
+
+    Args:
+        condition: 条件
+
+    Returns:
+        tuple: 指纹；value 不可哈希时返回None（不缓存）
+    """
+    try:
+        value = _freeze(condition.value)
+    except TypeError:
+        return None
+    return (condition.field, condition.operator, value)
+
+
+class FragmentCache:
+    """
+    有界、线程安全的LRU片段缓存
+
+    Examples:
+        >>> cache = FragmentCache(maxsize=2)
+        >>> cache.put(("role_id",), "`role_id`")
+        >>> cache.get(("role_id",))
+        '`role_id`'
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        """
+        Args:
+            maxsize: 最大条目数（0表示不缓存）
+        """
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable) -> Optional[str]:
+        """
+        获取片段
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[str]: 缓存的片段，不存在时返回None
+        """
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return fragment
+
+    def put(self, key: Hashable, fragment: str) -> None:
+        """
+        保存片段，超出容量时淘汰最久未使用的条目
+
+        Args:
+            key: 缓存键
+            fragment: SQL片段
+        """
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = fragment
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def resize(self, maxsize: int) -> None:
+        """
+        调整容量（0表示停用），多出的条目立即淘汰
+
+        Args:
+            maxsize: 最大条目数
+        """
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > max(maxsize, 0):
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空缓存和统计"""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计信息
+
+        Returns:
+            Dict: size/maxsize/hits/misses/hit_rate
+        """
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / total if total else 0.0,
+            }
+
+
+# 所有 FieldBuilder / WhereBuilder 实例共享
+FIELD_FRAGMENTS = FragmentCache()
+CONDITION_FRAGMENTS = FragmentCache()
+
+
+def clear_fragment_caches() -> None:
+    """清空字段和条件片段缓存"""
+    FIELD_FRAGMENTS.clear()
+    CONDITION_FRAGMENTS.clear()
+
+
+__all__ = [
+    "FragmentCache",
+    "FIELD_FRAGMENTS",
+    "CONDITION_FRAGMENTS",
+    "clear_fragment_caches",
+    "field_fingerprint",
+    "condition_fingerprint",
+]
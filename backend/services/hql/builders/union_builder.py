@@ -6,6 +6,7 @@ UnionBuilder - 多事件UNION HQL构建器
 
 from typing import List, Dict, Any, Optional
 from ..models.event import Event, Field, FieldType
+from .field_builder import FieldBuilder
 
 
 class UnionBuilder:
@@ -17,6 +18,7 @@ class UnionBuilder:
     - 支持分区过滤
     - 支持自定义WHERE条件
     - 支持参数字段（JSON提取）
+    - 支持把每个分支的顶层参数提取合并为一个 LATERAL VIEW json_tuple（use_json_tuple）
     """
 
     def __init__(self):
@@ -24,7 +26,12 @@ class UnionBuilder:
         pass
 
     def build_union_all(
-        self, events: List[Event], fields: List[Field], use_aliases: bool = False
+        self,
+        events: List[Event],
+        fields: List[Field],
+        use_aliases: bool = False,
+        use_json_tuple: bool = False,
+        branch_predicates: Optional[Dict[str, List[str]]] = None,
     ) -> str:
         """
         构建UNION ALL SQL
@@ -33,6 +40,8 @@ class UnionBuilder:
             events: 事件列表（至少2个）
             fields: 要查询的字段列表
             use_aliases: 是否使用表别名
+            use_json_tuple: 是否把顶层参数提取合并为 LATERAL VIEW json_tuple
+            branch_predicates: 事件名 → 该分支的WHERE谓词（AND连接）
 
         Returns:
             UNION ALL SQL字符串
@@ -50,32 +59,98 @@ class UnionBuilder:
         # 为每个事件构建SELECT子句
         select_parts = []
         for event in events:
-            select_sql = self._build_select_for_event(event, fields, use_aliases)
+            select_sql = self._build_select_for_event(event, fields, use_aliases, use_json_tuple)
+            predicates = (branch_predicates or {}).get(event.name)
+            if predicates:
+                select_sql += f"\nWHERE {self._join_predicates(predicates)}"
             select_parts.append(select_sql)
 
         # 用UNION ALL连接
         return "\nUNION ALL\n".join(select_parts)
 
-    def _build_select_for_event(self, event: Event, fields: List[Field], use_alias: bool) -> str:
+    def _build_select_for_event(
+        self, event: Event, fields: List[Field], use_alias: bool, use_json_tuple: bool = False
+    ) -> str:
         """为单个事件构建SELECT子句"""
-        # 构建字段列表
+        fields_str, lateral_view = self._build_field_list(event, fields, use_alias, use_json_tuple)
+
+        # 构建FROM子句
+        from_clause = event.table_name
+        if use_alias:
+            from_clause += f" AS {event.name}"
+
+        return f"SELECT\n  {fields_str}\nFROM {from_clause}{lateral_view}"
+
+    def _build_field_list(
+        self, event: Event, fields: List[Field], use_alias: bool, use_json_tuple: bool
+    ) -> tuple:
+        """
+        构建一个分支的字段列表
+
+        Returns:
+            tuple: (字段列表SQL, 紧跟FROM之后的LATERAL VIEW子句或空字符串)
+        """
+        json_tuple_keys = FieldBuilder.json_tuple_keys(fields) if use_json_tuple else []
+        json_tuple_columns = {FieldBuilder.json_tuple_column(key) for key in json_tuple_keys}
+
         field_parts = []
         for field in fields:
-            field_sql = self._format_field(field, event, use_alias)
+            field_sql = self._format_field(field, event, use_alias, json_tuple_keys)
             if field.alias:
                 field_sql += f" AS {field.alias}"
+            elif field_sql in json_tuple_columns:
+                # 不暴露 json_tuple 的内部列名
+                field_sql += f" AS {field.name}"
             field_parts.append(field_sql)
 
-        fields_str = ",\n  ".join(field_parts)
+        lateral_view = ""
+        if json_tuple_keys:
+            source = f"{event.name}.params" if use_alias else "params"
+            lateral_view = "\n" + FieldBuilder.build_lateral_view(json_tuple_keys, source)
 
-        # 构建FROM子句
-        from_clause = event.table_name
-        if use_alias:
-            from_clause += f" AS {event.name}"
+        return ",\n  ".join(field_parts), lateral_view
+
+    def field_expressions(
+        self, event: Event, fields: List[Field], use_alias: bool, use_json_tuple: bool = False
+    ) -> Dict[str, str]:
+        """
+        分支中每个输出列对应的SQL表达式（用于把条件下推到分支的WHERE）
 
-        return f"SELECT\n  {fields_str}\nFROM {from_clause}"
+        WHERE中不能引用SELECT别名，条件里的列名需要替换为表达式本身。
+        聚合字段不下推。
 
-    def _format_field(self, field: Field, event: Event, use_alias: bool) -> str:
+        Args:
+            event: 分支事件
+            fields: 字段列表
+            use_alias: 是否使用表别名
+            use_json_tuple: 是否把顶层参数提取合并为 LATERAL VIEW json_tuple
+
+        Returns:
+            Dict[str, str]: 列名（字段名和别名）→ 表达式
+        """
+        json_tuple_keys = FieldBuilder.json_tuple_keys(fields) if use_json_tuple else []
+        expressions = {}
+        for field in fields:
+            if field.aggregate_func:
+                continue
+            expression = self._format_field(field, event, use_alias, json_tuple_keys)
+            expressions.setdefault(field.name, expression)
+            if field.alias:
+                expressions[field.alias] = expression
+        return expressions
+
+    @staticmethod
+    def _join_predicates(predicates: List[str]) -> str:
+        """用AND连接分支谓词"""
+        return " AND\n  ".join(predicates)
+
+    def _format_field(
+        self,
+        field: Field,
+        event: Event,
+        use_alias: bool,
+        json_tuple_keys: Optional[List[str]] = None,
+    ) -> str:
         """格式化单个字段"""
         if field.type == FieldType.BASE.value:
             # 基础字段
@@ -85,11 +160,15 @@ class UnionBuilder:
 
         elif field.type == FieldType.PARAM.value:
             # 参数字段（JSON提取）
+            json_path = FieldBuilder.normalize_json_path(field.json_path)
+            key = FieldBuilder.top_level_key(json_path)
+            if json_tuple_keys and key in json_tuple_keys:
+                return FieldBuilder.json_tuple_column(key)
             if use_alias:
                 base_field = f"{event.name}.params"
             else:
                 base_field = "params"
-            return f"get_json_object({base_field}, '{field.json_path}')"
+            return f"get_json_object({base_field}, '{json_path}')"
 
         elif field.type == FieldType.CUSTOM.value:
             # 自定义表达式
@@ -109,6 +188,8 @@ class UnionBuilder:
         partition_field: str = "ds",
         partition_value: str = "'${bizdate}'",
         use_aliases: bool = False,
+        use_json_tuple: bool = False,
+        branch_predicates: Optional[Dict[str, List[str]]] = None,
     ) -> str:
         """
         构建带分区过滤的UNION ALL
@@ -119,6 +200,8 @@ class UnionBuilder:
             partition_field: 分区字段名
             partition_value: 分区值
             use_aliases: 是否使用别名
+            use_json_tuple: 是否把顶层参数提取合并为 LATERAL VIEW json_tuple
+            branch_predicates: 事件名 → 分区过滤之后追加的该分支WHERE谓词（AND连接）
 
         Returns:
             带分区过滤的UNION ALL SQL
@@ -133,7 +216,13 @@ class UnionBuilder:
         select_parts = []
         for event in events:
             select_sql = self._build_select_with_partition(
-                event, fields, partition_field, partition_value, use_aliases
+                event,
+                fields,
+                partition_field,
+                partition_value,
+                use_aliases,
+                use_json_tuple,
+                (branch_predicates or {}).get(event.name),
             )
             select_parts.append(select_sql)
 
@@ -146,17 +235,11 @@ class UnionBuilder:
         partition_field: str,
         partition_value: str,
         use_alias: bool,
+        use_json_tuple: bool = False,
+        predicates: Optional[List[str]] = None,
     ) -> str:
         """为单个事件构建带分区过滤的SELECT"""
-        # 构建字段列表
-        field_parts = []
-        for field in fields:
-            field_sql = self._format_field(field, event, use_alias)
-            if field.alias:
-                field_sql += f" AS {field.alias}"
-            field_parts.append(field_sql)
-
-        fields_str = ",\n  ".join(field_parts)
+        fields_str, lateral_view = self._build_field_list(event, fields, use_alias, use_json_tuple)
 
         # 构建FROM和WHERE
         from_clause = event.table_name
@@ -166,8 +249,10 @@ class UnionBuilder:
         else:
             # 使用事件名作为前缀
             where_clause = f"{event.name}.{partition_field} = {partition_value}"
+        if predicates:
+            where_clause = self._join_predicates([where_clause] + predicates)
 
-        return f"SELECT\n  {fields_str}\nFROM {from_clause}\nWHERE {where_clause}"
+        return f"SELECT\n  {fields_str}\nFROM {from_clause}{lateral_view}\nWHERE {where_clause}"
 
     def build_union_with_where(
         self,
@@ -175,6 +260,7 @@ class UnionBuilder:
         fields: List[Field],
         where_conditions: List[Dict[str, Any]],
         use_aliases: bool = False,
+        use_json_tuple: bool = False,
     ) -> str:
         """
         构建带自定义WHERE条件的UNION
@@ -185,6 +271,7 @@ class UnionBuilder:
             where_conditions: WHERE条件列表
                 [{"event": "login", "conditions": [...]}]
             use_aliases: 是否使用别名
+            use_json_tuple: 是否把顶层参数提取合并为 LATERAL VIEW json_tuple
 
         Returns:
             带WHERE条件的UNION ALL SQL
@@ -202,7 +289,9 @@ class UnionBuilder:
         select_parts = []
         for event in events:
             event_conditions = conditions_map.get(event.name, [])
-            select_sql = self._build_select_with_where(event, fields, event_conditions, use_aliases)
+            select_sql = self._build_select_with_where(
+                event, fields, event_conditions, use_aliases, use_json_tuple
+            )
             select_parts.append(select_sql)
 
         return "\nUNION ALL\n".join(select_parts)
@@ -213,22 +302,16 @@ class UnionBuilder:
         fields: List[Field],
         where_conditions: List[Dict[str, Any]],
         use_alias: bool,
+        use_json_tuple: bool = False,
     ) -> str:
         """为单个事件构建带WHERE的SELECT"""
-        # 构建字段列表
-        field_parts = []
-        for field in fields:
-            field_sql = self._format_field(field, event, use_alias)
-            if field.alias:
-                field_sql += f" AS {field.alias}"
-            field_parts.append(field_sql)
-
-        fields_str = ",\n  ".join(field_parts)
+        fields_str, lateral_view = self._build_field_list(event, fields, use_alias, use_json_tuple)
 
         # 构建FROM
         from_clause = event.table_name
         if use_alias:
             from_clause += f" AS {event.name}"
+        from_clause += lateral_view
 
         # 构建WHERE
         if where_conditions:
@@ -4,8 +4,13 @@ WHERE条件构建器
 负责将抽象Condition模型转换为SQL WHERE子句
 """
 
+import re
 from typing import List, Optional
 from ..models.event import Condition, Operator, LogicalOperator
+from .fragment_cache import CONDITION_FRAGMENTS, condition_fingerprint
+
+# 可以加表别名前缀的普通列名
+_COLUMN_NAME = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
 
 
 class WhereBuilder:
@@ -61,25 +66,82 @@ class WhereBuilder:
 
         return where_clause
 
+    def build_condition_list(
+        self, conditions: List[Condition], context: Optional[dict] = None
+    ) -> List[str]:
+        """
+        只构建用户条件（不含分区和事件名过滤），每个条件一项
+
+        用于UNION分支的谓词下推：context 中可以提供
+        - field_expressions: 输出列名 → 该分支中的SQL表达式（WHERE中不能引用SELECT别名）
+        - table_alias: 其余普通列名加的表别名前缀
+
+        Args:
+            conditions: 条件列表
+            context: 上下文信息
+
+        Returns:
+            List[str]: 条件SQL列表
+
+        Examples:
+            >>> builder = WhereBuilder()
+            >>> builder.build_condition_list(
+            ...     [Condition(field="zone_id", operator="=", value=1)],
+            ...     {"field_expressions": {"zone_id": "get_json_object(e.params, '$.zone_id')"}},
+            ... )
+            ["get_json_object(e.params, '$.zone_id') = 1"]
+        """
+        return [self._build_single_condition(cond, context) for cond in conditions]
+
+    def _resolve_field(self, condition: Condition, context: Optional[dict]) -> str:
+        """条件字段对应的SQL（未提供 field_expressions/table_alias 时原样使用）"""
+        if not context:
+            return condition.field
+
+        expressions = context.get("field_expressions") or {}
+        if condition.field in expressions:
+            return expressions[condition.field]
+
+        table_alias = context.get("table_alias")
+        if table_alias and _COLUMN_NAME.match(condition.field):
+            return f"{table_alias}.{condition.field}"
+
+        return condition.field
+
     def _build_single_condition(self, condition: Condition, context: Optional[dict]) -> str:
-        """构建单个条件SQL"""
+        """构建单个条件SQL（按解析后的列和条件指纹缓存到 CONDITION_FRAGMENTS）"""
+        field = self._resolve_field(condition, context)
+
+        fingerprint = condition_fingerprint(condition)
+        if fingerprint is None:
+            return self._render_condition(condition, field)
+
+        key = (type(self), field, fingerprint)
+        sql = CONDITION_FRAGMENTS.get(key)
+        if sql is None:
+            sql = self._render_condition(condition, field)
+            CONDITION_FRAGMENTS.put(key, sql)
+        return sql
+
+    def _render_condition(self, condition: Condition, field: str) -> str:
+        """渲染单个条件SQL（不经过缓存）"""
         # 处理IS NULL和IS NOT NULL（不需要值）
         if condition.is_null_operator():
-            return f"{condition.field} {condition.operator}"
+            return f"{field} {condition.operator}"
 
         # 处理IN操作符
         if condition.operator in [Operator.IN.value, Operator.NOT_IN.value]:
-            return self._build_in_condition(condition)
+            return self._build_in_condition(condition, field)
 
         # 处理LIKE操作符
         if condition.operator == Operator.LIKE.value:
-            return f"{condition.field} LIKE '{condition.value}'"
+            return f"{field} LIKE '{condition.value}'"
 
         # 处理普通比较操作符
         value = self._format_value(condition.value)
-        return f"{condition.field} {condition.operator} {value}"
+        return f"{field} {condition.operator} {value}"
 
-    def _build_in_condition(self, condition: Condition) -> str:
+    def _build_in_condition(self, condition: Condition, field: Optional[str] = None) -> str:
         """构建IN条件SQL"""
         if not isinstance(condition.value, (list, tuple)):
             raise ValueError("IN operator requires a list of values")
@@ -89,7 +151,7 @@ class WhereBuilder:
             raise ValueError("IN operator requires at least one value. " "Empty list provided.")
 
         values = ", ".join([self._format_value(v) for v in condition.value])
-        return f"{condition.field} {condition.operator} ({values})"
+        return f"{field or condition.field} {condition.operator} ({values})"
 
     def _build_partition_filter(self, context: Optional[dict]) -> str:
         """
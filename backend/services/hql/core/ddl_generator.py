@@ -144,7 +144,8 @@ class DDLGenerator:
         ddl_parts.append(f"{create_clause} IF NOT EXISTS {table_name}")
 
         # 字段定义
-        ddl_parts.append(f"(\n  {',\n  '.join(field_definitions)}\n)")
+        columns = ",\n  ".join(field_definitions)
+        ddl_parts.append(f"(\n  {columns}\n)")
 
         # 分区定义
         partition_type = self.PARTITION_FIELD_TYPE
@@ -4,7 +4,10 @@
 完全无框架依赖的HQL生成器
 """
 
-from typing import List, Optional, Union
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
 from ..models.event import Event, Field, Condition, HQLContext
 from ..builders.field_builder import FieldBuilder
 from ..builders.where_builder import WhereBuilder
@@ -56,6 +59,8 @@ class HQLGenerator:
                 - mode: 生成模式（single/join/union）
                 - sql_mode: SQL模式（VIEW/PROCEDURE/CUSTOM）
                 - include_comments: 是否包含注释（默认True）
+                - use_json_tuple: 把顶层参数字段的 get_json_object 合并为一个
+                  LATERAL VIEW json_tuple（single/union模式，默认False）
 
         Returns:
             str: 完整的HQL语句
@@ -91,6 +96,53 @@ class HQLGenerator:
 
         return hql
 
+    def generate_batch(
+        self,
+        configs: Iterable[Dict[str, Any]],
+        max_workers: Optional[int] = None,
+        use_processes: bool = False,
+        max_pending: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        批量生成HQL，按完成顺序逐条返回结果
+
+        每个worker使用独立的生成器实例（JoinBuilder带有构建状态，不能跨线程共享）。
+        同时在途的配置数不超过 max_pending，configs 可以是惰性生成器，
+        因此上万条配置的批次内存占用保持平稳。
+
+        Args:
+            configs: 配置序列，每项为字典:
+                - events / fields / conditions: 同 generate()
+                - options: generate() 的额外选项（可选）
+                - key: 原样返回的标识（可选，默认为序号）
+            max_workers: 并发数（默认CPU核数）
+            use_processes: 使用进程池（纯Python字符串拼接受GIL限制，大批次用进程池更快）
+            max_pending: 在途配置数上限（默认 max_workers * 4）
+
+        Returns:
+            Iterator[dict]: {"key": ..., "hql": str} 或
+                {"key": ..., "error": str, "error_type": str}
+
+        Examples:
+            >>> configs = ({"key": e.name, "events": [e], "fields": fields} for e in events)
+            >>> for result in HQLGenerator().generate_batch(configs):
+            ...     print(result["key"], result.get("error") or len(result["hql"]))
+        """
+        max_workers = max_workers or os.cpu_count() or 1
+        max_pending = max_pending or max_workers * 4
+        executor_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+
+        with executor_cls(max_workers=max_workers) as executor:
+            pending = {}
+            for index, config in enumerate(configs):
+                key = config.get("key", index)
+                future = executor.submit(_generate_in_worker, config)
+                pending[future] = key
+                if len(pending) >= max_pending:
+                    yield from _drain_completed(pending)
+            while pending:
+                yield from _drain_completed(pending)
+
     def _generate_single_event(
         self, events: List[Event], fields: List[Field], conditions: List[Condition], options: dict
     ) -> str:
@@ -100,8 +152,18 @@ class HQLGenerator:
 
         event = events[0]
 
+        # 顶层参数字段合并为一次 json_tuple 解析
+        lateral_view = ""
+        field_context = None
+        json_tuple_keys = (
+            self.field_builder.json_tuple_keys(fields) if options.get("use_json_tuple") else []
+        )
+        if json_tuple_keys:
+            field_context = {"json_tuple_keys": json_tuple_keys}
+            lateral_view = "\n" + self.field_builder.build_lateral_view(json_tuple_keys)
+
         # 构建字段SQL
-        field_sqls = self.field_builder.build_fields(fields)
+        field_sqls = self.field_builder.build_fields(fields, field_context)
         fields_clause = ",\n  ".join(field_sqls)
 
         # 构建WHERE子句
@@ -111,7 +173,7 @@ class HQLGenerator:
         # 组装HQL
         hql = f"""SELECT
   {fields_clause}
-FROM {event.table_name}
+FROM {event.table_name}{lateral_view}
 WHERE
   {where_clause}"""
 
@@ -153,13 +215,23 @@ WHERE
     def _generate_union_events(
         self, events: List[Event], fields: List[Field], conditions: List[Condition], options: dict
     ) -> str:
-        """生成多事件UNION HQL"""
+        """
+        生成多事件UNION HQL
+
+        每个分支只扫描本事件：分区过滤和 event_name 过滤写在每个分支内，
+        用户条件下推到分支的WHERE（Condition.event 指定时只下推到该事件的分支），
+        不需要在外层查询再过滤。
+        """
         if len(events) < 2:
             raise ValueError("union mode requires at least two events")
 
         # 使用UnionBuilder构建UNION ALL SQL
         use_aliases = options.get("use_aliases", True)
         include_partition_filter = options.get("include_partition_filter", True)
+        use_json_tuple = options.get("use_json_tuple", False)
+        branch_predicates = self._push_down_conditions(
+            events, fields, conditions, use_aliases, use_json_tuple
+        )
 
         if include_partition_filter:
             # 使用带分区过滤的UNION
@@ -169,19 +241,59 @@ WHERE
                 partition_field="ds",
                 partition_value="'${ds}'",
                 use_aliases=use_aliases,
+                use_json_tuple=use_json_tuple,
+                branch_predicates=branch_predicates,
             )
         else:
             # 普通UNION
-            union_sql = self.union_builder.build_union_all(events, fields, use_aliases=use_aliases)
-
-        # 添加额外的WHERE条件（如果有）
-        if conditions:
-            # TODO: 支持复杂的WHERE条件
-            # 目前暂时不支持，因为UNION每个子查询的WHERE可能不同
-            pass  # pragma: no cover
+            union_sql = self.union_builder.build_union_all(
+                events,
+                fields,
+                use_aliases=use_aliases,
+                use_json_tuple=use_json_tuple,
+                branch_predicates=branch_predicates,
+            )
 
         return union_sql
 
+    def _push_down_conditions(
+        self,
+        events: List[Event],
+        fields: List[Field],
+        conditions: List[Condition],
+        use_aliases: bool,
+        use_json_tuple: bool,
+    ) -> Dict[str, List[str]]:
+        """
+        计算每个UNION分支的WHERE谓词（不含分区过滤）
+
+        Returns:
+            Dict[str, List[str]]: 事件名 → [event_name过滤, 下推的用户条件...]
+
+        Raises:
+            ValueError: 条件指定的事件不在UNION中
+        """
+        event_names = {event.name for event in events}
+        for cond in conditions:
+            if cond.event is not None and cond.event not in event_names:
+                raise ValueError(f"Condition on '{cond.field}' targets unknown event: {cond.event}")
+
+        branch_predicates = {}
+        for event in events:
+            prefix = f"{event.name}." if use_aliases else ""
+            context = {
+                "event": event,
+                "field_expressions": self.union_builder.field_expressions(
+                    event, fields, use_aliases, use_json_tuple
+                ),
+                "table_alias": event.name if use_aliases else None,
+            }
+            branch_conditions = [c for c in conditions if c.event in (None, event.name)]
+            branch_predicates[event.name] = [
+                f"{prefix}event_name = '{event.name}'"
+            ] + self.where_builder.build_condition_list(branch_conditions, context)
+        return branch_predicates
+
     def _add_comments(self, hql: str, events: List[Event], options: dict) -> str:
         """添加注释信息"""
         # 检查events列表是否为空
@@ -197,6 +309,33 @@ WHERE
         return "\n".join(comments) + "\n" + hql
 
 
+# 批量生成的worker：每个线程/进程一个生成器实例
+_worker_state = threading.local()
+
+
+def _generate_in_worker(config: Dict[str, Any]) -> str:
+    generator = getattr(_worker_state, "generator", None)
+    if generator is None:
+        generator = _worker_state.generator = HQLGenerator()
+    return generator.generate(
+        config["events"],
+        config["fields"],
+        config.get("conditions") or [],
+        **(config.get("options") or {}),
+    )
+
+
+def _drain_completed(pending: Dict[Any, Any]) -> Iterator[Dict[str, Any]]:
+    """等待至少一个任务完成，逐条返回已完成的结果（单项失败不影响其余项）"""
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        key = pending.pop(future)
+        try:
+            yield {"key": key, "hql": future.result()}
+        except Exception as e:
+            yield {"key": key, "error": str(e), "error_type": type(e).__name__}
+
+
 class DebuggableHQLGenerator(HQLGenerator):
     """
     支持调试的HQL生成器
@@ -114,10 +114,12 @@ class IncrementalHQLGenerator:
         diff = self._compute_diff(events, fields, conditions)
 
         # 判断是否需要重新生成
+        # 增量拼装不生成 LATERAL VIEW，json_tuple 合并时总是完整生成
         needs_full_regeneration = (
             diff.events_changed
             or len(diff.added_fields) + len(diff.removed_fields) > 0
             or len(diff.added_conditions) + len(diff.removed_conditions) > 0
+            or options.get("use_json_tuple", False)
         )
 
         if needs_full_regeneration:
@@ -178,7 +180,9 @@ class IncrementalHQLGenerator:
         """计算条件哈希 - 使用SHA-256安全算法"""
         from backend.core.crypto import SecureHasher
 
-        condition_data = [(c.field, c.operator, str(c.value), c.logical_op) for c in conditions]
+        condition_data = [
+            (c.field, c.operator, str(c.value), c.logical_op, c.event) for c in conditions
+        ]
         return SecureHasher.hash_object(condition_data)
 
     def _compute_diff(
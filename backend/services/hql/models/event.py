@@ -148,12 +148,14 @@ class Condition:
         operator: 操作符（=, !=, >, <, LIKE, IN等）
         value: 条件值（可选，IS NULL等操作符不需要值）
         logical_op: 逻辑操作符（AND/OR，默认AND）
+        event: 限定作用的事件名（可选，UNION模式下只下推到该事件的分支）
     """
 
     field: str
     operator: str
     value: Optional[Any] = None
     logical_op: str = LogicalOperator.AND.value
+    event: Optional[str] = None
 
     def __post_init__(self):
         """初始化后验证"""
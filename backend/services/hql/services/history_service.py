@@ -13,8 +13,15 @@ import json
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from backend.core.database import get_db_connection
+from backend.core.database.fulltext import match_condition
+from backend.core.database.pagination import decode_cursor, keyset_condition, paginate_rows
+from backend.core.database.write_behind import submit_write
 from backend.core.config import DB_PATH
 
+# 历史列表的游标排序键：与 (user_id, created_at DESC) / (session_id, created_at DESC)
+# 索引的正向扫描顺序一致（索引末尾隐含 rowid 升序）
+HISTORY_SORT_KEYS = [("created_at", "DESC"), ("id", "ASC")]
+
 
 def _fetch_all_as_dict(sql, params=None, db_path=None):
     """Helper function to fetch all rows as dictionaries"""
@@ -121,9 +128,9 @@ class HQLHistoryService:
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
 
-        conn = get_db_connection(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
+        # 写入经由write-behind队列（启用时与并发的小写入合并为一次提交）；
+        # 调用方需要ID，因此等待所在批次提交
+        future = submit_write(
             sql,
             (
                 user_id,
@@ -140,10 +147,9 @@ class HQLHistoryService:
                 name_en,
                 name_cn,
             ),
+            db_path=self.db_path,
         )
-        conn.commit()
-        lastrowid = cursor.lastrowid
-        conn.close()
+        lastrowid = future.result().lastrowid
 
         return lastrowid
 
@@ -181,6 +187,43 @@ class HQLHistoryService:
 
         return _fetch_all_as_dict(sql, params, db_path=self.db_path)
 
+    def get_history_page(
+        self,
+        user_id: int = 0,
+        session_id: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        按游标获取历史记录列表（keyset分页，深分页不随页码变慢）
+
+        Args:
+            user_id: 用户ID
+            session_id: 会话ID（如果提供，优先按会话查询）
+            limit: 返回数量限制
+            cursor: 上一页返回的next_cursor，None表示第一页
+
+        Returns:
+            Tuple[List[Dict], Optional[str]]: (历史记录列表, 下一页游标，最后一页为None)
+
+        Raises:
+            InvalidCursorError: 游标无法解析
+        """
+        after = decode_cursor(cursor, len(HISTORY_SORT_KEYS))
+        keyset_sql, keyset_params = keyset_condition(HISTORY_SORT_KEYS, after)
+
+        owner_column, owner = ("session_id", session_id) if session_id else ("user_id", user_id)
+        sql = f"""
+            SELECT * FROM hql_history
+            WHERE {owner_column} = ? AND {keyset_sql}
+            ORDER BY created_at DESC, id ASC
+            LIMIT ?
+        """
+        params = [owner] + keyset_params + [limit + 1]
+
+        rows = _fetch_all_as_dict(sql, params, db_path=self.db_path)
+        return paginate_rows(rows, limit, lambda row: [row["created_at"], row["id"]])
+
     def get_history_by_id(self, history_id: int) -> Optional[Dict]:
         """
         获取单个历史记录
@@ -345,13 +388,13 @@ class HQLHistoryService:
         where_conditions = []
         params = []
 
-        # Keyword search (fuzzy match)
+        # Keyword search (FTS5索引，不可用时回退到LIKE模糊匹配)
         if keyword:
-            where_conditions.append("""
-                (hql LIKE ? OR name_en LIKE ? OR name_cn LIKE ?)
-            """)
-            keyword_pattern = f"%{keyword}%"
-            params.extend([keyword_pattern, keyword_pattern, keyword_pattern])
+            keyword_condition, keyword_params = match_condition(
+                "hql_history", keyword, "id", ["hql", "name_en", "name_cn"], db_path=self.db_path
+            )
+            where_conditions.append(keyword_condition)
+            params.extend(keyword_params)
 
         # HQL type filter
         if hql_type:
@@ -414,13 +457,13 @@ class HQLHistoryService:
         where_conditions = []
         params = []
 
-        # Keyword search (fuzzy match)
+        # Keyword search (FTS5索引，不可用时回退到LIKE模糊匹配)
         if keyword:
-            where_conditions.append("""
-                (hql LIKE ? OR name_en LIKE ? OR name_cn LIKE ?)
-            """)
-            keyword_pattern = f"%{keyword}%"
-            params.extend([keyword_pattern, keyword_pattern, keyword_pattern])
+            keyword_condition, keyword_params = match_condition(
+                "hql_history", keyword, "id", ["hql", "name_en", "name_cn"], db_path=self.db_path
+            )
+            where_conditions.append(keyword_condition)
+            params.extend(keyword_params)
 
         # HQL type filter
         if hql_type:
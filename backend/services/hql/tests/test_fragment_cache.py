@@ -0,0 +1,131 @@
+"""
+SQL片段缓存测试
+"""
+
+import threading
+
+import pytest
+
+from backend.services.hql.builders.field_builder import FieldBuilder
+from backend.services.hql.builders.fragment_cache import (
+    CONDITION_FRAGMENTS,
+    FIELD_FRAGMENTS,
+    FragmentCache,
+    clear_fragment_caches,
+    field_fingerprint,
+)
+from backend.services.hql.builders.where_builder import WhereBuilder
+from backend.services.hql.models.event import Condition, Field
+
+
+class TestFragmentCache:
+    """测试有界LRU缓存"""
+
+    def test_evicts_least_recently_used(self):
+        """测试超出容量时淘汰最久未使用的条目"""
+        cache = FragmentCache(maxsize=2)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        cache.get("a")
+        cache.put("c", "C")
+
+        assert cache.get("a") == "A"
+        assert cache.get("b") is None
+        assert cache.get_stats()["size"] == 2
+
+    def test_zero_maxsize_disables(self):
+        """测试容量为0时不缓存"""
+        cache = FragmentCache(maxsize=0)
+        cache.put("a", "A")
+
+        assert cache.get("a") is None
+
+    def test_concurrent_access_stays_bounded(self):
+        """测试并发读写后条目数不超过容量"""
+        cache = FragmentCache(maxsize=50)
+
+        def worker(offset):
+            for i in range(500):
+                cache.put((offset, i % 80), str(i))
+                cache.get((offset, i % 40))
+
+        threads = [threading.Thread(target=worker, args=(t,)) for t in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        stats = cache.get_stats()
+        assert stats["size"] == 50
+        assert stats["hits"] + stats["misses"] == 8 * 500
+
+
+class TestBuilderFragmentCache:
+    """测试FieldBuilder/WhereBuilder使用片段缓存"""
+
+    def setup_method(self):
+        """测试前准备"""
+        clear_fragment_caches()
+
+    def test_field_rendered_once_across_instances(self):
+        """测试同样的字段定义在不同构建器实例间只渲染一次"""
+        field = Field(name="zone_id", type="param", json_path="$.zone_id")
+
+        first = FieldBuilder().build(field)
+        second = FieldBuilder().build(Field(name="zone_id", type="param", json_path="$.zone_id"))
+
+        assert first == second == "get_json_object(params, '$.zone_id') AS `zone_id`"
+        assert FIELD_FRAGMENTS.get_stats()["hits"] == 1
+
+    def test_fixed_value_type_is_part_of_key(self):
+        """测试固定值 1 / True / "1" 不会互相命中"""
+        builder = FieldBuilder()
+
+        sqls = [
+            builder.build(Field(name="flag", type="fixed", fixed_value=value))
+            for value in (1, True, "1")
+        ]
+
+        assert sqls == ["1 AS `flag`", "TRUE AS `flag`", "'1' AS `flag`"]
+
+    def test_json_tuple_context_is_part_of_key(self):
+        """测试 json_tuple 合并与否分别缓存"""
+        builder = FieldBuilder()
+        field = Field(name="zone_id", type="param", json_path="$.zone_id")
+
+        plain = builder.build(field)
+        merged = builder.build(field, {"json_tuple_keys": ["zone_id", "level"]})
+
+        assert plain.startswith("get_json_object")
+        assert merged == "`jt_zone_id` AS `zone_id`"
+
+    def test_unhashable_fixed_value_not_cached(self):
+        """测试无法生成指纹的字段直接渲染"""
+        field = Field(name="tags", type="fixed", fixed_value={"a": 1})
+
+        assert field_fingerprint(field) is None
+        FieldBuilder().build(field)
+        assert FIELD_FRAGMENTS.get_stats()["size"] == 0
+
+    def test_validation_error_not_cached(self):
+        """测试校验失败每次都抛出异常"""
+        builder = FieldBuilder()
+        field = Field(name="x", type="custom", custom_expression="1; DROP TABLE t")
+
+        for _ in range(2):
+            with pytest.raises(ValueError, match="Dangerous SQL keyword"):
+                builder.build(field)
+        assert FIELD_FRAGMENTS.get_stats()["size"] == 0
+
+    def test_condition_keyed_by_resolved_field(self):
+        """测试条件按解析后的列缓存，不同分支互不命中"""
+        builder = WhereBuilder()
+        condition = Condition(field="role_id", operator="IN", value=[1, 2])
+
+        login = builder.build_condition_list([condition], {"table_alias": "login"})
+        logout = builder.build_condition_list([condition], {"table_alias": "logout"})
+        again = WhereBuilder().build_condition_list([condition], {"table_alias": "login"})
+
+        assert login == again == ["login.role_id IN (1, 2)"]
+        assert logout == ["logout.role_id IN (1, 2)"]
+        assert CONDITION_FRAGMENTS.get_stats()["hits"] == 1
@@ -5,6 +5,7 @@ HQL V2 核心服务单元测试
 """
 
 import pytest
+import re
 import sys
 from pathlib import Path
 
@@ -99,6 +100,21 @@ class TestWhereBuilder:
         sql = self.builder.build(conditions)
         assert "account LIKE '%test%'" in sql
 
+    def test_build_condition_list_resolves_fields(self):
+        """测试条件列表按上下文解析列名"""
+        conditions = [
+            Condition(field="zone", operator="=", value=1),
+            Condition(field="role_id", operator="IS NULL"),
+        ]
+        context = {
+            "field_expressions": {"zone": "get_json_object(e.params, '$.zone_id')"},
+            "table_alias": "e",
+        }
+
+        clauses = self.builder.build_condition_list(conditions, context)
+
+        assert clauses == ["get_json_object(e.params, '$.zone_id') = 1", "e.role_id IS NULL"]
+
     def test_build_in_condition(self):
         """测试构建IN条件"""
         conditions = [Condition(field="level", operator="IN", value=[1, 2, 3])]
@@ -183,6 +199,158 @@ class TestHQLGenerator:
         assert "-- 中文: login" in hql
 
 
+class TestGenerateBatch:
+    """测试批量生成入口"""
+
+    def setup_method(self):
+        """测试前准备"""
+        self.generator = HQLGenerator()
+        self.fields = [
+            Field(name="role_id", type="base"),
+            Field(name="zone_id", type="param", json_path="$.zone_id"),
+        ]
+
+    def _configs(self, count):
+        for i in range(count):
+            event = Event(name=f"event_{i}", table_name=f"ieu_ods.ods_{i}_all_view")
+            yield {"key": f"view_{i}", "events": [event], "fields": self.fields}
+
+    def test_results_match_generate(self):
+        """测试批量结果与逐个generate()一致"""
+        results = {r["key"]: r for r in self.generator.generate_batch(self._configs(50))}
+
+        assert len(results) == 50
+        for config in self._configs(50):
+            expected = self.generator.generate(config["events"], config["fields"], [])
+            assert results[config["key"]]["hql"] == expected
+
+    def test_per_item_error(self):
+        """测试单项失败只影响该项"""
+        configs = list(self._configs(3))
+        configs[1]["options"] = {"mode": "join"}  # join模式至少需要两个事件
+
+        results = {r["key"]: r for r in self.generator.generate_batch(configs, max_workers=2)}
+
+        assert "join mode requires at least two events" in results["view_1"]["error"]
+        assert results["view_1"]["error_type"] == "ValueError"
+        assert "hql" in results["view_0"] and "hql" in results["view_2"]
+
+    def test_default_key_is_position(self):
+        """测试未提供key时使用序号"""
+        configs = [{k: v for k, v in c.items() if k != "key"} for c in self._configs(3)]
+
+        keys = sorted(r["key"] for r in self.generator.generate_batch(configs, max_pending=1))
+
+        assert keys == [0, 1, 2]
+
+
+class TestJsonTupleConsolidation:
+    """测试 use_json_tuple：顶层参数合并为一个 LATERAL VIEW json_tuple"""
+
+    def setup_method(self):
+        """测试前准备"""
+        self.generator = HQLGenerator()
+        self.events = [
+            Event(name="login", table_name="ieu_ods.ods_10000147_all_view"),
+            Event(name="logout", table_name="ieu_ods.ods_10000147_all_view"),
+        ]
+        self.fields = [
+            Field(name="role_id", type="base"),
+            Field(name="zone_id", type="param", json_path="$.zone_id"),
+            Field(name="level", type="param", json_path="level", alias="lv"),
+            Field(name="item_id", type="param", json_path="$.items[0].id", alias="item_id"),
+        ]
+
+    @staticmethod
+    def _column_sources(select_sql):
+        """
+        把一个SELECT的每个输出列解析为 (列名, 数据来源)
+
+        get_json_object 和 json_tuple 输出列都解析为对应的JSON路径，
+        两种写法取值相同的列得到相同的结果
+        """
+        lateral = re.search(r"json_tuple\([\w.]+, ([^)]*)\) jt AS (.*)", select_sql)
+        tuple_paths = {}
+        if lateral:
+            keys = [key.strip().strip("'") for key in lateral.group(1).split(",")]
+            columns = [column.strip() for column in lateral.group(2).split(",")]
+            tuple_paths = {column: f"$.{key}" for column, key in zip(columns, keys)}
+
+        select_list = select_sql.split("SELECT\n", 1)[1].split("\nFROM", 1)[0]
+        sources = []
+        for column in select_list.split(",\n"):
+            expression, _, name = column.strip().rpartition(" AS ")
+            expression = expression.replace("`", "")
+            json_object = re.match(r"get_json_object\([\w.]+, '(.*)'\)", expression)
+            if json_object:
+                expression = json_object.group(1)
+            sources.append((name.replace("`", ""), tuple_paths.get(expression, expression)))
+        return sources
+
+    def test_single_event_equivalent(self):
+        """测试单事件：输出列与逐个 get_json_object 一致，只解析一次"""
+        plain = self.generator.generate(self.events[:1], self.fields, [])
+        merged = self.generator.generate(self.events[:1], self.fields, [], use_json_tuple=True)
+
+        assert self._column_sources(merged) == self._column_sources(plain)
+        assert (
+            "LATERAL VIEW json_tuple(params, 'zone_id', 'level') jt AS jt_zone_id, jt_level"
+            in merged
+        )
+        assert merged.index("LATERAL VIEW") < merged.index("WHERE")
+
+    def test_nested_path_keeps_get_json_object(self):
+        """测试嵌套路径不合并"""
+        merged = self.generator.generate(self.events[:1], self.fields, [], use_json_tuple=True)
+
+        assert "get_json_object(params, '$.items[0].id') AS `item_id`" in merged
+        assert "get_json_object(params, '$.zone_id')" not in merged
+
+    def test_single_key_not_consolidated(self):
+        """测试只有一个顶层键时不生成 LATERAL VIEW"""
+        fields = self.fields[:2]
+
+        merged = self.generator.generate(self.events[:1], fields, [], use_json_tuple=True)
+
+        assert merged == self.generator.generate(self.events[:1], fields, [])
+
+    def test_default_unchanged(self):
+        """测试默认不合并"""
+        hql = self.generator.generate(self.events[:1], self.fields, [])
+
+        assert "json_tuple" not in hql
+
+    def test_union_equivalent(self):
+        """测试UNION：每个分支各自一个 LATERAL VIEW，读取本分支的params"""
+        fields = [self.fields[0]] + [
+            Field(name=f.name, type="param", json_path=f.json_path, alias=f.name)
+            for f in self.fields[1:]
+        ]
+        plain = self.generator.generate(self.events, fields, [], mode="union")
+        merged = self.generator.generate(
+            self.events, fields, [], mode="union", use_json_tuple=True
+        )
+
+        plain_branches = plain.split("UNION ALL")
+        merged_branches = merged.split("UNION ALL")
+        assert len(merged_branches) == 2
+        for plain_branch, merged_branch in zip(plain_branches, merged_branches):
+            assert self._column_sources(merged_branch) == self._column_sources(plain_branch)
+        assert "json_tuple(login.params, 'zone_id', 'level')" in merged_branches[0]
+        assert "json_tuple(logout.params, 'zone_id', 'level')" in merged_branches[1]
+
+    def test_lateral_view_in_partition_filtered_union(self):
+        """测试带分区过滤的UNION中 LATERAL VIEW 位于 FROM 和 WHERE 之间"""
+        merged = self.generator.generate(
+            self.events, self.fields, [], mode="union", use_json_tuple=True
+        )
+
+        for branch in merged.split("UNION ALL"):
+            from_at = branch.index("FROM ")
+            assert from_at < branch.index("LATERAL VIEW") < branch.index("WHERE")
+            assert "jt_zone_id AS zone_id" in branch
+
+
 class TestEventModel:
     """测试Event模型"""
 
@@ -0,0 +1,74 @@
+"""
+HQL历史记录游标分页测试
+"""
+
+import sqlite3
+
+import pytest
+
+from backend.core.database.pagination import InvalidCursorError
+from backend.services.hql.migrations.create_hql_history import migrate_hql_history
+from backend.services.hql.services.history_service import HQLHistoryService
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """写入历史记录的临时数据库：created_at 大量并列，另有其他用户的记录"""
+    path = str(tmp_path / "history.db")
+    migrate_hql_history(path)
+    conn = sqlite3.connect(path)
+    for i in range(13):
+        for user_id in (0, 1):
+            conn.execute(
+                """
+                INSERT INTO hql_history (user_id, events_json, fields_json, hql, created_at)
+                VALUES (?, '[]', '[]', ?, ?)
+                """,
+                (user_id, f"SELECT {i}", f"2026-01-0{i % 4 + 1} 10:00:00"),
+            )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def offset_ids(db_path, limit):
+    """按 created_at DESC, id ASC 的 LIMIT/OFFSET 逐页列出用户0的记录ID"""
+    conn = sqlite3.connect(db_path)
+    ids = []
+    offset = 0
+    while True:
+        rows = conn.execute(
+            """
+            SELECT id FROM hql_history WHERE user_id = 0
+            ORDER BY created_at DESC, id ASC LIMIT ? OFFSET ?
+            """,
+            (limit, offset),
+        ).fetchall()
+        if not rows:
+            conn.close()
+            return ids
+        ids.extend(row[0] for row in rows)
+        offset += limit
+
+
+class TestHistoryPage:
+    """测试 get_history_page 的游标遍历"""
+
+    @pytest.mark.parametrize("limit", [1, 4, 5, 13, 20])
+    def test_cursor_walk_matches_offset(self, db_path, limit):
+        """测试沿游标翻页与 OFFSET 分页得到相同记录和顺序"""
+        service = HQLHistoryService(db_path=db_path)
+        ids, cursor = [], None
+        while True:
+            rows, cursor = service.get_history_page(user_id=0, limit=limit, cursor=cursor)
+            ids.extend(row["id"] for row in rows)
+            if cursor is None:
+                break
+
+        assert ids == offset_ids(db_path, limit)
+        assert len(ids) == 13
+
+    def test_invalid_cursor(self, db_path):
+        """测试无法解析的游标抛出 InvalidCursorError"""
+        with pytest.raises(InvalidCursorError):
+            HQLHistoryService(db_path=db_path).get_history_page(cursor="garbage")
@@ -231,6 +231,101 @@ class TestUNIONModeFullCoverage:
         assert "get_json_object" in result
 
 
+class TestUNIONPredicatePushdown:
+    """UNION模式谓词下推测试（带分区过滤路径）"""
+
+    def setup_method(self):
+        """测试前准备"""
+        self.generator = HQLGenerator()
+        self.events = [
+            Event(name="login", table_name="ieu_ods.ods_10000147_all_view"),
+            Event(name="logout", table_name="ieu_ods.ods_10000147_all_view"),
+        ]
+        self.fields = [
+            Field(name="role_id", type="base"),
+            Field(name="zone_id", type="param", json_path="$.zone_id", alias="zone"),
+        ]
+
+    def _branches(self, conditions, **options):
+        hql = self.generator.generate(
+            events=self.events,
+            fields=self.fields,
+            conditions=conditions,
+            mode="union",
+            include_comments=False,
+            **options,
+        )
+        return hql.split("\nUNION ALL\n")
+
+    def test_partition_and_event_filter_on_every_branch(self):
+        """测试每个分支都有分区过滤和event_name过滤"""
+        login_branch, logout_branch = self._branches([])
+
+        assert "login.ds = '${ds}'" in login_branch
+        assert "login.event_name = 'login'" in login_branch
+        assert "logout.ds = '${ds}'" in logout_branch
+        assert "logout.event_name = 'logout'" in logout_branch
+
+    def test_condition_pushed_into_every_branch(self):
+        """测试未限定事件的条件下推到所有分支"""
+        conditions = [Condition(field="role_id", operator=">", value=100)]
+
+        login_branch, logout_branch = self._branches(conditions)
+
+        assert "login.role_id > 100" in login_branch.split("WHERE")[1]
+        assert "logout.role_id > 100" in logout_branch.split("WHERE")[1]
+
+    def test_condition_on_output_alias_uses_expression(self):
+        """测试按输出列名过滤时使用分支内的表达式（WHERE不能引用SELECT别名）"""
+        conditions = [Condition(field="zone", operator="IN", value=[1, 2])]
+
+        for branch, event in zip(self._branches(conditions), ["login", "logout"]):
+            where = branch.split("WHERE")[1]
+            assert f"get_json_object({event}.params, '$.zone_id') IN (1, 2)" in where
+
+    def test_event_scoped_condition_only_in_its_branch(self):
+        """测试限定事件的条件只下推到该事件的分支"""
+        conditions = [
+            Condition(field="role_id", operator="=", value=1),
+            Condition(field="reason", operator="=", value="kick", event="logout"),
+        ]
+
+        login_branch, logout_branch = self._branches(conditions)
+
+        assert "reason" not in login_branch
+        assert "logout.reason = 'kick'" in logout_branch
+        assert "login.role_id = 1" in login_branch
+
+    def test_unknown_event_raises_error(self):
+        """测试条件限定的事件不在UNION中时报错"""
+        conditions = [Condition(field="role_id", operator="=", value=1, event="payment")]
+
+        with pytest.raises(ValueError, match="unknown event: payment"):
+            self._branches(conditions)
+
+    def test_without_aliases_or_partition_filter(self):
+        """测试不使用别名、不带分区过滤时仍按分支过滤"""
+        conditions = [Condition(field="role_id", operator="IS NOT NULL")]
+
+        login_branch, logout_branch = self._branches(
+            conditions, use_aliases=False, include_partition_filter=False
+        )
+
+        assert "WHERE event_name = 'login' AND\n  role_id IS NOT NULL" in login_branch
+        assert "WHERE event_name = 'logout' AND\n  role_id IS NOT NULL" in logout_branch
+        assert "ds =" not in login_branch
+
+    def test_pushdown_with_json_tuple(self):
+        """测试 use_json_tuple 时条件引用 json_tuple 输出列"""
+        self.fields.append(Field(name="level", type="param", json_path="$.level"))
+        conditions = [Condition(field="level", operator=">=", value=10, event="login")]
+
+        login_branch, logout_branch = self._branches(conditions, use_json_tuple=True)
+
+        assert "jt_level >= 10" in login_branch.split("WHERE")[1]
+        assert "jt_level >=" not in logout_branch
+
+
 class TestJOINUNIONEdgeCases:
     """JOIN/UNION边界情况测试"""
 
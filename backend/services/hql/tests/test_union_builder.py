@@ -68,6 +68,68 @@ class TestUnionBuilder:
         # 每个子查询都应该有分区过滤
         assert union_sql.count("ds = '${bizdate}'") == 2
 
+    def test_build_union_with_partition_filter_branch_predicates(self):
+        """测试分区过滤之后追加各分支自己的谓词"""
+        builder = UnionBuilder()
+
+        events = [
+            Event(name="login", table_name="ods_login"),
+            Event(name="logout", table_name="ods_logout"),
+        ]
+
+        fields = [Field(name="role_id", type="base")]
+
+        union_sql = builder.build_union_with_partition_filter(
+            events,
+            fields,
+            use_aliases=True,
+            branch_predicates={"login": ["login.event_name = 'login'", "login.role_id > 0"]},
+        )
+
+        login_branch, logout_branch = union_sql.split("UNION ALL")
+        assert (
+            "WHERE login.ds = '${bizdate}' AND\n  login.event_name = 'login' AND\n"
+            "  login.role_id > 0" in login_branch
+        )
+        assert logout_branch.rstrip().endswith("WHERE logout.ds = '${bizdate}'")
+
+    def test_build_union_all_branch_predicates(self):
+        """测试不带分区过滤时只有提供了谓词的分支有WHERE"""
+        builder = UnionBuilder()
+
+        events = [
+            Event(name="login", table_name="ods_login"),
+            Event(name="logout", table_name="ods_logout"),
+        ]
+
+        fields = [Field(name="role_id", type="base")]
+
+        union_sql = builder.build_union_all(
+            events, fields, branch_predicates={"logout": ["event_name = 'logout'"]}
+        )
+
+        login_branch, logout_branch = union_sql.split("UNION ALL")
+        assert "WHERE" not in login_branch
+        assert "WHERE event_name = 'logout'" in logout_branch
+
+    def test_field_expressions(self):
+        """测试输出列名解析为分支中的表达式"""
+        builder = UnionBuilder()
+
+        event = Event(name="login", table_name="ods_login")
+        fields = [
+            Field(name="role_id", type="base"),
+            Field(name="zone_id", type="param", json_path="$.zone_id", alias="zone"),
+            Field(name="cnt", type="base", aggregate_func="COUNT"),
+        ]
+
+        expressions = builder.field_expressions(event, fields, use_alias=True)
+
+        assert expressions["role_id"] == "login.role_id"
+        assert expressions["zone"] == "get_json_object(login.params, '$.zone_id')"
+        assert expressions["zone_id"] == expressions["zone"]
+        assert "cnt" not in expressions
+
     def test_build_union_with_where(self):
         """测试带自定义WHERE条件的UNION"""
         builder = UnionBuilder()
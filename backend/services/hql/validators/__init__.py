@@ -9,6 +9,7 @@ from .performance_analyzer import (
     PerformanceReport,
     IssueType,
     analyze_hql_performance,
+    estimate_json_parse_cost,
     format_report_for_api,
 )
 
@@ -28,6 +29,7 @@ __all__ = [
     "PerformanceReport",
     "IssueType",
     "analyze_hql_performance",
+    "estimate_json_parse_cost",
     "format_report_for_api",
     # 语法校验
     "SyntaxValidator",
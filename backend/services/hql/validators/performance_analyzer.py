@@ -5,10 +5,17 @@ HQL性能分析器
 提供HQL性能评分和优化建议
 """
 
+import re
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+_GET_JSON_OBJECT = re.compile(r"get_json_object\s*\(\s*([\w.`]+)\s*,\s*'([^']*)'\s*\)", re.I)
+_JSON_TUPLE = re.compile(r"\bjson_tuple\s*\(", re.I)
+_UNION_ALL = re.compile(r"\bUNION\s+ALL\b", re.I)
+# json_tuple 只能取顶层键
+_TOP_LEVEL_JSON_PATH = re.compile(r"^\$\.[a-zA-Z_][a-zA-Z0-9_]*$")
+
 
 class IssueType(Enum):
     """问题类型"""
@@ -38,6 +45,8 @@ class PerformanceMetrics:
     subquery_count: int
     udf_count: int
     complexity: str  # low/medium/high
+    json_parses_per_row: int = 0  # 每行JSON解析次数（见 estimate_json_parse_cost）
+    json_parses_saved: int = 0  # 合并为 json_tuple 后每行可省下的解析次数
 
 
 @dataclass
@@ -103,6 +112,7 @@ class HQLPerformanceAnalyzer:
         self._apply_complexity_rule(hql, metrics)
         self._apply_subquery_rule(metrics)
         self._apply_udf_rule(metrics)
+        self._apply_json_parse_rule(metrics)
 
         # 确保分数在0-100范围内
         self.score = max(0, min(100, self.score))
@@ -111,8 +121,6 @@ class HQLPerformanceAnalyzer:
 
     def _extract_metrics(self, hql: str) -> PerformanceMetrics:
         """提取HQL指标"""
-        import re
-
         hql_upper = hql.upper()
 
         # 检查分区过滤（改进检测逻辑）
@@ -216,6 +224,9 @@ class HQLPerformanceAnalyzer:
         # 计算复杂度
         complexity = self._calculate_complexity(hql)
 
+        # JSON解析开销
+        json_cost = estimate_json_parse_cost(hql)
+
         return PerformanceMetrics(
             has_partition_filter=has_partition_filter,
             has_select_star=has_select_star,
@@ -224,6 +235,8 @@ class HQLPerformanceAnalyzer:
             subquery_count=subquery_count,
             udf_count=udf_count,
             complexity=complexity,
+            json_parses_per_row=json_cost["parses_per_row"],
+            json_parses_saved=json_cost["saved_per_row"],
         )
 
     def _calculate_complexity(self, hql: str) -> str:
@@ -341,6 +354,72 @@ class HQLPerformanceAnalyzer:
                 )
 
 
+    def _apply_json_parse_rule(self, metrics: PerformanceMetrics):
+        """应用JSON重复解析规则（只给建议，不扣分）"""
+        if metrics.json_parses_saved > 0:
+            self.issues.append(
+                PerformanceIssue(
+                    type=IssueType.INFO,
+                    message=f"params JSON is parsed {metrics.json_parses_per_row} times per row",
+                    suggestion="Generate with option use_json_tuple to extract top-level keys "
+                    + f"with one LATERAL VIEW json_tuple ({metrics.json_parses_saved} fewer "
+                    + "parses per row).",
+                )
+            )
+
+
+def estimate_json_parse_cost(hql: str) -> Dict[str, int]:
+    """
+    静态估算HQL每行的JSON解析次数
+
+    每个 get_json_object 调用和每个 json_tuple 调用都会完整解析一次JSON字符串。
+    UNION ALL 的每个分支分别计算后相加（即每个分支各处理一行时的总次数）。
+    合并后的次数按 use_json_tuple 的规则估算：同一JSON列上不少于2个不同顶层键的
+    get_json_object 合并为一次 json_tuple，嵌套路径不变。
+
+    Args:
+        hql: HQL语句
+
+    Returns:
+        Dict:
+            - get_json_object: get_json_object 调用数
+            - json_tuple: json_tuple 调用数
+            - parses_per_row: 当前每行解析次数
+            - consolidated_parses_per_row: 合并后每行解析次数
+            - saved_per_row: 合并可省下的次数
+
+    Examples:
+        >>> estimate_json_parse_cost(
+        ...     "SELECT get_json_object(params, '$.a'), get_json_object(params, '$.b') FROM t"
+        ... )["saved_per_row"]
+        1
+    """
+    totals = {"get_json_object": 0, "json_tuple": 0, "parses_per_row": 0}
+    consolidated = 0
+    for branch in _UNION_ALL.split(hql):
+        calls = _GET_JSON_OBJECT.findall(branch)
+        tuples = len(_JSON_TUPLE.findall(branch))
+        totals["get_json_object"] += len(calls)
+        totals["json_tuple"] += tuples
+        totals["parses_per_row"] += len(calls) + tuples
+
+        # 按JSON列统计顶层键
+        top_level: Dict[str, List[str]] = {}
+        branch_cost = tuples
+        for source, path in calls:
+            if _TOP_LEVEL_JSON_PATH.match(path):
+                top_level.setdefault(source.replace("`", "").lower(), []).append(path)
+            else:
+                branch_cost += 1
+        for paths in top_level.values():
+            branch_cost += 1 if len(set(paths)) >= 2 else len(paths)
+        consolidated += branch_cost
+
+    totals["consolidated_parses_per_row"] = consolidated
+    totals["saved_per_row"] = totals["parses_per_row"] - consolidated
+    return totals
+
+
 # 便捷函数
 def analyze_hql_performance(hql: str) -> PerformanceReport:
     """
@@ -377,6 +456,8 @@ def format_report_for_api(report: PerformanceReport) -> Dict[str, Any]:
             "has_select_star": report.metrics.has_select_star,
             "join_count": report.metrics.join_count,
             "complexity": report.metrics.complexity,
+            "json_parses_per_row": report.metrics.json_parses_per_row,
+            "json_parses_saved": report.metrics.json_parses_saved,
         },
     }
 
@@ -389,5 +470,6 @@ __all__ = [
     "PerformanceReport",
     "IssueType",
     "analyze_hql_performance",
+    "estimate_json_parse_cost",
     "format_report_for_api",
 ]
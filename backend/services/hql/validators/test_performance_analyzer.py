@@ -6,6 +6,7 @@ import pytest
 from .performance_analyzer import (
     HQLPerformanceAnalyzer,
     analyze_hql_performance,
+    estimate_json_parse_cost,
     format_report_for_api,
     IssueType,
 )
@@ -155,6 +156,56 @@ class TestConvenienceFunctions:
         assert isinstance(report.issues, list)
 
 
+class TestJsonParseCost:
+    """测试JSON解析开销估算"""
+
+    def test_counts_savings_per_branch(self):
+        """测试每个UNION分支分别合并"""
+        branch = (
+            "SELECT get_json_object(e.params, '$.a'), get_json_object(e.params, '$.b'), "
+            "get_json_object(e.params, '$.c[0]') FROM t AS e"
+        )
+        cost = estimate_json_parse_cost(f"{branch}\nUNION ALL\n{branch}")
+
+        assert cost["get_json_object"] == 6
+        assert cost["parses_per_row"] == 6
+        assert cost["consolidated_parses_per_row"] == 4
+        assert cost["saved_per_row"] == 2
+
+    def test_json_tuple_counts_as_one_parse(self):
+        """测试已合并的HQL没有可省的解析"""
+        hql = (
+            "SELECT jt_a, jt_b, get_json_object(params, '$.c.d') FROM t\n"
+            "LATERAL VIEW json_tuple(params, 'a', 'b') jt AS jt_a, jt_b"
+        )
+        cost = estimate_json_parse_cost(hql)
+
+        assert cost["json_tuple"] == 1
+        assert cost["parses_per_row"] == 2
+        assert cost["saved_per_row"] == 0
+
+    def test_repeated_key_is_not_a_saving(self):
+        """测试同一个键重复提取不算可合并"""
+        hql = "SELECT get_json_object(params, '$.a'), get_json_object(params, '$.a') FROM t"
+
+        assert estimate_json_parse_cost(hql)["saved_per_row"] == 0
+
+    def test_report_suggests_json_tuple(self):
+        """测试报告给出合并建议"""
+        hql = (
+            "SELECT get_json_object(params, '$.a'), get_json_object(params, '$.b') "
+            "FROM t WHERE ds = '${ds}'"
+        )
+        report = analyze_hql_performance(hql)
+
+        assert report.metrics.json_parses_per_row == 2
+        assert report.metrics.json_parses_saved == 1
+        assert any(
+            issue.type == IssueType.INFO and "json_tuple" in issue.suggestion
+            for issue in report.issues
+        )
+
+
 # Pytest fixture配置
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
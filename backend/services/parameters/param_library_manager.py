@@ -10,6 +10,7 @@ from typing import Dict, List, Optional, Any
 from backend.core.database import get_db_connection
 from backend.core.logging import get_logger
 from backend.core.utils import fetch_all_as_dict, fetch_one_as_dict, execute_write
+from backend.core.database.write_behind import submit_write
 from backend.services.parameters.param_type_manager import param_type_manager
 
 logger = get_logger(__name__)
@@ -173,8 +174,8 @@ class ParamLibraryManager:
         return extracted_count
 
     def update_usage_count(self, library_id: int):
-        """更新参数使用次数"""
-        execute_write(
+        """更新参数使用次数（计数器可延迟，不等待提交；失败在提交完成后记录日志）"""
+        future = submit_write(
             """
             UPDATE param_library
             SET usage_count = (
@@ -185,6 +186,13 @@ class ParamLibraryManager:
             (library_id, library_id),
         )
 
+        def log_failure(done):
+            error = done.exception()
+            if error is not None:
+                logger.error(f"Failed to update usage_count for library {library_id}: {error}")
+
+        future.add_done_callback(log_failure)
+
     def update_parameter(self, library_id: int, param_data: Dict[str, Any]) -> bool:
         """更新库参数"""
         # 如果更新了类型，需要更新template_id
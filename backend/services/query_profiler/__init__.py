@@ -0,0 +1,9 @@
+"""
+Query Profiler Service Module
+
+Provides SQL query profiling endpoints and blueprints.
+"""
+
+from .query_profiler import query_profiler_bp
+
+__all__ = ["query_profiler_bp"]
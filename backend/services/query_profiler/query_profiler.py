@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Query Profiler Module
+=====================
+SQL查询剖析端点（数据来自 backend.core.database.query_profiler）
+
+API端点:
+- GET /admin/db/queries - 按端点+归一化SQL聚合的查询统计（延迟分位数、行数、执行计划）
+- GET /admin/db/queries/full-scans - 对大表做全表扫描的语句
+- POST /admin/db/queries/enable - 开启/关闭剖析（{"enabled": true}）
+- POST /admin/db/queries/reset - 清空统计
+"""
+
+from flask import Blueprint, jsonify, request
+from backend.core.logging import get_logger
+from backend.core.database.query_profiler import query_profiler
+
+logger = get_logger(__name__)
+
+query_profiler_bp = Blueprint("query_profiler", __name__)
+
+SORT_KEYS = ("total_ms", "avg_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms", "calls", "rows")
+
+
+@query_profiler_bp.route("/admin/db/queries")
+def query_profile():
+    """
+    获取查询剖析报告
+
+    查询参数:
+        sort: 排序字段（total_ms/avg_ms/p50_ms/p95_ms/p99_ms/max_ms/calls/rows，默认total_ms）
+        limit: 返回语句数（默认50）
+        endpoint: 只看某个Flask端点
+    """
+    sort = request.args.get("sort", "total_ms")
+    if sort not in SORT_KEYS:
+        return jsonify({"success": False, "error": f"sort必须是: {', '.join(SORT_KEYS)}"}), 400
+
+    try:
+        limit = request.args.get("limit", 50, type=int)
+        report = query_profiler.get_report(
+            sort=sort, limit=limit, endpoint=request.args.get("endpoint")
+        )
+        return jsonify({"success": True, "data": report})
+    except Exception as e:
+        logger.error(f"获取查询剖析报告失败: {e}")
+        return jsonify({"error": str(e), "message": "获取查询剖析报告失败"}), 500
+
+
+@query_profiler_bp.route("/admin/db/queries/full-scans")
+def full_scans():
+    """获取对大表做全表扫描的语句（按总耗时排序）"""
+    try:
+        report = query_profiler.get_report(limit=query_profiler.max_statements)
+        statements = [s for s in report["statements"] if s["full_scans"]]
+        return jsonify({"success": True, "data": statements, "count": len(statements)})
+    except Exception as e:
+        logger.error(f"获取全表扫描语句失败: {e}")
+        return jsonify({"error": str(e), "message": "获取全表扫描语句失败"}), 500
+
+
+@query_profiler_bp.route("/admin/db/queries/enable", methods=["POST"])
+def enable_profiler():
+    """开启或关闭查询剖析"""
+    data = request.get_json(silent=True) or {}
+    enabled = bool(data.get("enabled", True))
+    if enabled:
+        query_profiler.enable()
+    else:
+        query_profiler.disable()
+    logger.info(f"🔍 查询剖析已{'开启' if enabled else '关闭'}")
+    return jsonify({"success": True, "enabled": query_profiler.enabled})
+
+
+@query_profiler_bp.route("/admin/db/queries/reset", methods=["POST"])
+def reset_profiler():
+    """清空查询剖析统计"""
+    query_profiler.reset()
+    return jsonify({"success": True, "message": "✅ 查询剖析统计已清空"})
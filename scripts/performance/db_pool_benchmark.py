@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据库连接池基准测试：每次查询新建连接 vs 连接池
+
+在临时SQLite文件中构造游戏/事件/参数数据，按 fetch_one_as_dict / fetch_all_as_dict /
+execute_write 的用法（get_db_connection → 查询 → close）执行相同的查询，
+分别在关闭和开启 DB_POOL_ENABLED 时测量每秒查询数，并可选多线程并发。
+
+用法:
+    python scripts/performance/db_pool_benchmark.py
+    python scripts/performance/db_pool_benchmark.py --queries 20000 --threads 8
+"""
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# 添加项目根路径
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.core.config import DatabaseConfig  # noqa: E402
+from backend.core.database import close_all_pools, get_db_connection, get_pool_stats  # noqa: E402
+
+
+def build_database(path, games, events_per_game, params_per_event):
+    """构造基准数据"""
+    conn = get_db_connection(path)
+    conn.executescript("""
+        CREATE TABLE games (id INTEGER PRIMARY KEY, gid TEXT UNIQUE, name TEXT);
+        CREATE TABLE log_events (
+            id INTEGER PRIMARY KEY, game_gid TEXT, event_name TEXT, event_name_cn TEXT
+        );
+        CREATE TABLE event_params (
+            id INTEGER PRIMARY KEY, event_id INTEGER, param_name TEXT, is_active INTEGER
+        );
+        CREATE INDEX idx_log_events_game_gid ON log_events(game_gid);
+        CREATE INDEX idx_event_params_event_id ON event_params(event_id);
+    """)
+    event_id = 0
+    for g in range(games):
+        gid = str(10000000 + g)
+        conn.execute("INSERT INTO games (id, gid, name) VALUES (?, ?, ?)", (g + 1, gid, f"game{g}"))
+        for e in range(events_per_game):
+            event_id += 1
+            conn.execute(
+                "INSERT INTO log_events VALUES (?, ?, ?, ?)",
+                (event_id, gid, f"event_{e}", f"事件{e}"),
+            )
+            conn.executemany(
+                "INSERT INTO event_params (event_id, param_name, is_active) VALUES (?, ?, 1)",
+                [(event_id, f"param_{p}") for p in range(params_per_event)],
+            )
+    conn.commit()
+    conn.close()
+    return event_id
+
+
+def fetch_one(path, query, params):
+    conn = get_db_connection(path)
+    try:
+        row = conn.execute(query, params).fetchone()
+        return dict(row) if row else None
+    finally:
+        conn.close()
+
+
+def fetch_all(path, query, params):
+    conn = get_db_connection(path)
+    try:
+        return [dict(row) for row in conn.execute(query, params).fetchall()]
+    finally:
+        conn.close()
+
+
+def execute_write(path, query, params):
+    conn = get_db_connection(path)
+    try:
+        cursor = conn.execute(query, params)
+        conn.commit()
+        return cursor.rowcount
+    finally:
+        conn.close()
+
+
+def workload(path, queries, total_events, offset=0):
+    """混合负载：详情查询、列表查询、参数列表、每50次一次写入"""
+    for i in range(queries):
+        event_id = (i + offset) % total_events + 1
+        kind = i % 4
+        if kind == 0:
+            fetch_one(path, "SELECT * FROM log_events WHERE id = ?", (event_id,))
+        elif kind == 1:
+            fetch_all(
+                path,
+                "SELECT id, event_name FROM log_events WHERE game_gid = ? LIMIT 50",
+                (str(10000000 + event_id % 10),),
+            )
+        elif kind == 2:
+            fetch_all(path, "SELECT * FROM event_params WHERE event_id = ?", (event_id,))
+        elif i % 50 == 3:
+            execute_write(path, "UPDATE games SET name = name WHERE id = ?", (event_id % 10 + 1,))
+        else:
+            fetch_one(
+                path, "SELECT COUNT(*) AS c FROM event_params WHERE event_id = ?", (event_id,)
+            )
+
+
+def run(path, queries, threads, total_events):
+    """执行负载，返回 (总查询数, 耗时秒)"""
+    per_thread = queries // threads
+    workers = [
+        threading.Thread(target=workload, args=(path, per_thread, total_events, n * per_thread))
+        for n in range(threads)
+    ]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return per_thread * threads, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数据库连接池基准测试")
+    parser.add_argument("--queries", type=int, default=10000, help="查询次数（默认1万）")
+    parser.add_argument("--threads", type=int, default=4, help="并发线程数（默认4）")
+    parser.add_argument("--games", type=int, default=10, help="游戏数量")
+    parser.add_argument("--events", type=int, default=200, help="每个游戏的事件数量")
+    parser.add_argument("--params", type=int, default=20, help="每个事件的参数数量")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.TemporaryDirectory()
+    path = Path(tmpdir.name) / "bench.db"
+    total_events = build_database(path, args.games, args.events, args.params)
+
+    print("=" * 70)
+    print(f"连接池基准测试: {total_events}个事件, 每个事件{args.params}个参数")
+    print(
+        f"池大小={DatabaseConfig.DB_POOL_SIZE}, 语句缓存={DatabaseConfig.DB_STATEMENT_CACHE_SIZE}"
+    )
+    print("=" * 70)
+
+    rows = []
+    for threads in sorted({1, args.threads}):
+        for pooled in (False, True):
+            DatabaseConfig.DB_POOL_ENABLED = pooled
+            close_all_pools()
+            count, seconds = run(path, args.queries, threads, total_events)
+            label = "连接池" if pooled else "每次新建连接"
+            rows.append((label, threads, count, seconds))
+
+    print(f"{'模式':<14}{'线程':>6}{'查询数':>10}{'耗时(ms)':>12}{'queries/s':>12}")
+    print("-" * 70)
+    for label, threads, count, seconds in rows:
+        print(f"{label:<14}{threads:>6}{count:>10}{seconds * 1000:>12.1f}{count / seconds:>12.0f}")
+    print("-" * 70)
+    for pool_path, stats in get_pool_stats().items():
+        print(f"池统计 {Path(pool_path).name}: {stats}")
+
+    close_all_pools()
+    tmpdir.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+全文检索基准测试：LIKE '%kw%' vs FTS5
+
+在临时SQLite文件中构造HQL历史（默认10万条HQL正文）和事件数据，
+分别在关闭和开启 DB_FTS_ENABLED 时执行：
+- HQLHistoryService.global_search_history 的关键词搜索（HQL正文 + 中英文名称）
+- 事件名称搜索（event_name / event_name_cn，含中文关键词）
+并测量FTS索引构建耗时、写入时触发器的额外开销。
+
+用法:
+    python scripts/performance/fts_search_benchmark.py
+    python scripts/performance/fts_search_benchmark.py --history 200000 --rounds 10
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加项目根路径
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.core.config import DatabaseConfig  # noqa: E402
+from backend.core.database import close_all_pools, get_db_connection  # noqa: E402
+from backend.core.database.fulltext import (  # noqa: E402
+    ensure_search_indexes,
+    match_condition,
+    search_ids,
+)
+from backend.services.hql.services.history_service import HQLHistoryService  # noqa: E402
+
+WORDS = ["login", "logout", "payment", "recharge", "battle", "guild", "level_up", "quest"]
+WORDS_CN = ["登录", "登出", "支付", "充值", "战斗", "公会", "升级", "任务"]
+
+
+def build_database(path, history_rows, events):
+    """构造基准数据"""
+    conn = get_db_connection(path)
+    conn.executescript("""
+        CREATE TABLE log_events (
+            id INTEGER PRIMARY KEY, game_gid INTEGER, event_name TEXT, event_name_cn TEXT
+        );
+        CREATE TABLE hql_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER DEFAULT 0, session_id TEXT,
+            events_json TEXT NOT NULL, fields_json TEXT NOT NULL, conditions_json TEXT,
+            mode TEXT NOT NULL, hql TEXT NOT NULL, performance_score INTEGER,
+            metadata_json TEXT, hql_type TEXT DEFAULT 'select', game_gid INTEGER,
+            name_en TEXT, name_cn TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX idx_hql_history_created_at ON hql_history(created_at);
+    """)
+    rng = random.Random(42)
+    conn.executemany(
+        "INSERT INTO log_events VALUES (?, ?, ?, ?)",
+        [
+            (i + 1, 10000 + i % 20, f"{rng.choice(WORDS)}_{i}", f"{rng.choice(WORDS_CN)}事件{i}")
+            for i in range(events)
+        ],
+    )
+    rows = []
+    for i in range(history_rows):
+        word = rng.choice(WORDS)
+        fields = ", ".join(
+            f"get_json_object(params, '$.{rng.choice(WORDS)}_{n}')" for n in range(30)
+        )
+        hql = (
+            f"CREATE OR REPLACE VIEW dwd.v_{word}_{i} AS\nSELECT ds, role_id, {fields}\n"
+            f"FROM ieu_ods.ods_{10000 + i % 20}_all_view\n"
+            f"WHERE ds = '${{ds}}' AND event = '{word}_{i % 500}'"
+        )
+        rows.append(
+            (
+                "[]",
+                "[]",
+                "single",
+                hql,
+                f"v_{word}_{i}",
+                f"{rng.choice(WORDS_CN)}视图{i}",
+                f"2026-01-01 00:{i // 60 % 60:02d}:{i % 60:02d}",
+            )
+        )
+    conn.executemany(
+        "INSERT INTO hql_history (events_json, fields_json, mode, hql, name_en, name_cn,"
+        " created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+
+
+def timed(fn, rounds):
+    samples = []
+    result = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def event_search(path, keyword):
+    condition, params = match_condition(
+        "events", keyword, "le.id", ["le.event_name", "le.event_name_cn"], db_path=path
+    )
+    conn = get_db_connection(path)
+    try:
+        sql = f"SELECT le.* FROM log_events le WHERE {condition} ORDER BY le.id DESC LIMIT 20"
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def insert_history(path, count):
+    conn = get_db_connection(path)
+    try:
+        start = time.perf_counter()
+        for i in range(count):
+            conn.execute(
+                "INSERT INTO hql_history (events_json, fields_json, mode, hql, name_en, name_cn)"
+                " VALUES ('[]', '[]', 'single', ?, ?, ?)",
+                (f"SELECT * FROM t WHERE event = 'bench_{i}'", f"bench_{i}", f"基准{i}"),
+            )
+        conn.commit()
+        return (time.perf_counter() - start) * 1000 / count
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="全文检索基准测试")
+    parser.add_argument("--history", type=int, default=100000, help="HQL历史条数（默认10万）")
+    parser.add_argument("--events", type=int, default=50000, help="事件数量（默认5万）")
+    parser.add_argument("--rounds", type=int, default=5, help="每个查询的执行轮数（取中位数）")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.TemporaryDirectory()
+    path = Path(tmpdir.name) / "bench.db"
+    build_database(path, args.history, args.events)
+    service = HQLHistoryService(db_path=path)
+
+    history_keywords = ["guild_1234", "recharge", "公会视图77", "v_battle_9999"]
+    event_keywords = ["payment_12", "充值事件1", "quest"]
+
+    results = {}
+    for fts in (False, True):
+        DatabaseConfig.DB_FTS_ENABLED = fts
+        if fts:
+            start = time.perf_counter()
+            status = ensure_search_indexes(path)
+            build_ms = (time.perf_counter() - start) * 1000
+        mode = "FTS5" if fts else "LIKE"
+        for keyword in history_keywords:
+            results[(mode, "history", keyword)] = timed(
+                lambda: service.global_search_history(keyword=keyword, limit=50), args.rounds
+            )
+        for keyword in event_keywords:
+            results[(mode, "events", keyword)] = timed(
+                lambda: event_search(path, keyword), args.rounds
+            )
+        results[(mode, "insert", "")] = (insert_history(path, 500), None)
+
+    print("=" * 78)
+    print(f"全文检索基准测试: {args.history}条HQL历史, {args.events}个事件")
+    print(f"FTS索引: {status}")
+    print(f"FTS索引构建耗时: {build_ms:.0f}ms")
+    print("=" * 78)
+    print(f"{'查询':<10}{'关键词':<18}{'LIKE(ms)':>12}{'FTS5(ms)':>12}{'加速':>8}{'结果数':>10}")
+    print("-" * 78)
+    for kind, keywords in (("history", history_keywords), ("events", event_keywords)):
+        for keyword in keywords:
+            like_ms, like_rows = results[("LIKE", kind, keyword)]
+            fts_ms, fts_rows = results[("FTS5", kind, keyword)]
+            same = "" if len(like_rows) == len(fts_rows) else f" (LIKE {len(like_rows)})"
+            print(
+                f"{kind:<10}{keyword:<18}{like_ms:>12.2f}{fts_ms:>12.2f}"
+                f"{like_ms / fts_ms:>7.1f}x{len(fts_rows):>10}{same}"
+            )
+    print("-" * 78)
+    print(
+        f"写入开销: 每条插入 {results[('LIKE', 'insert', '')][0]:.3f}ms (无触发器) → "
+        f"{results[('FTS5', 'insert', '')][0]:.3f}ms (FTS触发器)"
+    )
+    print(
+        f"短关键词(<3字符)回退LIKE: search_ids('events', '支付') = "
+        f"{search_ids('events', '支付', db_path=path)}"
+    )
+
+    close_all_pools()
+    tmpdir.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQL片段缓存微基准：200字段视图重复生成
+
+模拟大量请求反复生成同一类视图：每次迭代都新建 HQLGenerator（与每个请求新建
+构建器一致），用同一组字段定义（基础字段、顶层/嵌套参数、自定义表达式、固定值）
+和条件生成单事件视图。分别测量:
+- no-cache: 片段缓存停用（FragmentCache.resize(0)），每个字段都重新校验和拼接
+- cache: 片段缓存启用，首次之后字段/条件片段直接命中
+
+两种模式生成的HQL必须完全相同。
+
+用法:
+    python scripts/performance/hql_fragment_cache_benchmark.py
+    python scripts/performance/hql_fragment_cache_benchmark.py --fields 200 --iterations 10000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根路径
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.services.hql.builders.fragment_cache import (  # noqa: E402
+    CONDITION_FRAGMENTS,
+    DEFAULT_MAXSIZE,
+    FIELD_FRAGMENTS,
+)
+from backend.services.hql.core.generator import HQLGenerator  # noqa: E402
+from backend.services.hql.models.event import Condition, Event, Field  # noqa: E402
+
+
+def build_fields(count):
+    """生成 count 个字段，各类型按常见比例混合"""
+    fields = []
+    for i in range(count):
+        kind = i % 10
+        if kind < 3:
+            fields.append(Field(name=f"base_{i}", type="base"))
+        elif kind < 7:
+            fields.append(Field(name=f"param_{i}", type="param", json_path=f"$.param_{i}"))
+        elif kind == 7:
+            fields.append(
+                Field(name=f"nested_{i}", type="param", json_path=f"$.obj_{i}.items[0].id")
+            )
+        elif kind == 8:
+            fields.append(
+                Field(
+                    name=f"custom_{i}",
+                    type="custom",
+                    custom_expression=f"CASE WHEN level > {i} THEN 1 ELSE 0 END",
+                    alias=f"custom_{i}",
+                )
+            )
+        else:
+            fields.append(Field(name=f"fixed_{i}", type="fixed", fixed_value=f"v{i}"))
+    return fields
+
+
+def run(iterations, event, fields, conditions):
+    """生成 iterations 次，返回 (总耗时秒, 最后一次的HQL)"""
+    hql = None
+    start = time.perf_counter()
+    for _ in range(iterations):
+        hql = HQLGenerator().generate([event], fields, conditions)
+    return time.perf_counter() - start, hql
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQL片段缓存微基准")
+    parser.add_argument("--fields", type=int, default=200, help="视图字段数（默认200）")
+    parser.add_argument("--iterations", type=int, default=10000, help="生成次数（默认10000）")
+    args = parser.parse_args()
+
+    event = Event(name="role_login", table_name="ieu_ods.ods_10000147_all_view")
+    fields = build_fields(args.fields)
+    conditions = [
+        Condition(field="zone_id", operator="IN", value=[1, 2, 3]),
+        Condition(field="role_name", operator="LIKE", value="%test%"),
+        Condition(field="level", operator=">=", value=10),
+    ]
+
+    print(f"字段数: {args.fields}  生成次数: {args.iterations}")
+
+    results = {}
+    for mode, maxsize in (("no-cache", 0), ("cache", DEFAULT_MAXSIZE)):
+        for cache in (FIELD_FRAGMENTS, CONDITION_FRAGMENTS):
+            cache.resize(maxsize)
+            cache.clear()
+        elapsed, hql = run(args.iterations, event, fields, conditions)
+        results[mode] = (elapsed, hql)
+        print(
+            f"{mode:<10} 总耗时 {elapsed:8.2f}s  "
+            f"每次 {elapsed / args.iterations * 1000:7.3f}ms  "
+            f"每字段 {elapsed / args.iterations / args.fields * 1e6:6.2f}µs"
+        )
+
+    stats = FIELD_FRAGMENTS.get_stats()
+    print(f"字段片段缓存: {stats['size']} 条, 命中率 {stats['hit_rate']:.2%}")
+
+    if results["no-cache"][1] != results["cache"][1]:
+        print("错误: 两种模式生成的HQL不一致")
+        return 1
+    print(f"加速比: {results['no-cache'][0] / results['cache'][0]:.2f}x（HQL一致）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
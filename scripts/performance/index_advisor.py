@@ -0,0 +1,661 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+索引顾问：根据采集到的查询负载推荐索引
+
+create_indexes() 中的索引列表是手工维护的，已经与真实查询形态脱节。本脚本：
+1. 采样查询负载：查询剖析报告（GET /admin/db/queries 或其JSON导出，按调用次数加权）、
+   SQL文件，或内置的热点接口查询
+2. 解析每条语句的 WHERE / JOIN ON / ORDER BY 列，生成候选索引
+   （等值列在前，其后是排序列、第一个范围列或连接列；
+   INTEGER PRIMARY KEY 作为rowid隐式位于索引末尾，不重复加入）
+3. 把数据库复制到临时文件并 ANALYZE，逐个创建候选索引，用 EXPLAIN QUERY PLAN
+   + sqlite_stat1 行数估算每条语句的代价，计算加权收益
+4. 输出迁移SQL（推荐的 CREATE INDEX）并标记冗余索引（重复、前缀、rowid后缀）
+
+代价为估算值（访问行数），只用于比较同一负载下有无索引的差异。
+
+用法:
+    python scripts/performance/index_advisor.py
+    python scripts/performance/index_advisor.py --profile-url http://localhost:5001
+    python scripts/performance/index_advisor.py --profile-file profile.json
+    python scripts/performance/index_advisor.py --db-path data/dwd_generator_dev.db
+    python scripts/performance/index_advisor.py --sql-file queries.sql \
+        --output migration/add_advised_indexes.sql
+"""
+
+import argparse
+import json
+import math
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import defaultdict
+from datetime import date
+from pathlib import Path
+
+# 添加项目根路径
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.core.config import get_db_path  # noqa: E402
+
+# 内置负载：热点接口的查询形态（没有剖析数据时使用）
+BUILTIN_WORKLOAD = [
+    # api_list_events
+    "SELECT le.*, g.name as game_name, ec.name as category_name FROM log_events le "
+    "LEFT JOIN games g ON le.game_gid = g.gid "
+    "LEFT JOIN event_categories ec ON le.category_id = ec.id "
+    "WHERE le.game_gid = ? ORDER BY le.id DESC LIMIT ? OFFSET ?",
+    "SELECT COUNT(*) as total FROM log_events le "
+    "LEFT JOIN event_categories ec ON le.category_id = ec.id WHERE le.game_gid = ?",
+    # api_get_all_parameters
+    "SELECT ep.param_name, MIN(ep.param_name_cn), pt.base_type, COUNT(*) FROM event_params ep "
+    "JOIN log_events le ON ep.event_id = le.id "
+    "LEFT JOIN param_templates pt ON ep.template_id = pt.id "
+    "WHERE le.game_gid = ? AND ep.is_active = 1 GROUP BY ep.param_name, pt.base_type",
+    "SELECT * FROM event_params WHERE event_id = ? AND is_active = 1 ORDER BY id",
+    # HQL历史
+    "SELECT * FROM hql_history WHERE user_id = ? ORDER BY created_at DESC LIMIT ? OFFSET ?",
+    "SELECT * FROM hql_history WHERE session_id = ? ORDER BY created_at DESC LIMIT ? OFFSET ?",
+    "SELECT created_at FROM hql_history WHERE user_id = ? ORDER BY created_at DESC LIMIT 1",
+    # 事件节点
+    "SELECT en.*, le.event_name, le.event_name_cn FROM event_nodes en "
+    "LEFT JOIN log_events le ON en.event_id = le.id "
+    "WHERE en.game_id = ? AND en.is_active = 1 ORDER BY en.created_at DESC",
+    "SELECT en.* FROM event_nodes en ORDER BY en.updated_at DESC LIMIT 100",
+    # 游戏列表
+    "SELECT g.*, COUNT(DISTINCT le.id) AS event_count FROM games g "
+    "LEFT JOIN log_events le ON le.game_gid = g.gid GROUP BY g.id ORDER BY g.id",
+]
+
+_KEYWORDS = {
+    "WHERE",
+    "LEFT",
+    "RIGHT",
+    "INNER",
+    "OUTER",
+    "CROSS",
+    "JOIN",
+    "ON",
+    "GROUP",
+    "ORDER",
+    "LIMIT",
+    "USING",
+    "NATURAL",
+    "HAVING",
+    "UNION",
+    "SET",
+    "VALUES",
+    "AS",
+    "INDEXED",
+    "NOT",
+    "WINDOW",
+    "SELECT",
+    "DEFAULT",
+    "EXCEPT",
+    "INTERSECT",
+}
+_TABLE_REF = re.compile(
+    r"\b(?:FROM|JOIN|UPDATE|INTO)\s+([A-Za-z_]\w*)(?:\s+(?:AS\s+)?([A-Za-z_]\w*))?", re.I
+)
+_PREDICATE = re.compile(
+    r"(?:\b([A-Za-z_]\w*)\.)?\b([A-Za-z_]\w*)\s*(==|=|>=|<=|<|>|\bIN\b|\bBETWEEN\b|\bIS\b)\s*"
+    r"(?:([A-Za-z_]\w*)\.([A-Za-z_]\w*)|\(|\?|'|-?\d|NULL\b)",
+    re.I,
+)
+_ORDER_BY = re.compile(r"\bORDER\s+BY\s+(.+?)(?:\bLIMIT\b|\bOFFSET\b|\)|$)", re.I | re.S)
+_ORDER_TERM = re.compile(r"(?:([A-Za-z_]\w*)\.)?([A-Za-z_]\w*)(?:\s+(ASC|DESC))?$", re.I)
+_LOOP = re.compile(
+    r"^(SCAN|SEARCH) (?:TABLE )?(\w+)(?: AS (\w+))?"
+    r"(?: USING (COVERING )?INDEX (\w+)(?: \((.*)\))?"
+    r"| USING INTEGER PRIMARY KEY \((.*)\)"
+    r"| USING AUTOMATIC (?:PARTIAL )?(?:COVERING )?INDEX \((.*)\))?"
+)
+
+
+# ============================================================================
+# 负载采样
+# ============================================================================
+
+
+def denormalize(sql):
+    """把剖析器的归一化SQL还原成可执行形式（IN (?+) / VALUES (...)+）"""
+    return sql.replace("IN (?+)", "IN (?)").replace(")+", ")")
+
+
+def load_workload(args):
+    """返回 [(sql, weight, source)]"""
+    if args.profile_url or args.profile_file:
+        if args.profile_file:
+            with open(args.profile_file, encoding="utf-8") as f:
+                payload = json.load(f)
+        else:
+            url = f"{args.profile_url.rstrip('/')}/admin/db/queries?sort=total_ms&limit=2000"
+            with urllib.request.urlopen(url, timeout=10) as response:
+                payload = json.loads(response.read().decode("utf-8"))
+        statements = payload.get("data", payload)["statements"]
+        merged = defaultdict(lambda: [0, set()])
+        for s in statements:
+            merged[s["sql"]][0] += s["calls"]
+            merged[s["sql"]][1].add(s["endpoint"])
+        workload = [
+            (denormalize(sql), calls, ",".join(sorted(endpoints)))
+            for sql, (calls, endpoints) in merged.items()
+        ]
+    elif args.sql_file:
+        text = Path(args.sql_file).read_text(encoding="utf-8")
+        workload = [(s.strip(), 1, args.sql_file) for s in text.split(";") if s.strip()]
+    else:
+        workload = [(sql, 1, "builtin") for sql in BUILTIN_WORKLOAD]
+
+    workload = [
+        w
+        for w in workload
+        if w[0].split(None, 1)[0].upper() in ("SELECT", "WITH", "UPDATE", "DELETE")
+    ]
+    workload.sort(key=lambda w: w[1], reverse=True)
+    return workload[: args.top]
+
+
+# ============================================================================
+# 数据库元数据与代价估算
+# ============================================================================
+
+
+class Advisor:
+    """在临时副本上评估候选索引"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._columns = {}
+        self._pk = {}
+        self._stats = {}
+        self.refresh_stats()
+
+    def refresh_stats(self):
+        self._stats = defaultdict(dict)
+        try:
+            for tbl, idx, stat in self.conn.execute("SELECT tbl, idx, stat FROM sqlite_stat1"):
+                self._stats[tbl][idx] = [int(x) for x in stat.split() if x.isdigit()]
+        except sqlite3.OperationalError:
+            pass
+
+    def columns(self, table):
+        if table not in self._columns:
+            info = self.conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+            self._columns[table] = [row[1] for row in info]
+            pk = [row for row in info if row[5]]
+            is_rowid = len(pk) == 1 and (pk[0][2] or "").upper() == "INTEGER"
+            self._pk[table] = pk[0][1] if is_rowid else None
+        return self._columns[table]
+
+    def rowid_alias(self, table):
+        self.columns(table)
+        return self._pk.get(table)
+
+    def table_rows(self, table):
+        for stat in self._stats.get(table, {}).values():
+            if stat:
+                return max(stat[0], 1)
+        try:
+            row = self.conn.execute(f'SELECT MAX(rowid) FROM "{table}"').fetchone()
+            return max(int(row[0] or 0), 1)
+        except sqlite3.Error:
+            return 1
+
+    def eq_rows(self, table, index, eq_columns):
+        stat = self._stats.get(table, {}).get(index)
+        nrow = self.table_rows(table)
+        if not stat:
+            return max(nrow / 10**eq_columns, 1)
+        if eq_columns <= 0:
+            return nrow
+        return stat[min(eq_columns, len(stat) - 1)]
+
+    def indexes(self):
+        """现有索引: {name: (table, [(column, desc)], unique, partial, origin)}"""
+        result = {}
+        tables = [
+            row[0]
+            for row in self.conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'"
+            )
+        ]
+        for table in tables:
+            for row in self.conn.execute(f'PRAGMA index_list("{table}")'):
+                name, unique, origin, partial = row[1], row[2], row[3], row[4]
+                if origin == "pk":
+                    continue
+                keys = [
+                    (col[2], bool(col[3]))
+                    for col in self.conn.execute(f'PRAGMA index_xinfo("{name}")')
+                    if col[5] and col[2] is not None
+                ]
+                result[name] = (table, keys, bool(unique), bool(partial), origin)
+        return result
+
+    def plan_cost(self, sql, aliases):
+        """EXPLAIN QUERY PLAN 估算代价，返回 (代价, 使用的索引集合, 计划)"""
+        params = [None] * sql.count("?")
+        plan = self.conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        total, multiplier, used = 0.0, 1.0, set()
+        for _, parent, _, detail in plan:
+            match = _LOOP.match(detail)
+            if match:
+                kind, name, alias, covering, index, cond, pk_cond, auto_cond = match.groups()
+                table = aliases.get(alias or name, name)
+                rows, cost = self._loop_cost(table, kind, covering, index, cond, pk_cond, auto_cond)
+                if index:
+                    used.add(index)
+                if parent == 0:
+                    total += multiplier * cost
+                    multiplier *= max(rows, 1)
+                else:
+                    total += cost
+            elif detail.startswith("USE TEMP B-TREE"):
+                total += multiplier * math.log2(multiplier + 1)
+        return total, used, [row[3] for row in plan]
+
+    def _loop_cost(self, table, kind, covering, index, cond, pk_cond, auto_cond):
+        nrow = self.table_rows(table)
+        if kind == "SCAN":
+            return nrow, nrow * (1.0 if covering or not index else 1.5)
+        if pk_cond is not None:
+            rows = 1 if "=" in pk_cond and ">" not in pk_cond and "<" not in pk_cond else nrow / 4
+            return rows, rows
+        if auto_cond is not None:
+            # 每次执行都要临时建索引
+            return 10, nrow * math.log2(nrow + 1)
+        terms = [t.strip() for t in (cond or "").split(" AND ") if t.strip()]
+        eq = sum(1 for t in terms if t.endswith("=?") and not t.endswith((">=?", "<=?")))
+        rows = self.eq_rows(table, index, eq)
+        if len(terms) > eq:
+            rows = max(rows / 4, 1)
+        return rows, rows * (1.0 if covering else 2.0) + math.log2(nrow + 1)
+
+
+# ============================================================================
+# 语句解析与候选索引
+# ============================================================================
+
+
+def parse_statement(sql, advisor):
+    """解析表别名、等值/范围/排序列，返回 (aliases, {table: {"eq": [], "range": [], "order": []}})"""
+    aliases = {}
+    for table, alias in _TABLE_REF.findall(sql):
+        if not advisor.columns(table):
+            continue
+        aliases[table] = table
+        if alias and alias.upper() not in _KEYWORDS:
+            aliases[alias] = table
+    tables = sorted(set(aliases.values()))
+    usage = {t: {"eq": [], "join": [], "range": [], "order": []} for t in tables}
+
+    def resolve(qualifier, column):
+        if qualifier:
+            table = aliases.get(qualifier)
+            return table if table and column in advisor.columns(table) else None
+        owners = [t for t in tables if column in advisor.columns(t)]
+        return owners[0] if len(owners) == 1 else None
+
+    def add(kind, table, column):
+        if table and column not in usage[table][kind]:
+            usage[table][kind].append(column)
+
+    upper = sql.upper()
+    body = sql[upper.find(" FROM ") :] if upper.startswith(("SELECT", "WITH")) else sql
+    for qual, column, op, rqual, rcolumn in _PREDICATE.findall(body):
+        if column.upper() in _KEYWORDS:
+            continue
+        kind = "eq" if op.upper() in ("=", "==", "IN", "IS") else "range"
+        table = resolve(qual, column)
+        if not rcolumn:
+            add(kind, table, column)
+            continue
+        # JOIN ON a.x = b.y: 对端是rowid别名时由对端按主键查找，本端不需要索引
+        rtable = resolve(rqual, rcolumn)
+        if kind == "eq" and table and rtable and table != rtable:
+            if rcolumn != advisor.rowid_alias(rtable):
+                add("join", table, column)
+            if column != advisor.rowid_alias(table):
+                add("join", rtable, rcolumn)
+
+    orders = _ORDER_BY.findall(sql)
+    if orders:
+        terms = [_ORDER_TERM.match(term.strip()) for term in orders[-1].split(",")]
+        if all(terms):
+            resolved = [(resolve(m.group(1), m.group(2)), m.group(2), m.group(3)) for m in terms]
+            owners = {r[0] for r in resolved}
+            if len(owners) == 1 and None not in owners:
+                mixed = len({(r[2] or "ASC").upper() for r in resolved}) > 1
+                table = owners.pop()
+                usage[table]["order"] = [
+                    (column, mixed and (direction or "").upper() == "DESC")
+                    for _, column, direction in resolved
+                ]
+    return aliases, usage
+
+
+def candidates_for(usage, advisor):
+    """每条语句每张表的候选索引: {(table, ((col, desc), ...))}"""
+    result = set()
+    for table, cols in usage.items():
+        pk = advisor.rowid_alias(table)
+        if pk in cols["eq"]:
+            continue
+        eq = [(c, False) for c in cols["eq"]][:4]
+        joins = [(c, False) for c in cols["join"] if c != pk and c not in cols["eq"]]
+        order = []
+        for column, desc in cols["order"]:
+            if column == pk:
+                # rowid 隐式位于每个索引末尾
+                break
+            order.append((column, desc))
+        ranges = [(c, False) for c in cols["range"] if c != pk and c not in cols["eq"]]
+        options = []
+        if eq:
+            options.append(eq)
+            if order:
+                options.append(eq + [o for o in order if o[0] not in cols["eq"]])
+            if ranges:
+                options.append(eq + ranges[:1])
+            if joins:
+                options.append(eq + joins[:1])
+        else:
+            if joins:
+                options.append(joins[:1])
+            if order:
+                options.append(order)
+            if ranges:
+                options.append(ranges[:1])
+        for option in options:
+            if option:
+                result.add((table, tuple(option[:4])))
+    return result
+
+
+def index_name(table, keys):
+    suffix = "_".join(c + ("_desc" if desc else "") for c, desc in keys)
+    return f"idx_{table}_{suffix}"
+
+
+def index_sql(name, table, keys):
+    cols = ", ".join(c + (" DESC" if desc else "") for c, desc in keys)
+    return f"CREATE INDEX IF NOT EXISTS {name} ON {table}({cols})"
+
+
+def served_by_existing(table, keys, existing):
+    for ex_table, ex_keys, _, partial, _ in existing.values():
+        if ex_table == table and not partial and tuple(ex_keys[: len(keys)]) == keys:
+            return True
+    return False
+
+
+def find_redundant(existing, advisor, used, tables):
+    """冗余索引: 重复 / 前缀 / rowid后缀（比较时去掉末尾的rowid别名列）"""
+
+    def effective(name):
+        table, keys = existing[name][0], existing[name][1]
+        pk = advisor.rowid_alias(table)
+        return keys[:-1] if pk and keys and keys[-1][0] == pk else keys
+
+    redundant = []
+    for name, (table, keys, unique, partial, origin) in sorted(existing.items()):
+        if partial or origin != "c" or unique:
+            continue
+        mine = effective(name)
+        if not mine:
+            redundant.append((name, table, f"只包含rowid别名列 {keys[0][0]}"))
+            continue
+        for other, (o_table, o_keys, _, o_partial, _) in sorted(existing.items()):
+            if other == name or o_table != table or o_partial:
+                continue
+            theirs = effective(other)
+            if theirs == mine:
+                # 保留列数更少的那个（同列数保留名字靠前的）
+                if (len(keys), name) > (len(o_keys), other):
+                    if len(keys) > len(o_keys):
+                        reason = f"等价于 {other}（rowid隐式位于索引末尾）"
+                    else:
+                        reason = f"与 {other} 列完全相同"
+                    redundant.append((name, table, reason))
+                    break
+            elif len(theirs) > len(mine) and theirs[: len(mine)] == mine:
+                redundant.append((name, table, f"是 {other} 的前缀"))
+                break
+    flagged = {r[0] for r in redundant}
+    unused = sorted(
+        name
+        for name, (table, _, unique, _, origin) in existing.items()
+        if table in tables
+        and origin == "c"
+        and not unique
+        and name not in used
+        and name not in flagged
+    )
+    return redundant, unused
+
+
+# ============================================================================
+# 评估
+# ============================================================================
+
+
+def workload_cost(advisor, statements):
+    costs, used = {}, set()
+    for i, st in enumerate(statements):
+        cost, indexes, plan = advisor.plan_cost(st["sql"], st["aliases"])
+        costs[i] = (cost, plan)
+        used |= indexes
+    return costs, used
+
+
+def evaluate(advisor, statements, candidates, baseline):
+    """逐个创建候选索引并重新估算受影响语句的代价"""
+    results = []
+    for (table, keys), affected in candidates.items():
+        name = index_name(table, keys)
+        start = time.perf_counter()
+        advisor.conn.execute(index_sql(name, table, keys))
+        advisor.conn.execute(f"ANALYZE {name}")
+        build_ms = (time.perf_counter() - start) * 1000
+        advisor.refresh_stats()
+        before = after = 0.0
+        served = []
+        for i in affected:
+            st = statements[i]
+            cost, indexes, _ = advisor.plan_cost(st["sql"], st["aliases"])
+            before += baseline[i][0] * st["weight"]
+            after += min(cost, baseline[i][0]) * st["weight"]
+            if name in indexes:
+                served.append(i)
+        advisor.conn.execute(f"DROP INDEX {name}")
+        advisor.conn.execute("DELETE FROM sqlite_stat1 WHERE idx = ?", (name,))
+        advisor.refresh_stats()
+        results.append(
+            {
+                "name": name,
+                "table": table,
+                "keys": keys,
+                "gain": before - after,
+                "before": before,
+                "after": after,
+                "served": served,
+                "build_ms": build_ms,
+            }
+        )
+    results.sort(key=lambda r: r["gain"], reverse=True)
+    return results
+
+
+def select(results, total_cost, min_gain, max_indexes):
+    """按收益贪心选择，跳过被已选索引前缀覆盖的候选"""
+    chosen = []
+    for r in results:
+        if len(chosen) >= max_indexes or r["gain"] <= total_cost * min_gain or not r["served"]:
+            continue
+        covered = any(
+            c["table"] == r["table"] and c["keys"][: len(r["keys"])] == r["keys"] for c in chosen
+        )
+        if not covered:
+            chosen.append(r)
+    return chosen
+
+
+def write_migration(chosen, redundant, statements, total_before, total_after):
+    lines = [
+        "-- Index advisor recommendations",
+        f"-- Created: {date.today().isoformat()}",
+        "-- Generated by scripts/performance/index_advisor.py from the captured query workload",
+        f"-- Estimated workload cost: {total_before:,.0f} -> {total_after:,.0f} rows visited",
+        "",
+    ]
+    for n, r in enumerate(chosen, 1):
+        pct = r["gain"] / total_before * 100 if total_before else 0.0
+        lines += [
+            "-- " + "=" * 76,
+            f"-- Index {n}: {r['table']}({', '.join(c for c, _ in r['keys'])})",
+            "-- " + "=" * 76,
+            f"-- Estimated gain: {pct:.1f}% of workload cost",
+            "-- Query patterns:",
+        ]
+        for i in r["served"][:3]:
+            lines.append(f"--   {statements[i]['sql'][:150]}")
+        lines += [index_sql(r["name"], r["table"], r["keys"]) + ";", ""]
+    if redundant:
+        rule = "-- " + "=" * 76
+        lines += [rule, "-- Redundant indexes (review before dropping)", rule]
+        for name, _, reason in redundant:
+            lines.append(f"-- DROP INDEX IF EXISTS {name};  -- {reason}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="索引顾问：根据查询负载推荐索引")
+    parser.add_argument("--db-path", help="数据库路径（默认 get_db_path()）")
+    parser.add_argument("--profile-url", help="从运行中的服务读取查询剖析数据")
+    parser.add_argument("--profile-file", help="查询剖析报告JSON（/admin/db/queries 的响应）")
+    parser.add_argument("--sql-file", help="SQL文件（分号分隔，每条权重为1）")
+    parser.add_argument("--top", type=int, default=200, help="采样的语句数（按调用次数，默认200）")
+    parser.add_argument("--max-indexes", type=int, default=10, help="最多推荐的索引数（默认10）")
+    parser.add_argument(
+        "--min-gain", type=float, default=0.01, help="最小收益占负载总代价的比例（默认0.01）"
+    )
+    parser.add_argument("--output", help="迁移SQL输出路径（默认只打印）")
+    args = parser.parse_args()
+
+    db_path = Path(args.db_path) if args.db_path else get_db_path()
+    workload = load_workload(args)
+    if not workload:
+        print("❌ 没有可分析的查询")
+        return 1
+
+    # 临时副本：候选索引只在副本上创建
+    tmpdir = tempfile.TemporaryDirectory()
+    scratch_path = Path(tmpdir.name) / "advisor.db"
+    source = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    conn = sqlite3.connect(str(scratch_path))
+    source.backup(conn)
+    source.close()
+    start = time.perf_counter()
+    conn.execute("ANALYZE")
+    conn.commit()
+    print(f"📦 已复制 {db_path} 并完成ANALYZE ({(time.perf_counter() - start) * 1000:.0f}ms)")
+
+    advisor = Advisor(conn)
+    statements, skipped = [], []
+    for sql, weight, source_name in workload:
+        aliases, usage = parse_statement(sql, advisor)
+        try:
+            advisor.plan_cost(sql, aliases)
+        except sqlite3.Error as e:
+            skipped.append((sql, str(e)))
+            continue
+        statements.append(
+            {
+                "sql": sql,
+                "weight": weight,
+                "source": source_name,
+                "aliases": aliases,
+                "usage": usage,
+            }
+        )
+
+    baseline, used = workload_cost(advisor, statements)
+    existing = advisor.indexes()
+    candidates = defaultdict(list)
+    for i, st in enumerate(statements):
+        for table, keys in candidates_for(st["usage"], advisor):
+            if not served_by_existing(table, keys, existing):
+                candidates[(table, keys)].append(i)
+
+    total_before = sum(baseline[i][0] * st["weight"] for i, st in enumerate(statements))
+    results = evaluate(advisor, statements, candidates, baseline)
+    chosen = select(results, total_before, args.min_gain, args.max_indexes)
+
+    # 同时创建所有推荐索引，估算组合收益
+    for r in chosen:
+        conn.execute(index_sql(r["name"], r["table"], r["keys"]))
+        conn.execute(f"ANALYZE {r['name']}")
+    advisor.refresh_stats()
+    combined, _ = workload_cost(advisor, statements)
+    total_after = sum(
+        min(combined[i][0], baseline[i][0]) * st["weight"] for i, st in enumerate(statements)
+    )
+    touched = {t for st in statements for t in st["usage"]}
+    redundant, unused = find_redundant(existing, advisor, used, touched)
+
+    print("=" * 100)
+    print(
+        f"索引顾问: {len(statements)}条语句（跳过{len(skipped)}条）, "
+        f"{len(existing)}个现有索引, {len(candidates)}个候选索引"
+    )
+    print("=" * 100)
+    print(f"{'权重':>8}{'代价':>14}  语句 / 计划")
+    print("-" * 100)
+    for i, st in sorted(enumerate(statements), key=lambda x: -baseline[x[0]][0] * x[1]["weight"]):
+        print(f"{st['weight']:>8}{baseline[i][0]:>14,.0f}  {st['sql'][:74]}")
+        for detail in baseline[i][1]:
+            print(f"{'':>24}{detail}")
+
+    print()
+    print(f"{'候选索引':<58}{'收益':>10}{'覆盖语句':>10}{'建索引(ms)':>12}")
+    print("-" * 100)
+    for r in results:
+        pct = r["gain"] / total_before * 100 if total_before else 0.0
+        mark = "✅" if r in chosen else "  "
+        print(f"{mark}{r['name'][:56]:<56}{pct:>9.1f}%{len(r['served']):>10}{r['build_ms']:>12.0f}")
+
+    print()
+    gain = (total_before - total_after) / total_before * 100 if total_before else 0.0
+    print(
+        f"📈 推荐{len(chosen)}个索引, 估算负载代价 {total_before:,.0f} → {total_after:,.0f} "
+        f"(-{gain:.1f}%)"
+    )
+    for name, table, reason in redundant:
+        print(f"🔁 冗余索引 {name} ({table}): {reason}")
+    if unused:
+        print(f"💤 负载涉及的表上未被使用的索引（仅供参考）: {', '.join(unused)}")
+    for sql, error in skipped:
+        print(f"⚠️  跳过: {sql[:70]}... ({error})")
+
+    migration = write_migration(chosen, redundant, statements, total_before, total_after)
+    if args.output:
+        Path(args.output).write_text(migration, encoding="utf-8")
+        print(f"💾 迁移已写入 {args.output}")
+    else:
+        print()
+        print(migration)
+
+    conn.close()
+    tmpdir.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
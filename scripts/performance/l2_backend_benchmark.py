@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+L2后端基准测试：SQLite共享文件 vs Redis
+
+对两种L2后端执行相同的负载：写入（含标签记录）、命中读取、单游戏标签失效，
+并可选地用多个进程并发读取SQLite文件，模拟多个gunicorn worker共享缓存。
+
+用法:
+    python scripts/performance/l2_backend_benchmark.py
+    python scripts/performance/l2_backend_benchmark.py --keys 50000 --processes 4
+    python scripts/performance/l2_backend_benchmark.py --redis-url redis://localhost:6379/15
+
+注意: 未指定 --redis-url 时Redis路径使用进程内fakeredis，没有网络往返，
+其耗时只能作为下限参考；与真实 redis-server 比较时请指定 --redis-url。
+"""
+
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加项目根路径
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.core.cache.cache_l2_invalidation import L2TagInvalidator  # noqa: E402
+from backend.core.cache.cache_sqlite_l2 import SQLiteCache  # noqa: E402
+from backend.core.cache.cache_system import CacheKeyBuilder  # noqa: E402
+
+KEY_PREFIX = "dwd_gen:v3:"
+PATTERN = "events.list"
+PAYLOAD = [{"id": i, "event_name": f"event_{i}", "event_name_cn": f"事件{i}"} for i in range(20)]
+
+
+class RedisL2:
+    """Redis路径：Flask-Caching RedisCache + 标签集合"""
+
+    def __init__(self, redis_url):
+        from flask_caching.backends.rediscache import RedisCache
+
+        if redis_url:
+            import redis
+
+            client = redis.Redis.from_url(redis_url)
+        else:
+            import fakeredis
+
+            client = fakeredis.FakeRedis()
+        client.flushdb()
+        self.client = client
+        self.cache = RedisCache(host=client, key_prefix=KEY_PREFIX)
+        self.tagger = L2TagInvalidator(key_namespace=CacheKeyBuilder.PREFIX)
+
+    def set(self, key, value, params):
+        self.cache.set(key, value, timeout=3600)
+        self.tagger.record(self.client, KEY_PREFIX, key, PATTERN, params, 3600)
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def invalidate(self, params):
+        return self.tagger.invalidate(self.client, KEY_PREFIX, PATTERN, params)
+
+
+class SQLiteL2:
+    """SQLite路径：共享WAL文件 + 标签表"""
+
+    def __init__(self, path):
+        self.cache = SQLiteCache(path, key_prefix=KEY_PREFIX, key_namespace=CacheKeyBuilder.PREFIX)
+        self.cache.clear()
+
+    def set(self, key, value, params):
+        self.cache.set(key, value, timeout=3600)
+        self.cache.record_tags(key, PATTERN, params, 3600)
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def invalidate(self, params):
+        return self.cache.invalidate_tags(PATTERN, params)
+
+
+def build_keys(total_keys, games):
+    pages = max(total_keys // games, 1)
+    return [
+        (CacheKeyBuilder.build(PATTERN, game_gid=g, page=p), {"game_gid": g, "page": p})
+        for g in range(games)
+        for p in range(pages)
+    ]
+
+
+def run_backend(name, backend, keys, games):
+    """对单个后端执行写入 / 读取 / 失效，返回结果行"""
+    rows = []
+
+    start = time.perf_counter()
+    for key, params in keys:
+        backend.set(key, PAYLOAD, params)
+    elapsed = time.perf_counter() - start
+    rows.append((name, "写入+标签", len(keys), elapsed))
+
+    start = time.perf_counter()
+    hits = sum(1 for key, _ in keys if backend.get(key) is not None)
+    elapsed = time.perf_counter() - start
+    rows.append((name, f"命中读取({hits})", len(keys), elapsed))
+
+    start = time.perf_counter()
+    deleted = backend.invalidate({"game_gid": games // 2})
+    elapsed = time.perf_counter() - start
+    rows.append((name, f"单游戏失效({deleted}键)", 1, elapsed))
+    return rows
+
+
+def _reader(path, keys, result_queue):
+    cache = SQLiteCache(path, key_prefix=KEY_PREFIX, key_namespace=CacheKeyBuilder.PREFIX)
+    start = time.perf_counter()
+    hits = sum(1 for key, _ in keys if cache.get(key) is not None)
+    result_queue.put((hits, time.perf_counter() - start))
+
+
+def run_shared_readers(path, keys, processes):
+    """多进程并发读取同一个SQLite文件（模拟多个worker）"""
+    result_queue = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=_reader, args=(path, keys, result_queue))
+        for _ in range(processes)
+    ]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    results = [result_queue.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    wall = time.perf_counter() - start
+    total_reads = len(keys) * processes
+    hits = sum(hits for hits, _ in results)
+    return ("SQLite", f"{processes}进程并发读取({hits})", total_reads, wall)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="L2后端基准测试（SQLite vs Redis）")
+    parser.add_argument("--keys", type=int, default=20000, help="写入的键数量（默认2万）")
+    parser.add_argument("--games", type=int, default=50, help="游戏数量（默认50）")
+    parser.add_argument("--processes", type=int, default=4, help="SQLite并发读取进程数")
+    parser.add_argument("--redis-url", default=None, help="Redis URL（默认使用fakeredis）")
+    parser.add_argument("--sqlite-path", default=None, help="SQLite文件路径（默认临时目录）")
+    args = parser.parse_args()
+
+    keys = build_keys(args.keys, args.games)
+    tmpdir = tempfile.TemporaryDirectory()
+    sqlite_path = args.sqlite_path or str(Path(tmpdir.name) / "cache_l2.db")
+
+    print("=" * 70)
+    print(f"L2后端基准测试: {len(keys)}个键, {args.games}个游戏")
+    print(f"Redis: {args.redis_url or 'fakeredis (in-process)'}")
+    print(f"SQLite: {sqlite_path}")
+    print("=" * 70)
+
+    rows = []
+    try:
+        rows += run_backend("Redis", RedisL2(args.redis_url), keys, args.games)
+    except ImportError as e:
+        print(f"跳过Redis路径: {e}")
+
+    rows += run_backend("SQLite", SQLiteL2(sqlite_path), keys, args.games)
+    if args.processes > 1:
+        rows.append(run_shared_readers(sqlite_path, keys, args.processes))
+
+    print("-" * 70)
+    print(f"{'后端':<10}{'操作':<28}{'次数':>10}{'耗时(ms)':>12}{'ops/s':>12}")
+    print("-" * 70)
+    for backend, op, count, seconds in rows:
+        ops = count / seconds if seconds > 0 else 0
+        print(f"{backend:<10}{op:<28}{count:>10}{seconds * 1000:>12.1f}{ops:>12.0f}")
+    print("-" * 70)
+
+    tmpdir.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
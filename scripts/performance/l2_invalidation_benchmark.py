@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+L2失效基准测试：KEYS+DEL vs 标签有序集合(ZSCAN+UNLINK) vs 游标SCAN
+
+向Redis（默认fakeredis，可用 --redis-url 指向本地 redis-server）写入 N 个
+parameters.all 分页键（分布在若干游戏下），随后分别用三种方式失效单个游戏的键，
+以及清空全部键，比较耗时。
+
+用法:
+    python scripts/performance/l2_invalidation_benchmark.py
+    python scripts/performance/l2_invalidation_benchmark.py --keys 100000 --games 50
+    python scripts/performance/l2_invalidation_benchmark.py --redis-url redis://localhost:6379/15
+
+注意: fakeredis 的 SCAN 每次调用都会遍历整个键空间，SCAN 路径的耗时只有在
+真实 redis-server 上才有参考意义，因此默认只在指定 --redis-url 时测量（或加 --scan）。
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根路径
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.core.cache.cache_l2_invalidation import L2TagInvalidator  # noqa: E402
+from backend.core.cache.cache_system import CacheKeyBuilder  # noqa: E402
+
+KEY_PREFIX = "dwd_gen:v3:"
+PATTERN = "parameters.all"
+SEED_BATCH = 10000
+
+
+def get_client(redis_url):
+    """获取Redis客户端（未指定URL时使用fakeredis）"""
+    if redis_url:
+        import redis
+
+        return redis.Redis.from_url(redis_url)
+
+    import fakeredis
+
+    return fakeredis.FakeRedis()
+
+
+def seed(client, tagger, total_keys, games, with_tags):
+    """写入 total_keys 个缓存键，with_tags 为 True 时同时写入标签集合"""
+    client.flushdb()
+    pages_per_game = max(total_keys // games, 1)
+    start = time.perf_counter()
+
+    expires_at = time.time() + 3600
+    pipe = client.pipeline(transaction=False)
+    pending = 0
+    for game_id in range(games):
+        for page in range(pages_per_game):
+            params = {"game_id": game_id, "page": page}
+            key = CacheKeyBuilder.build(PATTERN, **params)
+            raw_key = f"{KEY_PREFIX}{key}"
+            pipe.set(raw_key, b"!payload", ex=3600)
+            if with_tags:
+                for tag in tagger.tags_for(PATTERN, params):
+                    pipe.zadd(f"{KEY_PREFIX}{tagger.TAG_NAMESPACE}{tag}", {raw_key: expires_at})
+            pending += 1
+            if pending >= SEED_BATCH:
+                pipe.execute()
+                pending = 0
+    if pending:
+        pipe.execute()
+
+    return pages_per_game * games, time.perf_counter() - start
+
+
+def legacy_keys_delete(client, match):
+    """原实现：KEYS + DEL（阻塞整个Redis直到遍历完整个键空间）"""
+    keys = client.keys(match)
+    if keys:
+        client.delete(*keys)
+    return len(keys)
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="L2失效基准测试")
+    parser.add_argument("--keys", type=int, default=500000, help="写入的键数量（默认50万）")
+    parser.add_argument("--games", type=int, default=100, help="游戏数量（默认100）")
+    parser.add_argument("--batch-size", type=int, default=500, help="UNLINK/SCAN批大小")
+    parser.add_argument("--redis-url", default=None, help="Redis URL（默认使用fakeredis）")
+    parser.add_argument("--scan", action="store_true", help="在fakeredis上也测量SCAN路径")
+    args = parser.parse_args()
+    run_scan = args.scan or args.redis_url is not None
+
+    client = get_client(args.redis_url)
+    tagger = L2TagInvalidator(key_namespace=CacheKeyBuilder.PREFIX, batch_size=args.batch_size)
+    target_game = args.games // 2
+    game_match = f"{KEY_PREFIX}{CacheKeyBuilder.PREFIX}{PATTERN}:game_id:{target_game}:*"
+
+    print("=" * 70)
+    print(f"L2失效基准测试: {args.keys}个键, {args.games}个游戏, 批大小{args.batch_size}")
+    print(f"Redis: {args.redis_url or 'fakeredis (in-process)'}")
+    print("=" * 70)
+
+    results = []
+
+    # 1. 单游戏失效
+    n, seed_s = seed(client, tagger, args.keys, args.games, with_tags=False)
+    print(f"写入{n}个键（无标签）: {seed_s:.1f}s")
+    deleted, ms = timed(legacy_keys_delete, client, game_match)
+    results.append(("单游戏失效 KEYS+DEL", deleted, ms))
+
+    if run_scan:
+        # 目标游戏已被上一步删除，换相邻游戏测SCAN路径
+        deleted, ms = timed(
+            tagger.scan_invalidate,
+            client,
+            KEY_PREFIX,
+            PATTERN,
+            {"game_id": target_game - 1},
+        )
+        results.append(("单游戏失效 SCAN+UNLINK", deleted, ms))
+
+    n, seed_s = seed(client, tagger, args.keys, args.games, with_tags=True)
+    print(f"写入{n}个键（含标签集合）: {seed_s:.1f}s")
+    deleted, ms = timed(tagger.invalidate, client, KEY_PREFIX, PATTERN, {"game_id": target_game})
+    results.append(("单游戏失效 标签ZSCAN+UNLINK", deleted, ms))
+
+    # 2. 全量清空
+    if run_scan:
+        deleted, ms = timed(tagger.scan_delete, client, f"{KEY_PREFIX}*")
+        results.append(("全量清空 SCAN+UNLINK", deleted, ms))
+        seed(client, tagger, args.keys, args.games, with_tags=False)
+
+    deleted, ms = timed(legacy_keys_delete, client, f"{KEY_PREFIX}*")
+    results.append(("全量清空 KEYS+DEL", deleted, ms))
+
+    print("-" * 70)
+    print(f"{'方式':<32}{'删除键数':>12}{'耗时(ms)':>16}")
+    print("-" * 70)
+    for name, deleted, ms in results:
+        print(f"{name:<32}{deleted:>12}{ms:>16.2f}")
+    print("-" * 70)
+    print("注: KEYS 在真实Redis上是单条阻塞命令，耗时期间其他worker的请求全部排队；")
+    print("    SCAN/标签方式每条命令只处理一个批次，其他请求可以穿插执行。")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQL查询剖析报告
+
+从运行中的服务（GET /admin/db/queries）或保存下来的JSON文件读取查询剖析数据，
+按端点输出最耗时的语句、延迟分位数、返回行数，以及对大表做全表扫描的执行计划。
+服务需开启剖析：DB_PROFILER_ENABLED=true，或 POST /admin/db/queries/enable。
+
+用法:
+    python scripts/performance/query_profile_report.py
+    python scripts/performance/query_profile_report.py --url http://localhost:5001 --sort p95_ms
+    python scripts/performance/query_profile_report.py --file profile.json --full-scans
+    python scripts/performance/query_profile_report.py --save profile.json
+"""
+
+import argparse
+import json
+import sys
+import urllib.parse
+import urllib.request
+
+
+def load_report(args):
+    """读取剖析报告（文件或HTTP）"""
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            payload = json.load(f)
+    else:
+        params = {"sort": args.sort, "limit": args.limit}
+        if args.endpoint:
+            params["endpoint"] = args.endpoint
+        query = urllib.parse.urlencode(params)
+        url = f"{args.url.rstrip('/')}/admin/db/queries?{query}"
+        with urllib.request.urlopen(url, timeout=10) as response:
+            payload = json.loads(response.read().decode("utf-8"))
+    return payload.get("data", payload)
+
+
+def shorten(sql, width):
+    return sql if len(sql) <= width else sql[: width - 3] + "..."
+
+
+def print_report(report, args):
+    summary = report["summary"]
+    print("=" * 100)
+    print(
+        f"查询剖析: {summary['statements']}条语句, {summary['calls']}次执行, "
+        f"总耗时{summary['total_ms']:.1f}ms, 慢查询阈值{summary['slow_ms']}ms, "
+        f"全表扫描语句{summary['full_scan_statements']}条"
+    )
+    if not summary.get("enabled"):
+        print("⚠️  剖析当前未开启（DB_PROFILER_ENABLED=false）")
+    if summary.get("dropped"):
+        print(f"⚠️  超过语句上限被丢弃: {summary['dropped']}")
+    print("=" * 100)
+
+    print(f"{'端点':<40}{'语句数':>8}{'执行次数':>10}{'总耗时(ms)':>14}")
+    print("-" * 100)
+    endpoints = sorted(report["endpoints"].items(), key=lambda kv: kv[1]["total_ms"], reverse=True)
+    for endpoint, stats in endpoints:
+        print(
+            f"{shorten(endpoint, 38):<40}{stats['statements']:>8}"
+            f"{stats['calls']:>10}{stats['total_ms']:>14.1f}"
+        )
+
+    statements = report["statements"]
+    if args.full_scans:
+        statements = [s for s in statements if s["full_scans"]]
+
+    print()
+    print(
+        f"{'calls':>7}{'rows':>9}{'total':>10}{'avg':>8}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}"
+        "  端点 / SQL"
+    )
+    print("-" * 100)
+    for s in statements:
+        print(
+            f"{s['calls']:>7}{s['rows']:>9}{s['total_ms']:>10.1f}{s['avg_ms']:>8.2f}"
+            f"{s['p50_ms']:>8.2f}{s['p95_ms']:>8.2f}{s['p99_ms']:>8.2f}{s['max_ms']:>8.2f}"
+            f"  {s['endpoint']}"
+        )
+        print(f"{'':>7}{shorten(s['sql'], args.sql_width)}")
+        for scan in s["full_scans"]:
+            print(f"{'':>7}🚨 全表扫描 {scan['table']} (~{scan['rows']}行): {scan['detail']}")
+        if args.plans and s["plan"]:
+            for detail in s["plan"]:
+                print(f"{'':>7}plan: {detail}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQL查询剖析报告")
+    parser.add_argument("--url", default="http://localhost:5001", help="服务地址")
+    parser.add_argument("--file", help="从JSON文件读取（/admin/db/queries 的响应）")
+    parser.add_argument("--save", help="同时把原始报告保存到JSON文件")
+    parser.add_argument(
+        "--sort",
+        default="total_ms",
+        choices=["total_ms", "avg_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms", "calls", "rows"],
+        help="排序字段（默认total_ms）",
+    )
+    parser.add_argument("--limit", type=int, default=30, help="输出语句数（默认30）")
+    parser.add_argument("--endpoint", help="只看某个Flask端点")
+    parser.add_argument("--full-scans", action="store_true", help="只输出全表扫描的语句")
+    parser.add_argument("--plans", action="store_true", help="输出已捕获的执行计划")
+    parser.add_argument("--sql-width", type=int, default=93, help="SQL截断宽度")
+    args = parser.parse_args()
+
+    try:
+        report = load_report(args)
+    except Exception as e:
+        print(f"❌ 读取剖析报告失败: {e}", file=sys.stderr)
+        return 1
+
+    if args.file:
+        statements = report["statements"]
+        if args.endpoint:
+            statements = [s for s in statements if s["endpoint"] == args.endpoint]
+        statements.sort(key=lambda s: s[args.sort], reverse=True)
+        report["statements"] = statements[: args.limit]
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"data": report}, f, ensure_ascii=False, indent=2)
+
+    print_report(report, args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
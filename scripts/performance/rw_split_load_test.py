@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+读写分离负载测试：持续写事务期间，读吞吐量随读线程数的扩展
+
+场景：后台若干写线程不断执行长写事务（BEGIN IMMEDIATE，批量UPDATE，并在事务内
+停留 --hold-ms 毫秒，模拟级联删除/批量导入），同时 N 个读线程通过
+fetch_all_as_dict 执行聚合查询。分别在读写分离关闭/开启时测量：
+
+- 读吞吐量（次/秒）及相对单线程的加速比
+- 写事务吞吐量、忙重试次数、失败次数（busy_timeout 耗尽且重试用尽）
+
+sqlite3 在执行语句时释放GIL，读线程的聚合查询可以在多个CPU核上并行；
+加速比的上限是可用核数（本机核数见输出第一行）。
+
+用法:
+    python scripts/performance/rw_split_load_test.py
+    python scripts/performance/rw_split_load_test.py --readers 1,2,4,8 --writers 4 --seconds 5
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# 添加项目根路径
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.core.config import DatabaseConfig  # noqa: E402
+from backend.core.database import close_all_pools  # noqa: E402
+from backend.core.database import routing  # noqa: E402
+from backend.core.utils.converters import fetch_all_as_dict  # noqa: E402
+
+READ_SQL = """
+    SELECT game_gid, COUNT(*) AS events, SUM(LENGTH(event_name)) AS name_bytes
+    FROM log_events
+    WHERE id % ? = 0
+    GROUP BY game_gid
+"""
+
+
+def build_database(path, rows):
+    """建库并写入 rows 条事件"""
+    conn = sqlite3.connect(str(path))
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE log_events (id INTEGER PRIMARY KEY, game_gid INTEGER NOT NULL,"
+        " event_name TEXT NOT NULL, hits INTEGER NOT NULL DEFAULT 0)"
+    )
+    conn.executemany(
+        "INSERT INTO log_events (game_gid, event_name) VALUES (?, ?)",
+        ((10000 + i % 50, f"event_name_{i}") for i in range(rows)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def run_scenario(db_path, readers, writers, seconds, hold_ms, rows):
+    """运行一个场景，返回统计字典"""
+    stop = threading.Event()
+    counters = {"reads": 0, "read_errors": 0, "writes": 0, "write_errors": 0}
+    lock = threading.Lock()
+
+    def reader(index):
+        done = errors = 0
+        modulus = 1
+        while not stop.is_set():
+            modulus = modulus % 7 + 1
+            # fetch_all_as_dict 出错时返回空列表
+            if fetch_all_as_dict(READ_SQL, (modulus,)):
+                done += 1
+            else:
+                errors += 1
+        with lock:
+            counters["reads"] += done
+            counters["read_errors"] += errors
+
+    def writer(index):
+        done = errors = 0
+        start_id = index * 1000
+        while not stop.is_set():
+            try:
+                with routing.write_transaction(db_path) as conn:
+                    conn.execute(
+                        "UPDATE log_events SET hits = hits + 1 WHERE id BETWEEN ? AND ?",
+                        (start_id, start_id + 2000),
+                    )
+                    time.sleep(hold_ms / 1000)
+                done += 1
+            except sqlite3.OperationalError:
+                errors += 1
+            start_id = (start_id + 2000) % rows
+        with lock:
+            counters["writes"] += done
+            counters["write_errors"] += errors
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    retries_before = routing.get_routing_stats()["busy_retries"]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    counters["busy_retries"] = routing.get_routing_stats()["busy_retries"] - retries_before
+    return counters
+
+
+def main():
+    parser = argparse.ArgumentParser(description="读写分离负载测试")
+    parser.add_argument("--readers", default="1,2,4,8", help="读线程数列表（默认1,2,4,8）")
+    parser.add_argument("--writers", type=int, default=2, help="写线程数（默认2）")
+    parser.add_argument("--seconds", type=float, default=3, help="每个场景持续秒数（默认3）")
+    parser.add_argument("--hold-ms", type=float, default=20, help="写事务持有锁的毫秒数（默认20）")
+    parser.add_argument("--rows", type=int, default=100000, help="事件行数（默认10万）")
+    parser.add_argument(
+        "--busy-timeout", type=int, default=200, help="busy_timeout毫秒（默认200，放大锁竞争）"
+    )
+    args = parser.parse_args()
+    reader_counts = [int(n) for n in args.readers.split(",")]
+
+    for profile in DatabaseConfig.DB_PROFILES.values():
+        profile["busy_timeout"] = args.busy_timeout
+
+    tmpdir = tempfile.TemporaryDirectory()
+    db_path = Path(tmpdir.name) / "load.db"
+    build_database(db_path, args.rows)
+
+    # fetch_* 使用默认数据库路径
+    os.environ["FLASK_ENV"] = ""
+    import backend.core.config.config as config_module
+
+    config_module.DB_PATH = db_path
+
+    print(f"CPU核数: {os.cpu_count()}, 写线程: {args.writers}, 写事务持锁: {args.hold_ms}ms")
+    print("=" * 92)
+    print(
+        f"{'模式':<10}{'读线程':>6}{'读/秒':>10}{'加速比':>8}{'读失败':>8}"
+        f"{'写/秒':>10}{'忙重试':>8}{'写失败':>8}"
+    )
+    print("-" * 92)
+    for split in (False, True):
+        DatabaseConfig.DB_RW_SPLIT_ENABLED = split
+        baseline = None
+        for readers in reader_counts:
+            close_all_pools()
+            result = run_scenario(
+                db_path, readers, args.writers, args.seconds, args.hold_ms, args.rows
+            )
+            reads_per_s = result["reads"] / args.seconds
+            baseline = baseline or reads_per_s
+            print(
+                f"{'split' if split else 'shared':<10}{readers:>6}{reads_per_s:>10.1f}"
+                f"{reads_per_s / baseline:>8.2f}{result['read_errors']:>8}"
+                f"{result['writes'] / args.seconds:>10.1f}{result['busy_retries']:>8}"
+                f"{result['write_errors']:>8}"
+            )
+
+    close_all_pools()
+    tmpdir.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
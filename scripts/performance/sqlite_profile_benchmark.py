@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite性能配置基准测试
+
+构造合成数据库（默认100万行 event_params），在每个性能配置
+（DatabaseConfig.DB_PROFILES：default / read_heavy / bulk_import）以及
+baseline（引入性能配置之前：仅 journal_mode / synchronous，其余为SQLite默认值）下
+回放热点接口的查询：
+- api_list_events: 事件分页列表（含参数数量子查询）+ 总数
+- api_get_all_parameters: 按参数名分组去重 + 总数
+- api_list_games: 游戏列表聚合统计
+并测量各配置下的批量写入速度。
+
+每个配置使用新连接：第一轮为"冷连接"（页缓存为空，OS文件缓存可能已热），
+之后各轮取中位数作为稳态耗时。
+
+用法:
+    python scripts/performance/sqlite_profile_benchmark.py
+    python scripts/performance/sqlite_profile_benchmark.py --rows 200000 --rounds 3
+    python scripts/performance/sqlite_profile_benchmark.py --db-path /tmp/bench.db  # 复用已构造的数据
+"""
+
+import argparse
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加项目根路径
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.core.config import DatabaseConfig  # noqa: E402
+from backend.core.database import get_db_connection  # noqa: E402
+from backend.core.database._constants import PRAGMA_SETTINGS  # noqa: E402
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS games (
+        id INTEGER PRIMARY KEY, gid TEXT UNIQUE NOT NULL, name TEXT NOT NULL,
+        ods_db TEXT, icon_path TEXT, created_at TEXT, updated_at TEXT
+    );
+    CREATE TABLE IF NOT EXISTS event_categories (id INTEGER PRIMARY KEY, name TEXT);
+    CREATE TABLE IF NOT EXISTS log_events (
+        id INTEGER PRIMARY KEY, game_gid TEXT NOT NULL, event_name TEXT NOT NULL,
+        event_name_cn TEXT, category_id INTEGER, source_table TEXT, target_table TEXT
+    );
+    CREATE TABLE IF NOT EXISTS param_templates (id INTEGER PRIMARY KEY, base_type TEXT);
+    CREATE TABLE IF NOT EXISTS event_params (
+        id INTEGER PRIMARY KEY, event_id INTEGER NOT NULL, param_name TEXT NOT NULL,
+        param_name_cn TEXT, template_id INTEGER, is_active INTEGER DEFAULT 1
+    );
+    CREATE TABLE IF NOT EXISTS event_node_configs (id INTEGER PRIMARY KEY, game_gid INTEGER);
+    CREATE TABLE IF NOT EXISTS flow_templates (
+        id INTEGER PRIMARY KEY, game_id INTEGER, is_active INTEGER
+    );
+    CREATE INDEX IF NOT EXISTS idx_log_events_game_gid ON log_events(game_gid);
+    CREATE INDEX IF NOT EXISTS idx_event_params_event_id ON event_params(event_id);
+    CREATE INDEX IF NOT EXISTS idx_event_params_param_name ON event_params(param_name);
+"""
+
+# 与 backend/api/routes 中的查询保持一致
+LIST_EVENTS_COUNT = """
+    SELECT COUNT(*) as total FROM log_events le
+    LEFT JOIN event_categories ec ON le.category_id = ec.id
+    WHERE le.game_gid = ?
+"""
+LIST_EVENTS = """
+    SELECT
+        le.*,
+        g.gid, g.name as game_name, g.ods_db,
+        ec.name as category_name,
+        (SELECT COUNT(*) FROM event_params ep
+         WHERE ep.event_id = le.id AND ep.is_active = 1) as param_count
+    FROM log_events le
+    LEFT JOIN games g ON le.game_gid = g.gid
+    LEFT JOIN event_categories ec ON le.category_id = ec.id
+    WHERE le.game_gid = ?
+    ORDER BY le.id DESC LIMIT ? OFFSET ?
+"""
+ALL_PARAMETERS = """
+    SELECT
+        ep.param_name,
+        MIN(ep.param_name_cn) as param_name_cn,
+        pt.base_type,
+        COUNT(DISTINCT ep.event_id) as events_count,
+        COUNT(*) as usage_count,
+        CASE WHEN COUNT(DISTINCT ep.event_id) >= 3 THEN 1 ELSE 0 END as is_common
+    FROM event_params ep
+    JOIN log_events le ON ep.event_id = le.id
+    LEFT JOIN param_templates pt ON ep.template_id = pt.id
+    WHERE le.game_gid = ? AND ep.is_active = 1
+    GROUP BY ep.param_name, pt.base_type
+    ORDER BY usage_count DESC, ep.param_name ASC
+    LIMIT ? OFFSET ?
+"""
+ALL_PARAMETERS_COUNT = """
+    SELECT COUNT(DISTINCT ep.param_name) as total
+    FROM event_params ep
+    JOIN log_events le ON ep.event_id = le.id
+    LEFT JOIN param_templates pt ON ep.template_id = pt.id
+    WHERE le.game_gid = ? AND ep.is_active = 1
+"""
+LIST_GAMES = """
+    SELECT
+        g.id, g.gid, g.name, g.ods_db, g.icon_path, g.created_at, g.updated_at,
+        COUNT(DISTINCT le.id) as event_count,
+        COUNT(DISTINCT CASE WHEN ep.is_active = 1 THEN ep.id END) as param_count,
+        COUNT(DISTINCT enc.id) as event_node_count,
+        COUNT(DISTINCT CASE WHEN ft.is_active = 1 THEN ft.id END) as flow_template_count
+    FROM games g
+    LEFT JOIN log_events le ON le.game_gid = g.gid
+    LEFT JOIN event_params ep ON ep.event_id = le.id
+    LEFT JOIN event_node_configs enc ON enc.game_gid = CAST(g.gid AS INTEGER)
+    LEFT JOIN flow_templates ft ON ft.game_id = g.id
+    GROUP BY g.id, g.gid, g.name, g.ods_db, g.icon_path, g.created_at, g.updated_at
+    ORDER BY g.id
+"""
+
+
+def gid_of(game_index):
+    return str(10000000 + game_index)
+
+
+def build_database(path, rows, games, params_per_event):
+    """构造合成数据（已存在且行数足够时跳过）"""
+    conn = get_db_connection(path, profile="bulk_import")
+    try:
+        conn.executescript(SCHEMA)
+        existing = conn.execute("SELECT COUNT(*) FROM event_params").fetchone()[0]
+        if existing >= rows:
+            print(f"复用已有数据: {existing}行 event_params")
+            return
+
+        rng = random.Random(42)
+        events = max(rows // params_per_event, 1)
+        start = time.perf_counter()
+        conn.executemany(
+            "INSERT INTO games VALUES (?, ?, ?, 'ieu_ods', NULL, '2026-01-01', '2026-01-01')",
+            [(g + 1, gid_of(g), f"game_{g}") for g in range(games)],
+        )
+        conn.executemany(
+            "INSERT INTO event_categories VALUES (?, ?)", [(c, f"分类{c}") for c in range(1, 21)]
+        )
+        conn.executemany(
+            "INSERT INTO param_templates VALUES (?, ?)",
+            [(t, rng.choice(["string", "int", "bigint", "double"])) for t in range(1, 101)],
+        )
+        conn.executemany(
+            "INSERT INTO log_events VALUES (?, ?, ?, ?, ?, 'ods_src', 'dwd_tgt')",
+            [
+                (e, gid_of(e % games), f"event_{e}", f"事件{e}", e % 20 + 1)
+                for e in range(1, events + 1)
+            ],
+        )
+        # 参数名取自一个共享词表，分组去重有真实的重复度
+        vocabulary = [f"param_{i}" for i in range(params_per_event * 20)]
+        batch = []
+        for e in range(1, events + 1):
+            for name in rng.sample(vocabulary, params_per_event):
+                batch.append(
+                    (e, name, f"{name}中文", rng.randint(1, 100), int(rng.random() > 0.05))
+                )
+            if len(batch) >= 50000:
+                conn.executemany(
+                    "INSERT INTO event_params (event_id, param_name, param_name_cn, template_id,"
+                    " is_active) VALUES (?, ?, ?, ?, ?)",
+                    batch,
+                )
+                batch.clear()
+        if batch:
+            conn.executemany(
+                "INSERT INTO event_params (event_id, param_name, param_name_cn, template_id,"
+                " is_active) VALUES (?, ?, ?, ?, ?)",
+                batch,
+            )
+        conn.executemany(
+            "INSERT INTO event_node_configs (game_gid) VALUES (?)",
+            [(int(gid_of(g % games)),) for g in range(games * 5)],
+        )
+        conn.executemany(
+            "INSERT INTO flow_templates (game_id, is_active) VALUES (?, 1)",
+            [(g % games + 1,) for g in range(games * 3)],
+        )
+        conn.commit()
+        conn.execute("ANALYZE")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        total = conn.execute("SELECT COUNT(*) FROM event_params").fetchone()[0]
+        print(
+            f"构造完成: {events}个事件, {total}行 event_params ({time.perf_counter() - start:.1f}s)"
+        )
+    finally:
+        conn.close()
+
+
+def replay(conn, games):
+    """回放一轮热点查询，返回 {查询名: 耗时ms}"""
+    timings = {}
+    gid = gid_of(games // 2)
+
+    def timed(name, sql, params=()):
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        timings[name] = timings.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    for page in range(3):
+        timed("api_list_events", LIST_EVENTS_COUNT, (gid,))
+        timed("api_list_events", LIST_EVENTS, (gid, 20, page * 20))
+    timed("api_get_all_parameters", ALL_PARAMETERS, (gid, 50, 0))
+    timed("api_get_all_parameters", ALL_PARAMETERS_COUNT, (gid,))
+    timed("api_list_games", LIST_GAMES)
+    return timings
+
+
+def bulk_insert(conn, rows):
+    """批量写入临时表，返回耗时ms"""
+    conn.execute("DROP TABLE IF EXISTS bench_import")
+    conn.execute(
+        "CREATE TABLE bench_import (id INTEGER PRIMARY KEY, event_id INTEGER, param_name TEXT)"
+    )
+    conn.execute("CREATE INDEX idx_bench_import_event_id ON bench_import(event_id)")
+    conn.commit()
+    start = time.perf_counter()
+    for offset in range(0, rows, 5000):
+        conn.executemany(
+            "INSERT INTO bench_import (event_id, param_name) VALUES (?, ?)",
+            [(i % 997, f"param_{i % 311}") for i in range(offset, min(offset + 5000, rows))],
+        )
+        conn.commit()
+    elapsed = (time.perf_counter() - start) * 1000
+    conn.execute("DROP TABLE bench_import")
+    conn.commit()
+    return elapsed
+
+
+def open_connection(path, profile):
+    """打开指定配置的新连接；baseline 只应用 PRAGMA_SETTINGS"""
+    if profile != "baseline":
+        return get_db_connection(path, profile=profile)
+    conn = sqlite3.connect(str(path))
+    conn.row_factory = sqlite3.Row
+    for key, value in PRAGMA_SETTINGS.items():
+        conn.execute(f"PRAGMA {key}={value}")
+    return conn
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite性能配置基准测试")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="event_params行数（默认100万）")
+    parser.add_argument("--games", type=int, default=50, help="游戏数量（默认50）")
+    parser.add_argument("--params-per-event", type=int, default=20, help="每个事件的参数数量")
+    parser.add_argument("--rounds", type=int, default=5, help="每个配置的回放轮数（默认5）")
+    parser.add_argument("--insert-rows", type=int, default=200_000, help="批量写入行数")
+    parser.add_argument("--db-path", default=None, help="数据库路径（默认临时目录，可复用）")
+    parser.add_argument(
+        "--profiles",
+        default=",".join(["baseline", *DatabaseConfig.DB_PROFILES]),
+        help="逗号分隔的配置名（baseline 为引入性能配置之前的设置）",
+    )
+    args = parser.parse_args()
+
+    tmpdir = tempfile.TemporaryDirectory()
+    path = Path(args.db_path) if args.db_path else Path(tmpdir.name) / "profile_bench.db"
+    # 每个配置使用独立的新连接，不经过连接池
+    DatabaseConfig.DB_POOL_ENABLED = False
+    build_database(path, args.rows, args.games, args.params_per_event)
+
+    print("=" * 78)
+    print(f"SQLite性能配置基准测试: {path} ({path.stat().st_size / 1024 / 1024:.0f}MB)")
+    print("=" * 78)
+
+    results = []
+    for profile in [p.strip() for p in args.profiles.split(",") if p.strip()]:
+        conn = open_connection(path, profile)
+        try:
+            rounds = [replay(conn, args.games) for _ in range(args.rounds)]
+            insert_ms = bulk_insert(conn, args.insert_rows) if args.insert_rows else 0.0
+        finally:
+            conn.close()
+        for name in rounds[0]:
+            cold = rounds[0][name]
+            warm = statistics.median(r[name] for r in rounds[1:]) if len(rounds) > 1 else cold
+            results.append((profile, name, cold, warm))
+        if args.insert_rows:
+            results.append((profile, f"批量写入{args.insert_rows}行", insert_ms, insert_ms))
+
+    print(f"{'配置':<14}{'查询':<28}{'冷连接(ms)':>14}{'稳态中位数(ms)':>18}")
+    print("-" * 78)
+    for profile, name, cold, warm in results:
+        print(f"{profile:<14}{name:<28}{cold:>14.1f}{warm:>18.1f}")
+    print("-" * 78)
+
+    tmpdir.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
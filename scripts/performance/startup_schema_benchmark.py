@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动阶段schema管理基准测试：每个worker的冷启动耗时
+
+模拟N个gunicorn worker同时启动，分别测量：
+- legacy: 每个worker都执行 init_db → migrate_db → create_indexes → FTS索引 → 统计计数器
+- first deploy: ensure_schema()，数据库尚无指纹（一个worker完整执行，其余等锁后跳过）
+- restart: ensure_schema()，指纹匹配（只读快速路径）
+
+数据库为临时文件：先完整建库并写入少量数据，每个场景前复制一份。
+
+用法:
+    python scripts/performance/startup_schema_benchmark.py
+    python scripts/performance/startup_schema_benchmark.py --workers 8 --events 20000
+"""
+
+import argparse
+import multiprocessing
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加项目根路径
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.core.database import close_all_pools  # noqa: E402
+from backend.core.database.bootstrap import ensure_schema  # noqa: E402
+from backend.core.database.database import create_indexes, init_db, migrate_db  # noqa: E402
+from backend.core.database.fulltext import ensure_search_indexes  # noqa: E402
+from backend.core.database.stats import ensure_stats_tables  # noqa: E402
+
+
+def legacy_startup(path):
+    """改造前 web_app.py 的启动流程"""
+    init_db(path)
+    migrate_db(path)
+    create_indexes(path)
+    ensure_search_indexes(path)
+    ensure_stats_tables(path)
+
+
+def worker(mode, path, barrier, results):
+    barrier.wait()
+    start = time.perf_counter()
+    if mode == "legacy":
+        legacy_startup(path)
+        path_taken = "legacy"
+    else:
+        path_taken = ensure_schema(path)["path"]
+    results.put(((time.perf_counter() - start) * 1000, path_taken))
+    close_all_pools()
+
+
+def run_workers(mode, path, workers):
+    """同时启动N个进程，返回每个进程的 (耗时ms, 路径)"""
+    ctx = multiprocessing.get_context("fork")
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=worker, args=(mode, path, barrier, results)) for _ in range(workers)
+    ]
+    for p in processes:
+        p.start()
+    samples = [results.get() for _ in processes]
+    for p in processes:
+        p.join()
+    return samples
+
+
+def build_template(path, events):
+    """完整建库并写入数据"""
+    legacy_startup(path)
+    close_all_pools()
+    conn = sqlite3.connect(str(path))
+    rng = random.Random(7)
+    conn.executemany(
+        "INSERT INTO games (gid, name, ods_db) VALUES (?, ?, 'ieu_ods')",
+        [(str(10000 + g), f"game_{g}") for g in range(20)],
+    )
+    conn.executemany(
+        "INSERT INTO log_events (game_id, game_gid, event_name, event_name_cn, source_table,"
+        " target_table) VALUES (1, ?, ?, ?, 'src', 'dst')",
+        [(10000 + rng.randrange(20), f"event_{i}", f"事件{i}") for i in range(events)],
+    )
+    conn.executemany(
+        "INSERT INTO event_params (event_id, param_name, template_id) VALUES (?, ?, 1)",
+        [(rng.randrange(1, events + 1), f"param_{i}") for i in range(events * 5)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动阶段schema管理基准测试")
+    parser.add_argument("--workers", type=int, default=4, help="同时启动的worker数（默认4）")
+    parser.add_argument("--events", type=int, default=10000, help="事件数量（默认1万）")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.TemporaryDirectory()
+    template = Path(tmpdir.name) / "template.db"
+    build_template(template, args.events)
+
+    scenarios = []
+    for label, mode, prepare in (
+        ("legacy (每个worker完整执行)", "legacy", None),
+        ("first deploy (无指纹)", "schema", None),
+        ("restart (指纹匹配)", "schema", ensure_schema),
+    ):
+        path = Path(tmpdir.name) / f"{mode}_{len(scenarios)}.db"
+        shutil.copy(template, path)
+        if prepare is not None:
+            prepare(path)
+            close_all_pools()
+        scenarios.append((label, run_workers(mode, path, args.workers)))
+
+    print("=" * 78)
+    print(f"启动schema管理: {args.workers}个worker并发启动, {args.events}个事件")
+    print("=" * 78)
+    print(f"{'场景':<28}{'p50(ms)':>10}{'max(ms)':>10}{'sum(ms)':>10}  路径")
+    print("-" * 78)
+    for label, samples in scenarios:
+        times = [ms for ms, _ in samples]
+        paths = ",".join(sorted(p for _, p in samples))
+        print(
+            f"{label:<28}{statistics.median(times):>10.1f}{max(times):>10.1f}"
+            f"{sum(times):>10.1f}  {paths}"
+        )
+
+    tmpdir.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+write-behind队列基准测试：并发小写入的吞吐量与延迟
+
+模拟多个请求线程同时保存HQL历史（每次一条INSERT），分别测量：
+- sync: 每条写入独立提交（改造前 execute_write / save_history 的行为）
+- write-behind (等待): submit_write(...).result()，调用方等待所在批次提交
+- write-behind (不等待): submit_write(...) 直接返回，最后统一 flush
+
+数据库为临时文件，使用连接池默认的PRAGMA配置（WAL）。
+
+用法:
+    python scripts/performance/write_behind_benchmark.py
+    python scripts/performance/write_behind_benchmark.py --threads 16 --writes 200 --batch-ms 10
+"""
+
+import argparse
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# 添加项目根路径
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.core.config import DatabaseConfig  # noqa: E402
+from backend.core.database import close_all_pools  # noqa: E402
+from backend.core.database import write_behind  # noqa: E402
+from backend.core.database._constants import HQL_HISTORY_TABLE_SQL  # noqa: E402
+
+INSERT_SQL = """
+    INSERT INTO hql_history (user_id, session_id, events_json, fields_json, mode, hql)
+    VALUES (?, ?, '[]', '[]', 'single', ?)
+"""
+
+
+def run(db_path, threads, writes, wait):
+    """N个线程各写入M条，返回 (总耗时ms, 每次调用的延迟列表ms, 失败数)"""
+    latencies = []
+    failures = []
+    futures = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def worker(index):
+        local, local_futures, failed = [], [], 0
+        barrier.wait()
+        for i in range(writes):
+            start = time.perf_counter()
+            future = write_behind.submit_write(
+                INSERT_SQL, (index, f"s{index}", f"SELECT {i}"), db_path=db_path
+            )
+            if wait:
+                try:
+                    future.result()
+                except Exception:
+                    failed += 1
+            else:
+                local_futures.append(future)
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local)
+            futures.extend(local_futures)
+            failures.append(failed)
+
+    workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    write_behind.flush_writes()
+    elapsed = (time.perf_counter() - start) * 1000
+    failed = sum(failures) + sum(1 for f in futures if f.exception() is not None)
+    return elapsed, latencies, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="write-behind队列基准测试")
+    parser.add_argument("--threads", type=int, default=8, help="并发写线程数（默认8）")
+    parser.add_argument("--writes", type=int, default=200, help="每个线程的写入次数（默认200）")
+    parser.add_argument("--batch-ms", type=float, default=20, help="批次时间窗口ms（默认20）")
+    parser.add_argument("--batch-size", type=int, default=200, help="批次最大语句数（默认200）")
+    args = parser.parse_args()
+
+    DatabaseConfig.DB_WRITE_BEHIND_BATCH_MS = args.batch_ms
+    DatabaseConfig.DB_WRITE_BEHIND_BATCH_SIZE = args.batch_size
+
+    tmpdir = tempfile.TemporaryDirectory()
+    results = []
+    for label, enabled, wait in (
+        ("sync (逐条提交)", False, True),
+        ("write-behind (等待)", True, True),
+        ("write-behind (不等待)", True, False),
+    ):
+        db_path = Path(tmpdir.name) / f"bench_{len(results)}.db"
+        with sqlite3.connect(str(db_path)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(HQL_HISTORY_TABLE_SQL)
+        DatabaseConfig.DB_WRITE_BEHIND_ENABLED = enabled
+        elapsed, latencies, failed = run(db_path, args.threads, args.writes, wait)
+        queue_stats = write_behind.get_write_queue_stats().get(str(db_path), {})
+        results.append((label, elapsed, latencies, failed, queue_stats.get("batches", "-")))
+        close_all_pools()
+
+    total = args.threads * args.writes
+    print("=" * 86)
+    print(f"并发小写入: {args.threads}个线程 × {args.writes}次 = {total}条INSERT")
+    print("=" * 86)
+    print(
+        f"{'场景':<24}{'总耗时(ms)':>12}{'写入/秒':>10}{'p50(ms)':>10}"
+        f"{'p99(ms)':>10}{'提交次数':>10}{'失败':>6}"
+    )
+    print("-" * 86)
+    for label, elapsed, latencies, failed, batches in results:
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        commits = total if batches == "-" else batches
+        print(
+            f"{label:<24}{elapsed:>12.1f}{total / elapsed * 1000:>10.0f}"
+            f"{statistics.median(latencies):>10.2f}{p99:>10.2f}{commits:>10}{failed:>6}"
+        )
+
+    tmpdir.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
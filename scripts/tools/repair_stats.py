@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+统计计数器修复任务
+
+game_stats / event_stats 由SQLite触发器实时维护；绕过触发器的批量导入、手工改库
+或从备份恢复后可能产生偏差。本脚本按源表全量重算计数器，输出被修正的行数。
+可放入cron定期执行（正常情况下输出 0/0）。
+
+用法:
+    python scripts/tools/repair_stats.py
+    python scripts/tools/repair_stats.py --db /path/to/dwd_generator.db
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根路径
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.core.config import get_db_path  # noqa: E402
+from backend.core.database.stats import ensure_stats_tables, repair_stats  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="统计计数器修复任务")
+    parser.add_argument("--db", help="数据库路径（默认使用配置中的数据库）")
+    args = parser.parse_args()
+
+    db_path = Path(args.db) if args.db else get_db_path()
+    if not db_path.exists():
+        print(f"❌ 数据库不存在: {db_path}", file=sys.stderr)
+        return 1
+
+    status = ensure_stats_tables(db_path)
+    for table, result in status.items():
+        print(f"  {table}: {result}")
+
+    start = time.perf_counter()
+    drift = repair_stats(db_path)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if drift["games"] or drift["events"]:
+        print(f"⚠️  已修正: {drift['games']}个游戏, {drift['events']}个事件 ({elapsed_ms:.0f}ms)")
+    else:
+        print(f"✅ 计数器无偏差 ({elapsed_ms:.0f}ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
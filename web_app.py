@@ -9,11 +9,11 @@ from pathlib import Path
 import os
 from flask import Flask, render_template, send_from_directory
 from flask_caching import Cache
-from backend.core.database import init_db, migrate_db, get_db_connection, create_indexes
+from backend.core.database import get_db_connection, init_connection_pool, ensure_schema
 from backend.core.config import get_db_path, FlaskConfig, CacheConfig, BASE_DIR, OUTPUT_DIR
 from backend.core.logging import get_logger
 from backend.core.utils import fetch_all_as_dict, fetch_one_as_dict
-from backend.core.cache.cache_system import cache_result
+from backend.core.cache.cache_system import cache_result, hierarchical_cache
 from backend.core.cache.cache_warmer import cache_warmer
 
 # Initialize logger early
@@ -31,6 +31,7 @@ from backend.services.events import events_bp, event_nodes_bp
 from backend.services.parameters import common_params_bp, parameter_aliases_bp
 from backend.services.canvas import canvas_bp
 from backend.services.cache_monitor import cache_monitor_bp
+from backend.services.query_profiler import query_profiler_bp
 from backend.services.event_node_builder import event_node_builder_bp  # Event Node Builder API
 
 # Optional blueprints (may not exist in all deployments)
@@ -138,7 +139,29 @@ try:
         logger.warning("⚠️ Redis缓存连接异常")
 except Exception as e:
     logger.error(f"❌ Redis缓存初始化失败: {e}")
-    logger.warning("⚠️ 应用将在无缓存模式下运行")
+    if CacheConfig.CACHE_L2_FALLBACK == 'sqlite' and app.config['CACHE_TYPE'] == 'RedisCache':
+        # 单机降级：所有worker共享同一个SQLite缓存文件，而不是各自一份内存缓存
+        try:
+            cache = Cache(app, config={
+                'CACHE_TYPE': CacheConfig.CACHE_TYPE_SQLITE,
+                'CACHE_SQLITE_PATH': CacheConfig.CACHE_SQLITE_PATH,
+            })
+            app.cache = cache
+            logger.warning(f"⚠️ 已降级为SQLite共享L2缓存: {CacheConfig.CACHE_SQLITE_PATH}")
+        except Exception as fallback_error:
+            logger.error(f"❌ SQLite L2缓存初始化失败: {fallback_error}")
+            logger.warning("⚠️ 应用将在无缓存模式下运行")
+    else:
+        logger.warning("⚠️ 应用将在无缓存模式下运行")
+
+# 跨worker L1失效总线（每个worker一个订阅线程）
+try:
+    hierarchical_cache.init_invalidation_bus(app)
+except Exception as e:
+    logger.warning(f"⚠️ L1失效总线启动失败: {e}")
+
+# Return pooled SQLite connections a request left checked out
+init_connection_pool(app)
 
 # Register security middleware
 try:
@@ -238,36 +261,20 @@ def index():
         </ul>
         """, 200
 
-# Initialize database (always call init_db first to ensure schema exists)
-db_initialized = False
-if not Path(get_db_path()).exists():
-    db_initialized = True
-    logger.info(f"Creating new database at {get_db_path()}")
-
-# Always call init_db() to ensure all tables exist (CREATE TABLE IF NOT EXISTS is safe)
-init_db()
-if db_initialized:
-    logger.info("Database initialized successfully")
+# Initialize / migrate the database schema. Runs the full init_db -> migrate_db ->
+# create_indexes -> FTS / stats setup once per schema change under a file lock; other
+# workers and later restarts only compare the stored schema fingerprint.
+schema_report = ensure_schema()
+if schema_report["created"]:
+    logger.info(f"Created new database at {get_db_path()}")
+if schema_report["path"] == "full":
+    steps = ", ".join(f"{k[:-3]}={v:.0f}ms" for k, v in schema_report.items() if k.endswith("_ms"))
+    logger.info(f"Database schema set up ({steps})")
 else:
-    logger.info(f"Using existing database at {get_db_path()}")
-
-# Run database migrations (for both new and existing databases)
-try:
-    migrate_db()
-    logger.info("Database migrations completed successfully")
-except Exception as e:
-    logger.error(f"Database migration failed: {e}")
-    raise
-
-# Create indexes for performance optimization
-try:
-    create_indexes()
-    if db_initialized:
-        logger.info("Database indexes created successfully")
-    else:
-        logger.info("Database indexes verified/updated")
-except Exception as e:
-    logger.warning(f"Could not create database indexes: {e}")
+    logger.info(
+        f"Database schema up to date ({schema_report['path']} path, "
+        f"{schema_report['total_ms']:.1f}ms) at {get_db_path()}"
+    )
 
 # Register all blueprints
 # Note: Register API blueprints first, then React shell as catch-all
@@ -278,6 +285,7 @@ app.register_blueprint(event_node_builder_bp)  # Event Node Builder API (/event_
 if bulk_bp:
     app.register_blueprint(bulk_bp)  # Bulk operations
 app.register_blueprint(cache_monitor_bp)  # Cache monitoring (/admin/cache/*)
+app.register_blueprint(query_profiler_bp)  # SQL query profiling (/admin/db/queries*)
 app.register_blueprint(canvas_bp)  # Canvas pages and API (/canvas/*, /api/canvas/*)
 app.register_blueprint(event_nodes_bp)  # Event nodes management
 app.register_blueprint(parameter_aliases_bp)  # Parameter aliases
@@ -374,9 +382,16 @@ def internal_server_error(error):
 # Use app.app_context() to ensure cache utilities can access current_app
 try:
     with app.app_context():
+        # Replays the hot-key snapshot, then the baseline set, in a background thread
         cache_warmer.warmup_on_startup(warm_all_events=False)
         # Start periodic cache warming (every 1 hour)
         cache_warmer.start_periodic_warmup(interval_hours=1)
+    # Periodically persist the top-K hot keys for the next restart
+    hierarchical_cache.hotkeys.start_snapshots(
+        CacheConfig.CACHE_HOTKEY_SNAPSHOT_PATH,
+        CacheConfig.CACHE_HOTKEY_SNAPSHOT_INTERVAL,
+        loader_for=hierarchical_cache.loader_for,
+    )
 except Exception as e:
     logger.warning(f"⚠️ 缓存预热失败: {e}")
     logger.info("应用将在无预热缓存模式下运行")